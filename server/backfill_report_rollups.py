@@ -0,0 +1,40 @@
+# server/backfill_report_rollups.py
+import argparse
+from datetime import date
+
+from config.database import SessionLocal, Base, engine
+from services.report_rollup_service import ReportRollupService
+from repositories.report_rollup_repository import ROLLUP_KINDS
+
+
+def backfill_report_rollups():
+    parser = argparse.ArgumentParser(description="Rebuild the daily report rollups from raw rows")
+    parser.add_argument("--start", type=date.fromisoformat, help="First day (YYYY-MM-DD), default: first day with data")
+    parser.add_argument("--end", type=date.fromisoformat, help="Last day (YYYY-MM-DD), default: yesterday")
+    parser.add_argument("--kind", action="append", choices=ROLLUP_KINDS, help="Rollup kind, repeatable (default: all)")
+    parser.add_argument("--stale-only", action="store_true", help="Only rebuild days invalidated since their last build")
+    args = parser.parse_args()
+
+    # Rollup tables may not exist yet on an older database
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        service = ReportRollupService(db)
+        if args.stale_only:
+            rebuilt = service.refresh()
+            for kind, days in rebuilt.items():
+                print(f"✅ {kind}: {days} stale days rebuilt")
+        else:
+            summary = service.backfill(args.start, args.end, args.kind)
+            for kind, result in summary.items():
+                print(f"✅ {kind}: {result['days']} days, {result['rows']} rows")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    backfill_report_rollups()
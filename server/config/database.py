@@ -54,6 +54,7 @@ try:
     from models.delivery.delivery_person import DeliveryPerson
     from models.delivery.delivery import Delivery
     from models.delivery.delivery_earnings import DeliveryEarnings
+    from models.delivery.delivery_location_history import DeliveryLocationHistory
     
     # 7. Marketing
     from models.marketing.coupon import Coupon
@@ -80,11 +81,38 @@ try:
     from models.analytics.search_history import SearchHistory
     from models.analytics.admin_activity_log import AdminActivityLog
     from models.analytics.user_sessions import UserSession
+    from models.analytics.report_rollups import ReportRollupDay
+    from models.analytics.api_request_rollups import ApiRequestHourly, ApiRequestLatencyHourly
     from models.feedback.feedback import Feedback, FeedbackResponse
-    from models.notification import Notification
+    from models.notification import Notification, NotificationBroadcast, NotificationFeedCursor, NotificationCounter
     from models.feedback.user_issue import UserIssue
+    from models.outbox import OutboxJob
     
     print("✅ All models imported successfully")
+    
+    # Report rollups follow order, delivery and purchase writes on every session
+    from repositories.report_rollup_repository import register_rollup_listeners
+    register_rollup_listeners()
+    
+    # Dispatch rider index follows committed rider location / online changes
+    from repositories.delivery_panel.delivery_dispatch_repository import register_dispatch_listeners
+    register_dispatch_listeners()
+    
+    # Cached available-deliveries feed is dropped when the pool changes
+    from repositories.delivery_panel.delivery_available_repository import register_available_feed_listeners
+    register_available_feed_listeners()
+
+    # Unread / total notification counters follow notification writes
+    from repositories.notification_counter_repository import register_notification_counter_listeners
+    register_notification_counter_listeners()
+
+    # Outbox workers wake up when a transaction that enqueued jobs commits
+    from repositories.outbox_repository import register_outbox_listeners
+    register_outbox_listeners()
+
+    # WebSocket / SSE events are published only once their transaction commits
+    from utils.event_hub import register_event_listeners
+    register_event_listeners()
 except Exception as e:
     print(f"❌ Error importing models: {e}")
     import traceback
@@ -97,6 +125,52 @@ def get_db():
     finally:
         db.close()
 
+def ensure_columns():
+    """
+    Add nullable model columns that are missing from already existing tables.
+    """
+    from sqlalchemy import inspect, text
+    
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    preparer = engine.dialect.identifier_preparer
+    added = 0
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present or not column.nullable or column.primary_key:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text(
+                        f"ALTER TABLE {preparer.format_table(table)} "
+                        f"ADD COLUMN {preparer.format_column(column)} {column_type}"
+                    ))
+                added += 1
+            except Exception as e:
+                print(f"⚠️ Could not add column {table.name}.{column.name}: {e}")
+    print(f"✅ Columns verified ({added} added)")
+
+def ensure_indexes():
+    """
+    Create model-declared indexes that are missing from already existing tables.
+    """
+    from sqlalchemy.schema import CreateIndex
+    
+    checked = 0
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(CreateIndex(index, if_not_exists=True))
+                checked += 1
+            except Exception as e:
+                print(f"⚠️ Could not create index {index.name}: {e}")
+    print(f"✅ Indexes verified ({checked} checked)")
+
 def init_db():
     """
     Initialize database tables manually.
@@ -110,6 +184,19 @@ def init_db():
         Base.metadata.create_all(bind=engine)
         print("✅ All tables created successfully!")
         
+        # create_all skips columns and indexes on tables that already exist
+        ensure_columns()
+        ensure_indexes()
+        
+        # Full-text / trigram product search indexes (PostgreSQL only)
+        from repositories.product_catalog.product_search_repository import ProductSearchRepository
+        ProductSearchRepository.ensure_search_indexes(engine)
+        
+        # Monthly notification partitions, once the table has been converted with
+        # `python -m repositories.notification_retention_repository --partition` (PostgreSQL only)
+        from repositories.notification_retention_repository import NotificationRetentionRepository
+        NotificationRetentionRepository.ensure_partitions(engine)
+        
         # Verify tables were created
         from sqlalchemy import inspect
         inspector = inspect(engine)
@@ -2,8 +2,11 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from jose import jwt, JWTError
-from config.database import get_db
+from config.database import get_db, SessionLocal
 from models.user import User
+from repositories.auth_repository import AuthRepository
+from utils.cache import cache
+from typing import Optional, Tuple, Union
 import os
 
 security = HTTPBearer()
@@ -11,6 +14,78 @@ security = HTTPBearer()
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "aotisbest")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 
+# Resolved principals are cached briefly; role/user/delivery-person writes invalidate them
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+PRINCIPAL_NAMESPACE = "auth.principal"
+TAG_PRINCIPALS = "auth:principals"
+
+
+# -------------------------
+# PRINCIPAL
+# -------------------------
+class Principal:
+    """
+    Lightweight authenticated user handed to route handlers instead of the ORM User.
+
+    Carries only what authorization needs, so role guards never touch the database.
+    Load the full User through a repository when profile fields are needed.
+    """
+
+    __slots__ = ("user_id", "is_active", "roles", "delivery_person_id", "delivery_status")
+
+    def __init__(
+        self,
+        user_id: int,
+        is_active: bool = True,
+        roles: Tuple[str, ...] = (),
+        delivery_person_id: Optional[int] = None,
+        delivery_status: Optional[str] = None
+    ):
+        self.user_id = user_id
+        self.is_active = is_active
+        self.roles = roles
+        self.delivery_person_id = delivery_person_id
+        self.delivery_status = delivery_status
+
+    def has_role(self, role_name: str) -> bool:
+        return role_name.lower() in self.roles
+
+    def __repr__(self) -> str:
+        return f"Principal(user_id={self.user_id}, roles={list(self.roles)})"
+
+
+def _principal_key(user_id: int) -> str:
+    return f"principal:{user_id}"
+
+
+def load_principal(db: Session, user_id: int) -> Optional[Principal]:
+    """Resolve user id -> Principal with one query, cached for PRINCIPAL_CACHE_TTL seconds"""
+    key = _principal_key(user_id)
+    principal = cache.get(PRINCIPAL_NAMESPACE, key)
+    if isinstance(principal, Principal):
+        return principal
+
+    rows = AuthRepository.get_principal_rows(db, user_id)
+    if not rows:
+        return None
+
+    first = rows[0]
+    roles = tuple(sorted({row.role_name.lower() for row in rows if row.role_name}))
+    principal = Principal(
+        user_id=first.user_id,
+        is_active=first.is_active is not False,
+        roles=roles,
+        delivery_person_id=first.delivery_person_id,
+        delivery_status=first.status
+    )
+    cache.set(PRINCIPAL_NAMESPACE, key, principal, PRINCIPAL_CACHE_TTL, (key, TAG_PRINCIPALS))
+    return principal
+
+
+def invalidate_principal(user_id: Optional[int] = None) -> None:
+    """Forget one cached principal, or all of them when user_id is None (role-wide changes)"""
+    cache.invalidate_tags(_principal_key(user_id) if user_id is not None else TAG_PRINCIPALS)
+
 
 # -------------------------
 # JWT: Decode + extract user
@@ -29,10 +104,35 @@ def verify_token(token: str, credentials_exception):
         raise credentials_exception
 
 
+def principal_from_token(token: Optional[str]) -> Optional[Principal]:
+    """
+    Principal for a raw bearer token, or None if it is invalid or the user is inactive.
+
+    For long-lived connections (WebSocket, EventSource) that cannot send an
+    Authorization header; uses its own short session so no pooled connection is
+    held for the life of the stream.
+    """
+    if not token:
+        return None
+    try:
+        user_id = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM]).get("user_id")
+    except JWTError:
+        return None
+    if user_id is None:
+        return None
+
+    db = SessionLocal()
+    try:
+        principal = load_principal(db, user_id)
+    finally:
+        db.close()
+    return principal if principal and principal.is_active else None
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
+) -> Principal:
 
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -43,19 +143,22 @@ def get_current_user(
     token = credentials.credentials
     decoded = verify_token(token, credentials_exception)
 
-    user = db.query(User).filter(User.user_id == decoded["user_id"]).first()
+    principal = load_principal(db, decoded["user_id"])
 
-    if not user:
+    if not principal:
         raise credentials_exception
 
-    return user
+    return principal
 
 
 # -------------------------
 # ROLE CHECK UTILS
 # -------------------------
-def user_has_role(user: User, required_role: str) -> bool:
+def user_has_role(user: Union[Principal, User], required_role: str) -> bool:
     """Check if user has a specific role using UserRole + Role tables."""
+    if isinstance(user, Principal):
+        return user.has_role(required_role)
+
     if not user.roles:
         return False
 
@@ -69,19 +172,19 @@ def user_has_role(user: User, required_role: str) -> bool:
 # -------------------------
 # ROLE VALIDATORS
 # -------------------------
-def is_admin(current_user: User = Depends(get_current_user)):
+def is_admin(current_user: Principal = Depends(get_current_user)):
     if not user_has_role(current_user, "admin"):
         raise HTTPException(status_code=403, detail="Admin access required")
     return current_user
 
 
-def is_customer(current_user: User = Depends(get_current_user)):
+def is_customer(current_user: Principal = Depends(get_current_user)):
     if not user_has_role(current_user, "customer"):
         raise HTTPException(status_code=403, detail="Customer access required")
     return current_user
 
 
-def is_delivery_person(current_user: User = Depends(get_current_user)):
+def is_delivery_person(current_user: Principal = Depends(get_current_user)):
     if not user_has_role(current_user, "delivery"):
         raise HTTPException(status_code=403, detail="Delivery person access required")
     return current_user
@@ -90,9 +193,10 @@ def is_delivery_person(current_user: User = Depends(get_current_user)):
 # -------------------------
 # DELIVERY PERSON OR NONE
 # -------------------------
-def get_delivery_person_or_none(current_user: User = Depends(get_current_user)):
+def get_delivery_person_or_none(current_user: Principal = Depends(get_current_user)):
     """
-    Return delivery person user if role = 'delivery'
+    Return delivery person principal if role = 'delivery'
+    (carries delivery_person_id and delivery_status).
     Return None otherwise.
     Does NOT block access (no 403).
     """
@@ -20,11 +20,13 @@ class CheckoutController:
     @staticmethod
     def confirm_checkout(user_id: int, data: ConfirmCheckoutRequest, db: Session):
         try:
-            order = CheckoutService.confirm_order(
+            order_id = CheckoutService.confirm_order(
                 db=db,
                 user_id=user_id,
                 data=data
             )
-            return {"message": "Order placed", "order_id": order.order_id}
+            return {"message": "Order placed", "order_id": order_id}
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=400, detail=str(e))
@@ -61,6 +61,10 @@ class DeliveryAdminController:
         """Admin manually sends notification to specific delivery person"""
         return self.service.notifyDeliveryPerson(notification_data)
     
+    def dispatchDelivery(self, delivery_id):
+        """Admin offers delivery to nearest riders"""
+        return self.service.dispatchDelivery(delivery_id)
+    
     def cancelDeliveryAdmin(self, delivery_id):
         """Admin cancels delivery"""
         return self.service.cancelDeliveryAdmin(delivery_id)
\ No newline at end of file
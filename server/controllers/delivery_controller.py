@@ -44,10 +44,18 @@ class DeliveryController:
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
     
-    def get_all_deliveries(self, page: int = 1, per_page: int = 20, status: Optional[str] = None) -> Dict[str, Any]:
+    def get_all_deliveries(
+        self,
+        page: int = 1,
+        per_page: int = 20,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Get all deliveries"""
         try:
-            return self.service.get_all_deliveries(page, per_page, status)
+            return self.service.get_all_deliveries(page, per_page, status, cursor)
+        except HTTPException as e:
+            raise e
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
     
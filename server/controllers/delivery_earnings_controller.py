@@ -32,6 +32,11 @@ class DeliveryEarningsController:
     
     def _get_delivery_person_id(self, current_user: User) -> int:
         """Get delivery person ID from user"""
+        # The auth principal already carries it; only fall back to a lookup for ORM users
+        delivery_person_id = getattr(current_user, "delivery_person_id", None)
+        if delivery_person_id is not None:
+            return delivery_person_id
+        
         delivery_person = self.db.query(DeliveryPerson).filter(
             DeliveryPerson.user_id == current_user.user_id
         ).first()
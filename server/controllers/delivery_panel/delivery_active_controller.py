@@ -2,6 +2,7 @@
 from fastapi import HTTPException, status, Depends
 from sqlalchemy.orm import Session
 from typing import Optional, List
+from datetime import datetime, timedelta
 
 from config.dependencies import get_db, get_current_user, is_delivery_person
 from services.delivery_panel.delivery_active_service import DeliveryActiveService
@@ -9,7 +10,7 @@ from schemas.delivery_panel.delivery_active_schema import (
     ActiveDeliveriesListResponse, DeliveryResponse, StatusUpdateRequest,
     LocationUpdateResponse, CustomerCallResponse, NavigationDataResponse,
     SuccessResponse, DeliveryStatistics, StatusTransitionResponse,
-    ProgressUpdateRequest, DeliveryStatus
+    ProgressUpdateRequest, DeliveryStatus, LocationHistoryResponse
 )
 from models.user import User
 from models.delivery.delivery_person import DeliveryPerson
@@ -25,6 +26,11 @@ class DeliveryActiveController:
     
     def _get_delivery_person_id(self, current_user: User) -> int:
         """Get delivery person ID from user"""
+        # The auth principal already carries it; only fall back to a lookup for ORM users
+        delivery_person_id = getattr(current_user, "delivery_person_id", None)
+        if delivery_person_id is not None:
+            return delivery_person_id
+        
         delivery_person = self.db.query(DeliveryPerson).filter(
             DeliveryPerson.user_id == current_user.user_id
         ).first()
@@ -163,6 +169,26 @@ class DeliveryActiveController:
                 detail=f"Failed to update location: {str(e)}"
             )
     
+    def get_location_history(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        current_user: User = None
+    ) -> LocationHistoryResponse:
+        """Get delivery person's recorded route (last 24 hours by default)"""
+        try:
+            delivery_person_id = self._get_delivery_person_id(current_user)
+            if since is None:
+                since = datetime.now() - timedelta(hours=24)
+            return self.service.get_location_history(delivery_person_id, since, until)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get location history: {str(e)}"
+            )
+    
     # ===== CUSTOMER CALL =====
     
     def get_customer_contact_info(
@@ -1,20 +1,30 @@
 from sqlalchemy.orm import Session
 from services.delivery_panel.delivery_available_service import DeliveryAvailableService
+from services.delivery_panel.delivery_dispatch_service import DeliveryDispatchService
 
 
 class DeliveryAvailableController:
 
     def __init__(self, db: Session):
         self.service = DeliveryAvailableService(db)
+        self.dispatch_service = DeliveryDispatchService(db)
 
-    def get_available_deliveries_for_delivery_person(self):
+    def get_available_deliveries_for_delivery_person(self, delivery_person_id=None, sort="time", if_none_match=None, since=None):
         """Get available deliveries for delivery person"""
-        return self.service.fetchAvailableDeliveries()
+        return self.service.fetchAvailableFeed(delivery_person_id, sort, if_none_match, since)
 
     def accept_delivery(self, delivery_id, delivery_person_id):
         """Accept delivery by delivery person"""
         return self.service.assignDeliveryToPerson(delivery_id, delivery_person_id)
 
+    def claim_deliveries(self, delivery_ids, delivery_person_id):
+        """Accept several deliveries at once"""
+        return self.service.claimDeliveries(delivery_ids, delivery_person_id)
+
     def cancel_delivery(self, delivery_id, delivery_person_id):
         """Cancel delivery by delivery person"""
-        return self.service.cancelDelivery(delivery_id, delivery_person_id)
\ No newline at end of file
+        return self.service.cancelDelivery(delivery_id, delivery_person_id)
+
+    def reject_delivery(self, delivery_id, delivery_person_id):
+        """Reject a delivery offer so it moves on to the next nearest rider"""
+        return self.dispatch_service.reject_offer(delivery_id, delivery_person_id)
@@ -7,7 +7,7 @@ from schemas.delivery_panel.delivery_dashboard_schema import (
     DashboardStats, ActiveDeliveriesResponse, EarningsOverviewResponse,
     TodayScheduleResponse, DeliveryDashboardResponse, NavigationResponse,
     PerformanceMetrics, QRVerifyRequest, IssueReportRequest, 
-    PODUploadRequest, StatusUpdateRequest
+    PODUploadRequest, StatusUpdateRequest, DashboardOverviewResponse
 )
 from models.user import User
 from models.delivery.delivery_person import DeliveryPerson
@@ -23,6 +23,11 @@ class DeliveryDashboardController:
     
     def _get_delivery_person_id(self, current_user: User) -> int:
         """Get delivery person ID from user"""
+        # The auth principal already carries it; only fall back to a lookup for ORM users
+        delivery_person_id = getattr(current_user, "delivery_person_id", None)
+        if delivery_person_id is not None:
+            return delivery_person_id
+        
         delivery_person = self.db.query(DeliveryPerson).filter(
             DeliveryPerson.user_id == current_user.user_id
         ).first()
@@ -87,6 +92,21 @@ class DeliveryDashboardController:
                 detail=f"Failed to get today's schedule: {str(e)}"
             )
     
+    # ===== COMPOSITE DASHBOARD =====
+    
+    def get_dashboard_overview(self, current_user: User, timeout: float) -> DashboardOverviewResponse:
+        """Get all dashboard sections in one call"""
+        try:
+            delivery_person_id = self._get_delivery_person_id(current_user)
+            return self.service.get_dashboard_overview(delivery_person_id, timeout)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get dashboard: {str(e)}"
+            )
+    
     # ===== DELIVERY STATUS UPDATES =====
     
     def update_delivery_status(
@@ -2,7 +2,7 @@ from fastapi import HTTPException, Depends
 from sqlalchemy.orm import Session
 from config.dependencies import get_db
 from services.inventory.stock_service import StockService
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 class StockController:
     
@@ -10,10 +10,12 @@ class StockController:
         self.db = db
         self.service = StockService(db)
     
-    def get_stock_movements(self, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+    def get_stock_movements(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Dict[str, Any]:
         """Get all stock movements"""
         try:
-            return self.service.get_stock_movements(skip, limit)
+            return self.service.get_stock_movements(skip, limit, cursor)
+        except HTTPException as e:
+            raise e
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
     
@@ -6,6 +6,7 @@ from services.notification_admin_service import NotificationAdminService
 from schemas.notification_admin import (
     NotificationSearchQuery,
     NotificationBroadcast,
+    BroadcastProgress,
     NotificationUpdateAdmin,
     DeleteOldNotifications,
     NotificationStatsResponse,
@@ -180,16 +181,52 @@ class NotificationAdminController:
     def send_notification_to_all_users(self, broadcast: NotificationBroadcast) -> dict:
         """Broadcast notification to all users"""
         try:
-            count = self.service.send_notification_to_all_users(broadcast)
-            return {
-                "message": f"Notification sent to {count} users",
-                "sent_count": count
-            }
+            progress = self.service.send_notification_to_all_users(broadcast)
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to broadcast notification: {str(e)}"
             )
+        
+        if progress.status == "FAILED":
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Broadcast {progress.broadcast_id} stopped after {progress.sent_count} users "
+                       f"and can be resumed: {progress.error}"
+            )
+        
+        if progress.mode == "FEED":
+            message = "Notification published to every user's feed"
+        elif progress.status == "COMPLETED":
+            message = f"Notification sent to {progress.sent_count} users"
+        else:
+            message = f"Broadcast to {progress.target_count} users started"
+        
+        return {
+            "message": message,
+            "sent_count": progress.sent_count,
+            "broadcast": progress
+        }
+    
+    def get_broadcast(self, broadcast_id: int) -> BroadcastProgress:
+        """Progress of a broadcast"""
+        progress = self.service.get_broadcast(broadcast_id)
+        if not progress:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Broadcast not found"
+            )
+        return progress
+    
+    def resume_broadcast(self, broadcast_id: int, run_in_background: bool = False) -> BroadcastProgress:
+        """Continue an interrupted or failed fan-out"""
+        progress = self.service.resume_broadcast(broadcast_id, run_in_background)
+        if not progress:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Broadcast not found"
+            )
+        return progress
     
     # 4️⃣ Update & Moderation
     
@@ -244,7 +281,7 @@ class NotificationAdminController:
             )
         return {"message": "Notification deleted successfully"}
     
-    def delete_old_notifications(self, days: int = 30, confirm: bool = False) -> dict:
+    def delete_old_notifications(self, days: int = 30, confirm: bool = False, archive: bool = False) -> dict:
         """Delete notifications older than specified days"""
         try:
             if not confirm:
@@ -265,13 +302,30 @@ class NotificationAdminController:
                     "instruction": "Set confirm=true to actually delete"
                 }
             
-            count = self.service.delete_old_notifications(days)
+            summary = self.service.delete_old_notifications(days, archive)
+            if summary is None:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="A notification purge is already running"
+                )
             return {
-                "message": f"Successfully deleted {count} notifications older than {days} days",
-                "deleted_count": count
+                "message": f"Successfully deleted {summary['deleted_count']} notifications older than {days} days",
+                **summary
             }
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to delete old notifications: {str(e)}"
+            )
+    
+    def get_retention_status(self) -> dict:
+        """Notification partitions and purge metrics"""
+        try:
+            return self.service.get_retention_status()
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get retention status: {str(e)}"
             )
\ No newline at end of file
@@ -52,7 +52,8 @@ class NotificationController:
         current_user: User,
         skip: int = 0, 
         limit: int = 50,
-        is_read: Optional[bool] = None
+        is_read: Optional[bool] = None,
+        cursor: Optional[str] = None
     ) -> NotificationList:
         """Get all notifications for the current user"""
         try:
@@ -60,8 +61,11 @@ class NotificationController:
                 user_id=current_user.user_id,
                 skip=skip,
                 limit=limit,
-                is_read=is_read
+                is_read=is_read,
+                cursor=cursor
             )
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
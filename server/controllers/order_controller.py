@@ -53,10 +53,12 @@ class OrderController:
             print("🔥 ORDER ERROR:", str(e))
             raise HTTPException(status_code=500, detail="Order creation failed")
     
-    def get_user_orders(self, user_id: int, page: int = 1, per_page: int = 20) -> Dict[str, Any]:
+    def get_user_orders(self, user_id: int, page: int = 1, per_page: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
         """Get all orders for a user"""
         try:
-            return self.service.get_user_orders(user_id, page, per_page)
+            return self.service.get_user_orders(user_id, page, per_page, cursor)
+        except HTTPException as e:
+            raise e
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
     
@@ -87,10 +89,18 @@ class OrderController:
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
     
-    def get_all_orders(self, page: int = 1, per_page: int = 20, status: Optional[str] = None) -> Dict[str, Any]:
+    def get_all_orders(
+        self,
+        page: int = 1,
+        per_page: int = 20,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Get all orders"""
         try:
-            return self.service.get_all_orders(page, per_page, status)
+            return self.service.get_all_orders(page, per_page, status, cursor)
+        except HTTPException as e:
+            raise e
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
     
@@ -25,7 +25,8 @@ class ProductController:
         search: str = None,
         has_discount: bool = None,
         min_discount_percentage: float = None,
-        discount_type: str = None
+        discount_type: str = None,
+        cursor: str = None
     ) -> Dict[str, Any]:
         """Get all products with filters"""
         try:
@@ -42,8 +43,11 @@ class ProductController:
                 search=search,
                 has_discount=has_discount,
                 min_discount_percentage=min_discount_percentage,
-                discount_type=discount_type
+                discount_type=discount_type,
+                cursor=cursor
             )
+        except HTTPException as e:
+            raise e
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
     
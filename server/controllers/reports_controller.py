@@ -5,6 +5,7 @@ from datetime import datetime, date
 
 from config.dependencies import get_db, get_current_user, is_admin
 from services.reports_service import ReportsService
+from services.report_rollup_service import ReportRollupService
 from schemas.reports_schemas import (
     # Product Reports
     ProductPerformance, TopSellingProduct, ProductConversionRate,
@@ -33,7 +34,7 @@ from schemas.reports_schemas import (
     AdminActivity, NotificationReport,
     
     # Response schemas
-    ReportResponse, ReportExportResponse, ReportType, ReportFormat, DateRange
+    ReportResponse, ReportExportResponse, ReportType, ReportFormat, DateRange, ExportDataset
 )
 from models.user import User
 
@@ -42,6 +43,7 @@ class ReportsController:
     def __init__(self, db: Session = Depends(get_db)):
         self.db = db
         self.service = ReportsService(db)
+        self.rollups = ReportRollupService(db)
     
     # ===== PRODUCT REPORTS =====
     
@@ -721,4 +723,52 @@ class ReportsController:
             db=db,
             start_date=start_date,
             end_date=end_date
-        )
\ No newline at end of file
+        )
+    
+    def stream_export(
+        self,
+        dataset: ExportDataset,
+        format: ReportFormat,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        compress: bool = False
+    ):
+        """Streamed export of a large dataset"""
+        try:
+            return self.service.stream_export(dataset, format, start_date, end_date, compress)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    
+    # ===== REPORT ROLLUPS =====
+    
+    def get_rollup_status(self, current_user: User = None) -> Dict[str, Any]:
+        """Freshness of the daily report rollups"""
+        try:
+            return {"rollups": self.rollups.get_status()}
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get rollup status: {str(e)}"
+            )
+    
+    def rebuild_rollups(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        kind: Optional[str] = None,
+        current_user: User = None
+    ) -> Dict[str, Any]:
+        """Rebuild the daily report rollups from raw rows"""
+        try:
+            summary = self.rollups.backfill(start_date, end_date, [kind] if kind else None)
+            return {"message": "Report rollups rebuilt", "rollups": summary}
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to rebuild report rollups: {str(e)}"
+            )
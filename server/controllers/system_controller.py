@@ -173,16 +173,66 @@ class SystemController:
                 detail=f"Failed to get failed operations summary: {str(e)}"
             )
     
-    def get_api_usage_overview(self, current_user: User) -> ApiUsageOverview:
+    def get_api_usage_overview(self, current_user: User, hours: int = 24) -> ApiUsageOverview:
         """Get API usage overview"""
         try:
-            return self.service.get_api_usage_overview()
+            return self.service.get_api_usage_overview(hours)
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to get API usage overview: {str(e)}"
             )
     
+    def get_cache_metrics(self, current_user: User) -> Dict[str, Any]:
+        """Get response cache metrics"""
+        try:
+            return self.service.get_cache_metrics()
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get cache metrics: {str(e)}"
+            )
+    
+    def clear_cache(self, reset_stats: bool, current_user: User) -> Dict[str, Any]:
+        """Clear the response cache"""
+        try:
+            return self.service.clear_cache(reset_stats)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to clear cache: {str(e)}"
+            )
+    
+    def get_outbox_metrics(self, current_user: User) -> Dict[str, Any]:
+        """Get outbox queue and worker metrics"""
+        try:
+            return self.service.get_outbox_metrics()
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get outbox metrics: {str(e)}"
+            )
+    
+    def get_dead_outbox_jobs(self, kind: Optional[str], limit: int, current_user: User) -> List[Dict[str, Any]]:
+        """Get dead-lettered outbox jobs"""
+        try:
+            return self.service.get_dead_outbox_jobs(kind, limit)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get dead outbox jobs: {str(e)}"
+            )
+    
+    def retry_dead_outbox_jobs(self, job_ids: Optional[List[int]], kind: Optional[str], current_user: User) -> Dict[str, Any]:
+        """Requeue dead-lettered outbox jobs"""
+        try:
+            return self.service.retry_dead_outbox_jobs(job_ids, kind)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to retry outbox jobs: {str(e)}"
+            )
+    
     # ===== NOTIFICATION STATUS =====
     
     def get_notification_delivery_summary(
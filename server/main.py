@@ -10,9 +10,16 @@ from sqlalchemy import inspect
 from config.database import engine, SessionLocal
 from models.address import State, City, Area, Address
 from sqlalchemy.orm import Session
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.status import HTTP_401_UNAUTHORIZED, HTTP_403_FORBIDDEN
+from repositories.delivery_panel.delivery_location_repository import location_flusher
+from repositories.notification_broadcast_repository import resume_broadcasts
+from repositories.notification_counter_repository import counter_reconciler, start_counter_reconciler
+from repositories.outbox_repository import start_outbox_workers, stop_outbox_workers
+from repositories.notification_retention_repository import retention_scheduler, start_retention_scheduler
+from repositories.request_metrics_repository import start_request_metrics, stop_request_metrics
+from utils.request_metrics import REQUEST_METRICS_ENABLED, RequestMetricsMiddleware, render_prometheus
 
 # Import all route modules
 from routes import (
@@ -43,7 +50,8 @@ from routes import (
     order_admin_routes,
     delivery_admin_routes,
     reports_routes,
-    system_routes
+    system_routes,
+    event_routes
 )
 
 from routes.delivery_panel import (
@@ -114,6 +122,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- Request Metrics (per-route latency, status codes, sizes) ---
+if REQUEST_METRICS_ENABLED:
+    app.add_middleware(RequestMetricsMiddleware)
+
 # --- Static File Mount (uploads) ---
 if not os.path.exists("uploads"):
     os.makedirs("uploads")
@@ -262,12 +274,28 @@ app.include_router(purchase_return_routes.router)
 app.include_router(stock_routes.router)
 app.include_router(supplier_routes.router)
 
+# Push channel (WebSocket / SSE) for delivery and notification events
+app.include_router(event_routes.router)
+
 # --- Startup Event ---
 @app.on_event("startup")
 def startup():
     try:
         init_db()
         print("✅ Database initialized successfully!")
+        # Finish broadcasts a previous run was still fanning out
+        resumed = resume_broadcasts()
+        if resumed:
+            print(f"📢 Resuming {resumed} unfinished broadcast(s)")
+        # Seed missing notification counters and repair drift, then periodically
+        start_counter_reconciler()
+        # Deliver queued emails, including any left over from before the restart
+        start_outbox_workers()
+        # Keep notification partitions ahead of time and purge expired ones
+        start_retention_scheduler()
+        # Fold recorded API traffic into histograms and write hourly aggregates
+        if REQUEST_METRICS_ENABLED:
+            start_request_metrics()
         print("🚀 Server started on http://localhost:8000")
         print("📖 API Documentation: http://localhost:8000/docs")
     except Exception as e:
@@ -275,6 +303,18 @@ def startup():
         import traceback
         traceback.print_exc()
 
+# --- Shutdown Event ---
+@app.on_event("shutdown")
+def shutdown():
+    # Write rider positions still waiting in the location buffer
+    location_flusher.stop()
+    counter_reconciler.stop(final_flush=False)
+    stop_outbox_workers()
+    retention_scheduler.stop(final_flush=False)
+    # Write the API traffic recorded since the last flush
+    if REQUEST_METRICS_ENABLED:
+        stop_request_metrics()
+
 # --- Health & Root Routes ---
 @app.get("/")
 def root():
@@ -286,4 +326,13 @@ def root():
 
 @app.get("/api/v1/health")
 def health_check():
-    return {"status": "healthy", "message": "API is running"}
\ No newline at end of file
+    return {"status": "healthy", "message": "API is running"}
+
+# Prometheus scrape target; set METRICS_TOKEN to require "Authorization: Bearer <token>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics(request: Request):
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
\ No newline at end of file
@@ -37,6 +37,7 @@ from models.payment import Payment
 from models.delivery.delivery_person import DeliveryPerson
 from models.delivery.delivery import Delivery
 from models.delivery.delivery_earnings import DeliveryEarnings
+from models.delivery.delivery_location_history import DeliveryLocationHistory
 
 # 6. Marketing
 from models.marketing.coupon import Coupon
@@ -58,9 +59,14 @@ from models.analytics.product_analytics import ProductAnalytics
 from models.analytics.recently_viewed import RecentlyViewed
 from models.analytics.review_vote import ReviewVote
 from models.analytics.search_history import SearchHistory
+from models.analytics.report_rollups import (
+    ReportRollupDay, DailySalesRollup, DailyVariantSalesRollup, DailyCategorySalesRollup,
+    DailyBrandSalesRollup, DailyDeliveryRollup, DailySupplierRollup
+)
 from models.feedback.feedback import Feedback, FeedbackResponse
-from models.notification import Notification
+from models.notification import Notification, NotificationBroadcast, NotificationFeedCursor, NotificationCounter
 from models.feedback.user_issue import UserIssue
+from models.outbox import OutboxJob
 
 __all__ = [
     # Core
@@ -82,7 +88,7 @@ __all__ = [
     'OrderReturn', 'ReturnProduct', 'OrderRefund',
     
     # Payment & Delivery
-    'Payment', 'DeliveryPerson', 'Delivery', 'DeliveryEarnings',
+    'Payment', 'DeliveryPerson', 'Delivery', 'DeliveryEarnings', 'DeliveryLocationHistory',
     
     # Marketing
     'Coupon', 'CouponVariant', 'Offer', 'OfferVariant',
@@ -93,5 +99,8 @@ __all__ = [
     
     # Analytics & Support
     'ProductAnalytics', 'RecentlyViewed', 'ReviewVote', 'SearchHistory',
-    'Feedback', 'FeedbackResponse', 'Notification', 'UserIssue'
+    'ReportRollupDay', 'DailySalesRollup', 'DailyVariantSalesRollup', 'DailyCategorySalesRollup',
+    'DailyBrandSalesRollup', 'DailyDeliveryRollup', 'DailySupplierRollup',
+    'Feedback', 'FeedbackResponse', 'Notification', 'NotificationBroadcast', 'NotificationFeedCursor', 'NotificationCounter', 'UserIssue',
+    'OutboxJob'
 ]
\ No newline at end of file
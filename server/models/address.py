@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum, TIMESTAMP, Boolean, func
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, TIMESTAMP, Boolean, Float, func
 from sqlalchemy.orm import relationship
 from config.database import Base
 
@@ -25,6 +25,8 @@ class Area(Base):
     city_id = Column(Integer, ForeignKey("city.city_id", ondelete="RESTRICT"), nullable=False)
     area_name = Column(String(150), nullable=False)
     pincode = Column(String(10))
+    latitude = Column(Float)  # Area centre, used when an address has no coordinates
+    longitude = Column(Float)
     city = relationship("City", back_populates="areas")
     addresses = relationship("Address", back_populates="area")
     company = relationship("Company", back_populates="area")
@@ -40,6 +42,8 @@ class Address(Base):
     line2 = Column(String(100))
     area_id = Column(Integer, ForeignKey("area.area_id", ondelete="RESTRICT"), nullable=False)
     is_default = Column(Boolean, default=False)
+    latitude = Column(Float)
+    longitude = Column(Float)
     created_at = Column(TIMESTAMP, server_default=func.now())
 
     area = relationship("Area", back_populates="addresses")
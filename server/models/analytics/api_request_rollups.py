@@ -0,0 +1,32 @@
+from sqlalchemy import Column, BigInteger, Float, String, TIMESTAMP
+from config.database import Base
+
+# Hourly API traffic per endpoint, written by the request metrics flusher of every
+# process. Flushes add to the row of their hour, so the rows of an hour hold the
+# sum over all processes; rows older than REQUEST_METRICS_RETENTION_DAYS are purged.
+
+
+class ApiRequestHourly(Base):
+    """Requests, errors, time and bytes of one endpoint in one hour"""
+    __tablename__ = "api_request_hourly"
+
+    hour = Column(TIMESTAMP, primary_key=True)
+    method = Column(String(10), primary_key=True)
+    route = Column(String(255), primary_key=True)  # route template, e.g. /api/v1/orders/{order_id}
+    request_count = Column(BigInteger, nullable=False, default=0)
+    client_error_count = Column(BigInteger, nullable=False, default=0)  # 4xx
+    error_count = Column(BigInteger, nullable=False, default=0)  # 5xx
+    total_duration_ms = Column(Float, nullable=False, default=0)
+    request_bytes = Column(BigInteger, nullable=False, default=0)
+    response_bytes = Column(BigInteger, nullable=False, default=0)
+
+
+class ApiRequestLatencyHourly(Base):
+    """Latency histogram of one endpoint in one hour: requests that took at most le_ms (and more than the previous bound)"""
+    __tablename__ = "api_request_latency_hourly"
+
+    hour = Column(TIMESTAMP, primary_key=True)
+    method = Column(String(10), primary_key=True)
+    route = Column(String(255), primary_key=True)
+    le_ms = Column(Float, primary_key=True)  # inf for the open last bucket
+    request_count = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,92 @@
+from sqlalchemy import Column, Integer, String, Date, DECIMAL, Float, TIMESTAMP, func
+from config.database import Base
+
+# Daily aggregate tables behind the date-ranged admin reports. Rows are derived data:
+# a day is rebuilt from the raw order / delivery / purchase rows whenever its
+# ReportRollupDay entry is stale, so none of these carry foreign keys.
+
+
+class ReportRollupDay(Base):
+    """Freshness of one rollup kind for one day.
+
+    Writes bump `version`; a rebuild stores the version it started from in
+    `built_version`. The day is current only while both are equal.
+    """
+    __tablename__ = "report_rollup_day"
+
+    kind = Column(String(20), primary_key=True)  # sales, delivery, supplier
+    day = Column(Date, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    built_version = Column(Integer, nullable=False, default=0)
+    built_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+
+class DailySalesRollup(Base):
+    __tablename__ = "report_daily_sales"
+
+    day = Column(Date, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(DECIMAL(14, 2), nullable=False, default=0)
+    discount = Column(DECIMAL(14, 2), nullable=False, default=0)
+    items_sold = Column(Integer, nullable=False, default=0)
+    refund_amount = Column(DECIMAL(14, 2), nullable=False, default=0)
+
+
+class DailyVariantSalesRollup(Base):
+    __tablename__ = "report_daily_variant_sales"
+
+    day = Column(Date, primary_key=True)
+    variant_id = Column(Integer, primary_key=True, index=True)
+    items_sold = Column(Integer, nullable=False, default=0)
+    revenue = Column(DECIMAL(14, 2), nullable=False, default=0)
+
+
+class DailyCategorySalesRollup(Base):
+    __tablename__ = "report_daily_category_sales"
+
+    day = Column(Date, primary_key=True)
+    category_id = Column(Integer, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    items_sold = Column(Integer, nullable=False, default=0)
+    revenue = Column(DECIMAL(14, 2), nullable=False, default=0)
+
+
+class DailyBrandSalesRollup(Base):
+    __tablename__ = "report_daily_brand_sales"
+
+    day = Column(Date, primary_key=True)
+    brand_id = Column(Integer, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    items_sold = Column(Integer, nullable=False, default=0)
+    revenue = Column(DECIMAL(14, 2), nullable=False, default=0)
+
+
+class DailyDeliveryRollup(Base):
+    """Deliveries by assigned_at day and earnings by earned_at day, per delivery person (0 = unassigned)"""
+    __tablename__ = "report_daily_delivery"
+
+    day = Column(Date, primary_key=True)
+    delivery_person_id = Column(Integer, primary_key=True)
+    total_deliveries = Column(Integer, nullable=False, default=0)
+    completed_deliveries = Column(Integer, nullable=False, default=0)
+    pending_deliveries = Column(Integer, nullable=False, default=0)
+    delayed_deliveries = Column(Integer, nullable=False, default=0)
+    failed_deliveries = Column(Integer, nullable=False, default=0)
+    delivery_hours = Column(Float, nullable=False, default=0)
+    timed_deliveries = Column(Integer, nullable=False, default=0)
+    earnings = Column(DECIMAL(14, 2), nullable=False, default=0)
+
+
+class DailySupplierRollup(Base):
+    """Purchases (and returns against them) by purchase_date day, per supplier"""
+    __tablename__ = "report_daily_supplier"
+
+    day = Column(Date, primary_key=True)
+    supplier_id = Column(Integer, primary_key=True)
+    purchase_count = Column(Integer, nullable=False, default=0)
+    total_cost = Column(DECIMAL(14, 2), nullable=False, default=0)
+    total_quantity = Column(Integer, nullable=False, default=0)
+    unit_cost_sum = Column(DECIMAL(14, 2), nullable=False, default=0)
+    unit_cost_lines = Column(Integer, nullable=False, default=0)
+    returned_quantity = Column(Integer, nullable=False, default=0)
+    last_purchase_date = Column(TIMESTAMP)
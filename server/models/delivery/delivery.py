@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, String, TIMESTAMP, func, Boolean, DECIMAL, JSON
+from sqlalchemy import Column, Integer, ForeignKey, String, TIMESTAMP, func, Boolean, DECIMAL, JSON, Index
 from sqlalchemy.orm import relationship
 from config.database import Base
 
@@ -33,4 +33,13 @@ class Delivery(Base):
     order = relationship("Order", back_populates="delivery")
     delivery_person = relationship("DeliveryPerson", back_populates="deliveries")
     earnings = relationship("DeliveryEarnings", back_populates="delivery")
-    issues = relationship("UserIssue", back_populates="delivery")
\ No newline at end of file
+    issues = relationship("UserIssue", back_populates="delivery")
+
+
+# Delivery panel access paths: a rider's deliveries by status and by day assigned /
+# delivered, the available pool, and the delivery of an order
+Index("ix_delivery_person_status", Delivery.delivery_person_id, Delivery.status)
+Index("ix_delivery_person_assigned_at", Delivery.delivery_person_id, Delivery.assigned_at)
+Index("ix_delivery_person_delivered_at", Delivery.delivery_person_id, Delivery.delivered_at)
+Index("ix_delivery_pool", Delivery.status, Delivery.is_available, Delivery.available_since)
+Index("ix_delivery_order_id", Delivery.order_id)
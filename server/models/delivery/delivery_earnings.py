@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DECIMAL, TIMESTAMP, func
+from sqlalchemy import Column, Integer, ForeignKey, DECIMAL, TIMESTAMP, func, Index
 from sqlalchemy.orm import relationship
 from config.database import Base
 
@@ -12,4 +12,9 @@ class DeliveryEarnings(Base):
     earned_at = Column(TIMESTAMP, server_default=func.now())
 
     delivery_person = relationship("DeliveryPerson", back_populates="earnings")
-    delivery = relationship("Delivery", back_populates="earnings")
\ No newline at end of file
+    delivery = relationship("Delivery", back_populates="earnings")
+
+
+# Earnings of a rider over a date range, and the earning of a delivery
+Index("ix_delivery_earnings_person_earned_at", DeliveryEarnings.delivery_person_id, DeliveryEarnings.earned_at)
+Index("ix_delivery_earnings_delivery_id", DeliveryEarnings.delivery_id)
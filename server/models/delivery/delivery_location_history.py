@@ -0,0 +1,22 @@
+from sqlalchemy import Column, BigInteger, Integer, ForeignKey, Float, TIMESTAMP, Index
+from config.database import Base
+
+
+class DeliveryLocationHistory(Base):
+    """Rider positions sampled at each location flush, for route replay.
+
+    One row per rider per flush interval (not per ping); only written when
+    LOCATION_HISTORY_ENABLED is set.
+    """
+    __tablename__ = "delivery_location_history"
+
+    location_id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    delivery_person_id = Column(Integer, ForeignKey("delivery_person.delivery_person_id", ondelete="CASCADE"), nullable=False)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    accuracy = Column(Float)
+    recorded_at = Column(TIMESTAMP, nullable=False)
+
+
+# Replaying one rider's route over a time window
+Index("ix_delivery_location_history_person_recorded_at", DeliveryLocationHistory.delivery_person_id, DeliveryLocationHistory.recorded_at)
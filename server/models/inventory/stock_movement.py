@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DECIMAL, TIMESTAMP, String, func
+from sqlalchemy import Column, Integer, ForeignKey, DECIMAL, TIMESTAMP, String, func, Index
 from sqlalchemy.orm import relationship
 from config.database import Base
 
@@ -15,4 +15,10 @@ class StockMovement(Base):
     remark = Column(String(255))
     moved_at = Column(TIMESTAMP, server_default=func.now())
 
-    variant = relationship("ProductVariant")
\ No newline at end of file
+    variant = relationship("ProductVariant")
+
+
+# Movement history of a variant, date-ranged movement reports, and movements of a document
+Index("ix_stock_movement_variant_moved_at", StockMovement.variant_id, StockMovement.moved_at)
+Index("ix_stock_movement_moved_at", StockMovement.moved_at)
+Index("ix_stock_movement_reference", StockMovement.reference_type, StockMovement.reference_id)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, TIMESTAMP, func, Text, Enum
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, TIMESTAMP, func, Text, Enum, Index
 from sqlalchemy.orm import relationship
 from config.database import Base
 import enum
@@ -13,6 +13,63 @@ class NotificationType(enum.Enum):
     FEEDBACK = "FEEDBACK"
     SYSTEM = "SYSTEM"
 
+# Broadcast modes: FANOUT copies the notification to every user in chunked
+# INSERT ... SELECT statements; FEED stores only the broadcast row and each user
+# gets their copy the next time they read their notifications.
+BROADCAST_FANOUT = "FANOUT"
+BROADCAST_FEED = "FEED"
+
+class NotificationBroadcast(Base):
+    """A notification sent to all users, with fan-out progress.
+
+    Fan-out walks users in user_id order; last_user_id is the highest id already
+    written, so an interrupted broadcast resumes where it stopped. max_user_id is
+    the newest user when the broadcast was created: later signups do not get it.
+    """
+    __tablename__ = "notification_broadcasts"
+
+    broadcast_id = Column(Integer, primary_key=True, index=True)
+    title = Column(String(150), nullable=False)
+    message = Column(Text, nullable=False)
+    type = Column(Enum(NotificationType), nullable=False)
+    reference_id = Column(Integer, nullable=True)
+    mode = Column(String(10), nullable=False, default=BROADCAST_FANOUT)
+    status = Column(String(20), nullable=False, default="PENDING")  # PENDING, RUNNING, COMPLETED, FAILED
+    last_user_id = Column(Integer, nullable=False, default=0)
+    max_user_id = Column(Integer, nullable=True)
+    target_count = Column(Integer, nullable=True)
+    sent_count = Column(Integer, nullable=False, default=0)
+    send_email = Column(Boolean, nullable=True, default=False)  # queue an email per written notification
+    error = Column(Text, nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    started_at = Column(TIMESTAMP, nullable=True)
+    completed_at = Column(TIMESTAMP, nullable=True)
+
+
+class NotificationFeedCursor(Base):
+    """Newest FEED broadcast already copied into a user's notifications"""
+    __tablename__ = "notification_feed_cursors"
+
+    user_id = Column(Integer, ForeignKey("user.user_id", ondelete="CASCADE"), primary_key=True)
+    last_broadcast_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+
+class NotificationCounter(Base):
+    """Unread and total notifications of one user, kept in step with every notification write.
+
+    Read by the notification bell instead of counting rows; a missing row is
+    seeded from the notifications table on first read, and the reconciler
+    repairs any drift.
+    """
+    __tablename__ = "notification_counters"
+
+    user_id = Column(Integer, ForeignKey("user.user_id", ondelete="CASCADE"), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0)
+    total_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+
 class Notification(Base):
     __tablename__ = "notifications"  # ✅ Changed to plural
     
@@ -25,5 +82,17 @@ class Notification(Base):
     is_read = Column(Boolean, default=False)
     created_at = Column(TIMESTAMP, server_default=func.now())
     read_at = Column(TIMESTAMP, nullable=True)  # ✅ NEW: Track when notification was read
+    broadcast_id = Column(Integer, ForeignKey("notification_broadcasts.broadcast_id", ondelete="SET NULL"), nullable=True)
+
+    user = relationship("User", back_populates="notifications")
+
 
-    user = relationship("User", back_populates="notifications")
\ No newline at end of file
+# A user's notification feed (newest first) and unread filter
+Index("ix_notifications_user_created_at", Notification.user_id, Notification.created_at)
+Index("ix_notifications_user_is_read", Notification.user_id, Notification.is_read)
+# Retention purges walk rows oldest first, in chunks keyed on (created_at, notification_id)
+Index("ix_notifications_created_at", Notification.created_at, Notification.notification_id)
+# At most one copy of a broadcast per user, whichever mode or retry wrote it. Every
+# copy carries the broadcast's created_at; the column is part of the key because a
+# unique index on the partitioned table must include the partition key
+Index("ux_notifications_user_broadcast", Notification.user_id, Notification.broadcast_id, Notification.created_at, unique=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, String, DECIMAL, TIMESTAMP, func
+from sqlalchemy import Column, Integer, ForeignKey, String, DECIMAL, TIMESTAMP, func, Index
 from sqlalchemy.orm import relationship
 from config.database import Base
 
@@ -26,4 +26,10 @@ class Order(Base):
     delivery = relationship("Delivery", back_populates="order", uselist=False)
     payment = relationship("Payment", back_populates="order", uselist=False)
     issues = relationship("UserIssue", back_populates="order")
-    feedbacks = relationship("Feedback", back_populates="order")
\ No newline at end of file
+    feedbacks = relationship("Feedback", back_populates="order")
+
+
+# A customer's order history, and date-ranged reports filtered by status
+Index("ix_order_user_placed_at", Order.user_id, Order.placed_at)
+Index("ix_order_status_placed_at", Order.order_status, Order.placed_at)
+Index("ix_order_placed_at", Order.placed_at)
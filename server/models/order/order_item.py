@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DECIMAL
+from sqlalchemy import Column, Integer, ForeignKey, DECIMAL, Index
 from sqlalchemy.orm import relationship
 from config.database import Base
 
@@ -13,4 +13,8 @@ class OrderItem(Base):
     total = Column(DECIMAL(10, 2), nullable=False)
     
     order = relationship("Order", back_populates="items")
-    variant = relationship("ProductVariant")
\ No newline at end of file
+    variant = relationship("ProductVariant")
+
+
+# Sales of a variant (the primary key only serves lookups by order)
+Index("ix_order_item_variant_id", OrderItem.variant_id)
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Text, JSON, TIMESTAMP, func, Index
+from config.database import Base
+
+
+class OutboxJob(Base):
+    """A side effect (e.g. an email) to run after the transaction that wrote it commits.
+
+    Jobs are inserted in the same transaction as the change they belong to, so a
+    rolled-back order or notification never sends mail and a committed one always
+    does. Workers claim PENDING jobs whose available_at has passed; failures go back
+    to PENDING with a later available_at until max_attempts, then to DEAD.
+    """
+    __tablename__ = "outbox_jobs"
+
+    job_id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    kind = Column(String(50), nullable=False)
+    reference_id = Column(Integer, nullable=True)  # notification_id, order_id, ... depending on kind
+    payload = Column(JSON, nullable=True)
+    status = Column(String(20), nullable=False, default="PENDING")  # PENDING, PROCESSING, SENT, DEAD
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=6)
+    available_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+    locked_at = Column(TIMESTAMP, nullable=True)
+    locked_by = Column(String(100), nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    processed_at = Column(TIMESTAMP, nullable=True)
+
+
+# Workers pick the oldest due jobs of one status
+Index("ix_outbox_jobs_status_available_at", OutboxJob.status, OutboxJob.available_at)
@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DECIMAL, Enum, TIMESTAMP, Boolean, func
+from sqlalchemy import Column, Integer, String, ForeignKey, DECIMAL, Enum, TIMESTAMP, Boolean, Index, case, func
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from config.database import Base
+from decimal import Decimal
 
 class ProductVariant(Base):
     __tablename__ = "product_variant"
@@ -27,4 +29,56 @@ class ProductVariant(Base):
     batch_items = relationship("BatchItem", back_populates="variant")
     analytics = relationship("ProductAnalytics", back_populates="variant")
     offer_variant = relationship("OfferVariant", back_populates="variant")
-    coupon_variant = relationship("CouponVariant", back_populates="variant")
\ No newline at end of file
+    coupon_variant = relationship("CouponVariant", back_populates="variant")
+
+    # Price after discount. Same rule as ProductService.calculate_final_price, but also
+    # usable as a SQL expression so catalog filters and sorts run in the database.
+    @hybrid_property
+    def final_price(self):
+        price = self.price or Decimal("0.00")
+        discount = self.discount_value or Decimal("0.00")
+        if self.discount_type == "PERCENT":
+            return price * (1 - discount / 100)
+        if self.discount_type == "FLAT":
+            return max(price - discount, Decimal("0.00"))
+        return price
+
+    @final_price.expression
+    def final_price(cls):
+        return case(
+            (cls.discount_type == "PERCENT", cls.price * (1 - cls.discount_value / 100)),
+            (cls.discount_type == "FLAT", case(
+                (cls.price - cls.discount_value < 0, 0),
+                else_=cls.price - cls.discount_value
+            )),
+            else_=cls.price
+        )
+
+    # Effective discount as a percentage of the list price (FLAT discounts converted)
+    @hybrid_property
+    def discount_percentage(self):
+        price = self.price or Decimal("0.00")
+        discount = self.discount_value or Decimal("0.00")
+        if self.discount_type == "PERCENT":
+            return discount
+        if self.discount_type == "FLAT" and price > 0:
+            return min(discount * 100 / price, Decimal("100"))
+        return Decimal("0.00")
+
+    @discount_percentage.expression
+    def discount_percentage(cls):
+        return case(
+            (cls.discount_type == "PERCENT", cls.discount_value),
+            (cls.price > 0, case(
+                (cls.discount_type == "FLAT", case(
+                    (cls.discount_value > cls.price, 100),
+                    else_=cls.discount_value * 100 / cls.price
+                )),
+                else_=0
+            )),
+            else_=0
+        )
+
+
+# Catalog access path: default-variant lookup per product
+Index("ix_product_variant_product_default", ProductVariant.product_id, ProductVariant.is_default)
@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from models.address import State, City, Area, Address
 from typing import List, Optional
 
@@ -52,6 +52,13 @@ class AddressRepository:
         """Get address by ID (without user validation)"""
         return db.query(Address).filter(Address.address_id == address_id).first()
     
+    @staticmethod
+    def get_address_with_location(db: Session, address_id: int) -> Optional[Address]:
+        """Get address with its area, city and state loaded in the same query"""
+        return db.query(Address).options(
+            joinedload(Address.area).joinedload(Area.city).joinedload(City.state)
+        ).filter(Address.address_id == address_id).first()
+    
     @staticmethod
     def create_address(db: Session, address_data: dict) -> Address:
         """Create new address"""
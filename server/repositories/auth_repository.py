@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Session
 from models.user import User
-from typing import Optional
+from models.role import Role, UserRole
+from models.delivery.delivery_person import DeliveryPerson
+from typing import Optional, List, Tuple
 
 class AuthRepository:
     
@@ -33,4 +35,21 @@ class AuthRepository:
     @staticmethod
     def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
         """Get user by ID"""
-        return db.query(User).filter(User.user_id == user_id).first()
\ No newline at end of file
+        return db.query(User).filter(User.user_id == user_id).first()
+    
+    @staticmethod
+    def get_principal_rows(db: Session, user_id: int) -> List[Tuple]:
+        """(user_id, is_active, role_name, delivery_person_id, delivery_status) rows, one per role, in one query"""
+        return db.query(
+            User.user_id,
+            User.is_active,
+            Role.role_name,
+            DeliveryPerson.delivery_person_id,
+            DeliveryPerson.status
+        ).outerjoin(
+            UserRole, UserRole.user_id == User.user_id
+        ).outerjoin(
+            Role, Role.role_id == UserRole.role_id
+        ).outerjoin(
+            DeliveryPerson, DeliveryPerson.user_id == User.user_id
+        ).filter(User.user_id == user_id).all()
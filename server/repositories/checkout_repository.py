@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager
 from models.cart import Cart
 from models.product_catalog.product_variant import ProductVariant
 from models.address import Address
@@ -13,6 +13,7 @@ class CheckoutRepository:
         return (
             db.query(Cart)
               .join(ProductVariant)
+              .options(contains_eager(Cart.variant))
               .filter(Cart.user_id == user_id)
               .all()
         )
@@ -30,13 +31,8 @@ class CheckoutRepository:
 
     @staticmethod
     def create_order(db: Session, order: Order, items: list[OrderItem]):
+        """Insert the order and its items in one flush; the caller commits"""
+        order.items = items
         db.add(order)
         db.flush()  # get order_id
-
-        for item in items:
-            item.order_id = order.order_id
-            db.add(item)
-
-        db.commit()
-        db.refresh(order)
         return order
@@ -8,7 +8,7 @@ from models.cart import Cart
 from models.wishlist import Wishlist
 from models.payment import Payment
 from models.analytics.review_vote import ReviewVote
-from models.notification import Notification
+from models.notification import Notification, NotificationCounter, NotificationFeedCursor
 from models.feedback.feedback import Feedback
 from models.analytics.recently_viewed import RecentlyViewed
 from models.analytics.search_history import SearchHistory
@@ -76,6 +76,8 @@ class CustomerRepository:
         # ---------------------------
         db.query(ReviewVote).filter(ReviewVote.user_id == user_id).delete()
         db.query(Notification).filter(Notification.user_id == user_id).delete()
+        db.query(NotificationCounter).filter(NotificationCounter.user_id == user_id).delete()
+        db.query(NotificationFeedCursor).filter(NotificationFeedCursor.user_id == user_id).delete()
         db.query(Feedback).filter(Feedback.user_id == user_id).delete()
         db.query(RecentlyViewed).filter(RecentlyViewed.user_id == user_id).delete()
         db.query(SearchHistory).filter(SearchHistory.user_id == user_id).delete()
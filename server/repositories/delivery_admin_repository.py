@@ -5,6 +5,8 @@ from models.delivery.delivery_person import DeliveryPerson
 from models.delivery.delivery_earnings import DeliveryEarnings
 from models.feedback.user_issue import UserIssue
 from models.order.order import Order
+from repositories.delivery_panel.delivery_event_repository import DeliveryEventRepository
+from utils.event_hub import DELIVERY_CANCELLED
 from datetime import datetime
 
 
@@ -142,6 +144,9 @@ class DeliveryAdminRepository:
     # 1️⃣2️⃣ Cancel
     def cancel_delivery(self, db: Session, delivery: Delivery):
         delivery.status = "CANCELLED"
+        DeliveryEventRepository.stage_events(
+            db, DELIVERY_CANCELLED, DeliveryEventRepository.get_audience(db, [delivery.delivery_id]), status="CANCELLED"
+        )
         db.commit()
         return delivery
 
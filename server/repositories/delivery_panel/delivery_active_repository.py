@@ -7,7 +7,6 @@ from decimal import Decimal
 
 # Import models
 from models.delivery.delivery import Delivery
-from models.delivery.delivery_person import DeliveryPerson
 from models.delivery.delivery_earnings import DeliveryEarnings
 from models.order.order import Order
 from models.order.order_item import OrderItem
@@ -16,6 +15,10 @@ from models.address import Address, Area, City
 from models.payment import Payment
 from models.feedback.feedback import Feedback
 from models.feedback.user_issue import UserIssue
+from repositories.delivery_panel.delivery_event_repository import DeliveryEventRepository
+from repositories.delivery_panel.delivery_location_repository import DeliveryLocationRepository, record_location
+from utils.date_range import on_day
+from utils.event_hub import DELIVERY_STATUS_CHANGED
 
 # Import schemas
 from schemas.delivery_panel.delivery_active_schema import (
@@ -23,20 +26,43 @@ from schemas.delivery_panel.delivery_active_schema import (
 )
 
 
+ACTIVE_DELIVERY_STATUSES = ["ASSIGNED", "PICKED_UP", "IN_TRANSIT"]
+
+
 class DeliveryActiveRepository:
     
-    # ===== ACTIVE DELIVERIES =====
+    # ===== SHARED LOADER =====
     
     @staticmethod
-    def get_active_deliveries(db: Session, delivery_person_id: int) -> List[Dict[str, Any]]:
-        """Get active deliveries for delivery person"""
-        deliveries = db.query(
+    def delivery_rows_query(db: Session, delivery_person_id: int):
+        """Deliveries of a delivery person with everything a delivery card needs, in one statement.
+
+        Rows are (Delivery, Order, User, Address, Area, City, items_count, payment_status).
+        Item count and payment status are correlated subqueries, so they are only
+        evaluated for the rows actually returned; payment_status is None when the
+        order has no payment yet.
+        """
+        items_count = db.query(
+            func.coalesce(func.sum(OrderItem.quantity), 0)
+        ).filter(
+            OrderItem.order_id == Order.order_id
+        ).correlate(Order).scalar_subquery()
+
+        payment_status = db.query(
+            func.coalesce(Payment.payment_status, "")
+        ).filter(
+            Payment.order_id == Order.order_id
+        ).order_by(Payment.payment_id).limit(1).correlate(Order).scalar_subquery()
+
+        return db.query(
             Delivery,
             Order,
             User,
             Address,
             Area,
-            City
+            City,
+            items_count.label("items_count"),
+            payment_status.label("payment_status")
         ).join(
             Order, Order.order_id == Delivery.order_id
         ).join(
@@ -48,30 +74,53 @@ class DeliveryActiveRepository:
         ).join(
             City, City.city_id == Area.city_id
         ).filter(
-            Delivery.delivery_person_id == delivery_person_id,
-            Delivery.status.in_(["ASSIGNED", "PICKED_UP", "IN_TRANSIT"]),
-            Delivery.delivered_at.is_(None)
-        ).order_by(
-            case(
-                (Delivery.status == "ASSIGNED", 1),
-                (Delivery.status == "PICKED_UP", 2),
-                (Delivery.status == "IN_TRANSIT", 3)
-            ),
-            Delivery.expected_delivery_time
-        ).all()
+            Delivery.delivery_person_id == delivery_person_id
+        )
+    
+    @staticmethod
+    def load_active_deliveries(
+        db: Session,
+        delivery_person_id: int,
+        status: Optional[str] = None,
+        undelivered_only: bool = True,
+        by_stage: bool = True,
+        limit: Optional[int] = None
+    ) -> List[tuple]:
+        """Active deliveries (optionally one status), as delivery_rows_query rows.
+
+        by_stage orders pickups before in-flight drops, then by expected time.
+        """
+        query = DeliveryActiveRepository.delivery_rows_query(db, delivery_person_id).filter(
+            Delivery.status.in_(ACTIVE_DELIVERY_STATUSES)
+        )
+        if status:
+            query = query.filter(Delivery.status == status)
+        if undelivered_only:
+            query = query.filter(Delivery.delivered_at.is_(None))
+        if by_stage:
+            query = query.order_by(
+                case(
+                    (Delivery.status == "ASSIGNED", 1),
+                    (Delivery.status == "PICKED_UP", 2),
+                    (Delivery.status == "IN_TRANSIT", 3)
+                ),
+                Delivery.expected_delivery_time
+            )
+        else:
+            query = query.order_by(Delivery.expected_delivery_time)
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+    
+    # ===== ACTIVE DELIVERIES =====
+    
+    @staticmethod
+    def get_active_deliveries(db: Session, delivery_person_id: int) -> List[Dict[str, Any]]:
+        """Get active deliveries for delivery person"""
+        deliveries = DeliveryActiveRepository.load_active_deliveries(db, delivery_person_id)
         
         result = []
-        for delivery, order, user, address, area, city in deliveries:
-            # Get items count
-            items_count = db.query(func.sum(OrderItem.quantity)).filter(
-                OrderItem.order_id == order.order_id
-            ).scalar() or 0
-            
-            # Get payment info
-            payment = db.query(Payment).filter(
-                Payment.order_id == order.order_id
-            ).first()
-            
+        for delivery, order, user, address, area, city, items_count, payment_status in deliveries:
             # Format address
             delivery_address = f"{address.line1}"
             if address.line2:
@@ -99,8 +148,8 @@ class DeliveryActiveRepository:
             # Payment type and amount
             payment_type = PaymentType.COD
             amount = None
-            if payment:
-                payment_type = PaymentType.PREPAID if payment.payment_status == "COMPLETED" else PaymentType.COD
+            if payment_status is not None:
+                payment_type = PaymentType.PREPAID if payment_status == "COMPLETED" else PaymentType.COD
                 if payment_type == PaymentType.COD:
                     amount = float(order.total_amount)
             
@@ -147,42 +196,14 @@ class DeliveryActiveRepository:
     @staticmethod
     def get_delivery_by_id(db: Session, delivery_id: int, delivery_person_id: int) -> Optional[Dict[str, Any]]:
         """Get a specific delivery by ID"""
-        delivery_data = db.query(
-            Delivery,
-            Order,
-            User,
-            Address,
-            Area,
-            City
-        ).join(
-            Order, Order.order_id == Delivery.order_id
-        ).join(
-            User, User.user_id == Order.user_id
-        ).join(
-            Address, Address.address_id == Order.address_id
-        ).join(
-            Area, Area.area_id == Address.area_id
-        ).join(
-            City, City.city_id == Area.city_id
-        ).filter(
-            Delivery.delivery_id == delivery_id,
-            Delivery.delivery_person_id == delivery_person_id
+        delivery_data = DeliveryActiveRepository.delivery_rows_query(db, delivery_person_id).filter(
+            Delivery.delivery_id == delivery_id
         ).first()
         
         if not delivery_data:
             return None
         
-        delivery, order, user, address, area, city = delivery_data
-        
-        # Get items count
-        items_count = db.query(func.sum(OrderItem.quantity)).filter(
-            OrderItem.order_id == order.order_id
-        ).scalar() or 0
-        
-        # Get payment info
-        payment = db.query(Payment).filter(
-            Payment.order_id == order.order_id
-        ).first()
+        delivery, order, user, address, area, city, items_count, payment_status = delivery_data
         
         # Calculate progress based on status
         progress = 0
@@ -200,21 +221,17 @@ class DeliveryActiveRepository:
         # Payment type and amount
         payment_type = PaymentType.COD
         amount = None
-        if payment:
-            payment_type = PaymentType.PREPAID if payment.payment_status == "COMPLETED" else PaymentType.COD
+        if payment_status is not None:
+            payment_type = PaymentType.PREPAID if payment_status == "COMPLETED" else PaymentType.COD
             if payment_type == PaymentType.COD:
                 amount = float(order.total_amount)
         
         # Get delivery person's current location
         current_latitude = None
         current_longitude = None
-        delivery_person = db.query(DeliveryPerson).filter(
-            DeliveryPerson.delivery_person_id == delivery_person_id
-        ).first()
-        
-        if delivery_person and delivery_person.current_location:
+        loc_data = DeliveryLocationRepository.get_current_location(db, delivery_person_id)
+        if loc_data:
             try:
-                loc_data = delivery_person.current_location
                 if isinstance(loc_data, dict):
                     current_latitude = loc_data.get('lat')
                     current_longitude = loc_data.get('lng')
@@ -302,7 +319,7 @@ class DeliveryActiveRepository:
         today_completed = db.query(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
             Delivery.status == "DELIVERED",
-            func.date(Delivery.delivered_at) == today
+            on_day(Delivery.delivered_at, today)
         ).count()
         
         # Today's earnings
@@ -310,7 +327,7 @@ class DeliveryActiveRepository:
             func.coalesce(func.sum(DeliveryEarnings.amount), 0)
         ).join(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(DeliveryEarnings.earned_at) == today
+            on_day(DeliveryEarnings.earned_at, today)
         ).scalar() or Decimal('0')
         
         # Average delivery time for today's completed deliveries
@@ -324,7 +341,7 @@ class DeliveryActiveRepository:
             ).filter(
                 Delivery.delivery_person_id == delivery_person_id,
                 Delivery.status == "DELIVERED",
-                func.date(Delivery.delivered_at) == today,
+                on_day(Delivery.delivered_at, today),
                 Delivery.delivered_at.isnot(None),
                 Delivery.assigned_at.isnot(None)
             ).scalar()
@@ -336,7 +353,7 @@ class DeliveryActiveRepository:
         total_delivered_today = db.query(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
             Delivery.status == "DELIVERED",
-            func.date(Delivery.delivered_at) == today,
+            on_day(Delivery.delivered_at, today),
             Delivery.expected_delivery_time.isnot(None),
             Delivery.delivered_at.isnot(None)
         ).count()
@@ -345,7 +362,7 @@ class DeliveryActiveRepository:
             on_time_deliveries = db.query(Delivery).filter(
                 Delivery.delivery_person_id == delivery_person_id,
                 Delivery.status == "DELIVERED",
-                func.date(Delivery.delivered_at) == today,
+                on_day(Delivery.delivered_at, today),
                 Delivery.expected_delivery_time.isnot(None),
                 Delivery.delivered_at.isnot(None),
                 Delivery.delivered_at <= Delivery.expected_delivery_time
@@ -420,16 +437,11 @@ class DeliveryActiveRepository:
         
         # Update location if provided
         if latitude is not None and longitude is not None:
-            delivery_person = db.query(DeliveryPerson).filter(
-                DeliveryPerson.delivery_person_id == delivery_person_id
-            ).first()
-            
-            if delivery_person:
-                delivery_person.current_location = {
-                    "lat": latitude,
-                    "lng": longitude,
-                    "updated_at": datetime.now().isoformat()
-                }
+            record_location(delivery_person_id, latitude, longitude)
+        
+        DeliveryEventRepository.stage_events(
+            db, DELIVERY_STATUS_CHANGED, DeliveryEventRepository.get_audience(db, [delivery_id]), status=status
+        )
         
         try:
             db.commit()
@@ -449,32 +461,9 @@ class DeliveryActiveRepository:
         longitude: float,
         accuracy: Optional[float] = None
     ) -> bool:
-        """Update delivery person's current location"""
-        delivery_person = db.query(DeliveryPerson).filter(
-            DeliveryPerson.delivery_person_id == delivery_person_id
-        ).first()
-        
-        if not delivery_person:
-            return False
-        
-        location_data = {
-            "lat": latitude,
-            "lng": longitude,
-            "updated_at": datetime.now().isoformat()
-        }
-        
-        if accuracy is not None:
-            location_data["accuracy"] = accuracy
-        
-        delivery_person.current_location = location_data
-        
-        try:
-            db.commit()
-            return True
-        except Exception as e:
-            db.rollback()
-            print(f"Error updating delivery person location: {e}")
-            return False
+        """Update delivery person's current location (buffered, written in bulk)"""
+        record_location(delivery_person_id, latitude, longitude, accuracy)
+        return True
     
     # ===== CUSTOMER CONTACT =====
     
@@ -573,13 +562,9 @@ class DeliveryActiveRepository:
         current_lat = 23.0225  # Default coordinates (Ahmedabad)
         current_lng = 72.5714
         
-        delivery_person = db.query(DeliveryPerson).filter(
-            DeliveryPerson.delivery_person_id == delivery_person_id
-        ).first()
-        
-        if delivery_person and delivery_person.current_location:
+        loc_data = DeliveryLocationRepository.get_current_location(db, delivery_person_id)
+        if loc_data:
             try:
-                loc_data = delivery_person.current_location
                 if isinstance(loc_data, dict):
                     current_lat = loc_data.get('lat', current_lat)
                     current_lng = loc_data.get('lng', current_lng)
@@ -699,41 +684,13 @@ class DeliveryActiveRepository:
         status: str
     ) -> List[Dict[str, Any]]:
         """Get deliveries by specific status"""
-        deliveries = db.query(
-            Delivery,
-            Order,
-            User,
-            Address,
-            Area,
-            City
-        ).join(
-            Order, Order.order_id == Delivery.order_id
-        ).join(
-            User, User.user_id == Order.user_id
-        ).join(
-            Address, Address.address_id == Order.address_id
-        ).join(
-            Area, Area.area_id == Address.area_id
-        ).join(
-            City, City.city_id == Area.city_id
-        ).filter(
-            Delivery.delivery_person_id == delivery_person_id,
+        deliveries = DeliveryActiveRepository.delivery_rows_query(db, delivery_person_id).filter(
             Delivery.status == status,
             Delivery.delivered_at.is_(None)
         ).order_by(Delivery.assigned_at).all()
         
         result = []
-        for delivery, order, user, address, area, city in deliveries:
-            # Get items count
-            items_count = db.query(func.sum(OrderItem.quantity)).filter(
-                OrderItem.order_id == order.order_id
-            ).scalar() or 0
-            
-            # Get payment info
-            payment = db.query(Payment).filter(
-                Payment.order_id == order.order_id
-            ).first()
-            
+        for delivery, order, user, address, area, city, items_count, payment_status in deliveries:
             # Calculate progress based on status
             progress = 0
             status_text = delivery.status
@@ -750,8 +707,8 @@ class DeliveryActiveRepository:
             # Payment type and amount
             payment_type = PaymentType.COD
             amount = None
-            if payment:
-                payment_type = PaymentType.PREPAID if payment.payment_status == "COMPLETED" else PaymentType.COD
+            if payment_status is not None:
+                payment_type = PaymentType.PREPAID if payment_status == "COMPLETED" else PaymentType.COD
                 if payment_type == PaymentType.COD:
                     amount = float(order.total_amount)
             
@@ -800,40 +757,12 @@ class DeliveryActiveRepository:
         """Get all deliveries assigned today"""
         today = date.today()
         
-        deliveries = db.query(
-            Delivery,
-            Order,
-            User,
-            Address,
-            Area,
-            City
-        ).join(
-            Order, Order.order_id == Delivery.order_id
-        ).join(
-            User, User.user_id == Order.user_id
-        ).join(
-            Address, Address.address_id == Order.address_id
-        ).join(
-            Area, Area.area_id == Address.area_id
-        ).join(
-            City, City.city_id == Area.city_id
-        ).filter(
-            Delivery.delivery_person_id == delivery_person_id,
-            func.date(Delivery.assigned_at) == today
+        deliveries = DeliveryActiveRepository.delivery_rows_query(db, delivery_person_id).filter(
+            on_day(Delivery.assigned_at, today)
         ).order_by(Delivery.expected_delivery_time).all()
         
         result = []
-        for delivery, order, user, address, area, city in deliveries:
-            # Get items count
-            items_count = db.query(func.sum(OrderItem.quantity)).filter(
-                OrderItem.order_id == order.order_id
-            ).scalar() or 0
-            
-            # Get payment info
-            payment = db.query(Payment).filter(
-                Payment.order_id == order.order_id
-            ).first()
-            
+        for delivery, order, user, address, area, city, items_count, payment_status in deliveries:
             # Calculate progress based on status
             progress = 0
             status_text = delivery.status
@@ -850,8 +779,8 @@ class DeliveryActiveRepository:
             # Payment type and amount
             payment_type = PaymentType.COD
             amount = None
-            if payment:
-                payment_type = PaymentType.PREPAID if payment.payment_status == "COMPLETED" else PaymentType.COD
+            if payment_status is not None:
+                payment_type = PaymentType.PREPAID if payment_status == "COMPLETED" else PaymentType.COD
                 if payment_type == PaymentType.COD:
                     amount = float(order.total_amount)
             
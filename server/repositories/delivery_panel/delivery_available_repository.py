@@ -1,29 +1,86 @@
+from sqlalchemy import event, func, text, update
 from sqlalchemy.orm import Session
 from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from models.delivery.delivery import Delivery
+from models.order.order import Order
+from models.user import User
+from models.address import Address, Area, City, State
+from repositories.delivery_panel.delivery_event_repository import DeliveryEventRepository
+from repositories.report_rollup_repository import ReportRollupRepository, ROLLUP_DELIVERY, first_open_day
+from utils.date_range import as_date, day_start
+from utils.available_feed import available_feed
+from utils.event_hub import DELIVERY_ASSIGNED, DELIVERY_RELEASED
+
+# Delivery columns the available feed is built from
+POOL_COLUMNS = ("status", "is_available", "available_since", "order_id")
 
 
 class DeliveryAvailableRepository:
 
-    def get_available_deliveries(self, db: Session):
-        """Get available deliveries"""
-        return db.execute(
-            """
-            SELECT 
-                d.delivery_id,
-                d.order_id,
-                d.status,
-                d.available_since,
-                o.shipping_address,
-                c.first_name,
-                c.last_name
-            FROM delivery d
-            JOIN "order" o ON d.order_id = o.order_id
-            JOIN "user" c ON o.customer_id = c.user_id
-            WHERE d.status = 'AVAILABLE'
-              AND d.is_available = true
-            ORDER BY d.available_since ASC
-            """
-        ).fetchall()
+    def get_available_deliveries(self, db: Session) -> List[Dict[str, Any]]:
+        """Pool deliveries with customer, drop address and drop coordinates, in one query"""
+        rows = db.query(
+            Delivery.delivery_id,
+            Delivery.order_id,
+            Delivery.status,
+            Delivery.available_since,
+            User.user_id,
+            User.first_name,
+            User.last_name,
+            Order.address_id,
+            Address.line1,
+            Address.line2,
+            Area.area_name,
+            City.city_name,
+            State.state_name,
+            func.coalesce(Address.latitude, Area.latitude),
+            func.coalesce(Address.longitude, Area.longitude)
+        ).outerjoin(
+            Order, Order.order_id == Delivery.order_id
+        ).outerjoin(
+            User, User.user_id == Order.user_id
+        ).outerjoin(
+            Address, Address.address_id == Order.address_id
+        ).outerjoin(
+            Area, Area.area_id == Address.area_id
+        ).outerjoin(
+            City, City.city_id == Area.city_id
+        ).outerjoin(
+            State, State.state_id == City.state_id
+        ).filter(
+            Delivery.status == "AVAILABLE",
+            Delivery.is_available.is_(True)
+        ).order_by(Delivery.available_since.asc(), Delivery.delivery_id.asc()).all()
+
+        deliveries = []
+        for (delivery_id, order_id, status, available_since, customer_id, first_name, last_name, address_id,
+             line1, line2, area_name, city_name, state_name, latitude, longitude) in rows:
+            if customer_id is None:
+                customer_name = "Customer"
+                delivery_address = "Address not available"
+            elif address_id is None:
+                customer_name = f"{first_name} {last_name}"
+                delivery_address = "No address specified"
+            else:
+                customer_name = f"{first_name} {last_name}"
+                parts = [part for part in (line1, line2, area_name, city_name, state_name) if part]
+                # The old per-row query inner-joined the whole area/city/state chain
+                complete = area_name is not None and city_name is not None and state_name is not None
+                delivery_address = ", ".join(parts) if complete and parts else "Address not available"
+
+            deliveries.append({
+                "delivery_id": delivery_id,
+                "order_id": order_id,
+                "status": status,
+                "customer_name": customer_name,
+                "delivery_address": delivery_address,
+                "available_since": available_since,
+                "latitude": latitude,
+                "longitude": longitude
+            })
+        return deliveries
 
     def check_delivery_availability(self, db: Session, delivery_id: int):
         """Check if delivery is available"""
@@ -38,39 +95,135 @@ class DeliveryAvailableRepository:
         
         return result
 
-    def assign_delivery(self, db: Session, delivery_id: int, delivery_person_id: int):
-        """Assign delivery to person"""
-        db.execute(
-            """
-            UPDATE delivery 
-            SET delivery_person_id = :dp_id,
-                status = 'ASSIGNED',
-                is_available = false,
-                assigned_at = :now
-            WHERE delivery_id = :delivery_id
-            """,
-            {
-                "dp_id": delivery_person_id,
-                "delivery_id": delivery_id,
-                "now": datetime.utcnow()
+    def claim_deliveries(self, db: Session, delivery_ids: List[int], delivery_person_id: int) -> List[int]:
+        """Compare-and-set claim: assign every still-available delivery in delivery_ids to the
+        rider in a single UPDATE and return the ids this rider won.
+
+        Concurrent claims serialize on the row lock and re-check the WHERE clause, so each
+        delivery has exactly one winner; the others simply match no row. The caller commits.
+        """
+        if not delivery_ids:
+            return []
+
+        now = datetime.utcnow()
+        # Closed report days the claim moves rows out of (a pool row keeps the assigned_at
+        # of its creation or last assignment); a plain primary-key read, no locks
+        previous_days = dict(db.query(Delivery.delivery_id, Delivery.assigned_at).filter(
+            Delivery.delivery_id.in_(delivery_ids),
+            Delivery.status == "AVAILABLE",
+            Delivery.assigned_at < day_start(first_open_day())
+        ).all())
+
+        won = db.execute(
+            update(Delivery).where(
+                Delivery.delivery_id.in_(delivery_ids),
+                Delivery.status == "AVAILABLE",
+                Delivery.is_available.is_(True),
+                Delivery.delivery_person_id.is_(None)
+            ).values(
+                delivery_person_id=delivery_person_id,
+                status="ASSIGNED",
+                is_available=False,
+                assigned_at=now
+            ).returning(Delivery.delivery_id).execution_options(synchronize_session=False)
+        ).scalars().all()
+
+        # Core UPDATE skips the ORM flush hooks, so invalidate the delivery rollups here,
+        # after commit: claims must not queue on a report_rollup_day row (open days are skipped)
+        if won:
+            days = {as_date(now)} | {
+                as_date(previous_days[delivery_id]) for delivery_id in won
+                if delivery_id in previous_days
             }
-        )
+            ReportRollupRepository.mark_dirty_after_commit(db, {ROLLUP_DELIVERY: days})
+            mark_pool_changed(db)
+
+            # Customer and winner hear about the assignment; other riders drop it from their pool
+            DeliveryEventRepository.stage_events(
+                db, DELIVERY_ASSIGNED, DeliveryEventRepository.get_audience(db, won), roles=("delivery",)
+            )
+
+        return list(won)
+
+    def assign_delivery(self, db: Session, delivery_id: int, delivery_person_id: int) -> bool:
+        """Assign delivery to person if nobody else has claimed it"""
+        won = self.claim_deliveries(db, [delivery_id], delivery_person_id)
         db.commit()
+        return bool(won)
+
+    def get_claim_states(self, db: Session, delivery_ids: List[int]) -> Dict[int, Tuple[str, Optional[int]]]:
+        """delivery_id -> (status, delivery_person_id), to explain lost claims"""
+        rows = db.query(
+            Delivery.delivery_id, Delivery.status, Delivery.delivery_person_id
+        ).filter(Delivery.delivery_id.in_(delivery_ids)).all()
+        return {delivery_id: (status, person_id) for delivery_id, status, person_id in rows}
 
     def cancel_delivery(self, db: Session, delivery_id: int):
         """Cancel delivery and make available"""
+        # Read before the update so the rider who gave it up is still in the audience
+        audience = DeliveryEventRepository.get_audience(db, [delivery_id])
         db.execute(
-            """
+            text("""
             UPDATE delivery 
             SET status = 'AVAILABLE',
                 is_available = true,
                 delivery_person_id = NULL,
                 available_since = :now
             WHERE delivery_id = :delivery_id
-            """,
+            """),
             {
                 "delivery_id": delivery_id,
                 "now": datetime.utcnow()
             }
         )
-        db.commit()
\ No newline at end of file
+        DeliveryEventRepository.stage_events(
+            db, DELIVERY_RELEASED, audience, roles=("delivery",), status="AVAILABLE", delivery_person_id=None
+        )
+        mark_pool_changed(db)
+        db.commit()
+
+
+# ===== FEED INVALIDATION =====
+# The cached available feed is dropped when a transaction that changed the pool
+# commits. ORM changes are found on flush; Core UPDATEs call mark_pool_changed.
+
+_POOL_CHANGED_KEY = "available_pool_changed"
+
+
+def mark_pool_changed(db: Session) -> None:
+    """Drop the available feed once the current transaction commits"""
+    db.info[_POOL_CHANGED_KEY] = True
+
+
+def _track_pool_changes(session: Session, flush_context) -> None:
+    dirty = set(session.dirty)
+    for obj in list(session.new) + list(dirty) + list(session.deleted):
+        if not isinstance(obj, Delivery):
+            continue
+        state = obj._sa_instance_state
+        if obj in dirty and not any(state.attrs[name].history.has_changes() for name in POOL_COLUMNS):
+            continue
+        session.info[_POOL_CHANGED_KEY] = True
+        return
+
+
+def _apply_pool_changes(session: Session) -> None:
+    if session.info.pop(_POOL_CHANGED_KEY, False):
+        available_feed.invalidate()
+
+
+def _discard_pool_changes(session: Session, previous_transaction) -> None:
+    if previous_transaction.nested:
+        return
+    session.info.pop(_POOL_CHANGED_KEY, None)
+
+
+def register_available_feed_listeners() -> None:
+    """Keep the in-process available feed in step with committed pool changes"""
+    for name, listener in (
+        ("after_flush", _track_pool_changes),
+        ("after_commit", _apply_pool_changes),
+        ("after_soft_rollback", _discard_pool_changes),
+    ):
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
\ No newline at end of file
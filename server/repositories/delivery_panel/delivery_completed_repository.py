@@ -16,6 +16,7 @@ from models.product_catalog.product import Product
 from models.address import Address, Area, City
 from models.payment import Payment
 from models.feedback.feedback import Feedback
+from utils.date_range import between_days, on_day
 
 # Import schemas
 from schemas.delivery_panel.delivery_completed_schema import (
@@ -32,13 +33,12 @@ class DeliveryCompletedRepository:
         if period:
             today = date.today()
             if period == "today":
-                query = query.filter(func.date(Delivery.delivered_at) == today)
+                query = query.filter(on_day(Delivery.delivered_at, today))
             elif period == "week":
                 week_start = today - timedelta(days=today.weekday())
                 week_end = week_start + timedelta(days=6)
                 query = query.filter(
-                    func.date(Delivery.delivered_at) >= week_start,
-                    func.date(Delivery.delivered_at) <= week_end
+                    between_days(Delivery.delivered_at, week_start, week_end)
                 )
             elif period == "month":
                 month_start = today.replace(day=1)
@@ -48,8 +48,7 @@ class DeliveryCompletedRepository:
                 )
                 month_end = next_month - timedelta(days=1)
                 query = query.filter(
-                    func.date(Delivery.delivered_at) >= month_start,
-                    func.date(Delivery.delivered_at) <= month_end
+                    between_days(Delivery.delivered_at, month_start, month_end)
                 )
         
         # Apply custom date range
@@ -325,12 +324,12 @@ class DeliveryCompletedRepository:
         # Today's deliveries
         today = date.today()
         today_deliveries = base_query.filter(
-            func.date(Delivery.delivered_at) == today
+            on_day(Delivery.delivered_at, today)
         ).count()
         
         # Today's earnings
         today_earnings_query = base_query.filter(
-            func.date(Delivery.delivered_at) == today
+            on_day(Delivery.delivered_at, today)
         ).join(
             DeliveryEarnings, DeliveryEarnings.delivery_id == Delivery.delivery_id
         ).with_entities(
@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc, and_, or_, case, text, extract
 from datetime import datetime, timedelta, date
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from decimal import Decimal
 
 # Import models
@@ -9,14 +9,15 @@ from models.delivery.delivery import Delivery
 from models.delivery.delivery_person import DeliveryPerson
 from models.delivery.delivery_earnings import DeliveryEarnings
 from models.order.order import Order
-from models.order.order_item import OrderItem
 from models.user import User
 from models.product_catalog.product_variant import ProductVariant
 from models.product_catalog.product import Product
 from models.address import Address, Area, City
-from models.payment import Payment
 from models.feedback.feedback import Feedback
 from models.feedback.user_issue import UserIssue
+from repositories.delivery_panel.delivery_active_repository import DeliveryActiveRepository, ACTIVE_DELIVERY_STATUSES
+from repositories.delivery_panel.delivery_location_repository import DeliveryLocationRepository
+from utils.date_range import between_days, on_day
 
 # Import schemas
 from schemas.delivery_panel.delivery_dashboard_schema import (
@@ -32,57 +33,88 @@ class DeliveryDashboardRepository:
     def get_dashboard_stats(db: Session, delivery_person_id: int) -> Dict[str, Any]:
         """Get dashboard statistics for delivery person"""
         today = date.today()
-        yesterday = today - timedelta(days=1)
-        
-        # Today's deliveries
-        today_deliveries = db.query(Delivery).filter(
-            Delivery.delivery_person_id == delivery_person_id,
-            func.date(Delivery.assigned_at) == today
-        ).count()
-        
-        # Yesterday's deliveries for comparison
-        yesterday_deliveries = db.query(Delivery).filter(
-            Delivery.delivery_person_id == delivery_person_id,
-            func.date(Delivery.assigned_at) == yesterday
-        ).count()
-        
-        # Completed deliveries today
-        completed_today = db.query(Delivery).filter(
-            Delivery.delivery_person_id == delivery_person_id,
-            func.date(Delivery.assigned_at) == today,
-            Delivery.status == "DELIVERED"
-        ).count()
-        
-        # In progress deliveries
-        in_progress = db.query(Delivery).filter(
+        deliveries = DeliveryDashboardRepository.get_dashboard_deliveries(db, delivery_person_id, today)
+        today_earnings = DeliveryDashboardRepository.get_earnings_on_day(db, delivery_person_id, today)
+        rating, total_reviews = DeliveryDashboardRepository.get_rating_summary(db, delivery_person_id)
+        return DeliveryDashboardRepository.build_dashboard_stats(
+            deliveries, today, today_earnings, rating, total_reviews
+        )
+    
+    @staticmethod
+    def get_dashboard_deliveries(db: Session, delivery_person_id: int, today: date) -> List[Tuple]:
+        """
+        The delivery set the stats and schedule sections are derived from, in one query:
+        everything assigned yesterday or today plus every still-active delivery, as
+        (Delivery, Order, User, Address, Area, City) rows (outer joined).
+        """
+        return db.query(
+            Delivery, Order, User, Address, Area, City
+        ).outerjoin(
+            Order, Order.order_id == Delivery.order_id
+        ).outerjoin(
+            User, User.user_id == Order.user_id
+        ).outerjoin(
+            Address, Address.address_id == Order.address_id
+        ).outerjoin(
+            Area, Area.area_id == Address.area_id
+        ).outerjoin(
+            City, City.city_id == Area.city_id
+        ).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            Delivery.status.in_(["ASSIGNED", "PICKED_UP", "IN_TRANSIT"])
-        ).count()
-        
-        # Today's earnings
-        today_earnings = db.query(
+            or_(
+                between_days(Delivery.assigned_at, today - timedelta(days=1), today),
+                Delivery.status.in_(ACTIVE_DELIVERY_STATUSES)
+            )
+        ).all()
+    
+    @staticmethod
+    def get_earnings_on_day(db: Session, delivery_person_id: int, day: date) -> float:
+        earnings = db.query(
             func.coalesce(func.sum(DeliveryEarnings.amount), 0)
         ).join(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(DeliveryEarnings.earned_at) == today
+            on_day(DeliveryEarnings.earned_at, day)
         ).scalar() or 0
-        
-        # Average per delivery
-        avg_per_delivery = 0
-        if completed_today > 0:
-            avg_per_delivery = float(today_earnings) / completed_today
-        
-        # Rating
-        delivery_person = db.query(DeliveryPerson).filter(
+        return float(earnings)
+    
+    @staticmethod
+    def get_rating_summary(db: Session, delivery_person_id: int) -> Tuple[float, int]:
+        """(rating, number of delivery feedback reviews)"""
+        rating = db.query(DeliveryPerson.rating).filter(
             DeliveryPerson.delivery_person_id == delivery_person_id
-        ).first()
-        rating = float(delivery_person.rating) if delivery_person and delivery_person.rating else 0.0
-        
-        # Total reviews (delivery feedback)
+        ).scalar()
         total_reviews = db.query(Feedback).join(Order).join(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
             Feedback.feedback_type == "DELIVERY_FEEDBACK"
         ).count()
+        return float(rating) if rating else 0.0, total_reviews
+    
+    @staticmethod
+    def build_dashboard_stats(
+        deliveries: List[Tuple],
+        today: date,
+        today_earnings: float,
+        rating: float,
+        total_reviews: int
+    ) -> Dict[str, Any]:
+        """Dashboard statistics from get_dashboard_deliveries rows"""
+        yesterday = today - timedelta(days=1)
+        today_deliveries = yesterday_deliveries = completed_today = in_progress = 0
+        for delivery, *_ in deliveries:
+            assigned_day = delivery.assigned_at.date() if delivery.assigned_at else None
+            if assigned_day == today:
+                today_deliveries += 1
+                if delivery.status == "DELIVERED":
+                    completed_today += 1
+            elif assigned_day == yesterday:
+                yesterday_deliveries += 1
+            if delivery.status in ACTIVE_DELIVERY_STATUSES:
+                in_progress += 1
+        
+        # Average per delivery
+        avg_per_delivery = 0
+        if completed_today > 0:
+            avg_per_delivery = float(today_earnings) / completed_today
         
         # Percentage change
         yesterday_comparison = 0
@@ -105,47 +137,13 @@ class DeliveryDashboardRepository:
     @staticmethod
     def get_active_deliveries(db: Session, delivery_person_id: int) -> List[Dict[str, Any]]:
         """Get active deliveries for delivery person"""
-        deliveries = db.query(
-            Delivery,
-            Order,
-            User,
-            Address,
-            Area,
-            City
-        ).join(
-            Order, Order.order_id == Delivery.order_id
-        ).join(
-            User, User.user_id == Order.user_id
-        ).join(
-            Address, Address.address_id == Order.address_id
-        ).join(
-            Area, Area.area_id == Address.area_id
-        ).join(
-            City, City.city_id == Area.city_id
-        ).filter(
-            Delivery.delivery_person_id == delivery_person_id,
-            Delivery.status.in_(["ASSIGNED", "PICKED_UP", "IN_TRANSIT"])
-        ).order_by(
-            case(
-                (Delivery.status == "ASSIGNED", 1),
-                (Delivery.status == "PICKED_UP", 2),
-                (Delivery.status == "IN_TRANSIT", 3)
-            ),
-            Delivery.expected_delivery_time
-        ).all()
+        # Dashboard lists anything still in an active status
+        deliveries = DeliveryActiveRepository.load_active_deliveries(
+            db, delivery_person_id, undelivered_only=False
+        )
         
         result = []
-        for delivery, order, user, address, area, city in deliveries:
-            # Get items count
-            items_count = db.query(func.sum(OrderItem.quantity)).filter(
-                OrderItem.order_id == order.order_id
-            ).scalar() or 0
-            
-            # Get payment info
-            payment = db.query(Payment).filter(
-                Payment.order_id == order.order_id
-            ).first()
-            
+        for delivery, order, user, address, area, city, items_count, payment_status in deliveries:
             # Format address
             delivery_address = f"{address.line1}"
             if address.line2:
@@ -182,8 +180,8 @@ class DeliveryDashboardRepository:
             # Payment type and amount
             payment_type = "prepaid"
             amount = None
-            if payment:
-                payment_type = "prepaid" if payment.payment_status == "COMPLETED" else "cod"
+            if payment_status is not None:
+                payment_type = "prepaid" if payment_status == "COMPLETED" else "cod"
                 if payment_type == "cod":
                     amount = float(order.total_amount)
             
@@ -219,58 +217,43 @@ class DeliveryDashboardRepository:
         """Get earnings overview for different periods"""
         today = date.today()
         
-        # Today's earnings
-        today_earnings = db.query(
-            func.coalesce(func.sum(DeliveryEarnings.amount), 0)
-        ).join(Delivery).filter(
-            Delivery.delivery_person_id == delivery_person_id,
-            func.date(DeliveryEarnings.earned_at) == today
-        ).scalar() or 0
-        
-        today_deliveries = db.query(Delivery).filter(
-            Delivery.delivery_person_id == delivery_person_id,
-            func.date(Delivery.assigned_at) == today,
-            Delivery.status == "DELIVERED"
-        ).count()
-        
         # This week (Monday to Sunday)
         week_start = today - timedelta(days=today.weekday())
         week_end = week_start + timedelta(days=6)
         
-        week_earnings = db.query(
-            func.coalesce(func.sum(DeliveryEarnings.amount), 0)
-        ).join(Delivery).filter(
-            Delivery.delivery_person_id == delivery_person_id,
-            func.date(DeliveryEarnings.earned_at) >= week_start,
-            func.date(DeliveryEarnings.earned_at) <= week_end
-        ).scalar() or 0
-        
-        week_deliveries = db.query(Delivery).filter(
-            Delivery.delivery_person_id == delivery_person_id,
-            func.date(Delivery.assigned_at) >= week_start,
-            func.date(Delivery.assigned_at) <= week_end,
-            Delivery.status == "DELIVERED"
-        ).count()
-        
         # This month
         month_start = today.replace(day=1)
         next_month = month_start.replace(month=month_start.month % 12 + 1, year=month_start.year + (month_start.month // 12))
         month_end = next_month - timedelta(days=1)
         
-        month_earnings = db.query(
-            func.coalesce(func.sum(DeliveryEarnings.amount), 0)
-        ).join(Delivery).filter(
+        periods = {
+            "today": (today, today),
+            "week": (week_start, week_end),
+            "month": (month_start, month_end)
+        }
+        first_day = min(week_start, month_start)
+        last_day = max(week_end, month_end)
+        
+        # Earnings and delivered counts of all three periods, one scan each
+        earnings = db.query(*[
+            func.coalesce(func.sum(case((between_days(DeliveryEarnings.earned_at, start, end), DeliveryEarnings.amount), else_=0)), 0)
+            for start, end in periods.values()
+        ]).join(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(DeliveryEarnings.earned_at) >= month_start,
-            func.date(DeliveryEarnings.earned_at) <= month_end
-        ).scalar() or 0
+            between_days(DeliveryEarnings.earned_at, first_day, last_day)
+        ).one()
         
-        month_deliveries = db.query(Delivery).filter(
+        deliveries = db.query(*[
+            func.coalesce(func.sum(case((between_days(Delivery.assigned_at, start, end), 1), else_=0)), 0)
+            for start, end in periods.values()
+        ]).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(Delivery.assigned_at) >= month_start,
-            func.date(Delivery.assigned_at) <= month_end,
+            between_days(Delivery.assigned_at, first_day, last_day),
             Delivery.status == "DELIVERED"
-        ).count()
+        ).one()
+        
+        today_earnings, week_earnings, month_earnings = (float(amount or 0) for amount in earnings)
+        today_deliveries, week_deliveries, month_deliveries = (int(count or 0) for count in deliveries)
         
         # Pending settlement (earnings from delivered orders without earnings record)
         pending_earnings_query = db.query(
@@ -286,17 +269,17 @@ class DeliveryDashboardRepository:
             "periods": [
                 {
                     "period": "Today",
-                    "amount": float(today_earnings),
+                    "amount": today_earnings,
                     "deliveries": today_deliveries
                 },
                 {
                     "period": "This Week",
-                    "amount": float(week_earnings),
+                    "amount": week_earnings,
                     "deliveries": week_deliveries
                 },
                 {
                     "period": "This Month",
-                    "amount": float(month_earnings),
+                    "amount": month_earnings,
                     "deliveries": month_deliveries
                 },
                 {
@@ -314,31 +297,17 @@ class DeliveryDashboardRepository:
     def get_today_schedule(db: Session, delivery_person_id: int) -> Dict[str, Any]:
         """Get today's schedule for delivery person - Using deliveries as schedule"""
         today = date.today()
+        deliveries = DeliveryDashboardRepository.get_dashboard_deliveries(db, delivery_person_id, today)
+        return DeliveryDashboardRepository.build_today_schedule(deliveries, today)
+    
+    @staticmethod
+    def build_today_schedule(deliveries: List[Tuple], today: date) -> Dict[str, Any]:
+        """Today's schedule from get_dashboard_deliveries rows"""
+        now = datetime.now()
+        # Only deliveries whose order, customer and address chain are all present
+        complete = [row for row in deliveries if all(part is not None for part in row)]
         
-        # Get today's deliveries
-        today_deliveries = db.query(
-            Delivery,
-            Order,
-            User,
-            Address,
-            Area,
-            City
-        ).join(
-            Order, Order.order_id == Delivery.order_id
-        ).join(
-            User, User.user_id == Order.user_id
-        ).join(
-            Address, Address.address_id == Order.address_id
-        ).join(
-            Area, Area.area_id == Address.area_id
-        ).join(
-            City, City.city_id == Area.city_id
-        ).filter(
-            Delivery.delivery_person_id == delivery_person_id,
-            func.date(Delivery.assigned_at) == today
-        ).order_by(
-            Delivery.expected_delivery_time
-        ).all()
+        today_deliveries = [row for row in complete if row[0].assigned_at and row[0].assigned_at.date() == today]
         
         # Group deliveries by time periods (morning, afternoon, evening)
         morning_deliveries = []
@@ -401,30 +370,16 @@ class DeliveryDashboardRepository:
         
         # Find next delivery
         next_delivery = None
-        upcoming_deliveries = db.query(
-            Delivery,
-            Order,
-            User,
-            Address,
-            Area,
-            City
-        ).join(
-            Order, Order.order_id == Delivery.order_id
-        ).join(
-            User, User.user_id == Order.user_id
-        ).join(
-            Address, Address.address_id == Order.address_id
-        ).join(
-            Area, Area.area_id == Address.area_id
-        ).join(
-            City, City.city_id == Area.city_id
-        ).filter(
-            Delivery.delivery_person_id == delivery_person_id,
-            Delivery.status.in_(["ASSIGNED", "PICKED_UP"]),
-            Delivery.expected_delivery_time > datetime.now()
-        ).order_by(
-            Delivery.expected_delivery_time
-        ).first()
+        upcoming_deliveries = min(
+            (
+                row for row in complete
+                if row[0].status in ("ASSIGNED", "PICKED_UP")
+                and row[0].expected_delivery_time is not None
+                and row[0].expected_delivery_time > now
+            ),
+            key=lambda row: (row[0].expected_delivery_time, row[0].delivery_id),
+            default=None
+        )
         
         if upcoming_deliveries:
             delivery, order, user, address, area, city = upcoming_deliveries
@@ -726,16 +681,13 @@ class DeliveryDashboardRepository:
         encoded_address = urllib.parse.quote(formatted_address)
         
         # Try to get coordinates from delivery person's current location
-        delivery_person = db.query(DeliveryPerson).filter(
-            DeliveryPerson.delivery_person_id == delivery_person_id
-        ).first()
+        loc_data = DeliveryLocationRepository.get_current_location(db, delivery_person_id)
         
         latitude = 23.0225  # Default coordinates
         longitude = 72.5714
         
-        if delivery_person and delivery_person.current_location:
+        if loc_data:
             try:
-                loc_data = delivery_person.current_location
                 if isinstance(loc_data, dict):
                     latitude = loc_data.get('lat', latitude)
                     longitude = loc_data.get('lng', longitude)
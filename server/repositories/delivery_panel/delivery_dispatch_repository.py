@@ -0,0 +1,172 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from models.delivery.delivery import Delivery
+from models.delivery.delivery_person import DeliveryPerson
+from models.notification import Notification, NotificationType
+from repositories.delivery_panel.delivery_pickup_repository import DeliveryPickupRepository
+from utils.event_hub import DELIVERY_OFFERED, make_event, publish_after_commit
+from utils.rider_index import rider_index
+
+# Riders whose changes move them in or out of the dispatch index
+INDEXED_RIDER_COLUMNS = ("current_location", "is_online", "status")
+
+
+def rider_coordinates(current_location) -> Optional[Tuple[float, float]]:
+    """(lat, lng) from a DeliveryPerson.current_location value, if usable"""
+    if not isinstance(current_location, dict):
+        return None
+    try:
+        return float(current_location["lat"]), float(current_location["lng"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class DeliveryDispatchRepository:
+
+    @staticmethod
+    def get_dispatchable_riders(db: Session) -> List[Tuple[int, float, float]]:
+        """(delivery_person_id, lat, lng) of online, active riders with a known position"""
+        rows = db.query(
+            DeliveryPerson.delivery_person_id,
+            DeliveryPerson.current_location
+        ).filter(
+            DeliveryPerson.is_online.is_(True),
+            DeliveryPerson.status == "ACTIVE",
+            DeliveryPerson.current_location.isnot(None)
+        ).all()
+
+        riders = []
+        for delivery_person_id, current_location in rows:
+            coordinates = rider_coordinates(current_location)
+            if coordinates:
+                riders.append((delivery_person_id, *coordinates))
+        return riders
+
+    @staticmethod
+    def get_dispatchable_ids(db: Session, delivery_person_ids: List[int]) -> Set[int]:
+        """The riders among delivery_person_ids that are currently online and active"""
+        if not delivery_person_ids:
+            return set()
+        rows = db.query(DeliveryPerson.delivery_person_id).filter(
+            DeliveryPerson.delivery_person_id.in_(delivery_person_ids),
+            DeliveryPerson.is_online.is_(True),
+            DeliveryPerson.status == "ACTIVE"
+        ).all()
+        return {delivery_person_id for (delivery_person_id,) in rows}
+
+    @staticmethod
+    def get_available_delivery(db: Session, delivery_id: int) -> Optional[Delivery]:
+        """Pool delivery locked for an offer/reject update (offered_to and rejected_by are read-modify-write)"""
+        return db.query(Delivery).filter(
+            Delivery.delivery_id == delivery_id,
+            Delivery.status == "AVAILABLE",
+            Delivery.is_available.is_(True)
+        ).with_for_update().first()
+
+    @staticmethod
+    def get_pickup_point(db: Session, delivery: Delivery) -> Tuple[float, float]:
+        """Where the rider has to go first for this delivery"""
+        location = DeliveryPickupRepository._get_pickup_location(db, delivery.order, {})
+        return location["latitude"], location["longitude"]
+
+    @staticmethod
+    def record_offer(db: Session, delivery: Delivery, delivery_person_ids: List[int]) -> int:
+        """Add riders to offered_to and notify them; returns notifications created"""
+        now = datetime.utcnow()
+        # JSON columns only register a change when reassigned
+        delivery.offered_to = list(delivery.offered_to or []) + [
+            person_id for person_id in delivery_person_ids if person_id not in (delivery.offered_to or [])
+        ]
+        delivery.notification_sent = True
+        delivery.last_notification_sent = now
+        delivery.notification_count = (delivery.notification_count or 0) + 1
+
+        user_ids = db.query(DeliveryPerson.user_id).filter(
+            DeliveryPerson.delivery_person_id.in_(delivery_person_ids)
+        ).all()
+        db.add_all([
+            Notification(
+                user_id=user_id,
+                title="New Delivery Offer",
+                message=f"Order #{delivery.order_id} is waiting for pickup near you",
+                type=NotificationType.DELIVERY_OFFER,
+                reference_id=delivery.delivery_id,
+                created_at=now
+            )
+            for (user_id,) in user_ids if user_id is not None
+        ])
+        publish_after_commit(db, make_event(
+            DELIVERY_OFFERED,
+            {"delivery_id": delivery.delivery_id, "order_id": delivery.order_id, "status": delivery.status},
+            [user_id for (user_id,) in user_ids]
+        ))
+        return len(user_ids)
+
+    @staticmethod
+    def record_rejection(db: Session, delivery: Delivery, delivery_person_id: int) -> None:
+        rejected = list(delivery.rejected_by or [])
+        if delivery_person_id not in rejected:
+            rejected.append(delivery_person_id)
+            delivery.rejected_by = rejected
+
+    @staticmethod
+    def collect_rider_changes(session: Session) -> Dict[int, Optional[Tuple[float, float]]]:
+        """Riders the pending flush moves, brings online or takes offline (call from after_flush).
+
+        Maps delivery_person_id to its new position, or None when it should leave the index.
+        """
+        changes: Dict[int, Optional[Tuple[float, float]]] = {}
+        dirty = set(session.dirty)
+        for obj in list(session.new) + list(dirty) + list(session.deleted):
+            if not isinstance(obj, DeliveryPerson) or obj.delivery_person_id is None:
+                continue
+            state = obj._sa_instance_state
+            if obj in dirty and not any(state.attrs[name].history.has_changes() for name in INDEXED_RIDER_COLUMNS):
+                continue
+            values = state.dict
+            dispatchable = (
+                obj not in session.deleted
+                and values.get("is_online") is True
+                and values.get("status") == "ACTIVE"
+            )
+            changes[obj.delivery_person_id] = rider_coordinates(values.get("current_location")) if dispatchable else None
+        return changes
+
+
+# ===== INDEX MAINTENANCE =====
+# Flushed rider changes wait in session.info until the transaction commits, so
+# the index never shows positions or online states that were rolled back.
+
+_PENDING_KEY = "rider_index_changes"
+
+
+def _track_rider_changes(session: Session, flush_context) -> None:
+    changes = DeliveryDispatchRepository.collect_rider_changes(session)
+    if changes:
+        session.info.setdefault(_PENDING_KEY, {}).update(changes)
+
+
+def _apply_rider_changes(session: Session) -> None:
+    for delivery_person_id, coordinates in session.info.pop(_PENDING_KEY, {}).items():
+        if coordinates is None:
+            rider_index.remove(delivery_person_id)
+        else:
+            rider_index.update(delivery_person_id, *coordinates)
+
+
+def _discard_rider_changes(session: Session, *args) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_dispatch_listeners() -> None:
+    """Keep the in-process rider index in step with committed rider location / status changes"""
+    for name, listener in (
+        ("after_flush", _track_rider_changes),
+        ("after_commit", _apply_rider_changes),
+        ("after_soft_rollback", _discard_rider_changes),
+    ):
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
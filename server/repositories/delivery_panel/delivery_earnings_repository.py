@@ -11,6 +11,7 @@ from models.delivery.delivery_earnings import DeliveryEarnings
 from models.order.order import Order
 from models.user import User
 from models.payment import Payment
+from utils.date_range import between_days, on_day
 
 # Import schemas
 from schemas.delivery_panel.delivery_earnings_schema import (
@@ -27,13 +28,12 @@ class DeliveryEarningsRepository:
         if period:
             today = date.today()
             if period == EarningsPeriod.TODAY:
-                query = query.filter(func.date(DeliveryEarnings.earned_at) == today)
+                query = query.filter(on_day(DeliveryEarnings.earned_at, today))
             elif period == EarningsPeriod.WEEK:
                 week_start = today - timedelta(days=today.weekday())
                 week_end = week_start + timedelta(days=6)
                 query = query.filter(
-                    func.date(DeliveryEarnings.earned_at) >= week_start,
-                    func.date(DeliveryEarnings.earned_at) <= week_end
+                    between_days(DeliveryEarnings.earned_at, week_start, week_end)
                 )
             elif period == EarningsPeriod.MONTH:
                 month_start = today.replace(day=1)
@@ -43,15 +43,14 @@ class DeliveryEarningsRepository:
                 )
                 month_end = next_month - timedelta(days=1)
                 query = query.filter(
-                    func.date(DeliveryEarnings.earned_at) >= month_start,
-                    func.date(DeliveryEarnings.earned_at) <= month_end
+                    between_days(DeliveryEarnings.earned_at, month_start, month_end)
                 )
         
         # Apply custom date range
         if start_date:
-            query = query.filter(func.date(DeliveryEarnings.earned_at) >= start_date)
+            query = query.filter(between_days(DeliveryEarnings.earned_at, start_date))
         if end_date:
-            query = query.filter(func.date(DeliveryEarnings.earned_at) <= end_date)
+            query = query.filter(between_days(DeliveryEarnings.earned_at, end=end_date))
         
         return query
     
@@ -61,13 +60,12 @@ class DeliveryEarningsRepository:
         if period:
             today = date.today()
             if period == EarningsPeriod.TODAY:
-                query = query.filter(func.date(Delivery.delivered_at) == today)
+                query = query.filter(on_day(Delivery.delivered_at, today))
             elif period == EarningsPeriod.WEEK:
                 week_start = today - timedelta(days=today.weekday())
                 week_end = week_start + timedelta(days=6)
                 query = query.filter(
-                    func.date(Delivery.delivered_at) >= week_start,
-                    func.date(Delivery.delivered_at) <= week_end
+                    between_days(Delivery.delivered_at, week_start, week_end)
                 )
             elif period == EarningsPeriod.MONTH:
                 month_start = today.replace(day=1)
@@ -77,15 +75,14 @@ class DeliveryEarningsRepository:
                 )
                 month_end = next_month - timedelta(days=1)
                 query = query.filter(
-                    func.date(Delivery.delivered_at) >= month_start,
-                    func.date(Delivery.delivered_at) <= month_end
+                    between_days(Delivery.delivered_at, month_start, month_end)
                 )
         
         # Apply custom date range
         if start_date:
-            query = query.filter(func.date(Delivery.delivered_at) >= start_date)
+            query = query.filter(between_days(Delivery.delivered_at, start_date))
         if end_date:
-            query = query.filter(func.date(Delivery.delivered_at) <= end_date)
+            query = query.filter(between_days(Delivery.delivered_at, end=end_date))
         
         return query
     
@@ -102,7 +99,7 @@ class DeliveryEarningsRepository:
             func.coalesce(func.sum(DeliveryEarnings.amount), 0)
         ).join(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(DeliveryEarnings.earned_at) == today
+            on_day(DeliveryEarnings.earned_at, today)
         ).scalar()
         
         today_earnings = float(today_earnings_result or 0)
@@ -110,7 +107,7 @@ class DeliveryEarningsRepository:
         # Today's deliveries (for average calculation)
         today_deliveries = db.query(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(Delivery.delivered_at) == today,
+            on_day(Delivery.delivered_at, today),
             Delivery.status == "DELIVERED"
         ).count()
         
@@ -122,15 +119,13 @@ class DeliveryEarningsRepository:
             func.coalesce(func.sum(DeliveryEarnings.amount), 0)
         ).join(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(DeliveryEarnings.earned_at) >= week_start,
-            func.date(DeliveryEarnings.earned_at) <= week_end
+            between_days(DeliveryEarnings.earned_at, week_start, week_end)
         ).scalar()
         
         week_earnings = float(week_earnings_result or 0)
         week_deliveries = db.query(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(Delivery.delivered_at) >= week_start,
-            func.date(Delivery.delivered_at) <= week_end,
+            between_days(Delivery.delivered_at, week_start, week_end),
             Delivery.status == "DELIVERED"
         ).count()
         
@@ -146,15 +141,13 @@ class DeliveryEarningsRepository:
             func.coalesce(func.sum(DeliveryEarnings.amount), 0)
         ).join(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(DeliveryEarnings.earned_at) >= month_start,
-            func.date(DeliveryEarnings.earned_at) <= month_end
+            between_days(DeliveryEarnings.earned_at, month_start, month_end)
         ).scalar()
         
         month_earnings = float(month_earnings_result or 0)
         month_deliveries = db.query(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(Delivery.delivered_at) >= month_start,
-            func.date(Delivery.delivered_at) <= month_end,
+            between_days(Delivery.delivered_at, month_start, month_end),
             Delivery.status == "DELIVERED"
         ).count()
         
@@ -238,9 +231,9 @@ class DeliveryEarningsRepository:
         )
         
         if start_date:
-            query = query.filter(func.date(DeliveryEarnings.earned_at) >= start_date)
+            query = query.filter(between_days(DeliveryEarnings.earned_at, start_date))
         if end_date:
-            query = query.filter(func.date(DeliveryEarnings.earned_at) <= end_date)
+            query = query.filter(between_days(DeliveryEarnings.earned_at, end=end_date))
         
         delivery_fees = float(query.scalar() or 0)
         
@@ -272,8 +265,7 @@ class DeliveryEarningsRepository:
                 func.count(DeliveryEarnings.earning_id).label('deliveries')
             ).join(Delivery).filter(
                 Delivery.delivery_person_id == delivery_person_id,
-                func.date(DeliveryEarnings.earned_at) >= start_date,
-                func.date(DeliveryEarnings.earned_at) <= end_date
+                between_days(DeliveryEarnings.earned_at, start_date, end_date)
             ).group_by(
                 func.date(DeliveryEarnings.earned_at)
             ).order_by(
@@ -319,8 +311,7 @@ class DeliveryEarningsRepository:
                 func.count(DeliveryEarnings.earning_id).label('deliveries')
             ).join(Delivery).filter(
                 Delivery.delivery_person_id == delivery_person_id,
-                func.date(DeliveryEarnings.earned_at) >= start_date,
-                func.date(DeliveryEarnings.earned_at) <= end_date
+                between_days(DeliveryEarnings.earned_at, start_date, end_date)
             ).group_by(
                 func.year(DeliveryEarnings.earned_at),
                 func.week(DeliveryEarnings.earned_at)
@@ -356,8 +347,7 @@ class DeliveryEarningsRepository:
                 func.count(DeliveryEarnings.earning_id).label('deliveries')
             ).join(Delivery).filter(
                 Delivery.delivery_person_id == delivery_person_id,
-                func.date(DeliveryEarnings.earned_at) >= start_date,
-                func.date(DeliveryEarnings.earned_at) <= end_date
+                between_days(DeliveryEarnings.earned_at, start_date, end_date)
             ).group_by(
                 func.year(DeliveryEarnings.earned_at),
                 func.month(DeliveryEarnings.earned_at)
@@ -496,9 +486,9 @@ class DeliveryEarningsRepository:
         )
         
         if start_date:
-            query = query.filter(func.date(DeliveryEarnings.earned_at) >= start_date)
+            query = query.filter(between_days(DeliveryEarnings.earned_at, start_date))
         if end_date:
-            query = query.filter(func.date(DeliveryEarnings.earned_at) <= end_date)
+            query = query.filter(between_days(DeliveryEarnings.earned_at, end=end_date))
         
         # Group by date to simulate payouts
         subquery = query.subquery()
@@ -606,15 +596,13 @@ class DeliveryEarningsRepository:
             func.coalesce(func.sum(DeliveryEarnings.amount), 0)
         ).join(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(DeliveryEarnings.earned_at) >= current_start,
-            func.date(DeliveryEarnings.earned_at) <= current_end
+            between_days(DeliveryEarnings.earned_at, current_start, current_end)
         )
         current_earnings = float(current_query.scalar() or 0)
         
         current_deliveries = db.query(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(Delivery.delivered_at) >= current_start,
-            func.date(Delivery.delivered_at) <= current_end,
+            between_days(Delivery.delivered_at, current_start, current_end),
             Delivery.status == "DELIVERED"
         ).count()
         
@@ -623,15 +611,13 @@ class DeliveryEarningsRepository:
             func.coalesce(func.sum(DeliveryEarnings.amount), 0)
         ).join(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(DeliveryEarnings.earned_at) >= previous_start,
-            func.date(DeliveryEarnings.earned_at) <= previous_end
+            between_days(DeliveryEarnings.earned_at, previous_start, previous_end)
         )
         previous_earnings = float(previous_query.scalar() or 0)
         
         previous_deliveries = db.query(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(Delivery.delivered_at) >= previous_start,
-            func.date(Delivery.delivered_at) <= previous_end,
+            between_days(Delivery.delivered_at, previous_start, previous_end),
             Delivery.status == "DELIVERED"
         ).count()
         
@@ -0,0 +1,68 @@
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterable, List
+
+from models.delivery.delivery import Delivery
+from models.delivery.delivery_person import DeliveryPerson
+from models.order.order import Order
+from utils.event_hub import make_event, publish_after_commit
+
+
+class DeliveryEventRepository:
+    """Who hears about a delivery change, and staging the events for commit"""
+
+    @staticmethod
+    def get_audience(db: Session, delivery_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Current state of each delivery plus the customer's and rider's user ids, in one query"""
+        delivery_ids = list(delivery_ids)
+        if not delivery_ids:
+            return []
+        rows = db.query(
+            Delivery.delivery_id,
+            Delivery.order_id,
+            Delivery.status,
+            Delivery.delivery_person_id,
+            Order.user_id,
+            DeliveryPerson.user_id
+        ).outerjoin(
+            Order, Order.order_id == Delivery.order_id
+        ).outerjoin(
+            DeliveryPerson, DeliveryPerson.delivery_person_id == Delivery.delivery_person_id
+        ).filter(Delivery.delivery_id.in_(delivery_ids)).all()
+
+        return [
+            {
+                "delivery_id": delivery_id,
+                "order_id": order_id,
+                "status": status,
+                "delivery_person_id": delivery_person_id,
+                "customer_user_id": customer_user_id,
+                "rider_user_id": rider_user_id
+            }
+            for delivery_id, order_id, status, delivery_person_id, customer_user_id, rider_user_id in rows
+        ]
+
+    @staticmethod
+    def stage_events(
+        db: Session,
+        event_type: str,
+        audience: List[Dict[str, Any]],
+        roles: Iterable[str] = (),
+        **changes: Any
+    ) -> None:
+        """Queue one event per delivery for its customer and rider (and any roles), sent on commit.
+
+        changes override the audience's delivery fields, e.g. the new status when the
+        audience was read before the update.
+        """
+        roles = tuple(roles)
+        for entry in audience:
+            data = {
+                "delivery_id": entry["delivery_id"],
+                "order_id": entry["order_id"],
+                "status": entry["status"],
+                "delivery_person_id": entry["delivery_person_id"],
+                **changes
+            }
+            publish_after_commit(db, make_event(
+                event_type, data, (entry["customer_user_id"], entry["rider_user_id"]), roles
+            ))
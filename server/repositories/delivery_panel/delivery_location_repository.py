@@ -0,0 +1,164 @@
+import os
+import json
+from sqlalchemy import JSON, Integer, Text, bindparam, cast, column, insert, or_, update, values
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from config.database import SessionLocal
+from models.delivery.delivery_person import DeliveryPerson
+from models.delivery.delivery_location_history import DeliveryLocationHistory
+from utils.location_buffer import LocationFix, PeriodicFlusher, location_buffer
+from utils.rider_index import rider_index
+
+# Keep a sampled position trail per rider for route replay
+LOCATION_HISTORY_ENABLED = os.getenv("LOCATION_HISTORY_ENABLED", "false").lower() in ("1", "true", "yes")
+# Riders written per UPDATE statement
+LOCATION_FLUSH_BATCH = int(os.getenv("LOCATION_FLUSH_BATCH", "1000"))
+
+
+class DeliveryLocationRepository:
+
+    @staticmethod
+    def bulk_update_locations(db: Session, fixes: Iterable[LocationFix]) -> int:
+        """Write current_location for many riders; one statement per LOCATION_FLUSH_BATCH riders.
+
+        PostgreSQL gets UPDATE ... FROM (VALUES ...); other databases an executemany
+        of the same parameterised UPDATE. A stored location with a newer updated_at,
+        written by another worker, is left alone.
+        """
+        fixes = list(fixes)
+        table = DeliveryPerson.__table__
+        stored_at = table.c.current_location["updated_at"].as_string()
+        for start in range(0, len(fixes), LOCATION_FLUSH_BATCH):
+            locations = [(fix.delivery_person_id, fix.as_location()) for fix in fixes[start:start + LOCATION_FLUSH_BATCH]]
+            if db.get_bind().dialect.name == "postgresql":
+                batch = values(
+                    column("delivery_person_id", Integer),
+                    column("location", Text),
+                    column("updated_at", Text),
+                    name="batch"
+                ).data([
+                    (person_id, json.dumps(location), location["updated_at"])
+                    for person_id, location in locations
+                ])
+                db.execute(
+                    update(table)
+                    .where(
+                        table.c.delivery_person_id == batch.c.delivery_person_id,
+                        or_(stored_at.is_(None), stored_at < batch.c.updated_at)
+                    )
+                    .values(current_location=cast(batch.c.location, JSON))
+                )
+            else:
+                db.execute(
+                    update(table)
+                    .where(
+                        table.c.delivery_person_id == bindparam("person_id"),
+                        or_(stored_at.is_(None), stored_at < bindparam("updated_at", type_=Text))
+                    )
+                    .values(current_location=bindparam("location", type_=JSON)),
+                    [
+                        {"person_id": person_id, "location": location, "updated_at": location["updated_at"]}
+                        for person_id, location in locations
+                    ]
+                )
+        return len(fixes)
+
+    @staticmethod
+    def append_history(db: Session, fixes: Iterable[LocationFix]) -> None:
+        rows = [
+            {
+                "delivery_person_id": fix.delivery_person_id,
+                "latitude": fix.latitude,
+                "longitude": fix.longitude,
+                "accuracy": fix.accuracy,
+                "recorded_at": fix.recorded_at
+            }
+            for fix in fixes
+        ]
+        if rows:
+            db.execute(insert(DeliveryLocationHistory), rows)
+
+    @staticmethod
+    def get_location_history(
+        db: Session,
+        delivery_person_id: int,
+        since: datetime,
+        until: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """A rider's sampled positions in time order, for route replay"""
+        query = db.query(
+            DeliveryLocationHistory.latitude,
+            DeliveryLocationHistory.longitude,
+            DeliveryLocationHistory.accuracy,
+            DeliveryLocationHistory.recorded_at
+        ).filter(
+            DeliveryLocationHistory.delivery_person_id == delivery_person_id,
+            DeliveryLocationHistory.recorded_at >= since
+        )
+        if until is not None:
+            query = query.filter(DeliveryLocationHistory.recorded_at < until)
+
+        return [
+            {"latitude": latitude, "longitude": longitude, "accuracy": accuracy, "recorded_at": recorded_at}
+            for latitude, longitude, accuracy, recorded_at in query.order_by(DeliveryLocationHistory.recorded_at).all()
+        ]
+
+    @staticmethod
+    def get_current_location(db: Session, delivery_person_id: int) -> Optional[Dict[str, Any]]:
+        """Latest current_location JSON: this process's buffer while its fix is fresh, the database otherwise"""
+        fix = location_buffer.latest(delivery_person_id)
+        if fix is not None:
+            return fix.as_location()
+        current_location = db.query(DeliveryPerson.current_location).filter(
+            DeliveryPerson.delivery_person_id == delivery_person_id
+        ).scalar()
+        return current_location if isinstance(current_location, dict) else None
+
+
+# ===== INGESTION =====
+# Pings only touch memory; the flusher writes the newest fix per rider every
+# LOCATION_FLUSH_SECONDS in one transaction.
+
+def flush_locations() -> int:
+    """Write buffered fixes; on failure they go back to the buffer for the next run"""
+    fixes = location_buffer.drain()
+    if not fixes:
+        return 0
+
+    db = SessionLocal()
+    try:
+        DeliveryLocationRepository.bulk_update_locations(db, fixes.values())
+        if LOCATION_HISTORY_ENABLED:
+            DeliveryLocationRepository.append_history(db, fixes.values())
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        location_buffer.requeue(fixes)
+        print(f"⚠️ Location flush failed, {len(fixes)} riders requeued: {e}")
+        return 0
+    finally:
+        db.close()
+
+    location_buffer.mark_flushed(len(fixes))
+    return len(fixes)
+
+
+location_flusher = PeriodicFlusher(flush_locations)
+
+
+def record_location(
+    delivery_person_id: int,
+    latitude: float,
+    longitude: float,
+    accuracy: Optional[float] = None
+) -> LocationFix:
+    """Accept a GPS ping: buffer it, move the rider in the dispatch index, write it later"""
+    fix = LocationFix(delivery_person_id, latitude, longitude, accuracy)
+    location_buffer.record(fix)
+    # The bulk UPDATE bypasses the ORM listeners that normally keep the index current
+    if delivery_person_id in rider_index:
+        rider_index.update(delivery_person_id, fix.latitude, fix.longitude)
+    location_flusher.ensure_started()
+    return fix
@@ -22,6 +22,9 @@ from models.product_catalog.product import Product
 from models.analytics.review_vote import ReviewVote
 from models.product_catalog.product_review import ProductReview
 
+from utils.date_range import between_days
+from utils.fleet_metrics import fleet_metrics, FLEET_METRICS, RANK_METRIC
+
 # Import schemas
 from schemas.delivery_panel.delivery_performance_schema import PerformanceFilters, DateRangeFilter, PerformancePeriod
 
@@ -47,9 +50,9 @@ class DeliveryPerformanceRepository:
         )
         
         if start_date:
-            base_filter = and_(base_filter, Delivery.assigned_at >= start_date)
+            base_filter = and_(base_filter, between_days(Delivery.assigned_at, start_date))
         if end_date:
-            base_filter = and_(base_filter, Delivery.assigned_at <= end_date)
+            base_filter = and_(base_filter, between_days(Delivery.assigned_at, end=end_date))
         
         # Total deliveries count
         total_query = db.query(func.count(Delivery.delivery_id)).filter(base_filter)
@@ -102,9 +105,9 @@ class DeliveryPerformanceRepository:
         )
         
         if start_date:
-            rating_query = rating_query.filter(Feedback.created_at >= start_date)
+            rating_query = rating_query.filter(between_days(Feedback.created_at, start_date))
         if end_date:
-            rating_query = rating_query.filter(Feedback.created_at <= end_date)
+            rating_query = rating_query.filter(between_days(Feedback.created_at, end=end_date))
         
         rating_result = rating_query.first()
         average_rating = float(rating_result.avg_rating) if rating_result and rating_result.avg_rating else 0.0
@@ -164,9 +167,9 @@ class DeliveryPerformanceRepository:
         )
         
         if start_date:
-            earnings_stats = earnings_stats.filter(DeliveryEarnings.earned_at >= start_date)
+            earnings_stats = earnings_stats.filter(between_days(DeliveryEarnings.earned_at, start_date))
         if end_date:
-            earnings_stats = earnings_stats.filter(DeliveryEarnings.earned_at <= end_date)
+            earnings_stats = earnings_stats.filter(between_days(DeliveryEarnings.earned_at, end=end_date))
         
         earnings_result = earnings_stats.first()
         total_earnings = float(earnings_result.total_earnings) if earnings_result and earnings_result.total_earnings else 0.0
@@ -231,8 +234,7 @@ class DeliveryPerformanceRepository:
             and_(
                 Delivery.delivery_person_id == delivery_person_id,
                 Delivery.status == "DELIVERED",
-                Delivery.assigned_at >= start_date,
-                Delivery.assigned_at <= end_date
+                between_days(Delivery.assigned_at, start_date, end_date)
             )
         ).group_by(date_format(Delivery.assigned_at), func.date(Delivery.assigned_at))
         
@@ -252,8 +254,7 @@ class DeliveryPerformanceRepository:
                     Delivery.delivery_person_id == delivery_person_id,
                     Feedback.feedback_type == FeedbackType.DELIVERY_FEEDBACK,
                     Feedback.rating.isnot(None),
-                    Feedback.created_at >= start_date,
-                    Feedback.created_at <= end_date
+                    between_days(Feedback.created_at, start_date, end_date)
                 )
             ).group_by(
                 date_format(Feedback.created_at),
@@ -283,8 +284,7 @@ class DeliveryPerformanceRepository:
                 and_(
                     Delivery.delivery_person_id == delivery_person_id,
                     Delivery.status == "DELIVERED",
-                    Delivery.assigned_at >= start_date,
-                    Delivery.assigned_at <= end_date
+                    between_days(Delivery.assigned_at, start_date, end_date)
                 )
             ).group_by(date_format(Delivery.assigned_at), func.date(Delivery.assigned_at)).order_by('date').all()
         
@@ -297,8 +297,7 @@ class DeliveryPerformanceRepository:
                 and_(
                     Delivery.delivery_person_id == delivery_person_id,
                     Delivery.status == "DELIVERED",
-                    DeliveryEarnings.earned_at >= start_date,
-                    DeliveryEarnings.earned_at <= end_date
+                    between_days(DeliveryEarnings.earned_at, start_date, end_date)
                 )
             ).group_by(date_format(DeliveryEarnings.earned_at), func.date(DeliveryEarnings.earned_at)).order_by('date').all()
         
@@ -312,8 +311,7 @@ class DeliveryPerformanceRepository:
                     Delivery.delivery_person_id == delivery_person_id,
                     Delivery.status == "DELIVERED",
                     Delivery.distance_km.isnot(None),
-                    Delivery.assigned_at >= start_date,
-                    Delivery.assigned_at <= end_date
+                    between_days(Delivery.assigned_at, start_date, end_date)
                 )
             ).group_by(date_format(Delivery.assigned_at), func.date(Delivery.assigned_at)).order_by('date').all()
         
@@ -333,8 +331,7 @@ class DeliveryPerformanceRepository:
                     Delivery.status == "DELIVERED",
                     Delivery.actual_delivery_time.isnot(None),
                     Delivery.assigned_at.isnot(None),
-                    Delivery.assigned_at >= start_date,
-                    Delivery.assigned_at <= end_date
+                    between_days(Delivery.assigned_at, start_date, end_date)
                 )
             ).group_by(date_format(Delivery.assigned_at), func.date(Delivery.assigned_at)).order_by('date').all()
         
@@ -387,9 +384,9 @@ class DeliveryPerformanceRepository:
         )
         
         if start_date:
-            base_query = base_query.filter(Feedback.created_at >= start_date)
+            base_query = base_query.filter(between_days(Feedback.created_at, start_date))
         if end_date:
-            base_query = base_query.filter(Feedback.created_at <= end_date)
+            base_query = base_query.filter(between_days(Feedback.created_at, end=end_date))
         
         # Get paginated results
         ratings_data = base_query.order_by(
@@ -409,9 +406,9 @@ class DeliveryPerformanceRepository:
         )
         
         if start_date:
-            distribution_query = distribution_query.filter(Feedback.created_at >= start_date)
+            distribution_query = distribution_query.filter(between_days(Feedback.created_at, start_date))
         if end_date:
-            distribution_query = distribution_query.filter(Feedback.created_at <= end_date)
+            distribution_query = distribution_query.filter(between_days(Feedback.created_at, end=end_date))
         
         distribution_results = distribution_query.group_by(Feedback.rating).all()
         
@@ -577,6 +574,99 @@ class DeliveryPerformanceRepository:
     
     # ===== PEER COMPARISON =====
     
+    @staticmethod
+    def get_fleet_metrics(
+        db: Session,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Dict[int, Dict[str, float]]:
+        """Peer comparison metrics of every active delivery person in one grouped query.
+
+        Same definitions as get_performance_metrics; riders without deliveries get zeros.
+        """
+        delivery_seconds = (
+            func.extract('epoch', Delivery.actual_delivery_time) -
+            func.extract('epoch', Delivery.assigned_at)
+        )
+        delivered = Delivery.status == "DELIVERED"
+
+        delivery_filter = Delivery.status.in_(["DELIVERED", "CANCELLED", "FAILED"])
+        if start_date:
+            delivery_filter = and_(delivery_filter, between_days(Delivery.assigned_at, start_date))
+        if end_date:
+            delivery_filter = and_(delivery_filter, between_days(Delivery.assigned_at, end=end_date))
+
+        deliveries = db.query(
+            Delivery.delivery_person_id.label('delivery_person_id'),
+            func.count(case((delivered, 1))).label('completed'),
+            func.count(case((
+                and_(
+                    delivered,
+                    Delivery.actual_delivery_time.isnot(None),
+                    Delivery.expected_delivery_time.isnot(None),
+                    Delivery.actual_delivery_time <= Delivery.expected_delivery_time + timedelta(minutes=30)
+                ),
+                1
+            ))).label('on_time'),
+            func.avg(case((
+                and_(delivered, Delivery.actual_delivery_time.isnot(None), Delivery.assigned_at.isnot(None)),
+                delivery_seconds
+            ))).label('avg_seconds')
+        ).filter(delivery_filter).group_by(Delivery.delivery_person_id).subquery()
+
+        ratings = db.query(
+            Delivery.delivery_person_id.label('delivery_person_id'),
+            func.avg(Feedback.rating).label('avg_rating')
+        ).join(Order, Feedback.order_id == Order.order_id).join(
+            Delivery, Delivery.order_id == Order.order_id
+        ).filter(
+            Feedback.feedback_type == FeedbackType.DELIVERY_FEEDBACK,
+            Feedback.rating.isnot(None)
+        )
+        if start_date:
+            ratings = ratings.filter(between_days(Feedback.created_at, start_date))
+        if end_date:
+            ratings = ratings.filter(between_days(Feedback.created_at, end=end_date))
+        ratings = ratings.group_by(Delivery.delivery_person_id).subquery()
+
+        earnings = db.query(
+            Delivery.delivery_person_id.label('delivery_person_id'),
+            func.sum(DeliveryEarnings.amount).label('total_earnings')
+        ).join(Delivery).filter(delivered)
+        if start_date:
+            earnings = earnings.filter(between_days(DeliveryEarnings.earned_at, start_date))
+        if end_date:
+            earnings = earnings.filter(between_days(DeliveryEarnings.earned_at, end=end_date))
+        earnings = earnings.group_by(Delivery.delivery_person_id).subquery()
+
+        rows = db.query(
+            DeliveryPerson.delivery_person_id,
+            deliveries.c.completed,
+            deliveries.c.on_time,
+            deliveries.c.avg_seconds,
+            ratings.c.avg_rating,
+            earnings.c.total_earnings
+        ).outerjoin(
+            deliveries, deliveries.c.delivery_person_id == DeliveryPerson.delivery_person_id
+        ).outerjoin(
+            ratings, ratings.c.delivery_person_id == DeliveryPerson.delivery_person_id
+        ).outerjoin(
+            earnings, earnings.c.delivery_person_id == DeliveryPerson.delivery_person_id
+        ).filter(
+            DeliveryPerson.status == "ACTIVE"
+        ).all()
+
+        return {
+            delivery_person_id: {
+                "on_time_rate": (on_time / completed) * 100 if completed else 0.0,
+                "average_rating": float(avg_rating) if avg_rating else 0.0,
+                "average_delivery_time": float(avg_seconds / 60) if avg_seconds else 0.0,
+                "completed_deliveries": completed or 0,
+                "total_earnings": float(total_earnings) if total_earnings else 0.0,
+            }
+            for delivery_person_id, completed, on_time, avg_seconds, avg_rating, total_earnings in rows
+        }
+
     @staticmethod
     def get_peer_comparison(
         db: Session,
@@ -584,79 +674,37 @@ class DeliveryPerformanceRepository:
         start_date: Optional[date] = None,
         end_date: Optional[date] = None
     ) -> Dict[str, Any]:
-        """Get comparison data with other delivery persons"""
-        
-        # Get all delivery persons (excluding inactive)
-        all_delivery_persons = db.query(DeliveryPerson).filter(
-            DeliveryPerson.status == "ACTIVE"
-        ).all()
-        
-        if not all_delivery_persons:
+        """Get comparison data with other delivery persons.
+
+        Reads the fleet snapshot for the date range (rebuilt every FLEET_METRICS_TTL
+        seconds); percentiles and rank are binary searches over its sorted metrics.
+        """
+        snapshot = fleet_metrics.get(
+            (start_date, end_date),
+            lambda: DeliveryPerformanceRepository.get_fleet_metrics(db, start_date, end_date)
+        )
+
+        if not len(snapshot):
             return {"error": "No delivery persons found"}
-        
-        comparison_data = {}
-        
-        for dp in all_delivery_persons:
+
+        current_metrics = snapshot.metrics_for(delivery_person_id)
+        if current_metrics is None:
+            # Not in the snapshot (inactive, or activated since it was built): measure just this rider
             metrics = DeliveryPerformanceRepository.get_performance_metrics(
-                db, dp.delivery_person_id, start_date, end_date
+                db, delivery_person_id, start_date, end_date
             )
-            comparison_data[dp.delivery_person_id] = metrics
-        
-        # Calculate averages
-        total_persons = len(comparison_data)
-        
-        averages = {
-            "on_time_rate": sum(data["on_time_rate"] for data in comparison_data.values()) / total_persons,
-            "average_rating": sum(data["average_rating"] for data in comparison_data.values()) / total_persons,
-            "average_delivery_time": sum(data["average_delivery_time"] for data in comparison_data.values()) / total_persons,
-            "completed_deliveries": sum(data["completed_deliveries"] for data in comparison_data.values()) / total_persons,
-            "total_earnings": sum(data["total_earnings"] for data in comparison_data.values()) / total_persons,
-        }
-        
-        # Get current person's metrics
-        current_metrics = comparison_data.get(delivery_person_id, {})
-        
-        # Calculate percentiles
-        def calculate_percentile(current_value, all_values):
-            if not all_values:
-                return 50.0
-            sorted_values = sorted(all_values)
-            less_than = sum(1 for v in sorted_values if v < current_value)
-            equal_to = sum(1 for v in sorted_values if v == current_value)
-            return (less_than + 0.5 * equal_to) / len(sorted_values) * 100
-        
-        on_time_values = [data["on_time_rate"] for data in comparison_data.values()]
-        rating_values = [data["average_rating"] for data in comparison_data.values()]
-        delivery_time_values = [data["average_delivery_time"] for data in comparison_data.values()]
-        deliveries_values = [data["completed_deliveries"] for data in comparison_data.values()]
-        earnings_values = [data["total_earnings"] for data in comparison_data.values()]
-        
+            current_metrics = {metric: metrics[metric] for metric in FLEET_METRICS}
+
         percentiles = {
-            "on_time_rate": calculate_percentile(current_metrics.get("on_time_rate", 0), on_time_values),
-            "average_rating": calculate_percentile(current_metrics.get("average_rating", 0), rating_values),
-            "average_delivery_time": calculate_percentile(current_metrics.get("average_delivery_time", 0), delivery_time_values),
-            "completed_deliveries": calculate_percentile(current_metrics.get("completed_deliveries", 0), deliveries_values),
-            "total_earnings": calculate_percentile(current_metrics.get("total_earnings", 0), earnings_values),
+            metric: snapshot.percentile(metric, current_metrics[metric]) for metric in FLEET_METRICS
         }
-        
-        # Calculate rank
-        sorted_by_rating = sorted(
-            comparison_data.items(),
-            key=lambda x: x[1].get("average_rating", 0),
-            reverse=True
-        )
-        
-        rank = next(
-            (i + 1 for i, (dp_id, _) in enumerate(sorted_by_rating) if dp_id == delivery_person_id),
-            total_persons + 1
-        )
-        
+
         return {
-            "averages": averages,
+            "averages": dict(snapshot.averages),
             "percentiles": percentiles,
-            "rank": rank,
-            "total_peers": total_persons - 1,  # Excluding self
-            "current_metrics": current_metrics
+            "rank": snapshot.rank(current_metrics[RANK_METRIC]),
+            "total_peers": len(snapshot) - 1,  # Excluding self
+            "current_metrics": dict(current_metrics)
         }
     
     # ===== TREND ANALYSIS =====
@@ -819,9 +867,9 @@ class DeliveryPerformanceRepository:
         
         # Apply date filters
         if start_date:
-            base_query = base_query.filter(Delivery.assigned_at >= start_date)
+            base_query = base_query.filter(between_days(Delivery.assigned_at, start_date))
         if end_date:
-            base_query = base_query.filter(Delivery.assigned_at <= end_date)
+            base_query = base_query.filter(between_days(Delivery.assigned_at, end=end_date))
         
         # Apply status filter
         if status_filter:
@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc, and_, or_, case, text
 from datetime import datetime, timedelta, date
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from decimal import Decimal
 
 # Import models
@@ -17,6 +17,7 @@ from models.product_catalog.product_brand import ProductBrand
 from models.payment import Payment
 from models.inventory.supplier import Supplier
 from models.inventory.company import Company
+from repositories.delivery_panel.delivery_location_repository import DeliveryLocationRepository
 
 # Import schemas
 from schemas.delivery_panel.delivery_pickup_schema import (
@@ -464,6 +465,17 @@ class DeliveryPickupRepository:
     
     # ===== DISTANCE CALCULATION =====
     
+    @staticmethod
+    def get_current_coordinates(db: Session, delivery_person_id: int) -> Optional[Tuple[float, float]]:
+        """Delivery person's last reported (lat, lng), if any"""
+        current_location = DeliveryLocationRepository.get_current_location(db, delivery_person_id)
+        if not isinstance(current_location, dict):
+            return None
+        try:
+            return float(current_location["lat"]), float(current_location["lng"])
+        except (KeyError, TypeError, ValueError):
+            return None
+    
     @staticmethod
     def _calculate_distance(
         db: Session,
@@ -13,6 +13,7 @@ from models.delivery.delivery import Delivery
 from models.delivery.delivery_earnings import DeliveryEarnings
 from models.feedback.feedback import Feedback
 from models.order.order import Order
+from utils.date_range import between_days
 
 class DeliveryProfileRepository:
     
@@ -309,7 +310,7 @@ class DeliveryProfileRepository:
         completed_this_week = db.query(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
             Delivery.status == "DELIVERED",
-            func.date(Delivery.delivered_at) >= week_start
+            between_days(Delivery.delivered_at, week_start)
         ).count()
         
         # Total earnings
@@ -357,8 +358,7 @@ class DeliveryProfileRepository:
         last_week_deliveries = db.query(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
             Delivery.status == "DELIVERED",
-            func.date(Delivery.delivered_at) >= last_week_start,
-            func.date(Delivery.delivered_at) <= last_week_end
+            between_days(Delivery.delivered_at, last_week_start, last_week_end)
         ).count()
         
         performance_trend = 0.0
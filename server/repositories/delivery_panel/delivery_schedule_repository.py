@@ -15,6 +15,7 @@ from models.order.order_item import OrderItem
 from models.user import User
 from models.address import Address, Area, City
 from models.payment import Payment
+from utils.date_range import between_days, day_start, on_day
 
 # Import schemas
 from schemas.delivery_panel.delivery_schedule_schema import ShiftFilters, ShiftStatus
@@ -38,7 +39,7 @@ class DeliveryScheduleRepository:
         todays_deliveries = db.query(Delivery).filter(
             and_(
                 Delivery.delivery_person_id == delivery_person_id,
-                func.date(Delivery.assigned_at) == today
+                on_day(Delivery.assigned_at, today)
             )
         ).order_by(Delivery.assigned_at).all()
         
@@ -72,7 +73,7 @@ class DeliveryScheduleRepository:
         ).join(Delivery).filter(
             and_(
                 Delivery.delivery_person_id == delivery_person_id,
-                func.date(DeliveryEarnings.earned_at) == today
+                on_day(DeliveryEarnings.earned_at, today)
             )
         ).first()
         
@@ -175,8 +176,7 @@ class DeliveryScheduleRepository:
         ).filter(
             and_(
                 Delivery.delivery_person_id == delivery_person_id,
-                func.date(Delivery.assigned_at) > today,
-                func.date(Delivery.assigned_at) <= end_date,
+                between_days(Delivery.assigned_at, today + timedelta(days=1), end_date),
                 Delivery.status.in_(["ASSIGNED", "PICKED_UP", "IN_TRANSIT"])  # Only active/upcoming
             )
         ).group_by(func.date(Delivery.assigned_at)).order_by('delivery_date').all()
@@ -213,7 +213,7 @@ class DeliveryScheduleRepository:
             ).filter(
                 and_(
                     Delivery.delivery_person_id == delivery_person_id,
-                    func.date(Delivery.assigned_at) == delivery_date
+                    on_day(Delivery.assigned_at, delivery_date)
                 )
             ).group_by(Area.area_name, City.city_name).first()
             
@@ -287,8 +287,7 @@ class DeliveryScheduleRepository:
         ).filter(
             and_(
                 Delivery.delivery_person_id == delivery_person_id,
-                func.date(Delivery.assigned_at) >= start_date,
-                func.date(Delivery.assigned_at) <= end_date
+                between_days(Delivery.assigned_at, start_date, end_date)
             )
         )
         
@@ -344,7 +343,7 @@ class DeliveryScheduleRepository:
             ).filter(
                 and_(
                     Delivery.delivery_person_id == delivery_person_id,
-                    func.date(Delivery.assigned_at) == delivery_date
+                    on_day(Delivery.assigned_at, delivery_date)
                 )
             ).group_by(Area.area_name, City.city_name).first()
             
@@ -368,7 +367,7 @@ class DeliveryScheduleRepository:
             ).join(Delivery).filter(
                 and_(
                     Delivery.delivery_person_id == delivery_person_id,
-                    func.date(Delivery.assigned_at) == delivery_date
+                    on_day(Delivery.assigned_at, delivery_date)
                 )
             ).first()
             
@@ -537,7 +536,7 @@ class DeliveryScheduleRepository:
         ).filter(
             and_(
                 Delivery.delivery_person_id == delivery_person_id,
-                func.date(Delivery.assigned_at) < today
+                Delivery.assigned_at < day_start(today)
             )
         ).first()
         
@@ -549,7 +548,7 @@ class DeliveryScheduleRepository:
         ).filter(
             and_(
                 Delivery.delivery_person_id == delivery_person_id,
-                func.date(Delivery.assigned_at) >= today,
+                between_days(Delivery.assigned_at, today),
                 Delivery.status.in_(["ASSIGNED", "PICKED_UP", "IN_TRANSIT"])
             )
         ).first()
@@ -574,8 +573,7 @@ class DeliveryScheduleRepository:
         ).filter(
             and_(
                 Delivery.delivery_person_id == delivery_person_id,
-                func.date(Delivery.assigned_at) >= week_start,
-                func.date(Delivery.assigned_at) <= week_end
+                between_days(Delivery.assigned_at, week_start, week_end)
             )
         ).first()
         
@@ -587,8 +585,7 @@ class DeliveryScheduleRepository:
         ).filter(
             and_(
                 Delivery.delivery_person_id == delivery_person_id,
-                func.date(Delivery.assigned_at) >= next_week_start,
-                func.date(Delivery.assigned_at) <= next_week_end
+                between_days(Delivery.assigned_at, next_week_start, next_week_end)
             )
         ).first()
         
@@ -600,8 +597,7 @@ class DeliveryScheduleRepository:
         ).filter(
             and_(
                 Delivery.delivery_person_id == delivery_person_id,
-                func.date(Delivery.assigned_at) >= month_start,
-                func.date(Delivery.assigned_at) <= month_end
+                between_days(Delivery.assigned_at, month_start, month_end)
             )
         ).first()
         
@@ -692,7 +688,7 @@ class DeliveryScheduleRepository:
         deliveries = db.query(Delivery).filter(
             and_(
                 Delivery.delivery_person_id == delivery_person_id,
-                func.date(Delivery.assigned_at) == shift_date
+                on_day(Delivery.assigned_at, shift_date)
             )
         ).order_by(Delivery.assigned_at).all()
         
@@ -745,7 +741,7 @@ class DeliveryScheduleRepository:
         ).filter(
             and_(
                 Delivery.delivery_person_id == delivery_person_id,
-                func.date(Delivery.assigned_at) == shift_date
+                on_day(Delivery.assigned_at, shift_date)
             )
         ).group_by(Area.area_name, City.city_name).first()
         
@@ -774,7 +770,7 @@ class DeliveryScheduleRepository:
         ).join(Delivery).filter(
             and_(
                 Delivery.delivery_person_id == delivery_person_id,
-                func.date(Delivery.assigned_at) == shift_date
+                on_day(Delivery.assigned_at, shift_date)
             )
         ).first()
         
@@ -827,7 +823,7 @@ class DeliveryScheduleRepository:
             ).join(Order).join(Delivery).filter(
                 and_(
                     Delivery.delivery_person_id == delivery_person_id,
-                    func.date(Delivery.assigned_at) == shift_date,
+                    on_day(Delivery.assigned_at, shift_date),
                     Feedback.feedback_type == FeedbackType.DELIVERY_FEEDBACK,
                     Feedback.rating.isnot(None)
                 )
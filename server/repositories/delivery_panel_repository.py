@@ -1,6 +1,6 @@
 # delivery_panel_repository.py
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, and_, or_, case, text, extract
+from sqlalchemy import func, desc, and_, or_, text, extract
 from sqlalchemy.sql import exists
 from datetime import datetime, timedelta, date
 from typing import List, Optional, Dict, Any
@@ -17,7 +17,6 @@ from models.user import User
 from models.product_catalog.product_variant import ProductVariant
 from models.product_catalog.product import Product
 from models.address import Address, Area, City
-from models.payment import Payment
 from models.feedback.feedback import Feedback
 from models.feedback.user_issue import UserIssue
 from models.analytics.recently_viewed import RecentlyViewed
@@ -25,6 +24,10 @@ from models.analytics.product_analytics import ProductAnalytics
 from models.notification import Notification
 from models.cart import Cart
 from models.wishlist import Wishlist
+from repositories.delivery_panel.delivery_active_repository import DeliveryActiveRepository
+from repositories.delivery_panel.delivery_location_repository import record_location
+from utils.route_planner import plan_route, travel_minutes, ROUTE_SERVICE_MINUTES
+from utils.date_range import between_days, on_day
 
 
 class DeliveryPanelRepository:
@@ -40,13 +43,13 @@ class DeliveryPanelRepository:
         # Today's deliveries count
         today_deliveries = db.query(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(Delivery.assigned_at) == today
+            on_day(Delivery.assigned_at, today)
         ).count()
         
         # Completed today
         completed_today = db.query(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(Delivery.assigned_at) == today,
+            on_day(Delivery.assigned_at, today),
             Delivery.status == "DELIVERED"
         ).count()
         
@@ -61,13 +64,13 @@ class DeliveryPanelRepository:
             func.coalesce(func.sum(DeliveryEarnings.amount), 0)
         ).join(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(DeliveryEarnings.earned_at) == today
+            on_day(DeliveryEarnings.earned_at, today)
         ).scalar() or Decimal('0')
         
         # Yesterday's deliveries for comparison
         yesterday_deliveries = db.query(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(Delivery.assigned_at) == yesterday
+            on_day(Delivery.assigned_at, yesterday)
         ).count()
         
         # Percentage change
@@ -110,47 +113,12 @@ class DeliveryPanelRepository:
     @staticmethod
     def get_active_deliveries_preview(db: Session, delivery_person_id: int, limit: int = 5) -> List[Dict[str, Any]]:
         """Get preview of active deliveries for dashboard"""
-        deliveries = db.query(
-            Delivery,
-            Order,
-            User,
-            Address,
-            Area,
-            City
-        ).join(
-            Order, Order.order_id == Delivery.order_id
-        ).join(
-            User, User.user_id == Order.user_id
-        ).join(
-            Address, Address.address_id == Order.address_id
-        ).join(
-            Area, Area.area_id == Address.area_id
-        ).join(
-            City, City.city_id == Area.city_id
-        ).filter(
-            Delivery.delivery_person_id == delivery_person_id,
-            Delivery.status.in_(["ASSIGNED", "PICKED_UP", "IN_TRANSIT"])
-        ).order_by(
-            case(
-                (Delivery.status == "ASSIGNED", 1),
-                (Delivery.status == "PICKED_UP", 2),
-                (Delivery.status == "IN_TRANSIT", 3)
-            ),
-            Delivery.expected_delivery_time
-        ).limit(limit).all()
+        deliveries = DeliveryActiveRepository.load_active_deliveries(
+            db, delivery_person_id, undelivered_only=False, limit=limit
+        )
         
         result = []
-        for delivery, order, user, address, area, city in deliveries:
-            # Get items count
-            items_count = db.query(func.sum(OrderItem.quantity)).filter(
-                OrderItem.order_id == order.order_id
-            ).scalar() or 0
-            
-            # Get payment info
-            payment = db.query(Payment).filter(
-                Payment.order_id == order.order_id
-            ).first()
-            
+        for delivery, order, user, address, area, city, items_count, payment_status in deliveries:
             # Format address
             delivery_address = f"{address.line1}, {area.area_name}, {city.city_name}"
             
@@ -166,8 +134,8 @@ class DeliveryPanelRepository:
             # Payment type
             payment_type = "prepaid"
             amount = None
-            if payment:
-                payment_type = "prepaid" if payment.payment_status == "COMPLETED" else "cod"
+            if payment_status is not None:
+                payment_type = "prepaid" if payment_status == "COMPLETED" else "cod"
                 if payment_type == "cod":
                     amount = float(order.total_amount)
             
@@ -196,50 +164,18 @@ class DeliveryPanelRepository:
     @staticmethod
     def get_active_deliveries(db: Session, delivery_person_id: int, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Get all active deliveries with details"""
-        query = db.query(
-            Delivery,
-            Order,
-            User,
-            Address,
-            Area,
-            City,
-            Payment
-        ).join(
-            Order, Order.order_id == Delivery.order_id
-        ).join(
-            User, User.user_id == Order.user_id
-        ).join(
-            Address, Address.address_id == Order.address_id
-        ).join(
-            Area, Area.area_id == Address.area_id
-        ).join(
-            City, City.city_id == Area.city_id
-        ).outerjoin(
-            Payment, Payment.order_id == Order.order_id
-        ).filter(
-            Delivery.delivery_person_id == delivery_person_id,
-            Delivery.status.in_(["ASSIGNED", "PICKED_UP", "IN_TRANSIT"])
+        filters = filters or {}
+        # Note: No priority field in Delivery model - filters['priority'] is ignored
+        deliveries = DeliveryActiveRepository.load_active_deliveries(
+            db,
+            delivery_person_id,
+            status=filters.get('status'),
+            undelivered_only=False,
+            by_stage=False
         )
         
-        # Apply filters
-        if filters:
-            if filters.get('status'):
-                query = query.filter(Delivery.status == filters['status'])
-            if filters.get('priority'):
-                # Note: No priority field in Delivery model - using mock logic
-                pass
-        
-        deliveries = query.order_by(
-            Delivery.expected_delivery_time
-        ).all()
-        
         result = []
-        for delivery, order, user, address, area, city, payment in deliveries:
-            # Get items count
-            items_count = db.query(func.sum(OrderItem.quantity)).filter(
-                OrderItem.order_id == order.order_id
-            ).scalar() or 0
-            
+        for delivery, order, user, address, area, city, items_count, payment_status in deliveries:
             # Format address
             delivery_address = f"{address.line1}"
             if address.line2:
@@ -275,8 +211,8 @@ class DeliveryPanelRepository:
             # Payment type and amount
             payment_type = "prepaid"
             amount = None
-            if payment:
-                payment_type = "prepaid" if payment.payment_status == "COMPLETED" else "cod"
+            if payment_status is not None:
+                payment_type = "prepaid" if payment_status == "COMPLETED" else "cod"
                 if payment_type == "cod":
                     amount = float(order.total_amount)
             
@@ -379,27 +315,9 @@ class DeliveryPanelRepository:
         latitude: float,
         longitude: float
     ) -> bool:
-        """Update delivery person's current location"""
-        delivery_person = db.query(DeliveryPerson).filter(
-            DeliveryPerson.delivery_person_id == delivery_person_id
-        ).first()
-        
-        if not delivery_person:
-            return False
-        
-        delivery_person.current_location = {
-            "lat": latitude,
-            "lng": longitude,
-            "updated_at": datetime.now().isoformat()
-        }
-        
-        try:
-            db.commit()
-            return True
-        except Exception as e:
-            db.rollback()
-            print(f"Error updating location: {e}")
-            return False
+        """Update delivery person's current location (buffered, written in bulk)"""
+        record_location(delivery_person_id, latitude, longitude)
+        return True
     
     # ===== PENDING PICKUPS =====
     
@@ -549,9 +467,9 @@ class DeliveryPanelRepository:
         # Apply filters
         if filters:
             if filters.get('date_from'):
-                query = query.filter(func.date(Delivery.delivered_at) >= filters['date_from'])
+                query = query.filter(between_days(Delivery.delivered_at, filters['date_from']))
             if filters.get('date_to'):
-                query = query.filter(func.date(Delivery.delivered_at) <= filters['date_to'])
+                query = query.filter(between_days(Delivery.delivered_at, end=filters['date_to']))
         
         deliveries = query.order_by(
             desc(Delivery.delivered_at)
@@ -601,9 +519,9 @@ class DeliveryPanelRepository:
         
         if filters:
             if filters.get('date_from'):
-                query = query.filter(func.date(Delivery.delivered_at) >= filters['date_from'])
+                query = query.filter(between_days(Delivery.delivered_at, filters['date_from']))
             if filters.get('date_to'):
-                query = query.filter(func.date(Delivery.delivered_at) <= filters['date_to'])
+                query = query.filter(between_days(Delivery.delivered_at, end=filters['date_to']))
         
         total_completed = query.count()
         
@@ -618,9 +536,9 @@ class DeliveryPanelRepository:
         
         if filters:
             if filters.get('date_from'):
-                on_time_query = on_time_query.filter(func.date(Delivery.delivered_at) >= filters['date_from'])
+                on_time_query = on_time_query.filter(between_days(Delivery.delivered_at, filters['date_from']))
             if filters.get('date_to'):
-                on_time_query = on_time_query.filter(func.date(Delivery.delivered_at) <= filters['date_to'])
+                on_time_query = on_time_query.filter(between_days(Delivery.delivered_at, end=filters['date_to']))
         
         on_time_count = on_time_query.count()
         
@@ -669,12 +587,12 @@ class DeliveryPanelRepository:
             func.coalesce(func.sum(DeliveryEarnings.amount), 0)
         ).join(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(DeliveryEarnings.earned_at) == today
+            on_day(DeliveryEarnings.earned_at, today)
         ).scalar() or Decimal('0')
         
         today_deliveries = db.query(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(Delivery.assigned_at) == today,
+            on_day(Delivery.assigned_at, today),
             Delivery.status == "DELIVERED"
         ).count()
         
@@ -686,14 +604,12 @@ class DeliveryPanelRepository:
             func.coalesce(func.sum(DeliveryEarnings.amount), 0)
         ).join(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(DeliveryEarnings.earned_at) >= week_start,
-            func.date(DeliveryEarnings.earned_at) <= week_end
+            between_days(DeliveryEarnings.earned_at, week_start, week_end)
         ).scalar() or Decimal('0')
         
         week_deliveries = db.query(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(Delivery.assigned_at) >= week_start,
-            func.date(Delivery.assigned_at) <= week_end,
+            between_days(Delivery.assigned_at, week_start, week_end),
             Delivery.status == "DELIVERED"
         ).count()
         
@@ -706,14 +622,12 @@ class DeliveryPanelRepository:
             func.coalesce(func.sum(DeliveryEarnings.amount), 0)
         ).join(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(DeliveryEarnings.earned_at) >= month_start,
-            func.date(DeliveryEarnings.earned_at) <= month_end
+            between_days(DeliveryEarnings.earned_at, month_start, month_end)
         ).scalar() or Decimal('0')
         
         month_deliveries = db.query(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(Delivery.assigned_at) >= month_start,
-            func.date(Delivery.assigned_at) <= month_end,
+            between_days(Delivery.assigned_at, month_start, month_end),
             Delivery.status == "DELIVERED"
         ).count()
         
@@ -790,7 +704,7 @@ class DeliveryPanelRepository:
             # Get order count for that day
             same_day_earnings = db.query(DeliveryEarnings).filter(
                 DeliveryEarnings.delivery_person_id == delivery_person_id,
-                func.date(DeliveryEarnings.earned_at) == func.date(earning.earned_at)
+                on_day(DeliveryEarnings.earned_at, earning.earned_at)
             ).count()
             
             result.append({
@@ -845,7 +759,7 @@ class DeliveryPanelRepository:
             City, City.city_id == Area.city_id
         ).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(Delivery.assigned_at) == today,
+            on_day(Delivery.assigned_at, today),
             Delivery.status.in_(["ASSIGNED", "PICKED_UP", "IN_TRANSIT"])
         ).order_by(
             Delivery.expected_delivery_time
@@ -871,7 +785,6 @@ class DeliveryPanelRepository:
         }
         
         stops = []
-        total_distance = 0
         current_stop = 1  # Starting from pickup
         
         # Add pickup as first stop
@@ -885,19 +798,50 @@ class DeliveryPanelRepository:
             "longitude": pickup_location["longitude"],
             "distance_from_previous": 0,
             "estimated_time": "0 min",
+            "eta": None,
             "status": "pending"
         })
         
+        # Stops with coordinates (address, else area centre) are routed from the store;
+        # the rest follow in expected-time order
+        located = []
+        unlocated = []
+        for delivery, order, user, address, area, city in deliveries:
+            latitude, longitude = address.latitude, address.longitude
+            if latitude is None or longitude is None:
+                latitude, longitude = area.latitude, area.longitude
+            if latitude is None or longitude is None:
+                unlocated.append((delivery, order, user, address, area, city, None, None))
+            else:
+                located.append((delivery, order, user, address, area, city, latitude, longitude))
+        
+        plan = plan_route(
+            [
+                {"latitude": row[6], "longitude": row[7], "deadline": row[0].expected_delivery_time}
+                for row in located
+            ],
+            start=(pickup_location["latitude"], pickup_location["longitude"])
+        )
+        ordered = [
+            (located[index], plan["legs_km"][position], plan["etas"][position])
+            for position, index in enumerate(plan["order"])
+        ]
+        for row in unlocated:
+            delivery = row[0]
+            ordered.append((row, float(delivery.distance_km) if delivery.distance_km else None, None))
+        
+        total_distance = plan["total_km"]
+        total_minutes = plan["total_minutes"]
+        
         # Add delivery stops
-        for idx, (delivery, order, user, address, area, city) in enumerate(deliveries, 2):
+        for idx, (row, distance, eta) in enumerate(ordered, 2):
+            delivery, order, user, address, area, city, latitude, longitude = row
             delivery_address = f"{address.line1}, {area.area_name}, {city.city_name}"
             
-            # Mock distance calculation (in production, use distance matrix API)
-            distance = float(delivery.distance_km) if delivery.distance_km else (idx * 2.5)
-            total_distance += distance
-            
-            # Estimated time based on distance
-            estimated_minutes = int(distance * 3)  # 3 minutes per km
+            estimated_minutes = int(round(travel_minutes(distance))) if distance is not None else None
+            if eta is None and distance is not None:
+                total_distance += distance
+                total_minutes += estimated_minutes + ROUTE_SERVICE_MINUTES
             
             # Status based on delivery status
             stop_status = "pending"
@@ -914,25 +858,25 @@ class DeliveryPanelRepository:
                 "order_id": order.order_id,
                 "customer_name": f"{user.first_name} {user.last_name}",
                 "address": delivery_address,
-                "latitude": 23.0 + (idx * 0.1),  # Mock coordinates
-                "longitude": 72.5 + (idx * 0.1),
+                "latitude": latitude,
+                "longitude": longitude,
                 "distance_from_previous": distance,
-                "estimated_time": f"{estimated_minutes} min",
+                "estimated_time": f"{estimated_minutes} min" if estimated_minutes is not None else None,
+                "eta": eta.strftime("%I:%M %p") if eta else None,
                 "status": stop_status
             })
         
-        # Mock optimized path (in production, use route optimization algorithm)
         optimized_path = [
             {"lat": pickup_location["latitude"], "lng": pickup_location["longitude"]}
         ]
         for stop in stops[1:]:
-            if stop.get("latitude") and stop.get("longitude"):
+            if stop.get("latitude") is not None and stop.get("longitude") is not None:
                 optimized_path.append({"lat": stop["latitude"], "lng": stop["longitude"]})
         
         return {
             "route_id": f"ROUTE-{today.strftime('%Y%m%d')}",
-            "total_distance_km": total_distance,
-            "estimated_duration_minutes": int(total_distance * 3) + 30,  # 3 min/km + 30 min buffer
+            "total_distance_km": round(total_distance, 2),
+            "estimated_duration_minutes": int(round(total_minutes)),
             "total_stops": len(stops),
             "current_stop": current_stop,
             "stops": stops,
@@ -956,14 +900,14 @@ class DeliveryPanelRepository:
         total_deliveries = db.query(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
             Delivery.status == "DELIVERED",
-            func.date(Delivery.delivered_at) >= start_date
+            between_days(Delivery.delivered_at, start_date)
         ).count()
         
         # On-time deliveries
         on_time_deliveries = db.query(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
             Delivery.status == "DELIVERED",
-            func.date(Delivery.delivered_at) >= start_date,
+            between_days(Delivery.delivered_at, start_date),
             Delivery.actual_delivery_time.isnot(None),
             Delivery.expected_delivery_time.isnot(None),
             func.extract('epoch', Delivery.actual_delivery_time - Delivery.expected_delivery_time) <= 1800
@@ -975,7 +919,7 @@ class DeliveryPanelRepository:
         ).join(Order).join(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
             Feedback.feedback_type == "DELIVERY_FEEDBACK",
-            func.date(Feedback.created_at) >= start_date
+            between_days(Feedback.created_at, start_date)
         ).scalar() or 0.0
         
         # Total earnings
@@ -983,7 +927,7 @@ class DeliveryPanelRepository:
             func.coalesce(func.sum(DeliveryEarnings.amount), 0)
         ).join(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
-            func.date(DeliveryEarnings.earned_at) >= start_date
+            between_days(DeliveryEarnings.earned_at, start_date)
         ).scalar() or Decimal('0')
         
         # Average delivery time
@@ -994,7 +938,7 @@ class DeliveryPanelRepository:
         ).filter(
             Delivery.delivery_person_id == delivery_person_id,
             Delivery.status == "DELIVERED",
-            func.date(Delivery.delivered_at) >= start_date,
+            between_days(Delivery.delivered_at, start_date),
             Delivery.actual_delivery_time.isnot(None),
             Delivery.assigned_at.isnot(None)
         ).scalar() or 0.0
@@ -1003,7 +947,7 @@ class DeliveryPanelRepository:
         cancelled_deliveries = db.query(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
             Delivery.status == "CANCELLED",
-            func.date(Delivery.assigned_at) >= start_date
+            between_days(Delivery.assigned_at, start_date)
         ).count()
         
         total_assignments = total_deliveries + cancelled_deliveries
@@ -1014,13 +958,13 @@ class DeliveryPanelRepository:
             Delivery.delivery_person_id == delivery_person_id,
             Feedback.feedback_type == "DELIVERY_FEEDBACK",
             Feedback.rating >= 4,
-            func.date(Feedback.created_at) >= start_date
+            between_days(Feedback.created_at, start_date)
         ).count()
         
         total_feedback = db.query(Feedback).join(Order).join(Delivery).filter(
             Delivery.delivery_person_id == delivery_person_id,
             Feedback.feedback_type == "DELIVERY_FEEDBACK",
-            func.date(Feedback.created_at) >= start_date
+            between_days(Feedback.created_at, start_date)
         ).count()
         
         customer_satisfaction = (high_ratings / total_feedback * 100) if total_feedback > 0 else 0
@@ -8,7 +8,9 @@ from models.user import User
 from models.address import Address
 from datetime import datetime
 from decimal import Decimal
+from operator import attrgetter
 from typing import Dict, Any, List, Optional
+from utils.pagination import Paginator, split_page
 import math
 
 class DeliveryRepository:
@@ -68,13 +70,29 @@ class DeliveryRepository:
         return delivery
     
     @staticmethod
-    def get_all_deliveries(db: Session, page: int = 1, per_page: int = 20, status: Optional[str] = None) -> Dict[str, Any]:
-        """Get all deliveries"""
+    def get_all_deliveries(
+        db: Session,
+        page: int = 1,
+        per_page: int = 20,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get all deliveries (page/offset mode, or keyset mode when a cursor is given)"""
         query = db.query(Delivery)
         
         if status:
             query = query.filter(Delivery.status == status)
         
+        if cursor:
+            result = Paginator(query, per_page=per_page).cursor_paginate(
+                Delivery.assigned_at, Delivery.delivery_id, cursor
+            )
+            return {
+                "deliveries": result["items"],
+                "total_deliveries": result["total"],
+                "next_cursor": result["next_cursor"]
+            }
+        
         total = query.count()
         
         if total == 0:
@@ -84,11 +102,15 @@ class DeliveryRepository:
             }
         
         offset = (page - 1) * per_page
-        deliveries = query.order_by(Delivery.assigned_at.desc()).offset(offset).limit(per_page).all()
+        deliveries = query.order_by(
+            Delivery.assigned_at.desc(), Delivery.delivery_id.desc()
+        ).offset(offset).limit(per_page + 1).all()
+        deliveries, next_cursor = split_page(deliveries, per_page, attrgetter("assigned_at", "delivery_id"))
         
         return {
             "deliveries": deliveries,
-            "total_deliveries": total
+            "total_deliveries": total,
+            "next_cursor": next_cursor
         }
     
     @staticmethod
@@ -1,15 +1,25 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, case, update, insert
 from models.inventory.stock_movement import StockMovement
 from models.product_catalog.product_variant import ProductVariant
 from typing import List, Dict, Any, Optional
+from utils.pagination import apply_cursor
 
 class StockRepository:
     
     @staticmethod
-    def get_all_stock_movements(db: Session, skip: int = 0, limit: int = 100) -> List[StockMovement]:
-        """Get all stock movements"""
-        return db.query(StockMovement).offset(skip).limit(limit).all()
+    def get_all_stock_movements(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> List[StockMovement]:
+        """Get all stock movements, newest first (keyset mode when a cursor is given)"""
+        query = apply_cursor(db.query(StockMovement), StockMovement.moved_at, StockMovement.movement_id, cursor)
+        
+        if cursor:
+            return query.limit(limit).all()
+        return query.offset(skip).limit(limit).all()
     
     @staticmethod
     def get_stock_movements_by_variant(db: Session, variant_id: int, skip: int = 0, limit: int = 100) -> List[StockMovement]:
@@ -29,6 +39,60 @@ class StockRepository:
         db.refresh(movement)
         return movement
     
+    # ==================== RESERVATIONS ====================
+
+    @staticmethod
+    def lock_variants(db: Session, variant_ids: List[int]) -> List[ProductVariant]:
+        """Load variants with row locks taken in variant_id order, so concurrent orders never deadlock"""
+        if not variant_ids:
+            return []
+        return db.query(ProductVariant)\
+            .filter(ProductVariant.variant_id.in_(variant_ids))\
+            .order_by(ProductVariant.variant_id)\
+            .with_for_update(of=ProductVariant)\
+            .all()
+
+    @staticmethod
+    def decrement_stock(db: Session, quantities: Dict[int, int]) -> List[int]:
+        """Conditionally take stock for every variant in one UPDATE.
+
+        Rows without enough stock are left untouched; the ids that were decremented
+        are returned so the caller can tell whether the whole reservation succeeded.
+        """
+        if not quantities:
+            return []
+        requested = case(quantities, value=ProductVariant.variant_id, else_=0)
+        result = db.execute(
+            update(ProductVariant)
+            .where(
+                ProductVariant.variant_id.in_(list(quantities)),
+                ProductVariant.stock_quantity >= requested
+            )
+            .values(stock_quantity=ProductVariant.stock_quantity - requested)
+            .returning(ProductVariant.variant_id)
+            .execution_options(synchronize_session=False)
+        )
+        return [row[0] for row in result]
+
+    @staticmethod
+    def increment_stock(db: Session, quantities: Dict[int, int]) -> None:
+        """Give stock back for every variant in one UPDATE"""
+        if not quantities:
+            return
+        returned = case(quantities, value=ProductVariant.variant_id, else_=0)
+        db.execute(
+            update(ProductVariant)
+            .where(ProductVariant.variant_id.in_(list(quantities)))
+            .values(stock_quantity=ProductVariant.stock_quantity + returned)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def bulk_create_stock_movements(db: Session, movements: List[Dict[str, Any]]) -> None:
+        """Insert stock movements in one executemany (no commit; part of the caller's transaction)"""
+        if movements:
+            db.execute(insert(StockMovement), movements)
+
     @staticmethod
     def get_stock_summary(db: Session) -> List[Dict[str, Any]]:
         """Get current stock summary for all variants"""
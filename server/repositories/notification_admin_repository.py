@@ -1,7 +1,6 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, func, or_, and_
 from typing import List, Optional, Tuple, Dict
-from datetime import datetime, timedelta
 from models.notification import Notification
 from models.user import User
 from schemas.notification_admin import NotificationSearchQuery
@@ -145,40 +144,6 @@ class NotificationAdminRepository:
         
         return stats
     
-    @staticmethod
-    def send_notification_to_all_users(
-        db: Session,
-        title: str,
-        message: str,
-        type: str,
-        reference_id: Optional[int] = None
-    ) -> int:
-        """Send notification to all users in the system"""
-        # Get all user IDs
-        user_ids = [user_id[0] for user_id in db.query(User.user_id).all()]
-        
-        if not user_ids:
-            return 0
-        
-        # Create notifications in bulk
-        notifications = []
-        for user_id in user_ids:
-            notification = Notification(
-                user_id=user_id,
-                title=title,
-                message=message,
-                type=type,
-                reference_id=reference_id,
-                is_read=False,
-                created_at=func.now()
-            )
-            notifications.append(notification)
-        
-        db.add_all(notifications)
-        db.commit()
-        
-        return len(notifications)
-    
     @staticmethod
     def mark_notification_read_by_admin(db: Session, notification_id: int) -> Optional[Notification]:
         """Admin can mark any notification as read"""
@@ -237,18 +202,6 @@ class NotificationAdminRepository:
         
         return False
     
-    @staticmethod
-    def delete_old_notifications(db: Session, days: int = 30) -> int:
-        """Delete notifications older than specified days"""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
-        result = db.query(Notification).filter(
-            Notification.created_at < cutoff_date
-        ).delete()
-        
-        db.commit()
-        return result
-    
     @staticmethod
     def get_notification_with_user(db: Session, notification_id: int) -> Optional[Tuple[Notification, User]]:
         """Get notification with user details"""
@@ -0,0 +1,281 @@
+import os
+import threading
+from sqlalchemy import and_, exists, func, insert, select, literal
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+from datetime import datetime
+from typing import List, Optional
+
+from config.database import SessionLocal
+from models.notification import (
+    Notification,
+    NotificationBroadcast,
+    NotificationFeedCursor,
+    BROADCAST_FANOUT,
+    BROADCAST_FEED
+)
+from models.user import User
+from repositories.notification_repository import NotificationRepository
+from repositories.notification_counter_repository import NotificationCounterRepository
+from repositories.outbox_repository import OutboxRepository, JOB_NOTIFICATION_EMAIL
+from utils.cache import cache
+
+# Users written per INSERT ... SELECT (and per transaction) during a fan-out
+BROADCAST_CHUNK_SIZE = int(os.getenv("BROADCAST_CHUNK_SIZE", "5000"))
+# Seconds other workers may take to notice a new FEED broadcast
+FEED_LATEST_TTL = int(os.getenv("FEED_LATEST_TTL", "30"))
+
+FEED_NAMESPACE = "notifications.feed"
+FEED_LATEST_KEY = "feed_broadcast:latest"
+
+BROADCAST_PENDING = "PENDING"
+BROADCAST_RUNNING = "RUNNING"
+BROADCAST_COMPLETED = "COMPLETED"
+BROADCAST_FAILED = "FAILED"
+
+
+
+def _feed_cursor_key(user_id: int) -> str:
+    return f"feed_cursor:{user_id}"
+
+
+class NotificationBroadcastRepository:
+
+    @staticmethod
+    def create_broadcast(
+        db: Session,
+        title: str,
+        message: str,
+        type,
+        reference_id: Optional[int] = None,
+        mode: str = BROADCAST_FANOUT,
+        send_email: bool = False
+    ) -> NotificationBroadcast:
+        """Record a broadcast. FANOUT snapshots the current user range to walk; FEED is complete at once.
+        send_email only applies to FANOUT: each chunk queues its emails with its notifications."""
+        broadcast = NotificationBroadcast(
+            title=title,
+            message=message,
+            type=getattr(type, "value", type),
+            reference_id=reference_id,
+            mode=mode,
+            send_email=send_email and mode == BROADCAST_FANOUT,
+            last_user_id=0,
+            sent_count=0
+        )
+        if mode == BROADCAST_FANOUT:
+            broadcast.status = BROADCAST_PENDING
+            broadcast.max_user_id = db.query(func.max(User.user_id)).scalar() or 0
+            broadcast.target_count = db.query(func.count(User.user_id)).scalar() or 0
+        else:
+            broadcast.status = BROADCAST_COMPLETED
+            broadcast.completed_at = datetime.now()
+
+        db.add(broadcast)
+        db.commit()
+        db.refresh(broadcast)
+        if mode == BROADCAST_FEED:
+            cache.invalidate_tags(FEED_LATEST_KEY)
+        return broadcast
+
+    @staticmethod
+    def get_broadcast(db: Session, broadcast_id: int) -> Optional[NotificationBroadcast]:
+        return db.query(NotificationBroadcast).filter(NotificationBroadcast.broadcast_id == broadcast_id).first()
+
+    @staticmethod
+    def get_unfinished_broadcasts(db: Session) -> List[NotificationBroadcast]:
+        """Fan-outs that were started but never completed (not the failed ones)"""
+        return db.query(NotificationBroadcast).filter(
+            NotificationBroadcast.mode == BROADCAST_FANOUT,
+            NotificationBroadcast.status.in_([BROADCAST_PENDING, BROADCAST_RUNNING])
+        ).order_by(NotificationBroadcast.broadcast_id).all()
+
+    @staticmethod
+    def fan_out_next_chunk(
+        db: Session,
+        broadcast_id: int,
+        chunk_size: int = BROADCAST_CHUNK_SIZE
+    ) -> Optional[NotificationBroadcast]:
+        """
+        Write the broadcast to the next chunk_size users after its cursor and move
+        the cursor, in one transaction; commits.
+
+        The broadcast row is locked first, so workers resuming the same broadcast
+        take turns and never write a user range twice.
+        """
+        broadcast = db.query(NotificationBroadcast).filter(
+            NotificationBroadcast.broadcast_id == broadcast_id
+        ).with_for_update().first()
+        if broadcast is None or broadcast.mode != BROADCAST_FANOUT or broadcast.status == BROADCAST_COMPLETED:
+            db.rollback()
+            return broadcast
+
+        lower = broadcast.last_user_id or 0
+        # Upper bound of the chunk: the chunk_size-th user id after the cursor, so
+        # gaps in the id sequence do not shrink chunks
+        upper = db.query(User.user_id).filter(
+            User.user_id > lower,
+            User.user_id <= broadcast.max_user_id
+        ).order_by(User.user_id).offset(chunk_size - 1).limit(1).scalar()
+        if upper is None:
+            upper = broadcast.max_user_id
+
+        if upper > lower:
+            broadcast.sent_count += NotificationRepository.insert_for_users(
+                db,
+                and_(User.user_id > lower, User.user_id <= upper),
+                broadcast.title,
+                broadcast.message,
+                broadcast.type,
+                broadcast.reference_id,
+                broadcast_id=broadcast.broadcast_id,
+                created_at=broadcast.created_at
+            )
+            if broadcast.send_email:
+                OutboxRepository.enqueue_select(db, JOB_NOTIFICATION_EMAIL, select(Notification.notification_id).where(
+                    Notification.broadcast_id == broadcast.broadcast_id,
+                    Notification.user_id > lower,
+                    Notification.user_id <= upper
+                ))
+        broadcast.last_user_id = upper
+        broadcast.started_at = broadcast.started_at or datetime.now()
+        broadcast.error = None
+        if upper >= broadcast.max_user_id:
+            broadcast.status = BROADCAST_COMPLETED
+            broadcast.completed_at = datetime.now()
+        else:
+            broadcast.status = BROADCAST_RUNNING
+        db.commit()
+        return broadcast
+
+    @staticmethod
+    def mark_failed(db: Session, broadcast_id: int, error: str) -> None:
+        db.query(NotificationBroadcast).filter(
+            NotificationBroadcast.broadcast_id == broadcast_id,
+            NotificationBroadcast.status != BROADCAST_COMPLETED
+        ).update({"status": BROADCAST_FAILED, "error": error[:1000]}, synchronize_session=False)
+        db.commit()
+
+    @staticmethod
+    def latest_feed_broadcast_id(db: Session) -> Optional[int]:
+        """Newest FEED broadcast id, cached for FEED_LATEST_TTL seconds"""
+        latest = cache.get(FEED_NAMESPACE, FEED_LATEST_KEY)
+        if isinstance(latest, dict):
+            return latest["broadcast_id"]
+        broadcast_id = db.query(func.max(NotificationBroadcast.broadcast_id)).filter(
+            NotificationBroadcast.mode == BROADCAST_FEED
+        ).scalar()
+        cache.set(FEED_NAMESPACE, FEED_LATEST_KEY, {"broadcast_id": broadcast_id}, FEED_LATEST_TTL, (FEED_LATEST_KEY,))
+        return broadcast_id
+
+    @staticmethod
+    def merge_feed_broadcasts(db: Session, user_id: int) -> int:
+        """
+        Copy FEED broadcasts the user has not received yet into their notifications
+        and advance their feed cursor; returns how many were added.
+
+        Served from the cache when there is nothing new, so notification reads and
+        the bell do not pay for it. Broadcasts older than the account are skipped,
+        as a fan-out would have skipped them.
+        """
+        latest = NotificationBroadcastRepository.latest_feed_broadcast_id(db)
+        if latest is None:
+            return 0
+
+        cursor_key = _feed_cursor_key(user_id)
+        seen = cache.get(FEED_NAMESPACE, cursor_key)
+        if isinstance(seen, dict) and seen["broadcast_id"] >= latest:
+            return 0
+
+        cursor = db.query(NotificationFeedCursor).filter(NotificationFeedCursor.user_id == user_id).first()
+        last_seen = cursor.last_broadcast_id if cursor else 0
+        if last_seen >= latest:
+            cache.set(FEED_NAMESPACE, cursor_key, {"broadcast_id": last_seen}, FEED_LATEST_TTL, (cursor_key,))
+            return 0
+
+        broadcast = aliased(NotificationBroadcast)
+        table = Notification.__table__
+        pending = select(
+            literal(user_id),
+            broadcast.title,
+            broadcast.message,
+            broadcast.type,
+            broadcast.reference_id,
+            literal(False),
+            broadcast.broadcast_id,
+            broadcast.created_at
+        ).join(
+            User, User.user_id == user_id
+        ).where(
+            broadcast.mode == BROADCAST_FEED,
+            broadcast.broadcast_id > last_seen,
+            broadcast.broadcast_id <= latest,
+            broadcast.created_at >= User.created_at,
+            ~exists().where(table.c.user_id == user_id, table.c.broadcast_id == broadcast.broadcast_id)
+        )
+
+        try:
+            added = db.execute(insert(table).from_select(
+                ["user_id", "title", "message", "type", "reference_id", "is_read", "broadcast_id", "created_at"],
+                pending
+            )).rowcount
+            NotificationCounterRepository.apply_deltas(db, {user_id: (added, added)})
+            if cursor is None:
+                db.add(NotificationFeedCursor(user_id=user_id, last_broadcast_id=latest))
+            else:
+                cursor.last_broadcast_id = max(cursor.last_broadcast_id, latest)
+            db.commit()
+        except IntegrityError:
+            # A concurrent request of the same user merged them first
+            db.rollback()
+            return 0
+        cache.set(FEED_NAMESPACE, cursor_key, {"broadcast_id": latest}, FEED_LATEST_TTL, (cursor_key,))
+        return added
+
+
+# ===== RUNNER =====
+# Fan-outs run chunk by chunk, each chunk its own short transaction. A broadcast
+# interrupted by a crash or deploy stays PENDING / RUNNING and is picked up again
+# by resume_broadcasts(); one that hit an error is FAILED until resumed by an admin.
+
+def run_broadcast(db: Session, broadcast_id: int, chunk_size: int = BROADCAST_CHUNK_SIZE) -> Optional[NotificationBroadcast]:
+    """Fan a broadcast out to its remaining users; returns it completed, or FAILED on error"""
+    try:
+        while True:
+            broadcast = NotificationBroadcastRepository.fan_out_next_chunk(db, broadcast_id, chunk_size)
+            if broadcast is None or broadcast.mode != BROADCAST_FANOUT or broadcast.status == BROADCAST_COMPLETED:
+                return broadcast
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Broadcast {broadcast_id} failed: {e}")
+        NotificationBroadcastRepository.mark_failed(db, broadcast_id, str(e))
+        return NotificationBroadcastRepository.get_broadcast(db, broadcast_id)
+
+
+def _run_in_own_session(broadcast_id: int) -> None:
+    db = SessionLocal()
+    try:
+        broadcast = run_broadcast(db, broadcast_id)
+        if broadcast is not None and broadcast.status == BROADCAST_COMPLETED:
+            print(f"✅ Broadcast {broadcast_id} sent to {broadcast.sent_count} users")
+    finally:
+        db.close()
+
+
+def start_broadcast(broadcast_id: int) -> threading.Thread:
+    """Run a fan-out on a daemon thread with its own session"""
+    thread = threading.Thread(target=_run_in_own_session, args=(broadcast_id,), name=f"broadcast-{broadcast_id}", daemon=True)
+    thread.start()
+    return thread
+
+
+def resume_broadcasts() -> int:
+    """Restart every unfinished fan-out in the background; returns how many were restarted"""
+    db = SessionLocal()
+    try:
+        broadcast_ids = [broadcast.broadcast_id for broadcast in NotificationBroadcastRepository.get_unfinished_broadcasts(db)]
+    finally:
+        db.close()
+    for broadcast_id in broadcast_ids:
+        start_broadcast(broadcast_id)
+    return len(broadcast_ids)
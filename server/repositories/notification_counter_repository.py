@@ -0,0 +1,302 @@
+import os
+import threading
+from collections import defaultdict
+from sqlalchemy import bindparam, case, event, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, Optional, Tuple
+
+from config.database import SessionLocal
+from models.notification import Notification, NotificationCounter
+from models.user import User
+from utils.cache import cache
+from utils.location_buffer import PeriodicFlusher
+
+# Seconds a user's counts are served from the cache; commits that change them drop the entry
+NOTIFICATION_COUNT_TTL = int(os.getenv("NOTIFICATION_COUNT_TTL", "60"))
+# Seconds between reconciler passes, and users checked per reconciler transaction
+NOTIFICATION_RECONCILE_SECONDS = float(os.getenv("NOTIFICATION_RECONCILE_SECONDS", "3600"))
+NOTIFICATION_RECONCILE_BATCH = int(os.getenv("NOTIFICATION_RECONCILE_BATCH", "5000"))
+
+COUNTER_NAMESPACE = "notifications.counts"
+TAG_NOTIFICATION_COUNTS = "notifications:counts"
+
+# (unread, total) change per user
+Deltas = Dict[int, Tuple[int, int]]
+
+
+def _counter_key(user_id: int) -> str:
+    return f"notification_counts:{user_id}"
+
+
+class NotificationCounterRepository:
+
+    @staticmethod
+    def get_counts(db: Session, user_id: int) -> Dict[str, int]:
+        """
+        {"unread_count", "total_count"} of a user: the cache, else the counter row,
+        else counted once from the notifications table and stored.
+        """
+        key = _counter_key(user_id)
+        counts = cache.get(COUNTER_NAMESPACE, key)
+        if isinstance(counts, dict):
+            return counts
+
+        row = db.query(NotificationCounter.unread_count, NotificationCounter.total_count).filter(
+            NotificationCounter.user_id == user_id
+        ).first()
+        if row is None:
+            unread_count, total_count = NotificationCounterRepository.seed(db, user_id)
+        else:
+            unread_count, total_count = row
+
+        counts = {"unread_count": unread_count, "total_count": total_count}
+        cache.set(COUNTER_NAMESPACE, key, counts, NOTIFICATION_COUNT_TTL, (key, TAG_NOTIFICATION_COUNTS))
+        return counts
+
+    @staticmethod
+    def count_from_rows(db: Session, user_id: int) -> Tuple[int, int]:
+        """(unread, total) counted from the notifications table"""
+        unread_count, total_count = db.query(
+            func.coalesce(func.sum(case((Notification.is_read == False, 1), else_=0)), 0),
+            func.count(Notification.notification_id)
+        ).filter(Notification.user_id == user_id).one()
+        return int(unread_count), int(total_count)
+
+    @staticmethod
+    def seed(db: Session, user_id: int) -> Tuple[int, int]:
+        """Create a user's counter row from their notifications; commits"""
+        unread_count, total_count = NotificationCounterRepository.count_from_rows(db, user_id)
+        db.add(NotificationCounter(user_id=user_id, unread_count=unread_count, total_count=total_count))
+        try:
+            db.commit()
+        except IntegrityError:
+            # Seeded by a concurrent request (or the user no longer exists)
+            db.rollback()
+        return unread_count, total_count
+
+    @staticmethod
+    def apply_deltas(db: Session, deltas: Deltas, connection=None) -> None:
+        """
+        Add per-user (unread, total) changes to existing counter rows, in the
+        caller's transaction. Users without a row are skipped: their row is
+        seeded from the notifications themselves on first read.
+
+        Flush events pass the session's connection, on which they may execute.
+        """
+        params = [
+            {"counter_user_id": user_id, "unread_delta": unread, "total_delta": total}
+            for user_id, (unread, total) in deltas.items() if unread or total
+        ]
+        if not params:
+            return
+        table = NotificationCounter.__table__
+        (connection or db).execute(
+            update(table).where(table.c.user_id == bindparam("counter_user_id")).values(
+                unread_count=table.c.unread_count + bindparam("unread_delta"),
+                total_count=table.c.total_count + bindparam("total_delta")
+            ),
+            params
+        )
+        touch_counters(db, deltas.keys())
+
+    @staticmethod
+    def add_for_users(db: Session, user_filter, unread: int, total: int) -> None:
+        """Add the same change to every user matching user_filter (a criterion on User), in one UPDATE"""
+        table = NotificationCounter.__table__
+        db.execute(
+            update(table).where(
+                table.c.user_id.in_(select(User.user_id).where(user_filter).scalar_subquery())
+            ).values(
+                unread_count=table.c.unread_count + unread,
+                total_count=table.c.total_count + total
+            )
+        )
+        touch_counters(db, None)
+
+    @staticmethod
+    def deltas_for(db: Session, *criteria) -> Deltas:
+        """Per-user (unread, total) of the notifications matching criteria; negate before a bulk delete"""
+        rows = db.query(
+            Notification.user_id,
+            func.coalesce(func.sum(case((Notification.is_read == False, 1), else_=0)), 0),
+            func.count(Notification.notification_id)
+        ).filter(*criteria).group_by(Notification.user_id).all()
+        return {user_id: (int(unread), int(total)) for user_id, unread, total in rows}
+
+    @staticmethod
+    def collect_deltas(session: Session) -> Deltas:
+        """Counter changes made by the pending flush's Notification inserts, deletes and read flags (call from after_flush)"""
+        deltas: Dict[int, list] = defaultdict(lambda: [0, 0])
+
+        for obj in session.new:
+            if isinstance(obj, Notification) and obj.user_id is not None:
+                deltas[obj.user_id][1] += 1
+                if not obj.is_read:
+                    deltas[obj.user_id][0] += 1
+
+        for obj in session.deleted:
+            if isinstance(obj, Notification):
+                state = obj._sa_instance_state
+                # The row as it was in the database, before any change in this flush
+                user_id = state.committed_state.get("user_id", state.dict.get("user_id"))
+                was_read = state.committed_state.get("is_read", state.dict.get("is_read"))
+                if user_id is None:
+                    continue
+                deltas[user_id][1] -= 1
+                if not was_read:
+                    deltas[user_id][0] -= 1
+
+        for obj in session.dirty:
+            if not isinstance(obj, Notification) or obj in session.deleted:
+                continue
+            history = obj._sa_instance_state.attrs["is_read"].history
+            if not history.added:
+                continue
+            was_read = bool(history.deleted[0]) if history.deleted else False
+            is_read = bool(history.added[0])
+            if was_read != is_read:
+                deltas[obj.user_id][0] += -1 if is_read else 1
+
+        return {user_id: (unread, total) for user_id, (unread, total) in deltas.items() if unread or total}
+
+    @staticmethod
+    def reconcile_range(db: Session, lower: int, upper: int) -> Dict[str, int]:
+        """
+        Recount users lower < user_id <= upper; fix counter rows that drifted and
+        seed missing rows of users with notifications. Commits.
+
+        Counter rows are locked before counting, so a write racing the recount
+        applies its own change after ours instead of being overwritten.
+        """
+        counters = {
+            counter.user_id: counter
+            for counter in db.query(NotificationCounter).filter(
+                NotificationCounter.user_id > lower,
+                NotificationCounter.user_id <= upper
+            ).with_for_update().all()
+        }
+        actual = NotificationCounterRepository.deltas_for(
+            db, Notification.user_id > lower, Notification.user_id <= upper
+        )
+
+        repaired = seeded = 0
+        changed = []
+        for user_id in set(counters) | set(actual):
+            unread_count, total_count = actual.get(user_id, (0, 0))
+            counter = counters.get(user_id)
+            if counter is None:
+                db.add(NotificationCounter(user_id=user_id, unread_count=unread_count, total_count=total_count))
+                seeded += 1
+            elif (counter.unread_count, counter.total_count) != (unread_count, total_count):
+                counter.unread_count = unread_count
+                counter.total_count = total_count
+                repaired += 1
+                changed.append(user_id)
+        touch_counters(db, changed)
+        try:
+            db.commit()
+        except IntegrityError:
+            # A missing row was seeded meanwhile; the next pass checks it
+            db.rollback()
+            return {"checked": len(set(counters) | set(actual)), "repaired": 0, "seeded": 0}
+        return {"checked": len(set(counters) | set(actual)), "repaired": repaired, "seeded": seeded}
+
+    @staticmethod
+    def get_unread_totals(db: Session) -> Tuple[int, Dict[str, int]]:
+        """(total unread, unread per user) over all counter rows"""
+        rows = db.query(NotificationCounter.user_id, NotificationCounter.unread_count).filter(
+            NotificationCounter.unread_count > 0
+        ).all()
+        return sum(unread for _, unread in rows), {str(user_id): unread for user_id, unread in rows}
+
+
+# ===== CACHE INVALIDATION =====
+# Users whose counts a transaction changed wait in session.info until it
+# commits; then their cached counts are dropped.
+
+_TOUCHED_KEY = "notification_counter_users"
+
+
+def touch_counters(db: Session, user_ids: Optional[Iterable[int]]) -> None:
+    """Drop these users' cached counts (everyone's for None) once db's transaction commits"""
+    touched = db.info.setdefault(_TOUCHED_KEY, set())
+    if user_ids is None:
+        touched.add(None)
+    else:
+        touched.update(user_ids)
+
+
+def forget_counts(user_ids: Iterable[Optional[int]]) -> None:
+    user_ids = set(user_ids)
+    if None in user_ids:
+        cache.invalidate_tags(TAG_NOTIFICATION_COUNTS)
+        return
+    for user_id in user_ids:
+        cache.invalidate_tags(_counter_key(user_id))
+
+
+def _track_counter_writes(session: Session, flush_context) -> None:
+    deltas = NotificationCounterRepository.collect_deltas(session)
+    if deltas:
+        NotificationCounterRepository.apply_deltas(session, deltas, session.connection())
+
+
+def _forget_committed(session: Session) -> None:
+    forget_counts(session.info.pop(_TOUCHED_KEY, ()))
+
+
+def _discard_touched(session: Session, previous_transaction) -> None:
+    if not previous_transaction.nested:
+        session.info.pop(_TOUCHED_KEY, None)
+
+
+def register_notification_counter_listeners() -> None:
+    """Keep notification counters in step with ORM notification writes on every session"""
+    for name, listener in (
+        ("after_flush", _track_counter_writes),
+        ("after_commit", _forget_committed),
+        ("after_soft_rollback", _discard_touched),
+    ):
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
+
+
+# ===== RECONCILER =====
+
+def reconcile_notification_counters(batch_size: int = NOTIFICATION_RECONCILE_BATCH) -> Dict[str, int]:
+    """Walk all users in batches and repair their counter rows; returns totals"""
+    totals = {"checked": 0, "repaired": 0, "seeded": 0}
+    db = SessionLocal()
+    try:
+        max_user_id = db.query(func.max(User.user_id)).scalar() or 0
+        lower = 0
+        while lower < max_user_id:
+            upper = db.query(User.user_id).filter(User.user_id > lower).order_by(User.user_id).offset(
+                batch_size - 1
+            ).limit(1).scalar() or max_user_id
+            for name, value in NotificationCounterRepository.reconcile_range(db, lower, upper).items():
+                totals[name] += value
+            lower = upper
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️ Notification counter reconcile failed: {e}")
+    finally:
+        db.close()
+
+    if totals["repaired"] or totals["seeded"]:
+        print(f"✅ Notification counters: {totals['repaired']} repaired, {totals['seeded']} seeded")
+    return totals
+
+
+counter_reconciler = PeriodicFlusher(
+    reconcile_notification_counters,
+    interval=NOTIFICATION_RECONCILE_SECONDS,
+    name="notification-counter-reconciler"
+)
+
+
+def start_counter_reconciler() -> None:
+    """Seed / repair counters now in the background, then every NOTIFICATION_RECONCILE_SECONDS"""
+    threading.Thread(target=reconcile_notification_counters, name="notification-counter-seed", daemon=True).start()
+    counter_reconciler.ensure_started()
@@ -1,29 +1,120 @@
+import os
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
-from typing import List, Optional
-from models.notification import Notification
+from sqlalchemy import Row, desc, func, insert, select, literal, cast, Boolean, Integer, TIMESTAMP
+from datetime import datetime
+from typing import List, Optional, Union
+from models.notification import Notification, NotificationType
+from models.user import User
 from schemas.notification import NotificationCreate, NotificationUpdate
+from repositories.notification_counter_repository import NotificationCounterRepository
+from repositories.outbox_repository import OutboxRepository, JOB_NOTIFICATION_EMAIL
+from utils.pagination import apply_cursor
+
+# Users per INSERT ... SELECT when sending one notification to a list of users
+NOTIFICATION_INSERT_BATCH = int(os.getenv("NOTIFICATION_INSERT_BATCH", "1000"))
 
 class NotificationRepository:
     
     @staticmethod
-    def create_notification(db: Session, notification_data: NotificationCreate) -> Notification:
-        """Create a new notification"""
+    def create_notification(db: Session, notification_data: NotificationCreate, send_email: bool = False) -> Notification:
+        """Create a new notification, and queue its email in the same transaction when send_email is set"""
         db_notification = Notification(**notification_data.model_dump())
         db.add(db_notification)
+        if send_email:
+            db.flush()
+            OutboxRepository.enqueue(db, JOB_NOTIFICATION_EMAIL, reference_id=db_notification.notification_id)
         db.commit()
         db.refresh(db_notification)
         return db_notification
 
     @staticmethod
-    def create_bulk_notifications(db: Session, notifications_data: list) -> List[Notification]:
-        """Create multiple notifications at once"""
-        db_notifications = [Notification(**data) for data in notifications_data]
-        db.add_all(db_notifications)
+    def insert_for_users(
+        db: Session,
+        user_filter,
+        title: str,
+        message: str,
+        type,
+        reference_id: Optional[int] = None,
+        broadcast_id: Optional[int] = None,
+        created_at: Optional[datetime] = None,
+        returning: bool = False
+    ) -> Union[int, List[Row]]:
+        """
+        Give every user matching user_filter the same notification in one
+        INSERT ... SELECT, without loading users or building ORM objects (no commit).
+
+        Returns the inserted rows (plain rows, so they stay readable after the
+        commit) when returning is set, otherwise how many were inserted.
+        """
+        table = Notification.__table__
+        notification_type = NotificationType(getattr(type, "value", type))
+        columns = [
+            User.user_id,
+            literal(title, table.c.title.type),
+            literal(message, table.c.message.type),
+            cast(literal(notification_type.name), table.c.type.type),
+            cast(literal(reference_id), Integer),
+            literal(False, Boolean),
+            cast(literal(broadcast_id), Integer)
+        ]
+        targets = ["user_id", "title", "message", "type", "reference_id", "is_read", "broadcast_id"]
+        if created_at is not None:
+            columns.append(literal(created_at, TIMESTAMP))
+            targets.append("created_at")
+
+        statement = insert(table).from_select(targets, select(*columns).where(user_filter))
+        if returning:
+            result = db.execute(statement.returning(*table.c)).all()
+        else:
+            result = db.execute(statement).rowcount
+        # Every matching user got exactly one new unread notification
+        NotificationCounterRepository.add_for_users(db, user_filter, 1, 1)
+        return result
+
+    @staticmethod
+    def create_notifications_for_users(
+        db: Session,
+        user_ids: List[int],
+        title: str,
+        message: str,
+        type,
+        reference_id: Optional[int] = None,
+        send_email: bool = False
+    ) -> List[Row]:
+        """Send one notification to many users, NOTIFICATION_INSERT_BATCH users per statement, in one transaction.
+        Duplicate and unknown user ids are skipped; send_email queues an email per notification."""
+        user_ids = sorted(set(user_ids))
+        created: List[Row] = []
+        for start in range(0, len(user_ids), NOTIFICATION_INSERT_BATCH):
+            created.extend(NotificationRepository.insert_for_users(
+                db,
+                User.user_id.in_(user_ids[start:start + NOTIFICATION_INSERT_BATCH]),
+                title, message, type, reference_id,
+                returning=True
+            ))
+        if send_email:
+            OutboxRepository.enqueue_many(db, JOB_NOTIFICATION_EMAIL, [notification.notification_id for notification in created])
         db.commit()
-        for notification in db_notifications:
-            db.refresh(notification)
-        return db_notifications
+        return sorted(created, key=lambda notification: notification.notification_id)
+
+    @staticmethod
+    def create_bulk_notifications(db: Session, notifications_data: list) -> List[Row]:
+        """Create multiple notifications at once, NOTIFICATION_INSERT_BATCH rows per INSERT ... RETURNING"""
+        table = Notification.__table__
+        created: List[Row] = []
+        for start in range(0, len(notifications_data), NOTIFICATION_INSERT_BATCH):
+            created.extend(db.execute(
+                insert(table).returning(*table.c),
+                notifications_data[start:start + NOTIFICATION_INSERT_BATCH]
+            ).all())
+        
+        deltas = {}
+        for row in created:
+            unread, total = deltas.get(row.user_id, (0, 0))
+            deltas[row.user_id] = (unread + (0 if row.is_read else 1), total + 1)
+        NotificationCounterRepository.apply_deltas(db, deltas)
+        db.commit()
+        return created
 
     @staticmethod
     def get_user_notifications(
@@ -31,15 +122,23 @@ class NotificationRepository:
         user_id: int, 
         skip: int = 0, 
         limit: int = 50,
-        is_read: Optional[bool] = None
+        is_read: Optional[bool] = None,
+        cursor: Optional[str] = None
     ) -> List[Notification]:
-        """Get notifications for a user with pagination"""
+        """Get notifications for a user with pagination (keyset mode when a cursor is given)"""
         query = db.query(Notification).filter(Notification.user_id == user_id)
         
         if is_read is not None:
             query = query.filter(Notification.is_read == is_read)
+        
+        if cursor:
+            return apply_cursor(
+                query, Notification.created_at, Notification.notification_id, cursor
+            ).limit(limit).all()
             
-        return query.order_by(desc(Notification.created_at)).offset(skip).limit(limit).all()
+        return query.order_by(
+            desc(Notification.created_at), desc(Notification.notification_id)
+        ).offset(skip).limit(limit).all()
 
     @staticmethod
     def get_notification_by_id(db: Session, notification_id: int, user_id: int) -> Optional[Notification]:
@@ -75,21 +174,19 @@ class NotificationRepository:
             'is_read': True,
             'read_at': func.now()
         })
+        NotificationCounterRepository.apply_deltas(db, {user_id: (-result, 0)})
         db.commit()
         return result
 
     @staticmethod
     def get_unread_count(db: Session, user_id: int) -> int:
-        """Get count of unread notifications for a user"""
-        return db.query(Notification).filter(
-            Notification.user_id == user_id,
-            Notification.is_read == False
-        ).count()
+        """Get count of unread notifications for a user (maintained counter, cached)"""
+        return NotificationCounterRepository.get_counts(db, user_id)["unread_count"]
 
     @staticmethod
     def get_total_count(db: Session, user_id: int) -> int:
-        """Get total notification count for a user"""
-        return db.query(Notification).filter(Notification.user_id == user_id).count()
+        """Get total notification count for a user (maintained counter, cached)"""
+        return NotificationCounterRepository.get_counts(db, user_id)["total_count"]
 
     @staticmethod
     def delete_notification(db: Session, notification_id: int, user_id: int) -> bool:
@@ -108,6 +205,12 @@ class NotificationRepository:
     @staticmethod
     def delete_all_notifications(db: Session, user_id: int) -> int:
         """Delete all notifications for a user"""
-        result = db.query(Notification).filter(Notification.user_id == user_id).delete()
+        # Unread first, so the counters move by exactly what was removed
+        unread = db.query(Notification).filter(
+            Notification.user_id == user_id,
+            Notification.is_read == False
+        ).delete()
+        result = unread + db.query(Notification).filter(Notification.user_id == user_id).delete()
+        NotificationCounterRepository.apply_deltas(db, {user_id: (-unread, -result)})
         db.commit()
         return result
\ No newline at end of file
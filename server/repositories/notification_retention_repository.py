@@ -0,0 +1,552 @@
+import argparse
+import enum
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from sqlalchemy import case, column, delete, func, literal, select, table as sql_table, text, tuple_
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config.database import SessionLocal, engine
+from models.notification import Notification
+from repositories.notification_counter_repository import NotificationCounterRepository
+from utils.location_buffer import PeriodicFlusher
+
+# Days notifications are kept by the scheduled job (0: no scheduled purge) and how often it runs
+NOTIFICATION_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "0"))
+NOTIFICATION_RETENTION_SECONDS = float(os.getenv("NOTIFICATION_RETENTION_SECONDS", "86400"))
+# Rows per DELETE, pause between DELETEs, and a time budget per run (0: until done)
+NOTIFICATION_PURGE_BATCH = int(os.getenv("NOTIFICATION_PURGE_BATCH", "5000"))
+NOTIFICATION_PURGE_PAUSE_MS = int(os.getenv("NOTIFICATION_PURGE_PAUSE_MS", "50"))
+NOTIFICATION_PURGE_MAX_SECONDS = float(os.getenv("NOTIFICATION_PURGE_MAX_SECONDS", "0"))
+# Purged rows are written here as gzipped JSON lines when archiving is asked for
+NOTIFICATION_ARCHIVE_DIR = os.getenv("NOTIFICATION_ARCHIVE_DIR", "archive/notifications")
+NOTIFICATION_ARCHIVE_ON_PURGE = os.getenv("NOTIFICATION_ARCHIVE_ON_PURGE", "false").lower() in ("1", "true", "yes")
+# PostgreSQL: monthly partitions, created this many months ahead once the table
+# has been converted (python -m repositories.notification_retention_repository --partition)
+NOTIFICATION_PARTITION_MONTHS_AHEAD = int(os.getenv("NOTIFICATION_PARTITION_MONTHS_AHEAD", "3"))
+
+PARENT_TABLE = "notifications"
+LEGACY_PARTITION = "notifications_legacy"
+DEFAULT_PARTITION = "notifications_default"
+PARTITION_BOUND_CHECK = "notifications_partition_bound"
+# pg advisory lock id held by whoever is purging, so workers of several processes do not overlap
+RETENTION_LOCK_ID = 7204311
+
+_PARTITION_NAME = re.compile(r"^notifications_(p\d{6}|legacy)$")
+_RANGE_BOUND = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def _month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    month = value.month - 1 + months
+    return datetime(value.year + month // 12, month % 12 + 1, 1)
+
+
+def _parse_bound(value: str) -> Optional[datetime]:
+    value = value.strip()
+    if value.upper() == "MINVALUE" or value.upper() == "MAXVALUE":
+        return None
+    return datetime.fromisoformat(value.strip("'"))
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class NotificationArchiveWriter:
+    """Gzipped JSON lines file of purged notifications, one per purge run"""
+
+    def __init__(self, directory: str, cutoff: datetime):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(
+            directory, f"notifications-before-{cutoff:%Y%m%d}-{datetime.now():%Y%m%dT%H%M%S}.jsonl.gz"
+        )
+        self._raw = open(self.path, "wb")
+        self._gzip = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=6)
+        self.rows = 0
+
+    def write(self, rows) -> None:
+        for row in rows:
+            self._gzip.write((json.dumps(dict(row._mapping), default=_json_default) + "\n").encode())
+            self.rows += 1
+
+    def sync(self) -> None:
+        """Make what was written durable; called before the rows are deleted for good"""
+        self._gzip.flush()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+
+    def close(self) -> Optional[str]:
+        """Close the file; returns its path, or None (and removes it) when nothing was archived"""
+        self._gzip.close()
+        self._raw.close()
+        if not self.rows:
+            os.remove(self.path)
+            return None
+        return self.path
+
+
+class RetentionMetrics:
+    """Totals of this process's purge runs and the last run's summary"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.rows_purged = 0
+        self.partitions_dropped = 0
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    def record(self, summary: Dict[str, Any]) -> None:
+        with self._lock:
+            self.runs += 1
+            self.rows_purged += summary["deleted_count"]
+            self.partitions_dropped += len(summary["partitions_dropped"])
+            self.last_run = summary
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "rows_purged": self.rows_purged,
+                "partitions_dropped": self.partitions_dropped,
+                "last_run": self.last_run
+            }
+
+
+retention_metrics = RetentionMetrics()
+
+
+class NotificationRetentionRepository:
+
+    # ===== PARTITIONS (PostgreSQL) =====
+
+    @staticmethod
+    def is_partitioned(db: Session) -> bool:
+        if db.get_bind().dialect.name != "postgresql":
+            return False
+        return db.execute(
+            text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"), {"name": PARENT_TABLE}
+        ).scalar() == "p"
+
+    @staticmethod
+    def get_partitions(db: Session) -> List[Dict[str, Any]]:
+        """Attached partitions, oldest first: {"name", "lower", "upper", "is_default", "estimated_rows"}
+        (lower None means MINVALUE)"""
+        if not NotificationRetentionRepository.is_partitioned(db):
+            return []
+        rows = db.execute(text(
+            "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid), child.reltuples "
+            "FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:name)"
+        ), {"name": PARENT_TABLE}).all()
+
+        partitions = []
+        for name, bound, estimated_rows in rows:
+            match = _RANGE_BOUND.search(bound or "")
+            partitions.append({
+                "name": name,
+                "lower": _parse_bound(match.group(1)) if match else None,
+                "upper": _parse_bound(match.group(2)) if match else None,
+                "is_default": match is None,
+                "estimated_rows": max(0, int(estimated_rows))
+            })
+        return sorted(partitions, key=lambda p: (p["is_default"], p["upper"] or datetime.max))
+
+    @staticmethod
+    def get_detached_partitions(db: Session) -> List[str]:
+        """Partitions detached by a purge that stopped before dropping them"""
+        if db.get_bind().dialect.name != "postgresql":
+            return []
+        names = db.execute(text(
+            "SELECT relname FROM pg_class WHERE relkind = 'r' AND NOT relispartition "
+            "AND relnamespace = to_regnamespace(current_schema()) AND relname LIKE 'notifications\\_%'"
+        )).scalars().all()
+        return sorted(name for name in names if _PARTITION_NAME.match(name))
+
+    @staticmethod
+    def ensure_partitions(engine, months_ahead: int = NOTIFICATION_PARTITION_MONTHS_AHEAD) -> List[str]:
+        """
+        Create the missing monthly partitions up to months_ahead months from now,
+        plus a DEFAULT partition for anything outside them (PostgreSQL only).
+        Returns the names created.
+        """
+        if engine.dialect.name != "postgresql":
+            return []
+        created = []
+        with Session(engine) as db:
+            if not NotificationRetentionRepository.is_partitioned(db):
+                return []
+            uppers = [p["upper"] for p in NotificationRetentionRepository.get_partitions(db) if p["upper"]]
+            month = max(uppers) if uppers else _month_start(datetime.now())
+            last = _add_months(_month_start(datetime.now()), months_ahead + 1)
+
+            while month < last:
+                next_month = _add_months(month, 1)
+                name = f"notifications_p{month:%Y%m}"
+                try:
+                    with db.begin_nested():
+                        db.execute(text(
+                            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+                            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{next_month:%Y-%m-%d}')"
+                        ))
+                    created.append(name)
+                except Exception as e:
+                    # e.g. rows of that month already sit in the default partition
+                    print(f"⚠️ Could not create notification partition {name}: {e}")
+                month = next_month
+
+            db.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+            db.commit()
+        if created:
+            print(f"✅ Notification partitions created: {', '.join(created)}")
+        return created
+
+    @staticmethod
+    def partition_table(engine) -> bool:
+        """
+        Turn the plain notifications table into one partitioned by month on
+        created_at (PostgreSQL only); returns whether the table is partitioned.
+
+        No rows are copied: the existing table becomes the partition for
+        everything before the first monthly one. A CHECK constraint validated
+        ahead of time and unique indexes built CONCURRENTLY keep the final swap
+        down to catalog changes under a short lock. A one-off migration step, run
+        from the command line; the app never converts the table on its own.
+
+        The primary key becomes (notification_id, created_at), as a partitioned
+        table requires; unique indexes already carry created_at.
+        """
+        if engine.dialect.name != "postgresql":
+            return False
+        with engine.connect() as conn:
+            relkind = conn.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"), {"name": PARENT_TABLE}).scalar()
+            if relkind != "r":
+                return relkind == "p"
+
+        month = _month_start(datetime.now())
+        boundary = _add_months(month, 1)
+        if boundary - datetime.now() < timedelta(days=1):
+            boundary = _add_months(month, 2)
+
+        # 1. Online preparation: none of this blocks reads or writes for long, and
+        # a lock that is not granted quickly fails the conversion instead of queueing every query behind it
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("SET lock_timeout = '10s'"))
+            conn.execute(text(f"UPDATE {PARENT_TABLE} SET created_at = now() WHERE created_at IS NULL"))
+            conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DROP CONSTRAINT IF EXISTS {PARTITION_BOUND_CHECK}"))
+            conn.execute(text(
+                f"ALTER TABLE {PARENT_TABLE} ADD CONSTRAINT {PARTITION_BOUND_CHECK} "
+                f"CHECK (created_at IS NOT NULL AND created_at < '{boundary:%Y-%m-%d}') NOT VALID"
+            ))
+            conn.execute(text(f"ALTER TABLE {PARENT_TABLE} VALIDATE CONSTRAINT {PARTITION_BOUND_CHECK}"))
+            for name, columns in (
+                ("notifications_legacy_id_created_at", "notification_id, created_at"),
+                ("notifications_legacy_user_broadcast", "user_id, broadcast_id, created_at"),
+            ):
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+                conn.execute(text(f"CREATE UNIQUE INDEX CONCURRENTLY {name} ON {PARENT_TABLE} ({columns})"))
+            conn.execute(text("RESET lock_timeout"))
+
+        # 2. The swap, in one short transaction
+        with engine.begin() as conn:
+            conn.execute(text("SET LOCAL lock_timeout = '10s'"))
+            conn.execute(text(f"LOCK TABLE {PARENT_TABLE} IN ACCESS EXCLUSIVE MODE"))
+            sequence = conn.execute(text(f"SELECT pg_get_serial_sequence('{PARENT_TABLE}', 'notification_id')")).scalar()
+            indexes = conn.execute(text(
+                "SELECT idx.relname, coalesce(con.contype = 'p', false) FROM pg_index "
+                "JOIN pg_class idx ON idx.oid = pg_index.indexrelid "
+                "LEFT JOIN pg_constraint con ON con.conindid = pg_index.indexrelid AND con.conrelid = pg_index.indrelid "
+                "WHERE pg_index.indrelid = to_regclass(:name)"
+            ), {"name": PARENT_TABLE}).all()
+            foreign_keys = conn.execute(text(
+                "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE conrelid = to_regclass(:name) AND contype = 'f'"
+            ), {"name": PARENT_TABLE}).all()
+
+            conn.execute(text(f"ALTER TABLE {PARENT_TABLE} RENAME TO {LEGACY_PARTITION}"))
+            # Free the index names for the partitioned table's own indexes
+            old_primary_key = None
+            for name, is_primary_key in indexes:
+                if name.startswith("notifications_legacy_"):
+                    continue
+                renamed = f"{name[:55]}_legacy"
+                conn.execute(text(f'ALTER INDEX "{name}" RENAME TO "{renamed}"'))
+                if is_primary_key:
+                    old_primary_key = renamed
+            conn.execute(text(f"ALTER TABLE {LEGACY_PARTITION} ALTER COLUMN created_at SET NOT NULL"))
+            if old_primary_key:
+                conn.execute(text(f'ALTER TABLE {LEGACY_PARTITION} DROP CONSTRAINT "{old_primary_key}"'))
+            conn.execute(text(
+                f"ALTER TABLE {LEGACY_PARTITION} ADD CONSTRAINT notifications_legacy_pkey "
+                "PRIMARY KEY USING INDEX notifications_legacy_id_created_at"
+            ))
+
+            conn.execute(text(f"CREATE TABLE {PARENT_TABLE} (LIKE {LEGACY_PARTITION} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)"))
+            conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ADD CONSTRAINT notifications_pkey PRIMARY KEY (notification_id, created_at)"))
+            for name, definition in foreign_keys:
+                conn.execute(text(f'ALTER TABLE {PARENT_TABLE} ADD CONSTRAINT "{name}" {definition}'))
+            for index in Notification.__table__.indexes:
+                columns = [col.name for col in index.columns]
+                conn.execute(text(
+                    f"CREATE {'UNIQUE ' if index.unique else ''}INDEX {index.name} ON {PARENT_TABLE} ({', '.join(columns)})"
+                ))
+            if sequence:
+                conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {PARENT_TABLE}.notification_id"))
+
+            # Matching indexes and foreign keys of the old table are adopted, not rebuilt
+            conn.execute(text(
+                f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {LEGACY_PARTITION} "
+                f"FOR VALUES FROM (MINVALUE) TO ('{boundary:%Y-%m-%d}')"
+            ))
+            conn.execute(text(f"ALTER TABLE {LEGACY_PARTITION} DROP CONSTRAINT {PARTITION_BOUND_CHECK}"))
+
+        print(f"✅ {PARENT_TABLE} partitioned by month (existing rows kept in {LEGACY_PARTITION})")
+        NotificationRetentionRepository.ensure_partitions(engine)
+        return True
+
+    @staticmethod
+    def detach_partition(db: Session, name: str) -> None:
+        """Detach a partition in its own short transaction; its rows stop being visible at once. Commits."""
+        db.execute(text("SET LOCAL lock_timeout = '5s'"))
+        db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        db.commit()
+
+    @staticmethod
+    def drop_detached_partition(db: Session, name: str, archive: Optional[NotificationArchiveWriter] = None) -> int:
+        """
+        Take a detached partition's rows off the users' counters, archive them if
+        asked, and drop it, in one transaction; returns how many rows it held.
+        Nothing writes to a detached table, so the counts cannot move meanwhile.
+        """
+        partition = sql_table(name, column("user_id"), column("is_read"))
+        rows = db.execute(
+            select(
+                partition.c.user_id,
+                func.coalesce(func.sum(case((partition.c.is_read == False, 1), else_=0)), 0),
+                func.count()
+            ).group_by(partition.c.user_id)
+        ).all()
+        NotificationCounterRepository.apply_deltas(
+            db, {user_id: (-int(unread), -int(total)) for user_id, unread, total in rows}
+        )
+        if archive is not None:
+            rows_to_archive = select(text("*")).select_from(sql_table(name)).execution_options(yield_per=NOTIFICATION_PURGE_BATCH)
+            for chunk in db.execute(rows_to_archive).partitions():
+                archive.write(chunk)
+            archive.sync()
+        db.execute(text(f"DROP TABLE {name}"))
+        db.commit()
+        return sum(int(total) for _, _, total in rows)
+
+    # ===== CHUNKED DELETES =====
+
+    @staticmethod
+    def delete_chunk(
+        db: Session,
+        cutoff: datetime,
+        batch_size: int = NOTIFICATION_PURGE_BATCH,
+        archive: Optional[NotificationArchiveWriter] = None,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> Tuple[int, Optional[Tuple[datetime, int]]]:
+        """
+        Delete the next batch_size notifications created before cutoff, in
+        (created_at, notification_id) order after the key after, and take them
+        off the users' counters; commits. Returns how many went and the key to
+        continue after.
+
+        The chunk is a key range on ix_notifications_created_at, bounded by its
+        batch_size-th row, so neither the lookup nor the DELETE scans beyond it
+        (or over the index entries earlier chunks left dead), and broadcasts
+        sharing one created_at still split into chunks. DELETE ... RETURNING
+        reports exactly what went, so the counters stay exact under concurrent writes.
+        """
+        table = Notification.__table__
+        key = tuple_(table.c.created_at, table.c.notification_id)
+        window = [table.c.created_at < cutoff]
+        if after is not None:
+            window.append(key > tuple_(literal(after[0], table.c.created_at.type), literal(after[1])))
+        last = db.execute(
+            select(table.c.created_at, table.c.notification_id).where(*window)
+            .order_by(table.c.created_at, table.c.notification_id).offset(batch_size - 1).limit(1)
+        ).first()
+        if last is not None:
+            window.append(key <= tuple_(literal(last.created_at, table.c.created_at.type), literal(last.notification_id)))
+
+        returned = table.c if archive is not None else (table.c.user_id, table.c.is_read)
+        rows = db.execute(delete(table).where(*window).returning(*returned)).all()
+        if not rows:
+            db.rollback()
+            return 0, after
+
+        if archive is not None:
+            archive.write(rows)
+            archive.sync()
+        # Counter rows are shared with live writers: lock them last, in user order
+        deltas: Dict[int, Any] = {}
+        for row in sorted(rows, key=lambda row: row.user_id):
+            unread, total = deltas.get(row.user_id, (0, 0))
+            deltas[row.user_id] = (unread - (0 if row.is_read else 1), total - 1)
+        NotificationCounterRepository.apply_deltas(db, deltas)
+        db.commit()
+        return len(rows), (last.created_at, last.notification_id) if last is not None else None
+
+    # ===== PURGE =====
+
+    @staticmethod
+    def purge_expired(
+        db: Session,
+        cutoff: datetime,
+        archive: bool = False,
+        batch_size: int = NOTIFICATION_PURGE_BATCH,
+        pause_ms: int = NOTIFICATION_PURGE_PAUSE_MS,
+        max_seconds: float = NOTIFICATION_PURGE_MAX_SECONDS
+    ) -> Dict[str, Any]:
+        """
+        Remove notifications created before cutoff: whole partitions that end by
+        the cutoff are dropped, the rest is deleted in chunks of batch_size with
+        pause_ms between them. Stops early (complete False) after max_seconds.
+        Returns a summary with rows purged per second.
+        """
+        started = time.perf_counter()
+        writer = NotificationArchiveWriter(NOTIFICATION_ARCHIVE_DIR, cutoff) if archive else None
+        summary: Dict[str, Any] = {
+            "cutoff": cutoff.isoformat(),
+            "deleted_count": 0,
+            "partitions_dropped": [],
+            "chunks": 0,
+            "complete": True
+        }
+        try:
+            if NotificationRetentionRepository.is_partitioned(db):
+                # Finish partitions an interrupted run detached, then the expired ones
+                expired = NotificationRetentionRepository.get_detached_partitions(db)
+                for partition in NotificationRetentionRepository.get_partitions(db):
+                    if partition["upper"] is not None and partition["upper"] <= cutoff:
+                        NotificationRetentionRepository.detach_partition(db, partition["name"])
+                        expired.append(partition["name"])
+                for name in expired:
+                    summary["deleted_count"] += NotificationRetentionRepository.drop_detached_partition(db, name, writer)
+                    summary["partitions_dropped"].append(name)
+
+            after = None
+            while True:
+                if max_seconds and time.perf_counter() - started > max_seconds:
+                    summary["complete"] = False
+                    break
+                deleted, after = NotificationRetentionRepository.delete_chunk(db, cutoff, batch_size, writer, after)
+                summary["deleted_count"] += deleted
+                if deleted:
+                    summary["chunks"] += 1
+                if not deleted or after is None:
+                    break
+                if pause_ms:
+                    time.sleep(pause_ms / 1000)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            summary["archive_file"] = writer.close() if writer is not None else None
+            elapsed = time.perf_counter() - started
+            summary["elapsed_seconds"] = round(elapsed, 3)
+            summary["rows_per_second"] = round(summary["deleted_count"] / elapsed, 1) if elapsed else 0.0
+            retention_metrics.record(summary)
+        return summary
+
+
+# ===== SCHEDULED JOB =====
+
+_local_lock = threading.Lock()
+
+
+@contextmanager
+def retention_lock() -> Iterator[bool]:
+    """Yields whether this caller may purge: one run at a time per process, and on
+    PostgreSQL across processes through an advisory lock"""
+    if not _local_lock.acquire(blocking=False):
+        yield False
+        return
+    try:
+        if engine.dialect.name != "postgresql":
+            yield True
+            return
+        with engine.connect() as conn:
+            acquired = conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": RETENTION_LOCK_ID}).scalar()
+            conn.commit()
+            try:
+                yield bool(acquired)
+            finally:
+                if acquired:
+                    conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": RETENTION_LOCK_ID})
+                    conn.commit()
+    finally:
+        _local_lock.release()
+
+
+def purge_notifications(days: int, archive: bool = NOTIFICATION_ARCHIVE_ON_PURGE, **options) -> Optional[Dict[str, Any]]:
+    """Purge notifications older than days in a session of its own; None when another run holds the lock"""
+    with retention_lock() as acquired:
+        if not acquired:
+            return None
+        db = SessionLocal()
+        try:
+            summary = NotificationRetentionRepository.purge_expired(
+                db, datetime.now() - timedelta(days=days), archive=archive, **options
+            )
+        finally:
+            db.close()
+    if summary["deleted_count"]:
+        print(
+            f"✅ Notification retention: {summary['deleted_count']} purged "
+            f"({len(summary['partitions_dropped'])} partitions dropped, {summary['rows_per_second']} rows/s)"
+        )
+    return summary
+
+
+def run_notification_retention() -> int:
+    """Scheduled entry point: keep partitions ahead of time, then apply NOTIFICATION_RETENTION_DAYS"""
+    NotificationRetentionRepository.ensure_partitions(engine)
+    if NOTIFICATION_RETENTION_DAYS <= 0:
+        return 0
+    summary = purge_notifications(NOTIFICATION_RETENTION_DAYS)
+    return summary["deleted_count"] if summary else 0
+
+
+retention_scheduler = PeriodicFlusher(
+    run_notification_retention,
+    interval=NOTIFICATION_RETENTION_SECONDS,
+    name="notification-retention"
+)
+
+
+def start_retention_scheduler() -> None:
+    """Run the retention job now in the background, then every NOTIFICATION_RETENTION_SECONDS"""
+    threading.Thread(target=run_notification_retention, name="notification-retention-start", daemon=True).start()
+    retention_scheduler.ensure_started()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Notification partitioning and retention")
+    parser.add_argument("--partition", action="store_true", help="convert notifications to monthly partitions")
+    parser.add_argument("--days", type=int, default=NOTIFICATION_RETENTION_DAYS, help="purge notifications older than this many days")
+    parser.add_argument("--archive", action="store_true", default=NOTIFICATION_ARCHIVE_ON_PURGE, help="write purged rows to NOTIFICATION_ARCHIVE_DIR")
+    args = parser.parse_args()
+
+    if args.partition:
+        NotificationRetentionRepository.partition_table(engine)
+    NotificationRetentionRepository.ensure_partitions(engine)
+    if args.days > 0:
+        result = purge_notifications(args.days, archive=args.archive)
+        print(json.dumps(result, indent=2) if result else "⚠️ Another retention run is in progress")
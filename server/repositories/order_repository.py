@@ -11,7 +11,9 @@ from models.product_catalog.product import Product
 from schemas.order_schema import OrderCreate
 from datetime import datetime
 from decimal import Decimal
+from operator import attrgetter
 from typing import Dict, Any, List, Optional
+from utils.pagination import Paginator, split_page
 import math
 
 class OrderRepository:
@@ -74,13 +76,22 @@ class OrderRepository:
         return order
     
     @staticmethod
-    def get_all_orders(db: Session, page: int = 1, per_page: int = 20, status: Optional[str] = None) -> Dict[str, Any]:
-        """Get all orders"""
+    def get_all_orders(
+        db: Session,
+        page: int = 1,
+        per_page: int = 20,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get all orders (page/offset mode, or keyset mode when a cursor is given)"""
         query = db.query(Order)
         
         if status:
             query = query.filter(Order.order_status == status)
         
+        if cursor:
+            return OrderRepository._cursor_page(query, per_page, cursor)
+        
         total = query.count()
         total_pages = math.ceil(total / per_page) if per_page > 0 else 0
         
@@ -88,16 +99,19 @@ class OrderRepository:
             return {
                 "orders": [],
                 "total_orders": 0,
-                "total_pages": total_pages
+                "total_pages": total_pages,
+                "next_cursor": None
             }
         
         offset = (page - 1) * per_page
-        orders = query.order_by(Order.placed_at.desc()).offset(offset).limit(per_page).all()
+        orders = query.order_by(Order.placed_at.desc(), Order.order_id.desc()).offset(offset).limit(per_page + 1).all()
+        orders, next_cursor = split_page(orders, per_page, attrgetter("placed_at", "order_id"))
         
         return {
             "orders": orders,
             "total_orders": total,
-            "total_pages": total_pages
+            "total_pages": total_pages,
+            "next_cursor": next_cursor
         }
     
     @staticmethod
@@ -117,12 +131,19 @@ class OrderRepository:
         return return_product
 
     @staticmethod
-    def get_orders_by_user_id(db: Session, user_id: int, page: int = 1, per_page: int = 20) -> Dict[str, Any]:
-        """Get orders for a specific user"""
-        import math
-        
+    def get_orders_by_user_id(
+        db: Session,
+        user_id: int,
+        page: int = 1,
+        per_page: int = 20,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get orders for a specific user (keyset mode when a cursor is given)"""
         query = db.query(Order).filter(Order.user_id == user_id)
         
+        if cursor:
+            return OrderRepository._cursor_page(query, per_page, cursor)
+        
         total = query.count()
         total_pages = math.ceil(total / per_page) if per_page > 0 else 0
         
@@ -130,14 +151,29 @@ class OrderRepository:
             return {
                 "orders": [],
                 "total_orders": 0,
-                "total_pages": total_pages
+                "total_pages": total_pages,
+                "next_cursor": None
             }
         
         offset = (page - 1) * per_page
-        orders = query.order_by(Order.placed_at.desc()).offset(offset).limit(per_page).all()
+        orders = query.order_by(Order.placed_at.desc(), Order.order_id.desc()).offset(offset).limit(per_page + 1).all()
+        orders, next_cursor = split_page(orders, per_page, attrgetter("placed_at", "order_id"))
         
         return {
             "orders": orders,
             "total_orders": total,
-            "total_pages": total_pages
-        }
\ No newline at end of file
+            "total_pages": total_pages,
+            "next_cursor": next_cursor
+        }
+
+    @staticmethod
+    def _cursor_page(query, per_page: int, cursor: str) -> Dict[str, Any]:
+        """Keyset page of orders, newest first, without counting the full result set"""
+        result = Paginator(query, per_page=per_page).cursor_paginate(Order.placed_at, Order.order_id, cursor)
+        
+        return {
+            "orders": result["items"],
+            "total_orders": result["total"],
+            "total_pages": None,
+            "next_cursor": result["next_cursor"]
+        }
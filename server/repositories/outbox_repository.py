@@ -0,0 +1,466 @@
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, delete, event, func, insert, literal, select, update, Integer, String, TIMESTAMP
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, List, Optional
+
+from config.database import SessionLocal
+from models.notification import Notification
+from models.order.order import Order
+from models.outbox import OutboxJob
+from models.user import User
+from utils.location_buffer import PeriodicFlusher
+from utils.mail_transport import OutgoingEmail, get_transport
+from utils.outbox_worker import OutboxMetrics, OutboxWorkerPool, OUTBOX_BATCH_SIZE
+
+# Send an email for each notification created through the notification services
+NOTIFICATION_EMAILS_ENABLED = os.getenv("NOTIFICATION_EMAILS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Attempts before a job is dead-lettered; retry n waits BASE * 2^(n-1) seconds (+-20%), at most MAX
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "6"))
+OUTBOX_BACKOFF_BASE = float(os.getenv("OUTBOX_BACKOFF_BASE", "30"))
+OUTBOX_BACKOFF_MAX = float(os.getenv("OUTBOX_BACKOFF_MAX", "3600"))
+# A job PROCESSING for longer than this belongs to a worker that died; it is handed out again
+OUTBOX_LOCK_TIMEOUT = int(os.getenv("OUTBOX_LOCK_TIMEOUT", "300"))
+# Seconds between maintenance passes, and days SENT jobs are kept
+OUTBOX_MAINTENANCE_SECONDS = float(os.getenv("OUTBOX_MAINTENANCE_SECONDS", "60"))
+OUTBOX_SENT_RETENTION_DAYS = int(os.getenv("OUTBOX_SENT_RETENTION_DAYS", "7"))
+OUTBOX_PURGE_BATCH = int(os.getenv("OUTBOX_PURGE_BATCH", "5000"))
+
+OUTBOX_PENDING = "PENDING"
+OUTBOX_PROCESSING = "PROCESSING"
+OUTBOX_SENT = "SENT"
+OUTBOX_DEAD = "DEAD"
+
+JOB_EMAIL = "email"
+JOB_NOTIFICATION_EMAIL = "notification_email"
+JOB_ORDER_CONFIRMATION_EMAIL = "order_confirmation_email"
+
+
+class ClaimedJob:
+    """A job a worker holds, detached from any session"""
+
+    __slots__ = ("job_id", "kind", "reference_id", "payload", "attempts", "max_attempts")
+
+    def __init__(self, job_id: int, kind: str, reference_id: Optional[int], payload: Optional[dict], attempts: int, max_attempts: int):
+        self.job_id = job_id
+        self.kind = kind
+        self.reference_id = reference_id
+        self.payload = payload
+        self.attempts = attempts
+        self.max_attempts = max_attempts
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before the next try of a job that failed its attempts-th try"""
+    delay = OUTBOX_BACKOFF_BASE * (2 ** max(0, attempts - 1)) * random.uniform(0.8, 1.2)
+    return min(OUTBOX_BACKOFF_MAX, delay)
+
+
+class OutboxRepository:
+
+    @staticmethod
+    def enqueue(
+        db: Session,
+        kind: str,
+        reference_id: Optional[int] = None,
+        payload: Optional[Dict[str, Any]] = None,
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS
+    ) -> None:
+        """Add a job to db's transaction (no commit); workers see it once the caller commits"""
+        OutboxRepository.enqueue_many(db, kind, [reference_id], payload, max_attempts)
+
+    @staticmethod
+    def enqueue_many(
+        db: Session,
+        kind: str,
+        reference_ids: List[Optional[int]],
+        payload: Optional[Dict[str, Any]] = None,
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS
+    ) -> int:
+        """One job of kind per reference id, in one executemany INSERT (no commit)"""
+        if not reference_ids:
+            return 0
+        now = datetime.now()
+        db.execute(insert(OutboxJob.__table__), [
+            {
+                "kind": kind,
+                "reference_id": reference_id,
+                "payload": payload,
+                "status": OUTBOX_PENDING,
+                "attempts": 0,
+                "max_attempts": max_attempts,
+                "available_at": now
+            }
+            for reference_id in reference_ids
+        ])
+        _stage_wake(db)
+        return len(reference_ids)
+
+    @staticmethod
+    def enqueue_select(db: Session, kind: str, reference_ids, max_attempts: int = OUTBOX_MAX_ATTEMPTS) -> int:
+        """One job of kind per row of reference_ids (a one-column select), in one INSERT ... SELECT (no commit)"""
+        statement = insert(OutboxJob.__table__).from_select(
+            ["kind", "reference_id", "status", "attempts", "max_attempts", "available_at"],
+            select(
+                literal(kind, String),
+                reference_ids.subquery().c[0],
+                literal(OUTBOX_PENDING, String),
+                literal(0, Integer),
+                literal(max_attempts, Integer),
+                literal(datetime.now(), TIMESTAMP)
+            )
+        )
+        count = db.execute(statement).rowcount
+        if count:
+            _stage_wake(db)
+        return count
+
+    @staticmethod
+    def enqueue_email(db: Session, to_email: str, subject: str, body: str) -> None:
+        """Queue a plain email (no commit)"""
+        OutboxRepository.enqueue(db, JOB_EMAIL, payload={"to": to_email, "subject": subject, "body": body})
+
+    @staticmethod
+    def claim_batch(db: Session, worker: str, limit: int = OUTBOX_BATCH_SIZE) -> List[ClaimedJob]:
+        """
+        Take up to limit due PENDING jobs for worker and mark them PROCESSING; commits.
+
+        Rows other workers are claiming are skipped rather than waited on
+        (FOR UPDATE SKIP LOCKED), so any number of workers can poll at once. The
+        UPDATE only takes rows still PENDING, so databases without SKIP LOCKED
+        (SQLite in development) never hand a job to two workers either.
+        """
+        table = OutboxJob.__table__
+        now = datetime.now()
+        job_ids = db.execute(
+            select(table.c.job_id)
+            .where(table.c.status == OUTBOX_PENDING, table.c.available_at <= now)
+            .order_by(table.c.available_at, table.c.job_id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not job_ids:
+            db.rollback()
+            return []
+
+        rows = db.execute(
+            update(table)
+            .where(table.c.job_id.in_(job_ids), table.c.status == OUTBOX_PENDING)
+            .values(status=OUTBOX_PROCESSING, locked_at=now, locked_by=worker, attempts=table.c.attempts + 1)
+            .returning(table.c.job_id, table.c.kind, table.c.reference_id, table.c.payload, table.c.attempts, table.c.max_attempts)
+        ).all()
+        db.commit()
+        return [
+            ClaimedJob(row.job_id, row.kind, row.reference_id, row.payload, row.attempts, row.max_attempts)
+            for row in sorted(rows, key=lambda row: row.job_id)
+        ]
+
+    @staticmethod
+    def complete(db: Session, worker: str, jobs: List[ClaimedJob], errors: Dict[int, Optional[str]]) -> Dict[str, int]:
+        """
+        Record the outcome of a claimed batch; commits. errors maps job id to an
+        error message, or None when the job succeeded.
+
+        Failed jobs go back to PENDING after a backoff, or to DEAD once they used
+        their attempts. Jobs no longer held by worker (requeued as stale) are left alone.
+        """
+        table = OutboxJob.__table__
+        now = datetime.now()
+        held = (table.c.status == OUTBOX_PROCESSING, table.c.locked_by == worker)
+
+        sent_ids = [job.job_id for job in jobs if errors.get(job.job_id) is None]
+        failed = [job for job in jobs if errors.get(job.job_id) is not None]
+        if sent_ids:
+            db.execute(update(table).where(table.c.job_id.in_(sent_ids), *held).values(
+                status=OUTBOX_SENT, processed_at=now, locked_at=None, locked_by=None, last_error=None
+            ))
+
+        dead = 0
+        if failed:
+            rows = []
+            for job in failed:
+                is_dead = job.attempts >= job.max_attempts
+                dead += is_dead
+                rows.append({
+                    "b_job_id": job.job_id,
+                    "b_status": OUTBOX_DEAD if is_dead else OUTBOX_PENDING,
+                    "b_available_at": now if is_dead else now + timedelta(seconds=backoff_seconds(job.attempts)),
+                    "b_processed_at": now if is_dead else None,
+                    "b_last_error": errors[job.job_id][:2000]
+                })
+            db.execute(
+                update(table).where(table.c.job_id == bindparam("b_job_id"), *held).values(
+                    status=bindparam("b_status"),
+                    available_at=bindparam("b_available_at"),
+                    processed_at=bindparam("b_processed_at"),
+                    last_error=bindparam("b_last_error"),
+                    locked_at=None,
+                    locked_by=None
+                ),
+                rows
+            )
+        db.commit()
+        return {"sent": len(sent_ids), "retried": len(failed) - dead, "dead": dead}
+
+    @staticmethod
+    def requeue_stale(db: Session, timeout: int = OUTBOX_LOCK_TIMEOUT) -> int:
+        """Release jobs held longer than timeout seconds (their worker died); dead-letter those out of attempts. Commits."""
+        table = OutboxJob.__table__
+        now = datetime.now()
+        stale = (table.c.status == OUTBOX_PROCESSING, table.c.locked_at < now - timedelta(seconds=timeout))
+        released = db.execute(update(table).where(*stale, table.c.attempts >= table.c.max_attempts).values(
+            status=OUTBOX_DEAD, processed_at=now, locked_at=None, locked_by=None, last_error="Worker lock expired"
+        )).rowcount
+        released += db.execute(update(table).where(*stale).values(
+            status=OUTBOX_PENDING, available_at=now, locked_at=None, locked_by=None, last_error="Worker lock expired"
+        )).rowcount
+        db.commit()
+        return released
+
+    @staticmethod
+    def purge_sent(db: Session, days: int = OUTBOX_SENT_RETENTION_DAYS, batch_size: int = OUTBOX_PURGE_BATCH) -> int:
+        """Delete up to batch_size SENT jobs processed more than days ago; commits"""
+        table = OutboxJob.__table__
+        job_ids = db.execute(
+            select(table.c.job_id).where(
+                table.c.status == OUTBOX_SENT,
+                table.c.processed_at < datetime.now() - timedelta(days=days)
+            ).order_by(table.c.job_id).limit(batch_size)
+        ).scalars().all()
+        if job_ids:
+            db.execute(delete(table).where(table.c.job_id.in_(job_ids)))
+        db.commit()
+        return len(job_ids)
+
+    @staticmethod
+    def get_queue_stats(db: Session) -> Dict[str, Any]:
+        """Jobs per status and how late the oldest due job is"""
+        counts = dict(db.query(OutboxJob.status, func.count(OutboxJob.job_id)).group_by(OutboxJob.status).all())
+        oldest_due = db.query(func.min(OutboxJob.available_at)).filter(
+            OutboxJob.status == OUTBOX_PENDING,
+            OutboxJob.available_at <= datetime.now()
+        ).scalar()
+        return {
+            "by_status": {status: counts.get(status, 0) for status in (OUTBOX_PENDING, OUTBOX_PROCESSING, OUTBOX_SENT, OUTBOX_DEAD)},
+            "oldest_due_lag_seconds": round((datetime.now() - oldest_due).total_seconds(), 1) if oldest_due else 0
+        }
+
+    @staticmethod
+    def get_dead_jobs(db: Session, kind: Optional[str] = None, limit: int = 100) -> List[OutboxJob]:
+        query = db.query(OutboxJob).filter(OutboxJob.status == OUTBOX_DEAD)
+        if kind:
+            query = query.filter(OutboxJob.kind == kind)
+        return query.order_by(OutboxJob.job_id.desc()).limit(limit).all()
+
+    @staticmethod
+    def retry_dead(db: Session, job_ids: Optional[List[int]] = None, kind: Optional[str] = None) -> int:
+        """Put dead jobs (all, or the given ids / kind) back in the queue with fresh attempts; commits"""
+        query = db.query(OutboxJob).filter(OutboxJob.status == OUTBOX_DEAD)
+        if job_ids:
+            query = query.filter(OutboxJob.job_id.in_(job_ids))
+        if kind:
+            query = query.filter(OutboxJob.kind == kind)
+        count = query.update({
+            "status": OUTBOX_PENDING,
+            "attempts": 0,
+            "available_at": datetime.now(),
+            "processed_at": None
+        }, synchronize_session=False)
+        if count:
+            _stage_wake(db)
+        db.commit()
+        return count
+
+
+# ===== EMAIL HANDLERS =====
+# Each builder turns a batch of jobs of its kind into emails with one query;
+# a job mapped to None has nothing to send (its row is gone) and counts as done.
+
+EmailBuilder = Callable[[Session, List[ClaimedJob]], Dict[int, Optional[OutgoingEmail]]]
+JobHandler = Callable[[Session, List[ClaimedJob]], Dict[int, Optional[str]]]
+
+
+def _build_plain_emails(db: Session, jobs: List[ClaimedJob]) -> Dict[int, Optional[OutgoingEmail]]:
+    return {
+        job.job_id: OutgoingEmail(job.payload["to"], job.payload["subject"], job.payload["body"])
+        for job in jobs
+    }
+
+
+def _build_notification_emails(db: Session, jobs: List[ClaimedJob]) -> Dict[int, Optional[OutgoingEmail]]:
+    rows = db.query(Notification.notification_id, Notification.title, Notification.message, User.email).join(
+        User, User.user_id == Notification.user_id
+    ).filter(Notification.notification_id.in_({job.reference_id for job in jobs})).all()
+    by_id = {row.notification_id: row for row in rows}
+
+    emails = {}
+    for job in jobs:
+        row = by_id.get(job.reference_id)
+        emails[job.job_id] = OutgoingEmail(row.email, row.title, row.message) if row and row.email else None
+    return emails
+
+
+def _build_order_confirmation_emails(db: Session, jobs: List[ClaimedJob]) -> Dict[int, Optional[OutgoingEmail]]:
+    rows = db.query(Order.order_id, Order.total_amount, User.email, User.first_name).join(
+        User, User.user_id == Order.user_id
+    ).filter(Order.order_id.in_({job.reference_id for job in jobs})).all()
+    by_id = {row.order_id: row for row in rows}
+
+    emails = {}
+    for job in jobs:
+        row = by_id.get(job.reference_id)
+        if row is None or not row.email:
+            emails[job.job_id] = None
+            continue
+        emails[job.job_id] = OutgoingEmail(
+            row.email,
+            f"Your order #{row.order_id} is confirmed",
+            f"Hi {row.first_name},\n\nWe received your order #{row.order_id} "
+            f"for a total of {row.total_amount}. We will let you know when it is on its way.\n\nNexora"
+        )
+    return emails
+
+
+def email_handler(builder: EmailBuilder) -> JobHandler:
+    """Handler that builds a batch's emails and hands them to the transport in one call"""
+    def handle(db: Session, jobs: List[ClaimedJob]) -> Dict[int, Optional[str]]:
+        emails = builder(db, jobs)
+        to_send = [(job_id, email) for job_id, email in emails.items() if email is not None]
+        errors: Dict[int, Optional[str]] = {job_id: None for job_id in emails}
+        if to_send:
+            results = get_transport().send_batch([email for _, email in to_send])
+            for (job_id, _), error in zip(to_send, results):
+                errors[job_id] = error
+        return errors
+    return handle
+
+
+OUTBOX_HANDLERS: Dict[str, JobHandler] = {
+    JOB_EMAIL: email_handler(_build_plain_emails),
+    JOB_NOTIFICATION_EMAIL: email_handler(_build_notification_emails),
+    JOB_ORDER_CONFIRMATION_EMAIL: email_handler(_build_order_confirmation_emails),
+}
+
+
+def register_outbox_handler(kind: str, handler: JobHandler) -> None:
+    """Run jobs of kind with handler(db, jobs) -> {job_id: error or None}"""
+    OUTBOX_HANDLERS[kind] = handler
+
+
+# ===== WORKERS =====
+
+outbox_metrics = OutboxMetrics()
+
+
+def process_outbox_batch(worker: str, batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """Claim one batch, run it kind by kind and record the outcome; returns how many jobs were claimed"""
+    db = SessionLocal()
+    try:
+        jobs = OutboxRepository.claim_batch(db, worker, batch_size)
+        if not jobs:
+            return 0
+        started = time.perf_counter()
+
+        by_kind: Dict[str, List[ClaimedJob]] = {}
+        for job in jobs:
+            by_kind.setdefault(job.kind, []).append(job)
+
+        errors: Dict[int, Optional[str]] = {}
+        for kind, kind_jobs in by_kind.items():
+            handler = OUTBOX_HANDLERS.get(kind)
+            if handler is None:
+                errors.update({job.job_id: f"No handler for job kind {kind}" for job in kind_jobs})
+                continue
+            try:
+                errors.update(handler(db, kind_jobs))
+            except Exception as e:
+                db.rollback()
+                outbox_metrics.record_error()
+                errors.update({job.job_id: f"{type(e).__name__}: {e}" for job in kind_jobs})
+            db.rollback()  # end the handler's read transaction
+
+        outcome = OutboxRepository.complete(db, worker, jobs, errors)
+        outbox_metrics.record_batch(
+            len(jobs), outcome["sent"], outcome["retried"], outcome["dead"],
+            (time.perf_counter() - started) * 1000
+        )
+        if outcome["dead"]:
+            print(f"❌ Outbox: {outcome['dead']} jobs dead-lettered")
+        return len(jobs)
+    finally:
+        db.close()
+
+
+def drain_outbox(worker: str = "drain", batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """Process due jobs on the calling thread until none are left; returns how many were processed"""
+    processed = 0
+    while True:
+        claimed = process_outbox_batch(worker, batch_size)
+        if not claimed:
+            return processed
+        processed += claimed
+
+
+def run_outbox_maintenance() -> int:
+    """Release stale locks and purge old SENT jobs; returns how many rows were touched"""
+    db = SessionLocal()
+    try:
+        touched = OutboxRepository.requeue_stale(db) + OutboxRepository.purge_sent(db)
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️ Outbox maintenance failed: {e}")
+        return 0
+    finally:
+        db.close()
+    if touched:
+        outbox_pool.wake()
+    return touched
+
+
+outbox_pool = OutboxWorkerPool(process_outbox_batch, name="outbox")
+outbox_maintenance = PeriodicFlusher(run_outbox_maintenance, interval=OUTBOX_MAINTENANCE_SECONDS, name="outbox-maintenance")
+
+
+def start_outbox_workers() -> None:
+    """Start the worker pool and the maintenance thread; jobs left from before a restart are picked up at once"""
+    outbox_pool.ensure_started()
+    outbox_maintenance.ensure_started()
+    outbox_pool.wake()
+
+
+def stop_outbox_workers() -> None:
+    outbox_maintenance.stop(final_flush=False)
+    outbox_pool.stop()
+
+
+# ===== WAKE ON COMMIT =====
+# Enqueueing marks the session; when its transaction commits the workers are
+# woken instead of waiting for their next poll.
+
+_ENQUEUED_KEY = "outbox_enqueued"
+
+
+def _stage_wake(db: Session) -> None:
+    db.info[_ENQUEUED_KEY] = True
+
+
+def _wake_workers(session: Session) -> None:
+    if session.info.pop(_ENQUEUED_KEY, False):
+        outbox_pool.wake()
+
+
+def _discard_wake(session: Session, previous_transaction) -> None:
+    if not previous_transaction.nested:
+        session.info.pop(_ENQUEUED_KEY, None)
+
+
+def register_outbox_listeners() -> None:
+    """Wake the outbox workers when a transaction that enqueued jobs commits"""
+    for name, listener in (
+        ("after_commit", _wake_workers),
+        ("after_soft_rollback", _discard_wake),
+    ):
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
@@ -139,4 +139,69 @@ class ProductRepository:
             ProductVariant.is_default == True
         ).all()
         
-        return {v.product_id: v for v in variants}
\ No newline at end of file
+        return {v.product_id: v for v in variants}
+
+    # ==================== BATCHED LISTING LOOKUPS ====================
+    # Used by ProductService listing endpoints so that building a page costs a
+    # fixed number of queries regardless of how many products are on it.
+
+    @staticmethod
+    def get_listing_variants(
+        db: Session,
+        product_ids: List[int],
+        fallback_to_any: bool = True
+    ) -> Dict[int, ProductVariant]:
+        """Get the display variant for many products (default variant, else lowest variant_id)"""
+        if not product_ids:
+            return {}
+
+        variants = ProductRepository.get_products_with_default_variants(db, product_ids)
+
+        missing_ids = [pid for pid in product_ids if pid not in variants]
+        if fallback_to_any and missing_ids:
+            fallback_variants = db.query(ProductVariant).filter(
+                ProductVariant.product_id.in_(missing_ids)
+            ).order_by(asc(ProductVariant.product_id), asc(ProductVariant.variant_id)).all()
+
+            for variant in fallback_variants:
+                variants.setdefault(variant.product_id, variant)
+
+        return variants
+
+    @staticmethod
+    def get_images_for_variants(db: Session, variant_ids: List[int]) -> Dict[int, List[ProductImage]]:
+        """Get images for multiple variants grouped by variant_id"""
+        if not variant_ids:
+            return {}
+
+        images = db.query(ProductImage).filter(
+            ProductImage.variant_id.in_(variant_ids)
+        ).order_by(asc(ProductImage.variant_id), asc(ProductImage.image_id)).all()
+
+        grouped: Dict[int, List[ProductImage]] = {}
+        for image in images:
+            grouped.setdefault(image.variant_id, []).append(image)
+        return grouped
+
+    @staticmethod
+    def get_brands_by_ids(db: Session, brand_ids: List[int]) -> Dict[int, ProductBrand]:
+        """Get multiple brands keyed by brand_id"""
+        brand_ids = [bid for bid in set(brand_ids) if bid is not None]
+        if not brand_ids:
+            return {}
+
+        brands = db.query(ProductBrand).filter(ProductBrand.brand_id.in_(brand_ids)).all()
+        return {b.brand_id: b for b in brands}
+
+    @staticmethod
+    def get_category_lineage(db: Session, sub_category_ids: List[int]) -> Dict[int, tuple]:
+        """Get (SubCategory, Category) pairs keyed by sub_category_id in one joined query"""
+        sub_category_ids = [sid for sid in set(sub_category_ids) if sid is not None]
+        if not sub_category_ids:
+            return {}
+
+        rows = db.query(SubCategory, Category).outerjoin(
+            Category, Category.category_id == SubCategory.category_id
+        ).filter(SubCategory.sub_category_id.in_(sub_category_ids)).all()
+
+        return {sub.sub_category_id: (sub, cat) for sub, cat in rows}
@@ -0,0 +1,133 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, desc, literal_column, text
+from models.product_catalog.product import Product
+from models.analytics.search_history import SearchHistory
+from utils.search_index import tokenize
+from typing import Dict, List, Optional, Tuple
+
+# Text search configuration shared by the expression index and the queries that use it
+TS_CONFIG = literal_column("'english'::regconfig")
+
+# PostgreSQL DDL for the search indexes. The tsvector index is an expression index, so
+# PostgreSQL keeps it in sync on every product insert/update/delete by itself.
+SEARCH_INDEX_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_product_search_document ON product USING gin "
+    "(to_tsvector('english'::regconfig, coalesce(product_name, '') || ' ' || coalesce(description, '')))",
+    "CREATE INDEX IF NOT EXISTS ix_product_name_trgm ON product USING gin (product_name gin_trgm_ops)",
+]
+
+# Whether pg_trgm is installed, per database URL. Checked on first search and refreshed by
+# ensure_search_indexes; without it searches use full-text matching plus ILIKE on the name.
+_trigram_support: Dict[str, bool] = {}
+TRIGRAM_CHECK = "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"
+
+
+class ProductSearchRepository:
+
+    @staticmethod
+    def is_postgres(db: Session) -> bool:
+        """Full-text search needs PostgreSQL; other backends use the in-memory index"""
+        return db.get_bind().dialect.name == "postgresql"
+
+    @staticmethod
+    def ensure_search_indexes(engine) -> None:
+        """Create pg_trgm and the product search indexes (PostgreSQL only)"""
+        if engine.dialect.name != "postgresql":
+            return
+        for statement in SEARCH_INDEX_DDL:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text(statement))
+            except Exception as e:
+                print(f"⚠️ Search index setup failed ({statement.split(' ON ')[0]}): {e}")
+        with engine.connect() as conn:
+            _trigram_support[str(engine.url)] = conn.execute(text(TRIGRAM_CHECK)).first() is not None
+        if not _trigram_support[str(engine.url)]:
+            print("⚠️ pg_trgm is not installed: product search falls back to full-text matching without typo tolerance")
+
+    @staticmethod
+    def has_trigram(db: Session) -> bool:
+        """Whether similarity() and the % operator are available (pg_trgm installed)"""
+        bind = db.get_bind()
+        if bind.dialect.name != "postgresql":
+            return False
+        key = str(bind.engine.url)
+        if key not in _trigram_support:
+            _trigram_support[key] = db.execute(text(TRIGRAM_CHECK)).first() is not None
+        return _trigram_support[key]
+
+    @staticmethod
+    def search_document():
+        """tsvector over name + description; must match ix_product_search_document exactly"""
+        return func.to_tsvector(
+            TS_CONFIG,
+            func.coalesce(Product.product_name, literal_column("''"))
+            + literal_column("' '")
+            + func.coalesce(Product.description, literal_column("''"))
+        )
+
+    @staticmethod
+    def prefix_tsquery(term: str):
+        """AND of all tokens, the last one as a prefix (autocomplete-friendly)"""
+        tokens = tokenize(term)
+        if not tokens:
+            return None
+        parts = tokens[:-1] + [f"{tokens[-1]}:*"]
+        return func.to_tsquery(TS_CONFIG, " & ".join(parts))
+
+    @staticmethod
+    def build_match_clauses(term: str, trigram: bool = True) -> Optional[Tuple[object, object]]:
+        """(filter, rank) expressions for ranked full-text matching, with trigram typo
+        tolerance when pg_trgm is installed and a plain name ILIKE otherwise"""
+        tsquery = ProductSearchRepository.prefix_tsquery(term)
+        if tsquery is None:
+            return None
+
+        document = ProductSearchRepository.search_document()
+        if not trigram:
+            match_filter = or_(
+                document.op("@@")(tsquery),
+                Product.product_name.ilike(f"%{term}%")
+            )
+            return match_filter, func.ts_rank(document, tsquery)
+
+        match_filter = or_(
+            document.op("@@")(tsquery),
+            Product.product_name.op("%")(term)  # pg_trgm similarity above pg_trgm.similarity_threshold
+        )
+        rank = func.greatest(
+            func.ts_rank(document, tsquery),
+            func.similarity(Product.product_name, term)
+        )
+        return match_filter, rank
+
+    @staticmethod
+    def suggest_names(db: Session, term: str, limit: int = 10) -> List[str]:
+        """Best matching product names for autocomplete"""
+        clauses = ProductSearchRepository.build_match_clauses(term, ProductSearchRepository.has_trigram(db))
+        if clauses is None:
+            return []
+
+        match_filter, rank = clauses
+        rows = db.query(Product.product_name).filter(match_filter).order_by(
+            desc(rank), Product.product_name
+        ).limit(limit).all()
+        return [r[0] for r in rows]
+
+    @staticmethod
+    def get_search_documents(db: Session) -> List[Tuple[int, Optional[str], Optional[str]]]:
+        """(product_id, name, description) rows used to build the in-memory index"""
+        return db.query(Product.product_id, Product.product_name, Product.description).all()
+
+    @staticmethod
+    def record_search(db: Session, search_query: str, results_count: int, user_id: Optional[int] = None) -> SearchHistory:
+        """Store a search in search_history"""
+        entry = SearchHistory(
+            user_id=user_id,
+            search_query=search_query[:255],
+            results_count=results_count
+        )
+        db.add(entry)
+        db.commit()
+        return entry
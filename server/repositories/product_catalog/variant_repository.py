@@ -29,6 +29,14 @@ class VariantRepository:
         """Get product by ID"""
         return db.query(Product).filter(Product.product_id == product_id).first()
     
+    @staticmethod
+    def get_products_by_ids(db: Session, product_ids: List[int]) -> Dict[int, Product]:
+        """Products keyed by id, in one IN query"""
+        if not product_ids:
+            return {}
+        products = db.query(Product).filter(Product.product_id.in_(set(product_ids))).all()
+        return {product.product_id: product for product in products}
+    
     @staticmethod
     def get_variant_images(db: Session, variant_id: int) -> List[ProductImage]:
         """Get images for variant"""
@@ -0,0 +1,731 @@
+import os
+from sqlalchemy.orm import Session
+from sqlalchemy import event, func, case, distinct, insert, select, update, and_
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, date, timedelta
+from collections import defaultdict
+from itertools import chain
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from models.order.order import Order
+from models.order.order_item import OrderItem
+from models.order.order_return import OrderReturn
+from models.order.order_refund import OrderRefund
+from models.product_catalog.product import Product
+from models.product_catalog.product_variant import ProductVariant
+from models.product_catalog.sub_category import SubCategory
+from models.delivery.delivery import Delivery
+from models.delivery.delivery_earnings import DeliveryEarnings
+from models.inventory.purchase import Purchase
+from models.inventory.purchase_item import PurchaseItem
+from models.inventory.purchase_return import PurchaseReturn, PurchaseReturnItem
+from models.analytics.report_rollups import (
+    ReportRollupDay, DailySalesRollup, DailyVariantSalesRollup, DailyCategorySalesRollup,
+    DailyBrandSalesRollup, DailyDeliveryRollup, DailySupplierRollup
+)
+from utils.date_range import as_date, day_bounds
+
+# Rollup kinds; each is rebuilt as a unit for a day
+ROLLUP_SALES = "sales"
+ROLLUP_DELIVERY = "delivery"
+ROLLUP_SUPPLIER = "supplier"
+ROLLUP_KINDS = (ROLLUP_SALES, ROLLUP_DELIVERY, ROLLUP_SUPPLIER)
+
+# delivery_person_id used for deliveries nobody has accepted yet
+UNASSIGNED = 0
+
+# session.info key of the days a transaction marks stale once it commits
+_DEFERRED_DAYS_KEY = "rollup_days_after_commit"
+
+# A day stays open (read from raw rows, never marked dirty) until this many seconds
+# past midnight, so a transaction still writing it at midnight commits before anyone
+# builds its rollup
+ROLLUP_SETTLE_SECONDS = int(os.getenv("ROLLUP_SETTLE_SECONDS", "300"))
+
+# Measures folded with max() instead of sum() when combining days
+MAX_MEASURES = {"last_purchase_date"}
+
+# Columns whose changes move report numbers; other updates (tracking, notifications) are ignored
+WATCHED_COLUMNS = {
+    Order: ("order_status", "placed_at", "total_amount", "discount_amount"),
+    OrderItem: ("quantity", "price", "variant_id"),
+    OrderRefund: ("amount",),
+    Delivery: ("status", "assigned_at", "delivered_at", "delivery_person_id"),
+    DeliveryEarnings: ("amount", "earned_at", "delivery_person_id"),
+    Purchase: ("supplier_id", "total_cost", "purchase_date"),
+    PurchaseItem: ("quantity", "cost_per_unit"),
+    PurchaseReturn: ("purchase_id",),
+    PurchaseReturnItem: ("quantity",),
+}
+
+
+def contiguous_runs(days: Iterable[date]) -> List[Tuple[date, date]]:
+    """Collapse days into (first, last) runs of consecutive days"""
+    runs: List[Tuple[date, date]] = []
+    for day in sorted(days):
+        if runs and runs[-1][1] + timedelta(days=1) == day:
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+
+def first_open_day(now: Optional[datetime] = None) -> date:
+    """First day still served from raw rows; every earlier day is closed and may have a built rollup"""
+    return ((now or datetime.now()) - timedelta(seconds=ROLLUP_SETTLE_SECONDS)).date()
+
+
+def _dialect_insert(dialect_name: str):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert
+
+
+class ReportRollupRepository:
+
+    # ===== RAW AGGREGATION =====
+    # Each returns rollup rows (column -> value) for [start_dt, end_dt), one per day and key.
+    # They are used both to rebuild closed days and to cover the current partial day.
+
+    @staticmethod
+    def _hours_between(db: Session, end_column, start_column):
+        if db.get_bind().dialect.name == "sqlite":
+            return (func.julianday(end_column) - func.julianday(start_column)) * 24
+        return func.extract('epoch', end_column - start_column) / 3600
+
+    @staticmethod
+    def raw_daily_sales(db: Session, start_dt: datetime, end_dt: datetime) -> List[Dict]:
+        day = func.date(Order.placed_at)
+        in_range = and_(Order.placed_at >= start_dt, Order.placed_at < end_dt)
+        delivered = and_(Order.order_status == "DELIVERED", in_range)
+
+        rows: Dict[date, Dict] = {}
+
+        def row_for(value) -> Dict:
+            key = as_date(value)
+            if key not in rows:
+                rows[key] = {
+                    "day": key, "order_count": 0, "revenue": 0, "discount": 0,
+                    "items_sold": 0, "refund_amount": 0
+                }
+            return rows[key]
+
+        for r in db.query(
+            day.label('day'),
+            func.count(Order.order_id).label('order_count'),
+            func.coalesce(func.sum(Order.total_amount), 0).label('revenue'),
+            func.coalesce(func.sum(Order.discount_amount), 0).label('discount')
+        ).filter(delivered).group_by(day).all():
+            row = row_for(r.day)
+            row.update(order_count=r.order_count, revenue=r.revenue, discount=r.discount)
+
+        for r in db.query(
+            day.label('day'),
+            func.coalesce(func.sum(OrderItem.quantity), 0).label('items_sold')
+        ).select_from(OrderItem).join(
+            Order, Order.order_id == OrderItem.order_id
+        ).filter(delivered).group_by(day).all():
+            row_for(r.day)["items_sold"] = r.items_sold
+
+        # Refunds count against the day the order was placed, whatever its status
+        for r in db.query(
+            day.label('day'),
+            func.coalesce(func.sum(OrderRefund.amount), 0).label('refund_amount')
+        ).select_from(OrderRefund).join(
+            OrderReturn, OrderReturn.return_id == OrderRefund.return_id
+        ).join(
+            Order, Order.order_id == OrderReturn.order_id
+        ).filter(in_range).group_by(day).all():
+            row_for(r.day)["refund_amount"] = r.refund_amount
+
+        return list(rows.values())
+
+    @staticmethod
+    def _delivered_items(db: Session, start_dt: datetime, end_dt: datetime, *columns):
+        return db.query(*columns).select_from(OrderItem).join(
+            Order, Order.order_id == OrderItem.order_id
+        ).filter(
+            Order.order_status == "DELIVERED",
+            Order.placed_at >= start_dt,
+            Order.placed_at < end_dt
+        )
+
+    @staticmethod
+    def raw_daily_variant_sales(db: Session, start_dt: datetime, end_dt: datetime) -> List[Dict]:
+        day = func.date(Order.placed_at)
+        results = ReportRollupRepository._delivered_items(
+            db, start_dt, end_dt,
+            day.label('day'),
+            OrderItem.variant_id,
+            func.sum(OrderItem.quantity).label('items_sold'),
+            func.sum(OrderItem.quantity * OrderItem.price).label('revenue')
+        ).group_by(day, OrderItem.variant_id).all()
+
+        return [
+            {
+                "day": as_date(r.day),
+                "variant_id": r.variant_id,
+                "items_sold": r.items_sold or 0,
+                "revenue": r.revenue or 0
+            }
+            for r in results
+        ]
+
+    @staticmethod
+    def raw_daily_category_sales(db: Session, start_dt: datetime, end_dt: datetime) -> List[Dict]:
+        day = func.date(Order.placed_at)
+        results = ReportRollupRepository._delivered_items(
+            db, start_dt, end_dt,
+            day.label('day'),
+            SubCategory.category_id,
+            func.count(distinct(Order.order_id)).label('order_count'),
+            func.sum(OrderItem.quantity).label('items_sold'),
+            func.sum(OrderItem.quantity * OrderItem.price).label('revenue')
+        ).join(
+            ProductVariant, ProductVariant.variant_id == OrderItem.variant_id
+        ).join(
+            Product, Product.product_id == ProductVariant.product_id
+        ).join(
+            SubCategory, SubCategory.sub_category_id == Product.sub_category_id
+        ).group_by(day, SubCategory.category_id).all()
+
+        return [
+            {
+                "day": as_date(r.day),
+                "category_id": r.category_id,
+                "order_count": r.order_count,
+                "items_sold": r.items_sold or 0,
+                "revenue": r.revenue or 0
+            }
+            for r in results
+        ]
+
+    @staticmethod
+    def raw_daily_brand_sales(db: Session, start_dt: datetime, end_dt: datetime) -> List[Dict]:
+        day = func.date(Order.placed_at)
+        results = ReportRollupRepository._delivered_items(
+            db, start_dt, end_dt,
+            day.label('day'),
+            Product.brand_id,
+            func.count(distinct(Order.order_id)).label('order_count'),
+            func.sum(OrderItem.quantity).label('items_sold'),
+            func.sum(OrderItem.quantity * OrderItem.price).label('revenue')
+        ).join(
+            ProductVariant, ProductVariant.variant_id == OrderItem.variant_id
+        ).join(
+            Product, Product.product_id == ProductVariant.product_id
+        ).filter(
+            Product.brand_id.isnot(None)
+        ).group_by(day, Product.brand_id).all()
+
+        return [
+            {
+                "day": as_date(r.day),
+                "brand_id": r.brand_id,
+                "order_count": r.order_count,
+                "items_sold": r.items_sold or 0,
+                "revenue": r.revenue or 0
+            }
+            for r in results
+        ]
+
+    @staticmethod
+    def raw_daily_delivery(db: Session, start_dt: datetime, end_dt: datetime) -> List[Dict]:
+        day = func.date(Delivery.assigned_at)
+        person = func.coalesce(Delivery.delivery_person_id, UNASSIGNED)
+        timed = and_(Delivery.status == "DELIVERED", Delivery.delivered_at.isnot(None))
+
+        rows: Dict[Tuple[date, int], Dict] = {}
+
+        def row_for(day_value, delivery_person_id) -> Dict:
+            key = (as_date(day_value), delivery_person_id)
+            if key not in rows:
+                rows[key] = {
+                    "day": key[0], "delivery_person_id": key[1],
+                    "total_deliveries": 0, "completed_deliveries": 0, "pending_deliveries": 0,
+                    "delayed_deliveries": 0, "failed_deliveries": 0,
+                    "delivery_hours": 0.0, "timed_deliveries": 0, "earnings": 0
+                }
+            return rows[key]
+
+        for r in db.query(
+            day.label('day'),
+            person.label('delivery_person_id'),
+            func.count(Delivery.delivery_id).label('total_deliveries'),
+            func.sum(case((Delivery.status == "DELIVERED", 1), else_=0)).label('completed_deliveries'),
+            func.sum(case((Delivery.status.in_(["ASSIGNED", "PICKED_UP"]), 1), else_=0)).label('pending_deliveries'),
+            func.sum(case((Delivery.status == "DELAYED", 1), else_=0)).label('delayed_deliveries'),
+            func.sum(case((Delivery.status.in_(["FAILED", "CANCELLED"]), 1), else_=0)).label('failed_deliveries'),
+            func.sum(case(
+                (timed, ReportRollupRepository._hours_between(db, Delivery.delivered_at, Delivery.assigned_at)),
+                else_=0
+            )).label('delivery_hours'),
+            func.sum(case((timed, 1), else_=0)).label('timed_deliveries')
+        ).filter(
+            Delivery.assigned_at >= start_dt,
+            Delivery.assigned_at < end_dt
+        ).group_by(day, person).all():
+            row = row_for(r.day, r.delivery_person_id)
+            row.update(
+                total_deliveries=r.total_deliveries,
+                completed_deliveries=r.completed_deliveries or 0,
+                pending_deliveries=r.pending_deliveries or 0,
+                delayed_deliveries=r.delayed_deliveries or 0,
+                failed_deliveries=r.failed_deliveries or 0,
+                delivery_hours=float(r.delivery_hours or 0),
+                timed_deliveries=r.timed_deliveries or 0
+            )
+
+        earned_day = func.date(DeliveryEarnings.earned_at)
+        for r in db.query(
+            earned_day.label('day'),
+            DeliveryEarnings.delivery_person_id,
+            func.sum(DeliveryEarnings.amount).label('earnings')
+        ).filter(
+            DeliveryEarnings.delivery_person_id.isnot(None),
+            DeliveryEarnings.earned_at >= start_dt,
+            DeliveryEarnings.earned_at < end_dt
+        ).group_by(earned_day, DeliveryEarnings.delivery_person_id).all():
+            row_for(r.day, r.delivery_person_id)["earnings"] = r.earnings or 0
+
+        return list(rows.values())
+
+    @staticmethod
+    def raw_daily_supplier(db: Session, start_dt: datetime, end_dt: datetime) -> List[Dict]:
+        day = func.date(Purchase.purchase_date)
+        in_range = and_(
+            Purchase.supplier_id.isnot(None),
+            Purchase.purchase_date >= start_dt,
+            Purchase.purchase_date < end_dt
+        )
+
+        rows: Dict[Tuple[date, int], Dict] = {}
+
+        def row_for(day_value, supplier_id) -> Dict:
+            key = (as_date(day_value), supplier_id)
+            if key not in rows:
+                rows[key] = {
+                    "day": key[0], "supplier_id": key[1],
+                    "purchase_count": 0, "total_cost": 0, "total_quantity": 0,
+                    "unit_cost_sum": 0, "unit_cost_lines": 0, "returned_quantity": 0,
+                    "last_purchase_date": None
+                }
+            return rows[key]
+
+        # Header totals and line totals are aggregated separately so the line join
+        # cannot multiply purchase.total_cost
+        for r in db.query(
+            day.label('day'),
+            Purchase.supplier_id,
+            func.count(Purchase.purchase_id).label('purchase_count'),
+            func.coalesce(func.sum(Purchase.total_cost), 0).label('total_cost'),
+            func.max(Purchase.purchase_date).label('last_purchase_date')
+        ).filter(in_range).group_by(day, Purchase.supplier_id).all():
+            row = row_for(r.day, r.supplier_id)
+            row.update(
+                purchase_count=r.purchase_count,
+                total_cost=r.total_cost,
+                last_purchase_date=r.last_purchase_date
+            )
+
+        for r in db.query(
+            day.label('day'),
+            Purchase.supplier_id,
+            func.coalesce(func.sum(PurchaseItem.quantity), 0).label('total_quantity'),
+            func.coalesce(func.sum(PurchaseItem.cost_per_unit), 0).label('unit_cost_sum'),
+            func.count(PurchaseItem.variant_id).label('unit_cost_lines')
+        ).join(
+            PurchaseItem, PurchaseItem.purchase_id == Purchase.purchase_id
+        ).filter(in_range).group_by(day, Purchase.supplier_id).all():
+            row_for(r.day, r.supplier_id).update(
+                total_quantity=r.total_quantity,
+                unit_cost_sum=r.unit_cost_sum,
+                unit_cost_lines=r.unit_cost_lines
+            )
+
+        for r in db.query(
+            day.label('day'),
+            Purchase.supplier_id,
+            func.coalesce(func.sum(PurchaseReturnItem.quantity), 0).label('returned_quantity')
+        ).join(
+            PurchaseReturn, PurchaseReturn.purchase_id == Purchase.purchase_id
+        ).join(
+            PurchaseReturnItem, PurchaseReturnItem.return_id == PurchaseReturn.return_id
+        ).filter(in_range).group_by(day, Purchase.supplier_id).all():
+            row_for(r.day, r.supplier_id)["returned_quantity"] = r.returned_quantity
+
+        return list(rows.values())
+
+    # ===== ROLLUP TABLES =====
+
+    @staticmethod
+    def tables(kind: str) -> List[Tuple[type, Callable]]:
+        """(rollup model, raw aggregation) pairs rebuilt together for a kind"""
+        repo = ReportRollupRepository
+        return {
+            ROLLUP_SALES: [
+                (DailySalesRollup, repo.raw_daily_sales),
+                (DailyVariantSalesRollup, repo.raw_daily_variant_sales),
+                (DailyCategorySalesRollup, repo.raw_daily_category_sales),
+                (DailyBrandSalesRollup, repo.raw_daily_brand_sales),
+            ],
+            ROLLUP_DELIVERY: [
+                (DailyDeliveryRollup, repo.raw_daily_delivery),
+            ],
+            ROLLUP_SUPPLIER: [
+                (DailySupplierRollup, repo.raw_daily_supplier),
+            ],
+        }[kind]
+
+    @staticmethod
+    def first_activity_day(db: Session, kind: str) -> Optional[date]:
+        """Earliest day with raw data for a kind"""
+        if kind == ROLLUP_SALES:
+            candidates = [db.query(func.min(Order.placed_at)).scalar()]
+        elif kind == ROLLUP_DELIVERY:
+            candidates = [
+                db.query(func.min(Delivery.assigned_at)).scalar(),
+                db.query(func.min(DeliveryEarnings.earned_at)).scalar()
+            ]
+        else:
+            candidates = [db.query(func.min(Purchase.purchase_date)).scalar()]
+
+        days = [as_date(value) for value in candidates if value is not None]
+        return min(days) if days else None
+
+    @staticmethod
+    def get_current_days(db: Session, kind: str, start_day: date, end_day: date) -> Set[date]:
+        rows = db.query(ReportRollupDay.day).filter(
+            ReportRollupDay.kind == kind,
+            ReportRollupDay.day >= start_day,
+            ReportRollupDay.day <= end_day,
+            ReportRollupDay.built_version == ReportRollupDay.version
+        ).all()
+        return {as_date(r.day) for r in rows}
+
+    @staticmethod
+    def get_versions(db: Session, kind: str, start_day: date, end_day: date) -> Dict[date, int]:
+        rows = db.query(ReportRollupDay.day, ReportRollupDay.version).filter(
+            ReportRollupDay.kind == kind,
+            ReportRollupDay.day >= start_day,
+            ReportRollupDay.day <= end_day
+        ).all()
+        return {as_date(r.day): r.version for r in rows}
+
+    @staticmethod
+    def get_day_counts(db: Session) -> Dict[str, Dict]:
+        """Per kind: tracked days, stale days and the last built day"""
+        stale = case((ReportRollupDay.built_version != ReportRollupDay.version, 1), else_=0)
+        rows = db.query(
+            ReportRollupDay.kind,
+            func.count(ReportRollupDay.day).label('tracked_days'),
+            func.sum(stale).label('stale_days'),
+            func.max(ReportRollupDay.day).label('last_day')
+        ).group_by(ReportRollupDay.kind).all()
+        return {
+            r.kind: {
+                "tracked_days": r.tracked_days,
+                "stale_days": r.stale_days or 0,
+                "last_day": as_date(r.last_day)
+            }
+            for r in rows
+        }
+
+    @staticmethod
+    def rebuild(db: Session, kind: str, start_day: date, end_day: date) -> int:
+        """Recompute every rollup of a kind for [start_day, end_day] from raw rows; does not commit.
+
+        Versions are read before the raw rows, so a write that lands mid-rebuild
+        leaves its day stale instead of being lost.
+        """
+        versions = ReportRollupRepository.get_versions(db, kind, start_day, end_day)
+        start_dt, end_dt = day_bounds(start_day, end_day)
+
+        written = 0
+        for model, aggregate in ReportRollupRepository.tables(kind):
+            rows = aggregate(db, start_dt, end_dt)
+            db.query(model).filter(
+                model.day >= start_day,
+                model.day <= end_day
+            ).delete(synchronize_session=False)
+            if rows:
+                db.execute(insert(model), rows)
+                written += len(rows)
+
+        built = []
+        day = start_day
+        while day <= end_day:
+            version = versions.get(day, 0)
+            built.append({"kind": kind, "day": day, "version": version, "built_version": version})
+            day += timedelta(days=1)
+        ReportRollupRepository._mark_built(db, built)
+        return written
+
+    @staticmethod
+    def _mark_built(db: Session, rows: List[Dict]) -> None:
+        table = ReportRollupDay.__table__
+        dialect_insert = _dialect_insert(db.get_bind().dialect.name)
+        if dialect_insert is not None:
+            stmt = dialect_insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.kind, table.c.day],
+                set_={"built_version": stmt.excluded.built_version, "built_at": func.now()}
+            )
+            db.execute(stmt, rows)
+            return
+
+        for row in rows:
+            updated = db.execute(
+                update(table).where(
+                    table.c.kind == row["kind"], table.c.day == row["day"]
+                ).values(built_version=row["built_version"], built_at=func.now())
+            ).rowcount
+            if not updated:
+                db.execute(insert(table), [row])
+
+    @staticmethod
+    def ensure_current(db: Session, kind: str, start_day: date, end_day: date) -> int:
+        """Rebuild the stale or never-built days of [start_day, end_day]; returns days rebuilt"""
+        if start_day > end_day:
+            return 0
+
+        current = ReportRollupRepository.get_current_days(db, kind, start_day, end_day)
+        missing = []
+        day = start_day
+        while day <= end_day:
+            if day not in current:
+                missing.append(day)
+            day += timedelta(days=1)
+        if not missing:
+            return 0
+
+        try:
+            for first, last in contiguous_runs(missing):
+                ReportRollupRepository.rebuild(db, kind, first, last)
+            db.commit()
+        except IntegrityError as e:
+            # Another request rebuilt the same days first; its rows are just as good
+            db.rollback()
+            print(f"⚠️ Concurrent {kind} rollup rebuild, using the other result: {e.orig}")
+        return len(missing)
+
+    @staticmethod
+    def aggregate(
+        db: Session,
+        kind: str,
+        model,
+        group_by: Tuple[str, ...],
+        measures: Tuple[str, ...],
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Dict[tuple, Dict]:
+        """
+        Sum a rollup's measures per group_by key over [start_date, end_date] (whole days).
+
+        Closed days come from the rollup table (stale days are rebuilt first); open days
+        (today, and yesterday during ROLLUP_SETTLE_SECONDS after midnight) are always
+        aggregated from raw rows since they are still changing. Without dates the range
+        runs from the first day with data up to today.
+        """
+        today = date.today()
+        open_day = first_open_day()
+        if start_date is None or end_date is None:
+            start_date = ReportRollupRepository.first_activity_day(db, kind) or today
+            end_date = today
+
+        results: Dict[tuple, Dict] = {}
+
+        def fold(key: tuple, values: Dict) -> None:
+            current = results.get(key)
+            if current is None:
+                results[key] = {name: values[name] for name in measures}
+                return
+            for name in measures:
+                value = values[name]
+                if name in MAX_MEASURES:
+                    if value is not None and (current[name] is None or value > current[name]):
+                        current[name] = value
+                else:
+                    current[name] = (current[name] or 0) + (value or 0)
+
+        closed_end = min(end_date, open_day - timedelta(days=1))
+        if start_date <= closed_end:
+            ReportRollupRepository.ensure_current(db, kind, start_date, closed_end)
+            columns = [getattr(model, name) for name in group_by]
+            sums = [
+                (func.max if name in MAX_MEASURES else func.sum)(getattr(model, name)).label(name)
+                for name in measures
+            ]
+            for r in db.query(*columns, *sums).filter(
+                model.day >= start_date,
+                model.day <= closed_end
+            ).group_by(*columns).all():
+                mapping = r._mapping
+                fold(tuple(as_date(mapping[n]) if n == "day" else mapping[n] for n in group_by), mapping)
+
+        raw_start, raw_end = max(start_date, open_day), min(end_date, today)
+        if raw_start <= raw_end:
+            aggregate = dict(ReportRollupRepository.tables(kind))[model]
+            for row in aggregate(db, *day_bounds(raw_start, raw_end)):
+                fold(tuple(row[name] for name in group_by), row)
+
+        return results
+
+    # ===== CHANGE TRACKING =====
+
+    @staticmethod
+    def mark_dirty(connection, days: Dict[str, Set[date]]) -> None:
+        """Bump the version of every closed (kind, day) so readers rebuild it.
+
+        Open days are skipped: they are read from raw rows and have no built rollup
+        to invalidate. Current writes therefore never touch report_rollup_day, and
+        checkouts, status changes and claims do not queue on one row per kind.
+        """
+        open_day = first_open_day()
+        rows = [
+            {"kind": kind, "day": day, "version": 1, "built_version": 0}
+            for kind, kind_days in days.items() for day in kind_days if day < open_day
+        ]
+        if not rows:
+            return
+
+        table = ReportRollupDay.__table__
+        dialect_insert = _dialect_insert(connection.dialect.name)
+        if dialect_insert is not None:
+            stmt = dialect_insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.kind, table.c.day],
+                set_={"version": table.c.version + 1}
+            )
+            connection.execute(stmt, rows)
+            return
+
+        for row in rows:
+            updated = connection.execute(
+                update(table).where(
+                    table.c.kind == row["kind"], table.c.day == row["day"]
+                ).values(version=table.c.version + 1)
+            ).rowcount
+            if not updated:
+                connection.execute(insert(table), [row])
+
+    @staticmethod
+    def mark_dirty_after_commit(db: Session, days: Dict[str, Set[date]]) -> None:
+        """mark_dirty in a short transaction of its own once the current one commits,
+        for hot paths that should hold no report_rollup_day lock.
+
+        Safe against a concurrent rebuild: it reads versions before raw rows, so it
+        either already sees the committed write or ends up with an older version.
+        """
+        pending = db.info.setdefault(_DEFERRED_DAYS_KEY, defaultdict(set))
+        for kind, kind_days in days.items():
+            pending[kind].update(kind_days)
+
+    @staticmethod
+    def collect_dirty_days(session: Session) -> Dict[str, Set[date]]:
+        """Days whose rollups the pending flush invalidates (call from after_flush)"""
+        days: Dict[str, Set[date]] = defaultdict(set)
+        lookups: Dict[str, Set[int]] = defaultdict(set)
+
+        def changed(obj) -> bool:
+            state = obj._sa_instance_state
+            return any(state.attrs[name].history.has_changes() for name in WATCHED_COLUMNS[type(obj)])
+
+        def history_days(obj, attribute: str) -> List[date]:
+            history = obj._sa_instance_state.attrs[attribute].history
+            return [as_date(value) for value in chain(history.deleted, history.unchanged) if value is not None]
+
+        dirty = set(session.dirty)
+        for obj in chain(session.new, dirty, session.deleted):
+            cls = type(obj)
+            if cls not in WATCHED_COLUMNS:
+                continue
+            if obj in dirty and not changed(obj):
+                continue
+
+            values = obj._sa_instance_state.dict
+            if cls is Order:
+                days[ROLLUP_SALES].update(history_days(obj, "placed_at"))
+                lookups["order"].add(values.get("order_id"))
+            elif cls is OrderItem:
+                lookups["order"].add(values.get("order_id"))
+            elif cls is OrderRefund:
+                lookups["order_return"].add(values.get("return_id"))
+            elif cls is Delivery:
+                days[ROLLUP_DELIVERY].update(history_days(obj, "assigned_at"))
+                lookups["delivery"].add(values.get("delivery_id"))
+            elif cls is DeliveryEarnings:
+                days[ROLLUP_DELIVERY].update(history_days(obj, "earned_at"))
+                lookups["earning"].add(values.get("earning_id"))
+            elif cls in (Purchase, PurchaseItem, PurchaseReturn):
+                if cls is Purchase:
+                    days[ROLLUP_SUPPLIER].update(history_days(obj, "purchase_date"))
+                lookups["purchase"].add(values.get("purchase_id"))
+            elif cls is PurchaseReturnItem:
+                lookups["purchase_return"].add(values.get("return_id"))
+
+        # Current dates straight from the rows just flushed (covers server defaults)
+        queries = {
+            "order": (ROLLUP_SALES, Order.order_id, select(Order.placed_at)),
+            "order_return": (
+                ROLLUP_SALES, OrderReturn.return_id,
+                select(Order.placed_at).join(OrderReturn, OrderReturn.order_id == Order.order_id)
+            ),
+            "delivery": (ROLLUP_DELIVERY, Delivery.delivery_id, select(Delivery.assigned_at)),
+            "earning": (ROLLUP_DELIVERY, DeliveryEarnings.earning_id, select(DeliveryEarnings.earned_at)),
+            "purchase": (ROLLUP_SUPPLIER, Purchase.purchase_id, select(Purchase.purchase_date)),
+            "purchase_return": (
+                ROLLUP_SUPPLIER, PurchaseReturn.return_id,
+                select(Purchase.purchase_date).join(PurchaseReturn, PurchaseReturn.purchase_id == Purchase.purchase_id)
+            ),
+        }
+        connection = None
+        for name, ids in lookups.items():
+            ids.discard(None)
+            if not ids:
+                continue
+            kind, id_column, query = queries[name]
+            connection = connection or session.connection()
+            for (value,) in connection.execute(query.where(id_column.in_(sorted(ids)))):
+                if value is not None:
+                    days[kind].add(as_date(value))
+
+        return {kind: kind_days for kind, kind_days in days.items() if kind_days}
+
+
+def _track_rollup_writes(session: Session, flush_context) -> None:
+    dirty_days = ReportRollupRepository.collect_dirty_days(session)
+    if dirty_days:
+        ReportRollupRepository.mark_dirty(session.connection(), dirty_days)
+
+
+def _mark_deferred_days(session: Session) -> None:
+    days = session.info.pop(_DEFERRED_DAYS_KEY, None)
+    if not days:
+        return
+    try:
+        with session.get_bind().begin() as connection:
+            ReportRollupRepository.mark_dirty(connection, days)
+    except Exception as e:
+        print(f"⚠️ Could not mark report rollup days stale: {e}")
+
+
+def _discard_deferred_days(session: Session, previous_transaction) -> None:
+    if previous_transaction.nested:
+        return
+    session.info.pop(_DEFERRED_DAYS_KEY, None)
+
+
+def register_rollup_listeners() -> None:
+    """Keep report rollups in step with order, delivery and purchase writes on every session"""
+    for name, listener in (
+        ("after_flush", _track_rollup_writes),
+        ("after_commit", _mark_deferred_days),
+        ("after_soft_rollback", _discard_deferred_days),
+    ):
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
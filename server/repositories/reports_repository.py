@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session, aliased
 from sqlalchemy import func, desc, asc, and_, or_, case, text, cast, Date, distinct
 from datetime import datetime, date, timedelta
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, Iterator
 from decimal import Decimal
 
 # Import models
@@ -28,7 +28,6 @@ from models.inventory.purchase import Purchase
 from models.inventory.purchase_item import PurchaseItem
 from models.inventory.supplier import Supplier
 from models.inventory.company import Company
-from models.inventory.purchase_return import PurchaseReturn, PurchaseReturnItem
 from models.marketing.coupon import Coupon
 from models.marketing.offer import Offer
 from models.analytics.admin_activity_log import AdminActivityLog
@@ -37,36 +36,22 @@ from models.payment import Payment
 from models.address import Address
 from models.cart import Cart
 from models.wishlist import Wishlist
+from models.analytics.report_rollups import (
+    DailySalesRollup, DailyVariantSalesRollup, DailyCategorySalesRollup,
+    DailyBrandSalesRollup, DailyDeliveryRollup, DailySupplierRollup
+)
+from repositories.report_rollup_repository import (
+    ReportRollupRepository, ROLLUP_SALES, ROLLUP_DELIVERY, ROLLUP_SUPPLIER
+)
 
 class ReportsRepository:
     
     # ===== PRODUCT REPORTS =====
     
     @staticmethod
-    def get_product_performance(
-        db: Session, 
-        start_date: Optional[date] = None,
-        end_date: Optional[date] = None
-    ) -> List[Dict]:
-        """Get product performance analytics"""
-        # Subquery for sales data
-        sales_subquery = db.query(
-            OrderItem.variant_id,
-            func.sum(OrderItem.quantity).label('total_sold'),
-            func.sum(OrderItem.quantity * OrderItem.price).label('total_revenue')
-        ).join(Order, Order.order_id == OrderItem.order_id).filter(
-            Order.order_status == "DELIVERED"
-        )
-        
-        if start_date and end_date:
-            sales_subquery = sales_subquery.filter(
-                Order.placed_at >= start_date,
-                Order.placed_at <= end_date
-            )
-        
-        sales_subquery = sales_subquery.group_by(OrderItem.variant_id).subquery()
-        
-        results = db.query(
+    def _variant_details(db: Session, variant_ids: Optional[List[int]] = None):
+        """Variant rows with product, category, brand and analytics columns (no sales)"""
+        query = db.query(
             ProductVariant.variant_id,
             Product.product_name,
             ProductVariant.variant_name,
@@ -76,8 +61,6 @@ class ReportsRepository:
             func.coalesce(ProductAnalytics.wishlist_add_count, 0).label('wishlist_adds'),
             func.coalesce(ProductAnalytics.cart_add_count, 0).label('cart_adds'),
             func.coalesce(ProductAnalytics.purchase_count, 0).label('purchases'),
-            func.coalesce(sales_subquery.c.total_sold, 0).label('total_sold'),
-            func.coalesce(sales_subquery.c.total_revenue, 0).label('total_revenue'),
             case(
                 (func.coalesce(ProductAnalytics.view_count, 0) > 0, 
                  (func.coalesce(ProductAnalytics.purchase_count, 0) * 100.0) / ProductAnalytics.view_count),
@@ -94,25 +77,41 @@ class ReportsRepository:
             Category, Category.category_id == SubCategory.category_id
         ).outerjoin(
             ProductBrand, ProductBrand.brand_id == Product.brand_id
-        ).outerjoin(
-            sales_subquery, sales_subquery.c.variant_id == ProductVariant.variant_id
-        ).group_by(
-            ProductVariant.variant_id,
-            Product.product_name,
-            ProductVariant.variant_name,
-            Category.category_name,
-            ProductBrand.brand_name,
-            ProductAnalytics.view_count,
-            ProductAnalytics.wishlist_add_count,
-            ProductAnalytics.cart_add_count,
-            ProductAnalytics.purchase_count,
-            ProductVariant.stock_quantity,
-            sales_subquery.c.total_sold,
-            sales_subquery.c.total_revenue
-        ).all()
+        )
         
-        return [
-            {
+        if variant_ids is not None:
+            query = query.filter(ProductVariant.variant_id.in_(variant_ids))
+        
+        return query.all()
+    
+    @staticmethod
+    def _variant_sales(
+        db: Session,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Dict[int, Dict]:
+        """Delivered units and revenue per variant, from the daily rollups"""
+        sales = ReportRollupRepository.aggregate(
+            db, ROLLUP_SALES, DailyVariantSalesRollup,
+            ("variant_id",), ("items_sold", "revenue"),
+            start_date, end_date
+        )
+        return {key[0]: values for key, values in sales.items()}
+    
+    @staticmethod
+    def get_product_performance(
+        db: Session, 
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> List[Dict]:
+        """Get product performance analytics"""
+        sales = ReportsRepository._variant_sales(db, start_date, end_date)
+        results = ReportsRepository._variant_details(db)
+        
+        report = []
+        for r in results:
+            sold = sales.get(r.variant_id, {})
+            report.append({
                 "variant_id": r.variant_id,
                 "product_name": r.product_name,
                 "variant_name": r.variant_name,
@@ -122,13 +121,12 @@ class ReportsRepository:
                 "wishlist_adds": r.wishlist_adds or 0,
                 "cart_adds": r.cart_adds or 0,
                 "purchases": r.purchases or 0,
-                "total_sold": r.total_sold or 0,
-                "total_revenue": float(r.total_revenue or 0),
+                "total_sold": sold.get("items_sold") or 0,
+                "total_revenue": float(sold.get("revenue") or 0),
                 "conversion_rate": float(r.conversion_rate or 0),
                 "stock_quantity": r.stock_quantity
-            }
-            for r in results
-        ]
+            })
+        return report
     
     @staticmethod
     def get_top_selling_products(
@@ -138,61 +136,34 @@ class ReportsRepository:
         limit: int = 10
     ) -> List[Dict]:
         """Get top selling products by quantity and revenue"""
-        query = db.query(
-            ProductVariant.variant_id,
-            Product.product_name,
-            ProductVariant.variant_name,
-            Category.category_name,
-            ProductBrand.brand_name,
-            func.sum(OrderItem.quantity).label('total_sold'),
-            func.sum(OrderItem.quantity * OrderItem.price).label('total_revenue'),
-            ProductVariant.stock_quantity
-        ).join(
-            OrderItem, OrderItem.variant_id == ProductVariant.variant_id
-        ).join(
-            Order, Order.order_id == OrderItem.order_id
-        ).join(
-            Product, Product.product_id == ProductVariant.product_id
-        ).outerjoin(
-            SubCategory, SubCategory.sub_category_id == Product.sub_category_id
-        ).outerjoin(
-            Category, Category.category_id == SubCategory.category_id
-        ).outerjoin(
-            ProductBrand, ProductBrand.brand_id == Product.brand_id
-        ).filter(
-            Order.order_status == "DELIVERED"
-        )
-        
-        if start_date and end_date:
-            query = query.filter(
-                Order.placed_at >= start_date,
-                Order.placed_at <= end_date
-            )
-        
-        results = query.group_by(
-            ProductVariant.variant_id,
-            Product.product_name,
-            ProductVariant.variant_name,
-            Category.category_name,
-            ProductBrand.brand_name,
-            ProductVariant.stock_quantity
-        ).order_by(
-            desc('total_sold')
-        ).limit(limit).all()
-        
-        return [
-            {
+        sales = ReportsRepository._variant_sales(db, start_date, end_date)
+        top_ids = sorted(
+            (variant_id for variant_id, sold in sales.items() if sold["items_sold"]),
+            key=lambda variant_id: sales[variant_id]["items_sold"],
+            reverse=True
+        )[:limit]
+        if not top_ids:
+            return []
+        
+        # Only the variants that made the cut need their details loaded
+        details = {r.variant_id: r for r in ReportsRepository._variant_details(db, top_ids)}
+        
+        report = []
+        for variant_id in top_ids:
+            r = details.get(variant_id)
+            if r is None:
+                continue
+            report.append({
                 "variant_id": r.variant_id,
                 "product_name": r.product_name,
                 "variant_name": r.variant_name,
                 "category_name": r.category_name,
                 "brand_name": r.brand_name,
-                "total_sold": r.total_sold or 0,
-                "total_revenue": float(r.total_revenue or 0),
+                "total_sold": sales[variant_id]["items_sold"] or 0,
+                "total_revenue": float(sales[variant_id]["revenue"] or 0),
                 "stock_quantity": r.stock_quantity
-            }
-            for r in results
-        ]
+            })
+        return report
     
     @staticmethod
     def get_product_conversion_rate(
@@ -462,62 +433,27 @@ class ReportsRepository:
         end_date: Optional[date] = None
     ) -> Dict:
         """Get total sales report"""
-        query = db.query(Order).filter(Order.order_status == "DELIVERED")
+        totals = ReportRollupRepository.aggregate(
+            db, ROLLUP_SALES, DailySalesRollup,
+            (), ("order_count", "revenue", "discount", "items_sold", "refund_amount"),
+            start_date, end_date
+        ).get((), {})
         
-        if start_date and end_date:
-            query = query.filter(
-                Order.placed_at >= start_date,
-                Order.placed_at <= end_date
-            )
-        
-        total_orders = query.count()
-        
-        # Calculate totals
-        totals = query.with_entities(
-            func.sum(Order.total_amount).label('total_revenue'),
-            func.sum(Order.discount_amount).label('total_discount'),
-            func.sum(
-                Order.total_amount - Order.discount_amount
-            ).label('net_sales')
-        ).first()
-        
-        # Count items sold
-        items_query = db.query(func.sum(OrderItem.quantity)).join(
-            Order, Order.order_id == OrderItem.order_id
-        ).filter(Order.order_status == "DELIVERED")
-        
-        if start_date and end_date:
-            items_query = items_query.filter(
-                Order.placed_at >= start_date,
-                Order.placed_at <= end_date
-            )
-        
-        total_items_sold = items_query.scalar() or 0
-        
-        # Calculate refunds
-        refund_query = db.query(func.sum(OrderRefund.amount)).join(
-            OrderReturn, OrderReturn.return_id == OrderRefund.return_id
-        ).join(Order, Order.order_id == OrderReturn.order_id)
-        
-        if start_date and end_date:
-            refund_query = refund_query.filter(
-                Order.placed_at >= start_date,
-                Order.placed_at <= end_date
-            )
-        
-        refund_amount = refund_query.scalar() or 0
+        total_orders = totals.get("order_count") or 0
+        total_revenue = totals.get("revenue") or 0
+        total_discount = totals.get("discount") or 0
         
         # Average order value
-        avg_order_value = totals.total_revenue / total_orders if total_orders > 0 else 0
+        avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
         
         return {
-            "total_revenue": float(totals.total_revenue or 0),
+            "total_revenue": float(total_revenue),
             "total_orders": total_orders,
-            "total_items_sold": total_items_sold,
+            "total_items_sold": totals.get("items_sold") or 0,
             "average_order_value": float(avg_order_value),
-            "total_discount": float(totals.total_discount or 0),
-            "net_sales": float(totals.net_sales or 0),
-            "refund_amount": float(refund_amount)
+            "total_discount": float(total_discount),
+            "net_sales": float(total_revenue - total_discount),
+            "refund_amount": float(totals.get("refund_amount") or 0)
         }
     
     @staticmethod
@@ -527,46 +463,32 @@ class ReportsRepository:
         end_date: Optional[date] = None
     ) -> List[Dict]:
         """Get sales by category"""
-        query = db.query(
-            Category.category_id,
-            Category.category_name,
-            func.sum(OrderItem.quantity * OrderItem.price).label('revenue'),
-            func.count(distinct(Order.order_id)).label('order_count'),
-            func.sum(OrderItem.quantity).label('item_count')
-        ).join(
-            ProductVariant, ProductVariant.variant_id == OrderItem.variant_id
-        ).join(
-            Product, Product.product_id == ProductVariant.product_id
-        ).join(
-            SubCategory, SubCategory.sub_category_id == Product.sub_category_id
-        ).join(
-            Category, Category.category_id == SubCategory.category_id
-        ).join(
-            Order, Order.order_id == OrderItem.order_id
-        ).filter(
-            Order.order_status == "DELIVERED"
+        sales = ReportRollupRepository.aggregate(
+            db, ROLLUP_SALES, DailyCategorySalesRollup,
+            ("category_id",), ("order_count", "items_sold", "revenue"),
+            start_date, end_date
         )
+        if not sales:
+            return []
         
-        if start_date and end_date:
-            query = query.filter(
-                Order.placed_at >= start_date,
-                Order.placed_at <= end_date
-            )
-        
-        results = query.group_by(
-            Category.category_id, Category.category_name
-        ).order_by(desc('revenue')).all()
+        names = dict(
+            db.query(Category.category_id, Category.category_name).filter(
+                Category.category_id.in_([key[0] for key in sales])
+            ).all()
+        )
         
-        return [
+        results = [
             {
-                "category_id": r.category_id,
-                "category_name": r.category_name,
-                "revenue": float(r.revenue or 0),
-                "order_count": r.order_count,
-                "item_count": r.item_count or 0
+                "category_id": category_id,
+                "category_name": names[category_id],
+                "revenue": float(values["revenue"] or 0),
+                "order_count": values["order_count"] or 0,
+                "item_count": values["items_sold"] or 0
             }
-            for r in results
+            for (category_id,), values in sales.items() if category_id in names
         ]
+        results.sort(key=lambda item: item["revenue"], reverse=True)
+        return results
     
     @staticmethod
     def get_sales_by_brand(
@@ -575,44 +497,32 @@ class ReportsRepository:
         end_date: Optional[date] = None
     ) -> List[Dict]:
         """Get sales by brand"""
-        query = db.query(
-            ProductBrand.brand_id,
-            ProductBrand.brand_name,
-            func.sum(OrderItem.quantity * OrderItem.price).label('revenue'),
-            func.count(distinct(Order.order_id)).label('order_count'),
-            func.sum(OrderItem.quantity).label('item_count')
-        ).join(
-            Product, Product.brand_id == ProductBrand.brand_id
-        ).join(
-            ProductVariant, ProductVariant.product_id == Product.product_id
-        ).join(
-            OrderItem, OrderItem.variant_id == ProductVariant.variant_id
-        ).join(
-            Order, Order.order_id == OrderItem.order_id
-        ).filter(
-            Order.order_status == "DELIVERED"
+        sales = ReportRollupRepository.aggregate(
+            db, ROLLUP_SALES, DailyBrandSalesRollup,
+            ("brand_id",), ("order_count", "items_sold", "revenue"),
+            start_date, end_date
         )
+        if not sales:
+            return []
         
-        if start_date and end_date:
-            query = query.filter(
-                Order.placed_at >= start_date,
-                Order.placed_at <= end_date
-            )
-        
-        results = query.group_by(
-            ProductBrand.brand_id, ProductBrand.brand_name
-        ).order_by(desc('revenue')).all()
+        names = dict(
+            db.query(ProductBrand.brand_id, ProductBrand.brand_name).filter(
+                ProductBrand.brand_id.in_([key[0] for key in sales])
+            ).all()
+        )
         
-        return [
+        results = [
             {
-                "brand_id": r.brand_id,
-                "brand_name": r.brand_name,
-                "revenue": float(r.revenue or 0),
-                "order_count": r.order_count,
-                "item_count": r.item_count or 0
+                "brand_id": brand_id,
+                "brand_name": names[brand_id],
+                "revenue": float(values["revenue"] or 0),
+                "order_count": values["order_count"] or 0,
+                "item_count": values["items_sold"] or 0
             }
-            for r in results
+            for (brand_id,), values in sales.items() if brand_id in names
         ]
+        results.sort(key=lambda item: item["revenue"], reverse=True)
+        return results
     
     @staticmethod
     def get_daily_sales_trend(
@@ -621,45 +531,29 @@ class ReportsRepository:
         end_date: date
     ) -> List[Dict]:
         """Get daily sales trend"""
-        results = db.query(
-            func.date(Order.placed_at).label('date'),
-            func.sum(Order.total_amount).label('revenue'),
-            func.count(Order.order_id).label('order_count'),
-            func.sum(
-                db.query(func.sum(OrderItem.quantity))
-                .filter(OrderItem.order_id == Order.order_id)
-                .correlate(Order)
-                .scalar_subquery()
-            ).label('item_count'),
-            func.avg(Order.total_amount).label('average_order_value')
-        ).filter(
-            Order.order_status == "DELIVERED",
-            Order.placed_at >= start_date,
-            Order.placed_at <= end_date
-        ).group_by(
-            func.date(Order.placed_at)
-        ).order_by(
-            func.date(Order.placed_at)
-        ).all()
+        days = ReportRollupRepository.aggregate(
+            db, ROLLUP_SALES, DailySalesRollup,
+            ("day",), ("order_count", "revenue", "items_sold"),
+            start_date, end_date
+        )
         
         return [
             {
-                "date": r.date,
-                "revenue": float(r.revenue or 0),
-                "order_count": r.order_count,
-                "item_count": r.item_count or 0,
-                "average_order_value": float(r.average_order_value or 0)
+                "date": day,
+                "revenue": float(values["revenue"] or 0),
+                "order_count": values["order_count"],
+                "item_count": values["items_sold"] or 0,
+                "average_order_value": float((values["revenue"] or 0) / values["order_count"])
             }
-            for r in results
+            for (day,), values in sorted(days.items()) if values["order_count"]
         ]
     
     @staticmethod
-    def report_all_orders(
+    def _all_orders_query(
         db: Session,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None
-    ) -> List[Dict]:
-        """Get all orders with details"""
+    ):
         # Subquery for items count
         items_subquery = db.query(
             OrderItem.order_id,
@@ -691,25 +585,46 @@ class ReportsRepository:
                 Order.placed_at <= end_date
             )
         
-        results = query.order_by(desc(Order.placed_at)).all()
-        
-        return [
-            {
-                "order_id": r.order_id,
-                "order_date": r.order_date,
-                "customer_name": r.customer_name,
-                "customer_email": r.customer_email,
-                "order_status": r.order_status,
-                "payment_status": r.payment_status,
-                "subtotal": float(r.subtotal),
-                "discount": float(r.discount or 0),
-                "delivery_fee": float(r.delivery_fee or 0),
-                "tax": float(r.tax or 0),
-                "total_amount": float(r.total_amount),
-                "items_count": r.items_count or 0
-            }
-            for r in results
-        ]
+        return query.order_by(desc(Order.placed_at))
+    
+    @staticmethod
+    def _all_orders_row(r) -> Dict:
+        return {
+            "order_id": r.order_id,
+            "order_date": r.order_date,
+            "customer_name": r.customer_name,
+            "customer_email": r.customer_email,
+            "order_status": r.order_status,
+            "payment_status": r.payment_status,
+            "subtotal": float(r.subtotal),
+            "discount": float(r.discount or 0),
+            "delivery_fee": float(r.delivery_fee or 0),
+            "tax": float(r.tax or 0),
+            "total_amount": float(r.total_amount),
+            "items_count": r.items_count or 0
+        }
+    
+    @staticmethod
+    def report_all_orders(
+        db: Session,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> List[Dict]:
+        """Get all orders with details"""
+        results = ReportsRepository._all_orders_query(db, start_date, end_date).all()
+        return [ReportsRepository._all_orders_row(r) for r in results]
+    
+    @staticmethod
+    def stream_all_orders(
+        db: Session,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Dict]:
+        """report_all_orders rows fetched batch_size at a time (server-side cursor on PostgreSQL)"""
+        query = ReportsRepository._all_orders_query(db, start_date, end_date)
+        for r in query.yield_per(batch_size):
+            yield ReportsRepository._all_orders_row(r)
     
     @staticmethod
     def get_order_status_summary(
@@ -857,12 +772,11 @@ class ReportsRepository:
         }
     
     @staticmethod
-    def report_order_items_detail(
+    def _order_items_detail_query(
         db: Session,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None
-    ) -> List[Dict]:
-        """Get detailed order items"""
+    ):
         query = db.query(
             OrderItem.order_id,
             OrderItem.variant_id,
@@ -886,21 +800,43 @@ class ReportsRepository:
                 Order.placed_at <= end_date
             )
         
-        results = query.all()
-        
-        return [
-            {
-                "order_id": r.order_id,
-                "variant_id": r.variant_id,
-                "product_name": r.product_name,
-                "variant_name": r.variant_name,
-                "quantity": r.quantity,
-                "unit_price": float(r.unit_price),
-                "discount_per_unit": float(r.discount_per_unit) if r.discount_per_unit else 0.0,  # Add this
-                "total_price": float(r.total_price)
-            }
-            for r in results
-        ]
+        return query
+    
+    @staticmethod
+    def _order_items_detail_row(r) -> Dict:
+        return {
+            "order_id": r.order_id,
+            "variant_id": r.variant_id,
+            "product_name": r.product_name,
+            "variant_name": r.variant_name,
+            "quantity": r.quantity,
+            "unit_price": float(r.unit_price),
+            "discount_per_unit": float(r.discount_per_unit) if r.discount_per_unit else 0.0,  # Add this
+            "total_price": float(r.total_price)
+        }
+    
+    @staticmethod
+    def report_order_items_detail(
+        db: Session,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> List[Dict]:
+        """Get detailed order items"""
+        results = ReportsRepository._order_items_detail_query(db, start_date, end_date).all()
+        return [ReportsRepository._order_items_detail_row(r) for r in results]
+    
+    @staticmethod
+    def stream_order_items_detail(
+        db: Session,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Dict]:
+        """report_order_items_detail rows fetched batch_size at a time (server-side cursor on PostgreSQL)"""
+        query = ReportsRepository._order_items_detail_query(db, start_date, end_date)
+        # Stable order so a streamed export reads like the order it was placed in
+        for r in query.order_by(OrderItem.order_id, OrderItem.variant_id).yield_per(batch_size):
+            yield ReportsRepository._order_items_detail_row(r)
     
     # ===== CUSTOMER REPORTS =====
     
@@ -1184,60 +1120,33 @@ class ReportsRepository:
         end_date: Optional[date] = None
     ) -> Dict:
         """Get delivery performance report"""
-        query = db.query(Delivery)
-        
-        if start_date and end_date:
-            query = query.filter(
-                Delivery.assigned_at >= start_date,
-                Delivery.assigned_at <= end_date
-            )
-        
-        total_deliveries = query.count()
-        
-        # Status breakdown
-        status_counts = db.query(
-            Delivery.status,
-            func.count(Delivery.delivery_id).label('count')
-        )
-        
-        if start_date and end_date:
-            status_counts = status_counts.filter(
-                Delivery.assigned_at >= start_date,
-                Delivery.assigned_at <= end_date
-            )
-        
-        status_counts = status_counts.group_by(Delivery.status).all()
-        
-        status_map = {r.status: r.count for r in status_counts}
+        totals = ReportRollupRepository.aggregate(
+            db, ROLLUP_DELIVERY, DailyDeliveryRollup,
+            (), (
+                "total_deliveries", "completed_deliveries", "pending_deliveries",
+                "delayed_deliveries", "failed_deliveries", "delivery_hours", "timed_deliveries"
+            ),
+            start_date, end_date
+        ).get((), {})
+        
+        total_deliveries = totals.get("total_deliveries") or 0
+        completed_deliveries = totals.get("completed_deliveries") or 0
+        timed_deliveries = totals.get("timed_deliveries") or 0
         
         # Calculate on-time rate (assuming DELIVERED status means on-time)
-        on_time_deliveries = status_map.get("DELIVERED", 0)
-        on_time_rate = (on_time_deliveries / total_deliveries * 100) if total_deliveries > 0 else 0
+        on_time_rate = (completed_deliveries / total_deliveries * 100) if total_deliveries > 0 else 0
         
         # Average delivery time (for completed deliveries)
-        avg_time = db.query(
-            func.avg(
-                func.extract('epoch', Delivery.delivered_at - Delivery.assigned_at) / 3600
-            )
-        ).filter(
-            Delivery.status == "DELIVERED",
-            Delivery.delivered_at.isnot(None)
+        average_delivery_time = (
+            totals["delivery_hours"] / timed_deliveries if timed_deliveries else None
         )
         
-        if start_date and end_date:
-            avg_time = avg_time.filter(
-                Delivery.assigned_at >= start_date,
-                Delivery.assigned_at <= end_date
-            )
-        
-        average_delivery_time = avg_time.scalar()
-        
         return {
             "total_deliveries": total_deliveries,
-            "completed_deliveries": status_map.get("DELIVERED", 0),
-            "pending_deliveries": status_map.get("ASSIGNED", 0) + status_map.get("PICKED_UP", 0),
-            "delayed_deliveries": status_map.get("DELAYED", 0),
-            "failed_deliveries": status_map.get("FAILED", 0) + status_map.get("CANCELLED", 0),
+            "completed_deliveries": completed_deliveries,
+            "pending_deliveries": totals.get("pending_deliveries") or 0,
+            "delayed_deliveries": totals.get("delayed_deliveries") or 0,
+            "failed_deliveries": totals.get("failed_deliveries") or 0,
             "on_time_rate": float(on_time_rate),
             "average_delivery_time": float(average_delivery_time) if average_delivery_time else None
         }
@@ -1249,48 +1158,42 @@ class ReportsRepository:
         end_date: Optional[date] = None
     ) -> List[Dict]:
         """Get delivery person ranking"""
-        query = db.query(
+        stats = ReportRollupRepository.aggregate(
+            db, ROLLUP_DELIVERY, DailyDeliveryRollup,
+            ("delivery_person_id",), (
+                "total_deliveries", "completed_deliveries", "delayed_deliveries",
+                "failed_deliveries", "earnings"
+            ),
+            start_date, end_date
+        )
+        
+        persons = db.query(
             DeliveryPerson.delivery_person_id,
             func.concat(User.first_name, ' ', User.last_name).label('delivery_person_name'),
-            func.count(Delivery.delivery_id).label('total_deliveries'),
-            func.sum(case((Delivery.status == "DELIVERED", 1), else_=0)).label('completed_deliveries'),
-            func.sum(case((Delivery.status == "DELAYED", 1), else_=0)).label('delayed_deliveries'),
-            func.sum(case((Delivery.status.in_(["FAILED", "CANCELLED"]), 1), else_=0)).label('failed_deliveries'),
-            func.avg(DeliveryPerson.rating).label('average_rating'),
-            func.sum(DeliveryEarnings.amount).label('total_earnings')
+            DeliveryPerson.rating
         ).join(
             User, User.user_id == DeliveryPerson.user_id
-        ).outerjoin(
-            Delivery, Delivery.delivery_person_id == DeliveryPerson.delivery_person_id
-        ).outerjoin(
-            DeliveryEarnings, DeliveryEarnings.delivery_person_id == DeliveryPerson.delivery_person_id
-        )
-        
-        if start_date and end_date:
-            query = query.filter(
-                Delivery.assigned_at >= start_date,
-                Delivery.assigned_at <= end_date
-            )
-        
-        results = query.group_by(
-            DeliveryPerson.delivery_person_id,
-            User.first_name,
-            User.last_name
-        ).order_by(desc('completed_deliveries')).all()
+        ).all()
         
-        return [
-            {
+        results = []
+        for r in persons:
+            person_stats = stats.get((r.delivery_person_id,), {})
+            # A date range only ranks people who had deliveries in it
+            if start_date and end_date and not person_stats.get("total_deliveries"):
+                continue
+            results.append({
                 "delivery_person_id": r.delivery_person_id,
                 "delivery_person_name": r.delivery_person_name,
-                "total_deliveries": r.total_deliveries or 0,
-                "completed_deliveries": r.completed_deliveries or 0,
-                "delayed_deliveries": r.delayed_deliveries or 0,
-                "failed_deliveries": r.failed_deliveries or 0,
-                "average_rating": float(r.average_rating or 0),
-                "total_earnings": float(r.total_earnings or 0)
-            }
-            for r in results
-        ]
+                "total_deliveries": person_stats.get("total_deliveries") or 0,
+                "completed_deliveries": person_stats.get("completed_deliveries") or 0,
+                "delayed_deliveries": person_stats.get("delayed_deliveries") or 0,
+                "failed_deliveries": person_stats.get("failed_deliveries") or 0,
+                "average_rating": float(r.rating or 0),
+                "total_earnings": float(person_stats.get("earnings") or 0)
+            })
+        
+        results.sort(key=lambda item: item["completed_deliveries"], reverse=True)
+        return results
     
     @staticmethod
     def get_delivery_issue_summary(
@@ -1620,82 +1523,42 @@ class ReportsRepository:
         end_date: Optional[date] = None
     ) -> List[Dict]:
         """Get supplier performance"""
-        # Purchase data
-        purchase_subq = db.query(
-            Purchase.supplier_id,
-            func.count(Purchase.purchase_id).label('purchase_count'),
-            func.sum(Purchase.total_cost).label('total_purchases'),
-            func.sum(PurchaseItem.quantity).label('total_quantity'),
-            func.avg(PurchaseItem.cost_per_unit).label('average_cost'),
-            func.max(Purchase.purchase_date).label('last_purchase_date')
-        ).join(
-            PurchaseItem, PurchaseItem.purchase_id == Purchase.purchase_id
+        stats = ReportRollupRepository.aggregate(
+            db, ROLLUP_SUPPLIER, DailySupplierRollup,
+            ("supplier_id",), (
+                "total_cost", "total_quantity", "unit_cost_sum", "unit_cost_lines",
+                "returned_quantity", "last_purchase_date"
+            ),
+            start_date, end_date
         )
         
-        if start_date and end_date:
-            purchase_subq = purchase_subq.filter(
-                Purchase.purchase_date >= start_date,
-                Purchase.purchase_date <= end_date
-            )
-        
-        purchase_subq = purchase_subq.group_by(Purchase.supplier_id).subquery()
-        
-        # Return data
-        return_subq = db.query(
-            Supplier.supplier_id,
-            func.count(PurchaseReturn.return_id).label('return_count'),
-            func.sum(PurchaseReturnItem.quantity).label('returned_quantity')
-        ).join(
-            Purchase, Purchase.supplier_id == Supplier.supplier_id
-        ).outerjoin(
-            PurchaseReturn, PurchaseReturn.purchase_id == Purchase.purchase_id
-        ).outerjoin(
-            PurchaseReturnItem, PurchaseReturnItem.return_id == PurchaseReturn.return_id
-        )
-        
-        if start_date and end_date:
-            return_subq = return_subq.filter(
-                Purchase.purchase_date >= start_date,
-                Purchase.purchase_date <= end_date
-            )
-        
-        return_subq = return_subq.group_by(Supplier.supplier_id).subquery()
-        
-        # Main query
-        results = db.query(
+        suppliers = db.query(
             Supplier.supplier_id,
             Supplier.name.label('supplier_name'),
-            Company.name.label('company_name'),
-            func.coalesce(purchase_subq.c.total_purchases, 0).label('total_purchases'),
-            func.coalesce(purchase_subq.c.total_quantity, 0).label('total_quantity'),
-            func.coalesce(purchase_subq.c.average_cost, 0).label('average_cost'),
-            purchase_subq.c.last_purchase_date,
-            case(
-                (purchase_subq.c.total_quantity > 0,
-                 (func.coalesce(return_subq.c.returned_quantity, 0) * 100.0) / purchase_subq.c.total_quantity),
-                else_=0.0
-            ).label('return_rate')
+            Company.name.label('company_name')
         ).join(
             Company, Company.company_id == Supplier.company_id
-        ).outerjoin(
-            purchase_subq, purchase_subq.c.supplier_id == Supplier.supplier_id
-        ).outerjoin(
-            return_subq, return_subq.c.supplier_id == Supplier.supplier_id
-        ).order_by(desc('total_purchases')).all()
+        ).all()
         
-        return [
-            {
+        results = []
+        for r in suppliers:
+            supplier_stats = stats.get((r.supplier_id,), {})
+            total_quantity = supplier_stats.get("total_quantity") or 0
+            unit_cost_lines = supplier_stats.get("unit_cost_lines") or 0
+            returned_quantity = supplier_stats.get("returned_quantity") or 0
+            results.append({
                 "supplier_id": r.supplier_id,
                 "supplier_name": r.supplier_name,
                 "company_name": r.company_name,
-                "total_purchases": float(r.total_purchases),
-                "total_quantity": r.total_quantity,
-                "average_cost": float(r.average_cost),
-                "last_purchase_date": r.last_purchase_date,
-                "return_rate": float(r.return_rate or 0)
-            }
-            for r in results
-        ]
+                "total_purchases": float(supplier_stats.get("total_cost") or 0),
+                "total_quantity": total_quantity,
+                "average_cost": float(supplier_stats["unit_cost_sum"] / unit_cost_lines) if unit_cost_lines else 0.0,
+                "last_purchase_date": supplier_stats.get("last_purchase_date"),
+                "return_rate": float(returned_quantity * 100.0 / total_quantity) if total_quantity > 0 else 0.0
+            })
+        
+        results.sort(key=lambda item: item["total_purchases"], reverse=True)
+        return results
     
     # ===== MARKETING REPORTS =====
     
@@ -0,0 +1,129 @@
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+
+from config.database import SessionLocal
+from models.analytics.api_request_rollups import ApiRequestHourly, ApiRequestLatencyHourly
+from repositories.report_rollup_repository import _dialect_insert
+from utils.location_buffer import PeriodicFlusher
+from utils.request_metrics import LATENCY_BUCKETS_MS, RouteStats, request_metrics, request_metrics_collector
+
+# Seconds between writes of the hourly aggregates, and days of them kept
+REQUEST_METRICS_FLUSH_SECONDS = float(os.getenv("REQUEST_METRICS_FLUSH_SECONDS", "60"))
+REQUEST_METRICS_RETENTION_DAYS = int(os.getenv("REQUEST_METRICS_RETENTION_DAYS", "30"))
+
+HOURLY_COUNTERS = ("request_count", "client_error_count", "error_count", "total_duration_ms", "request_bytes", "response_bytes")
+LATENCY_BOUNDS_MS = tuple(float(bound) for bound in LATENCY_BUCKETS_MS) + (float("inf"),)
+
+
+class RequestMetricsRepository:
+
+    @staticmethod
+    def _add_rows(db: Session, model, rows: List[Dict], counters: Tuple[str, ...]) -> None:
+        """Insert rows, adding their counters to the rows that already exist for the same key"""
+        table = model.__table__
+        keys = [column for column in table.primary_key.columns]
+        dialect_insert = _dialect_insert(db.get_bind().dialect.name)
+        if dialect_insert is not None:
+            stmt = dialect_insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=keys,
+                set_={name: table.c[name] + stmt.excluded[name] for name in counters}
+            )
+            db.execute(stmt, rows)
+            return
+
+        for row in rows:
+            updated = db.execute(
+                update(table).where(*[column == row[column.name] for column in keys]).values(
+                    {name: table.c[name] + row[name] for name in counters}
+                )
+            ).rowcount
+            if not updated:
+                db.execute(insert(table), [row])
+
+    @staticmethod
+    def write_hourly(db: Session, pending: Dict[Tuple[datetime, str, str], RouteStats]) -> int:
+        """Add per-hour aggregates to api_request_hourly and its latency histogram; returns the endpoint-hours written"""
+        hourly, latency = [], []
+        for (hour, method, route), stats in sorted(pending.items()):
+            hourly.append({
+                "hour": hour,
+                "method": method,
+                "route": route[:255],
+                "request_count": stats.count,
+                "client_error_count": stats.client_errors,
+                "error_count": stats.errors,
+                "total_duration_ms": stats.duration_ms,
+                "request_bytes": stats.request_bytes,
+                "response_bytes": stats.response_bytes
+            })
+            latency.extend(
+                {"hour": hour, "method": method, "route": route[:255], "le_ms": bound, "request_count": count}
+                for bound, count in zip(LATENCY_BOUNDS_MS, stats.buckets) if count
+            )
+        if hourly:
+            RequestMetricsRepository._add_rows(db, ApiRequestHourly, hourly, HOURLY_COUNTERS)
+            RequestMetricsRepository._add_rows(db, ApiRequestLatencyHourly, latency, ("request_count",))
+        return len(hourly)
+
+    @staticmethod
+    def purge_before(db: Session, cutoff: datetime) -> int:
+        """Delete hourly aggregates of hours before cutoff"""
+        deleted = db.execute(delete(ApiRequestHourly).where(ApiRequestHourly.hour < cutoff)).rowcount
+        db.execute(delete(ApiRequestLatencyHourly).where(ApiRequestLatencyHourly.hour < cutoff))
+        return deleted
+
+
+# ===== FLUSHING =====
+# Requests only touch memory; the flusher adds this process's hourly aggregates
+# to the database every REQUEST_METRICS_FLUSH_SECONDS in one transaction.
+
+_last_purge: Optional[datetime] = None
+
+
+def flush_request_metrics() -> int:
+    """Write the aggregates collected since the last flush; on failure they are kept for the next run"""
+    global _last_purge
+    pending = request_metrics.drain_pending()
+    if not pending:
+        return 0
+
+    hour = datetime.now().replace(minute=0, second=0, microsecond=0)
+    db = SessionLocal()
+    try:
+        written = RequestMetricsRepository.write_hourly(db, pending)
+        if _last_purge != hour:
+            RequestMetricsRepository.purge_before(db, hour - timedelta(days=REQUEST_METRICS_RETENTION_DAYS))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        request_metrics.requeue(pending)
+        print(f"⚠️ Request metrics flush failed, {len(pending)} endpoint-hours kept: {e}")
+        return 0
+    finally:
+        db.close()
+
+    _last_purge = hour
+    return written
+
+
+request_metrics_flusher = PeriodicFlusher(
+    flush_request_metrics,
+    interval=REQUEST_METRICS_FLUSH_SECONDS,
+    name="request-metrics-flusher"
+)
+
+
+def start_request_metrics() -> None:
+    request_metrics_collector.ensure_started()
+    request_metrics_flusher.ensure_started()
+
+
+def stop_request_metrics() -> None:
+    """Stop both threads and write what was recorded up to now"""
+    request_metrics_collector.stop(final_flush=False)
+    request_metrics_flusher.stop()
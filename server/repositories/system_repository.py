@@ -9,6 +9,7 @@ from models.role import Role, Permission, UserRole, RolePermission
 from models.analytics.user_sessions import UserSession
 from models.analytics.admin_activity_log import AdminActivityLog
 from models.notification import Notification
+from repositories.notification_counter_repository import NotificationCounterRepository
 from models.order.order import Order
 from models.payment import Payment
 from models.order.order_refund import OrderRefund
@@ -16,6 +17,8 @@ from models.order.order_return import OrderReturn
 from models.delivery.delivery import Delivery
 from models.feedback.feedback import Feedback
 from models.feedback.user_issue import UserIssue
+from models.analytics.api_request_rollups import ApiRequestHourly, ApiRequestLatencyHourly
+from utils.request_metrics import histogram_quantile
 
 class SystemRepository:
     
@@ -557,32 +560,18 @@ class SystemRepository:
     @staticmethod
     def get_unread_notifications_count(db: Session) -> Dict[str, Any]:
         """Get count of unread notifications"""
-        unread_notifications = db.query(Notification).filter(
-            Notification.is_read == False
-        ).all()
-        
-        total_unread = len(unread_notifications)
+        # Totals per user come from the maintained counters, not from the rows
+        total_unread, by_user = NotificationCounterRepository.get_unread_totals(db)
         
-        # Group by user
-        by_user = {}
-        for n in unread_notifications:
-            user_id = str(n.user_id)
-            if user_id not in by_user:
-                by_user[user_id] = 0
-            by_user[user_id] += 1
-        
-        # Group by type
         by_type = {}
-        for n in unread_notifications:
-            n_type = n.type.value if hasattr(n.type, 'value') else str(n.type)
-            if n_type not in by_type:
-                by_type[n_type] = 0
-            by_type[n_type] += 1
+        for n_type, count in db.query(Notification.type, func.count(Notification.notification_id)).filter(
+            Notification.is_read == False
+        ).group_by(Notification.type).all():
+            by_type[n_type.value if hasattr(n_type, 'value') else str(n_type)] = count
         
-        # Find oldest unread
-        oldest = None
-        if unread_notifications:
-            oldest = min(n.created_at for n in unread_notifications)
+        oldest = db.query(func.min(Notification.created_at)).filter(
+            Notification.is_read == False
+        ).scalar()
         
         return {
             "total_unread": total_unread,
@@ -820,13 +809,82 @@ class SystemRepository:
     # ===== HELPER METHODS =====
     
     @staticmethod
-    def get_api_usage_overview(db: Session) -> Dict[str, Any]:
-        """Get API usage overview (simplified version)"""
-        # This would typically come from API logging table
-        # For now, return placeholder data
+    def get_api_usage_overview(db: Session, hours: int = 24, limit: int = 50) -> Dict[str, Any]:
+        """
+        API traffic of the last `hours` hours from the hourly request aggregates:
+        the `limit` busiest endpoints with their p50 / p95 / p99 latency, and the
+        hour of day that saw the most requests. Times are in seconds, rates in percent.
+        """
+        since = datetime.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=hours - 1)
+
+        endpoint_rows = db.query(
+            ApiRequestHourly.method,
+            ApiRequestHourly.route,
+            func.sum(ApiRequestHourly.request_count).label("requests"),
+            func.sum(ApiRequestHourly.client_error_count).label("client_errors"),
+            func.sum(ApiRequestHourly.error_count).label("errors"),
+            func.sum(ApiRequestHourly.total_duration_ms).label("duration_ms"),
+            func.sum(ApiRequestHourly.request_bytes).label("request_bytes"),
+            func.sum(ApiRequestHourly.response_bytes).label("response_bytes")
+        ).filter(
+            ApiRequestHourly.hour >= since
+        ).group_by(
+            ApiRequestHourly.method, ApiRequestHourly.route
+        ).order_by(desc("requests")).all()
+
+        histograms: Dict[Tuple[str, str], List[Tuple[float, int]]] = {}
+        for method, route, le_ms, count in db.query(
+            ApiRequestLatencyHourly.method,
+            ApiRequestLatencyHourly.route,
+            ApiRequestLatencyHourly.le_ms,
+            func.sum(ApiRequestLatencyHourly.request_count)
+        ).filter(
+            ApiRequestLatencyHourly.hour >= since
+        ).group_by(
+            ApiRequestLatencyHourly.method, ApiRequestLatencyHourly.route, ApiRequestLatencyHourly.le_ms
+        ).all():
+            histograms.setdefault((method, route), []).append((float(le_ms), int(count)))
+
+        by_hour_of_day: Dict[int, int] = {}
+        for hour, count in db.query(
+            ApiRequestHourly.hour, func.sum(ApiRequestHourly.request_count)
+        ).filter(
+            ApiRequestHourly.hour >= since
+        ).group_by(ApiRequestHourly.hour).all():
+            by_hour_of_day[hour.hour] = by_hour_of_day.get(hour.hour, 0) + int(count)
+
+        total_requests = sum(int(row.requests) for row in endpoint_rows)
+        total_duration_ms = sum(float(row.duration_ms) for row in endpoint_rows)
+        overall: Dict[float, int] = {}
+        for buckets in histograms.values():
+            for le_ms, count in buckets:
+                overall[le_ms] = overall.get(le_ms, 0) + count
+
+        endpoints = []
+        for row in endpoint_rows[:limit]:
+            requests = int(row.requests)
+            buckets = histograms.get((row.method, row.route), [])
+            endpoints.append({
+                "endpoint": row.route,
+                "method": row.method,
+                "request_count": requests,
+                "avg_response_time": round(float(row.duration_ms) / requests / 1000, 4) if requests else 0,
+                "p50_response_time": round(histogram_quantile(0.50, buckets) / 1000, 4),
+                "p95_response_time": round(histogram_quantile(0.95, buckets) / 1000, 4),
+                "p99_response_time": round(histogram_quantile(0.99, buckets) / 1000, 4),
+                "error_rate": round(int(row.errors) / requests * 100, 2) if requests else 0,
+                "client_error_rate": round(int(row.client_errors) / requests * 100, 2) if requests else 0,
+                "avg_request_bytes": int(row.request_bytes) // requests if requests else 0,
+                "avg_response_bytes": int(row.response_bytes) // requests if requests else 0
+            })
+
+        peak_hour, peak_requests = max(by_hour_of_day.items(), key=lambda item: item[1], default=(0, 0))
         return {
-            "total_requests": 0,
-            "endpoints": [],
-            "peak_hour": "14:00",
-            "avg_response_time": 0.15
+            "total_requests": total_requests,
+            "endpoints": endpoints,
+            "peak_hour": f"{peak_hour:02d}:00",
+            "peak_hour_requests": peak_requests,
+            "avg_response_time": round(total_duration_ms / total_requests / 1000, 4) if total_requests else 0,
+            "p95_response_time": round(histogram_quantile(0.95, overall.items()) / 1000, 4),
+            "hours": hours
         }
\ No newline at end of file
@@ -11,7 +11,7 @@ from models.analytics.recently_viewed import RecentlyViewed
 from models.analytics.search_history import SearchHistory
 from models.analytics.user_sessions import UserSession 
 from models.analytics.admin_activity_log import AdminActivityLog 
-from models.notification import Notification
+from models.notification import Notification, NotificationCounter, NotificationFeedCursor
 from models.feedback.feedback import Feedback
 from models.feedback.user_issue import UserIssue
 from models.delivery.delivery_person import DeliveryPerson
@@ -56,6 +56,8 @@ class UserRepository:
         db.query(Payment).filter(Payment.user_id == user_id).delete()
         db.query(ReviewVote).filter(ReviewVote.user_id == user_id).delete()
         db.query(Notification).filter(Notification.user_id == user_id).delete()
+        db.query(NotificationCounter).filter(NotificationCounter.user_id == user_id).delete()
+        db.query(NotificationFeedCursor).filter(NotificationFeedCursor.user_id == user_id).delete()
         db.query(Feedback).filter(Feedback.user_id == user_id).delete()
         db.query(RecentlyViewed).filter(RecentlyViewed.user_id == user_id).delete()
         db.query(SearchHistory).filter(SearchHistory.user_id == user_id).delete()
@@ -106,4 +106,14 @@ def cancel_delivery_admin(
     admin=Depends(is_admin)
 ):
     """Admin cancels delivery (makes it available again)"""
-    return DeliveryAdminController(db).cancelDeliveryAdmin(delivery_id)
\ No newline at end of file
+    return DeliveryAdminController(db).cancelDeliveryAdmin(delivery_id)
+
+
+@router.post("/{delivery_id}/dispatch")
+def dispatch_delivery(
+    delivery_id: int,
+    db: Session = Depends(get_db),
+    admin=Depends(is_admin)
+):
+    """Offer a pool delivery to the nearest online riders not yet offered it"""
+    return DeliveryAdminController(db).dispatchDelivery(delivery_id)
@@ -9,7 +9,8 @@ from schemas.delivery_panel.delivery_active_schema import (
     ActiveDeliveriesListResponse, DeliveryResponse, StatusUpdateRequest,
     LocationUpdateResponse, CustomerCallResponse, NavigationDataResponse,
     SuccessResponse, DeliveryStatistics, StatusTransitionResponse,
-    ProgressUpdateRequest, DeliveryStatus, PaymentType, PriorityLevel
+    ProgressUpdateRequest, DeliveryStatus, PaymentType, PriorityLevel,
+    LocationHistoryResponse
 )
 from models.user import User
 
@@ -282,6 +283,22 @@ def update_delivery_person_location(
     )
 
 
+@router.get("/location/history", response_model=LocationHistoryResponse)
+def get_location_history(
+    since: Optional[datetime] = Query(None, description="Start of the window, default 24 hours ago"),
+    until: Optional[datetime] = Query(None, description="End of the window (exclusive)"),
+    current_user: User = Depends(is_delivery_person),
+    controller: DeliveryActiveController = Depends()
+):
+    """
+    Get delivery person's recorded route
+    
+    Positions are sampled once per location flush and only kept when
+    LOCATION_HISTORY_ENABLED is set
+    """
+    return controller.get_location_history(since, until, current_user)
+
+
 # ===== CUSTOMER CALL =====
 
 @router.get("/{delivery_id}/call", response_model=CustomerCallResponse)
@@ -1,21 +1,58 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query, Response
 from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Literal, Optional
 from config.dependencies import get_db, get_current_user, is_delivery_person
 from controllers.delivery_panel.delivery_available_controller import DeliveryAvailableController
 from schemas.delivery_panel.delivery_available_schema import *
 
-from models.delivery.delivery_person import DeliveryPerson
-
 router = APIRouter(prefix="/api/v1/delivery_panel", tags=["Delivery Available"])
 
 
 @router.get("/available", response_model=list[AvailableDeliveryResponse])
 def get_available_deliveries(
+    response: Response,
+    sort: Literal["time", "distance"] = Query("time", description="time: oldest first; distance: nearest drop address first"),
+    since: Optional[datetime] = Query(None, description="Return 304 if the pool has not changed since this time"),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db), 
     current_user = Depends(is_delivery_person)
 ):
-    """Get available deliveries for delivery person"""
-    return DeliveryAvailableController(db).get_available_deliveries_for_delivery_person()
+    """
+    Get available deliveries for delivery person
+    
+    Served from a shared snapshot of the pool. Send the returned ETag as
+    If-None-Match (or X-Feed-Changed-At as since) to get 304 while nothing changed.
+    """
+    feed = DeliveryAvailableController(db).get_available_deliveries_for_delivery_person(
+        current_user.delivery_person_id, sort, if_none_match, since
+    )
+    headers = {"Cache-Control": "no-cache"}
+    if feed["etag"]:
+        headers["ETag"] = feed["etag"]
+    if feed["changed_at"]:
+        headers["X-Feed-Changed-At"] = feed["changed_at"].isoformat()
+    
+    if feed["not_modified"]:
+        return Response(status_code=304, headers=headers)
+    
+    response.headers.update(headers)
+    return feed["deliveries"]
+
+
+@router.post("/available/claim", response_model=ClaimDeliveriesResponse)
+def claim_deliveries(
+    payload: ClaimDeliveriesRequest,
+    db: Session = Depends(get_db),
+    current_user = Depends(is_delivery_person)
+):
+    """Accept several deliveries in one request; each one goes to exactly one rider"""
+    
+    if current_user.delivery_person_id is None:
+        from fastapi import HTTPException
+        raise HTTPException(404, "Delivery person not found for this user")
+    
+    return DeliveryAvailableController(db).claim_deliveries(payload.delivery_ids, current_user.delivery_person_id)
 
 
 @router.post("/available/{delivery_id}/accept")
@@ -26,15 +63,26 @@ def accept_delivery(
 ):
     """Accept delivery by delivery person"""
     
-    delivery_person = db.query(DeliveryPerson).filter(
-        DeliveryPerson.user_id == current_user.user_id
-    ).first()
+    if current_user.delivery_person_id is None:
+        from fastapi import HTTPException
+        raise HTTPException(404, "Delivery person not found for this user")
     
-    if not delivery_person:
+    return DeliveryAvailableController(db).accept_delivery(delivery_id, current_user.delivery_person_id)
+
+
+@router.post("/available/{delivery_id}/reject")
+def reject_delivery(
+    delivery_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(is_delivery_person)
+):
+    """Reject a delivery offered to this delivery person"""
+    
+    if current_user.delivery_person_id is None:
         from fastapi import HTTPException
         raise HTTPException(404, "Delivery person not found for this user")
     
-    return DeliveryAvailableController(db).accept_delivery(delivery_id, delivery_person.delivery_person_id)
+    return DeliveryAvailableController(db).reject_delivery(delivery_id, current_user.delivery_person_id)
 
 
 @router.post("/{delivery_id}/cancel")
@@ -45,12 +93,8 @@ def cancel_delivery(
 ):
     """Cancel delivery by delivery person"""
     
-    delivery_person = db.query(DeliveryPerson).filter(
-        DeliveryPerson.user_id == current_user.user_id
-    ).first()
-    
-    if not delivery_person:
+    if current_user.delivery_person_id is None:
         from fastapi import HTTPException
         raise HTTPException(404, "Delivery person not found for this user")
     
-    return DeliveryAvailableController(db).cancel_delivery(delivery_id, delivery_person.delivery_person_id)
\ No newline at end of file
+    return DeliveryAvailableController(db).cancel_delivery(delivery_id, current_user.delivery_person_id)
\ No newline at end of file
@@ -5,15 +5,31 @@ from controllers.delivery_panel.delivery_dashboard_controller import DeliveryDas
 from schemas.delivery_panel.delivery_dashboard_schema import (
     DashboardStats, ActiveDeliveriesResponse, EarningsOverviewResponse,
     TodayScheduleResponse, DeliveryDashboardResponse, QRVerifyRequest,
-    IssueReportRequest, PODUploadRequest, StatusUpdateRequest
+    IssueReportRequest, PODUploadRequest, StatusUpdateRequest,
+    DashboardOverviewResponse
 )
 from models.user import User
+from utils.section_loader import SECTION_TIMEOUT_SECONDS
 
 router = APIRouter(prefix="/api/v1/delivery_panel/delivery_dashboard", tags=["Delivery Dashboard"])
 
 
 # ===== DASHBOARD ENDPOINTS =====
 
+@router.get("/dashboard", response_model=DashboardOverviewResponse)
+def get_dashboard_overview(
+    timeout: float = Query(SECTION_TIMEOUT_SECONDS, gt=0, le=30, description="Seconds to wait for the slowest section"),
+    current_user: User = Depends(is_delivery_person),
+    controller: DeliveryDashboardController = Depends()
+):
+    """
+    Get the whole rider dashboard (stats, active deliveries, earnings, today's
+    schedule, performance) in one call, with per-section timings. Sections that
+    do not finish within timeout are omitted and partial is set.
+    """
+    return controller.get_dashboard_overview(current_user, timeout)
+
+
 @router.get("/dashboard/stats", response_model=DashboardStats)
 def get_dashboard_stats(
     current_user: User = Depends(is_delivery_person),
@@ -104,21 +104,23 @@ def admin_all_deliveries(
     admin = Depends(is_admin),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
-    status: Optional[str] = Query(None)
+    status: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page (keyset mode)")
 ):
     """Admin: Get all deliveries"""
     # Using the admin controller for detailed admin view
-    if page == 1 and per_page == 20 and not status:
+    if page == 1 and per_page == 20 and not status and not cursor:
         # Original admin endpoint
         return DeliveryAdminController(db).getAllDeliveries()
     else:
         # Using delivery controller for paginated response
         controller = DeliveryController(db)
-        deliveries = controller.get_all_deliveries(page, per_page, status)
+        deliveries = controller.get_all_deliveries(page, per_page, status, cursor)
         return {
             "success": True,
             "message": "Deliveries retrieved successfully",
-            "data": deliveries["deliveries"]
+            "data": deliveries["deliveries"],
+            "next_cursor": deliveries["next_cursor"]
         }
 
 
@@ -263,7 +265,7 @@ def delivery_person_my_orders(
                 "data": []
             }
         
-        if delivery_person.status != "ACTIVE":
+        if delivery_person.delivery_status != "ACTIVE":
             raise HTTPException(
                 status_code=403, 
                 detail="Your delivery account is not active. Please contact admin."
@@ -407,13 +409,15 @@ def legacy_get_all_deliveries_admin(
     admin = Depends(is_admin),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
-    status: Optional[str] = Query(None)
+    status: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page (keyset mode)")
 ):
     """Admin: Get all deliveries (legacy endpoint)"""
     controller = DeliveryController(db)
-    deliveries = controller.get_all_deliveries(page, per_page, status)
+    deliveries = controller.get_all_deliveries(page, per_page, status, cursor)
     return {
         "success": True,
         "message": "Deliveries retrieved successfully",
-        "data": deliveries["deliveries"]
+        "data": deliveries["deliveries"],
+        "next_cursor": deliveries["next_cursor"]
     }
\ No newline at end of file
@@ -0,0 +1,117 @@
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from config.dependencies import principal_from_token
+from utils.event_hub import (
+    event_hub, EVENT_TYPES, EVENT_HEARTBEAT_SECONDS, format_sse, event_payload
+)
+
+router = APIRouter(prefix="/api/v1/events", tags=["Events"])
+
+
+def _parse_types(types: Optional[str]):
+    """Comma-separated event types a client wants, or None for all of them"""
+    if not types:
+        return None
+    wanted = {name.strip() for name in types.split(",") if name.strip()}
+    unknown = wanted - set(EVENT_TYPES)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown event types: {', '.join(sorted(unknown))}")
+    return wanted
+
+
+def _bearer(request_token: Optional[str], authorization: Optional[str]) -> Optional[str]:
+    if request_token:
+        return request_token
+    if authorization and authorization.lower().startswith("bearer "):
+        return authorization[7:]
+    return None
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    token: Optional[str] = Query(None, description="Bearer token (EventSource cannot send headers)"),
+    types: Optional[str] = Query(None, description="Comma-separated event types, default all")
+):
+    """
+    Server-Sent Events stream of the delivery and notification events addressed to
+    the caller (by user id and role). A comment line is sent every
+    EVENT_HEARTBEAT_SECONDS to keep idle connections open through proxies.
+    """
+    wanted = _parse_types(types)
+    principal = await asyncio.to_thread(
+        principal_from_token, _bearer(token, request.headers.get("authorization"))
+    )
+    if principal is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+
+    subscription = event_hub.subscribe(principal.user_id, principal.roles, wanted)
+
+    async def frames():
+        try:
+            yield f"retry: 5000\n: connected as user {principal.user_id}\n\n"
+            while True:
+                try:
+                    item = await asyncio.wait_for(subscription.queue.get(), EVENT_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield format_sse(item)
+        finally:
+            event_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def events_websocket(
+    websocket: WebSocket,
+    token: Optional[str] = Query(None),
+    types: Optional[str] = Query(None)
+):
+    """
+    WebSocket feed of the same events as /stream, one JSON message per event.
+    The connection is closed with 1008 when the token is missing or invalid.
+    """
+    try:
+        wanted = _parse_types(types)
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=e.detail)
+        return
+    principal = await asyncio.to_thread(
+        principal_from_token, _bearer(token, websocket.headers.get("authorization"))
+    )
+    if principal is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Could not validate credentials")
+        return
+
+    await websocket.accept()
+    subscription = event_hub.subscribe(principal.user_id, principal.roles, wanted)
+
+    async def drain_client():
+        # Clients only send keep-alives; reading them is how a disconnect is noticed
+        while True:
+            await websocket.receive_text()
+
+    reader = asyncio.create_task(drain_client())
+    try:
+        while not reader.done():
+            getter = asyncio.create_task(subscription.queue.get())
+            done, _ = await asyncio.wait({getter, reader}, timeout=EVENT_HEARTBEAT_SECONDS, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                await websocket.send_text(event_payload(getter.result()))
+                continue
+            getter.cancel()
+            if not done:
+                await websocket.send_json({"type": "ping"})
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        reader.cancel()
+        event_hub.unsubscribe(subscription)
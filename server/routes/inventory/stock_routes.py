@@ -6,6 +6,7 @@ from schemas.inventory_schema import (
     StockMovementListWrapper, StockSummaryListWrapper, MessageWrapper
 )
 from models.user import User
+from typing import Optional
 
 router = APIRouter(prefix="/api/v1/inventory/stock", tags=["Inventory - Stock"])
 
@@ -15,15 +16,17 @@ def get_stock_movements_route(
     db: Session = Depends(get_db),
     admin: User = Depends(is_admin),
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000)
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page (keyset mode, ignores skip)")
 ):
-    """Get all stock movements"""
+    """Get all stock movements, newest first"""
     controller = StockController(db)
-    movements = controller.get_stock_movements(skip, limit)
+    result = controller.get_stock_movements(skip, limit, cursor)
     return {
         "success": True,
         "message": "Stock movements retrieved successfully",
-        "data": movements
+        "data": result["movements"],
+        "next_cursor": result["next_cursor"]
     }
 
 @router.get("/summary", response_model=StockSummaryListWrapper)
@@ -16,6 +16,7 @@ from controllers.notification_admin_controller import NotificationAdminControlle
 from schemas.notification_admin import (
     NotificationSearchQuery,
     NotificationBroadcast,
+    BroadcastProgress,
     NotificationUpdateAdmin,
     DeleteOldNotifications,
     NotificationStatsResponse,
@@ -35,14 +36,16 @@ def get_user_notifications(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(50, ge=1, le=100, description="Number of records to return"),
     is_read: Optional[bool] = Query(None, description="Filter by read status"),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page (keyset mode, ignores skip)"),
     current_user: User = Depends(get_current_user),
     controller: NotificationController = Depends()
 ):
     """
     Get all notifications for the authenticated user with pagination.
-    Optionally filter by read status.
+    Optionally filter by read status. Pass the returned next_cursor to fetch
+    the following page without an OFFSET scan.
     """
-    return controller.get_user_notifications(current_user, skip, limit, is_read)
+    return controller.get_user_notifications(current_user, skip, limit, is_read, cursor)
 
 # ✅ GET /api/v1/notifications/unread-count - Get unread count
 @router.get("/unread-count", response_model=UnreadCountResponse)
@@ -291,9 +294,40 @@ def send_notification_to_all_users(
     - Send to every user in the system
     - Ideal for maintenance announcements
     - System type by default
+    - **FANOUT** mode writes one notification per user in chunks; set
+      `run_in_background` to return at once and poll the broadcast
+    - **FEED** mode stores a single broadcast that users receive the next
+      time they open their notifications
     """
     return controller.send_notification_to_all_users(broadcast)
 
+@router.get("/admin/broadcasts/{broadcast_id}", response_model=BroadcastProgress)
+def get_broadcast(
+    broadcast_id: int,
+    current_user: User = Depends(is_admin),
+    controller: NotificationAdminController = Depends()
+):
+    """
+    📊 **ADMIN ONLY** - Progress of a broadcast
+    
+    - Users written so far, target and status
+    """
+    return controller.get_broadcast(broadcast_id)
+
+@router.post("/admin/broadcasts/{broadcast_id}/resume", response_model=BroadcastProgress)
+def resume_broadcast(
+    broadcast_id: int,
+    run_in_background: bool = Query(False),
+    current_user: User = Depends(is_admin),
+    controller: NotificationAdminController = Depends()
+):
+    """
+    🔁 **ADMIN ONLY** - Resume an interrupted or failed broadcast
+    
+    - Continues after the last user already written; nobody gets it twice
+    """
+    return controller.resume_broadcast(broadcast_id, run_in_background)
+
 # 4️⃣ Update & Moderation
 
 @router.put("/admin/{notification_id}/read-admin", response_model=NotificationOut)
@@ -348,6 +382,7 @@ def delete_notification_by_admin(
 def delete_old_notifications(
     days: int = Query(30, ge=1, le=365, description="Delete notifications older than X days"),
     confirm: bool = Query(False, description="Set to true to confirm deletion"),
+    archive: bool = Query(False, description="Write deleted notifications to a compressed archive file first"),
     current_user: User = Depends(is_admin),
     controller: NotificationAdminController = Depends()
 ):
@@ -358,5 +393,19 @@ def delete_old_notifications(
     - Remove notifications older than X days
     - Preview mode (confirm=false) shows what would be deleted
     - Confirmation required for actual deletion
+    - Expired monthly partitions are dropped whole; the rest goes in small throttled batches
+    """
+    return controller.delete_old_notifications(days, confirm, archive)
+
+@router.get("/admin/cleanup/status")
+def get_retention_status(
+    current_user: User = Depends(is_admin),
+    controller: NotificationAdminController = Depends()
+):
+    """
+    📦 **ADMIN ONLY** - Notification partitions and retention metrics
+    
+    - Monthly partitions with their date ranges (PostgreSQL)
+    - Rows purged, partitions dropped and rows/second of the last purge
     """
-    return controller.delete_old_notifications(days, confirm)
\ No newline at end of file
+    return controller.get_retention_status()
\ No newline at end of file
@@ -43,22 +43,26 @@ def get_my_orders(
     db: Session = Depends(get_db),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
-    status: Optional[str] = Query(None)
+    status: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page (keyset mode)")
 ):
     """Get all orders for current user"""
     try:
         print(f"📋 Fetching orders for user {current_user.user_id}, page {page}, per_page {per_page}")
         
         controller = OrderController(db)
-        orders = controller.get_user_orders(current_user.user_id, page, per_page)
+        orders = controller.get_user_orders(current_user.user_id, page, per_page, cursor)
         
         print(f"✅ Found {len(orders.get('orders', []))} orders")
         
         return {
             "success": True,
             "message": "Orders retrieved successfully",
-            "data": orders["orders"]
+            "data": orders["orders"],
+            "next_cursor": orders["next_cursor"]
         }
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"🔥 Error in /orders/my route: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -137,15 +141,17 @@ def list_all_orders(
     admin = Depends(is_admin),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
-    status: Optional[str] = Query(None)
+    status: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page (keyset mode)")
 ):
     """Admin: Get all orders"""
     controller = OrderController(db)
-    orders = controller.get_all_orders(page, per_page, status)
+    orders = controller.get_all_orders(page, per_page, status, cursor)
     return {
         "success": True,
         "message": "Orders retrieved successfully",
-        "data": orders["orders"]
+        "data": orders["orders"],
+        "next_cursor": orders["next_cursor"]
     }
 
 @router.patch("/{order_id}/status", response_model=OrderWrapper)
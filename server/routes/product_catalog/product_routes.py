@@ -24,7 +24,7 @@ def list_products(
     brand_ids: Optional[str] = Query(None, description="Filter by Brand IDs (comma-separated list)"), 
     min_price: Optional[float] = Query(None, ge=0, description="Minimum price"),
     max_price: Optional[float] = Query(None, ge=0, description="Maximum price"),
-    sort_by: str = Query("newest", description="Sort by: newest, price_low, price_high, name_asc, name_desc"),
+    sort_by: str = Query("newest", description="Sort by: newest, price_low, price_high, name_asc, name_desc, discount_desc, relevance (with search)"),
     status: str = Query("ACTIVE", description="Filter by status: ACTIVE, INACTIVE, OUT_OF_STOCK"),
     brand: Optional[str] = Query(None, description="Brand name (friendly)"),
     type: Optional[str] = Query(None, description="Category name (friendly)"),
@@ -33,7 +33,8 @@ def list_products(
     search: Optional[str] = Query(None, description="Search products by keyword"),
     has_discount: Optional[bool] = Query(None, description="Filter products with discounts"),
     min_discount_percentage: Optional[float] = Query(None, ge=0, le=100, description="Minimum discount percentage"),
-    discount_type: Optional[str] = Query(None, description="Discount type: PERCENT, FLAT")
+    discount_type: Optional[str] = Query(None, description="Discount type: PERCENT, FLAT"),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page (keyset mode, skips the total count)")
 ):
     """Get all products with advanced filters (Paginated)."""
     
@@ -88,7 +89,8 @@ def list_products(
         search=search,
         has_discount=has_discount,
         min_discount_percentage=min_discount_percentage,
-        discount_type=discount_type
+        discount_type=discount_type,
+        cursor=cursor
     )
     
     return {"success": True, "message": "Products retrieved successfully", "data": products}
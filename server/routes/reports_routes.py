@@ -34,7 +34,7 @@ from schemas.reports_schemas import (
     AdminActivity, NotificationReport,
     
     # Response schemas
-    ReportResponse, ReportExportResponse, ReportType, ReportFormat, DateRange
+    ReportResponse, ReportExportResponse, ReportType, ReportFormat, DateRange, ExportDataset
 )
 from models.user import User
 from config.dependencies import get_db
@@ -545,6 +545,58 @@ def export_report(
             "Content-Disposition": f"attachment; filename={filename}"
         }
     )
+
+@router.get("/export/stream/{dataset}")
+def stream_export(
+    dataset: ExportDataset,
+    format: ReportFormat = Query(ReportFormat.CSV, description="csv, ndjson or json"),
+    gzip: bool = Query(False, description="Gzip-compress the file"),
+    start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
+    current_user: User = Depends(is_admin),
+    controller: ReportsController = Depends()
+):
+    """
+    Export every row of a large report, encoded while it is read from the database
+    """
+    chunks, media_type, extension = controller.stream_export(
+        dataset, format, start_date, end_date, gzip
+    )
+    filename = f"{dataset.value}_report_{datetime.now().date()}.{extension}"
+
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}"
+        }
+    )
+
+# ===== REPORT ROLLUPS =====
+
+@router.get("/rollups/status")
+def get_rollup_status(
+    current_user: User = Depends(is_admin),
+    controller: ReportsController = Depends()
+):
+    """
+    Tracked, stale and last built days of the daily report rollups
+    """
+    return controller.get_rollup_status(current_user)
+
+@router.post("/rollups/rebuild")
+def rebuild_rollups(
+    start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD), default: first day with data"),
+    end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD), default: yesterday"),
+    kind: Optional[str] = Query(None, description="sales, delivery or supplier (default: all)"),
+    current_user: User = Depends(is_admin),
+    controller: ReportsController = Depends()
+):
+    """
+    Rebuild the daily report rollups from raw order, delivery and purchase rows
+    """
+    return controller.rebuild_rollups(start_date, end_date, kind, current_user)
+
 # ===== HEALTH CHECK =====
 
 @router.get("/health")
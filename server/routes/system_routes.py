@@ -159,13 +159,70 @@ def get_failed_operations_summary(
 
 @router.get("/health/api-usage", response_model=ApiUsageOverview)
 def get_api_usage_overview(
+    hours: int = Query(24, ge=1, le=720, description="Hours to look back"),
     current_user: User = Depends(is_admin),
     controller: SystemController = Depends()
 ):
     """
-    Get API usage overview including request counts and response times
+    Get API usage overview including request counts, p50 / p95 / p99 response
+    times per endpoint and the busiest hour of day
     """
-    return controller.get_api_usage_overview(current_user)
+    return controller.get_api_usage_overview(current_user, hours)
+
+@router.get("/health/cache", response_model=Dict[str, Any])
+def get_cache_metrics(
+    current_user: User = Depends(is_admin),
+    controller: SystemController = Depends()
+):
+    """
+    Get response cache backend info and hit/miss rates per cached endpoint
+    """
+    return controller.get_cache_metrics(current_user)
+
+@router.post("/health/cache/clear", response_model=Dict[str, Any])
+def clear_cache(
+    reset_stats: bool = Query(False, description="Also reset hit/miss counters"),
+    current_user: User = Depends(is_admin),
+    controller: SystemController = Depends()
+):
+    """
+    Drop every cached response
+    """
+    return controller.clear_cache(reset_stats, current_user)
+
+@router.get("/health/outbox", response_model=Dict[str, Any])
+def get_outbox_metrics(
+    current_user: User = Depends(is_admin),
+    controller: SystemController = Depends()
+):
+    """
+    Get outbox queue depth, worker throughput and retry / dead-letter counts
+    """
+    return controller.get_outbox_metrics(current_user)
+
+@router.get("/health/outbox/dead", response_model=List[Dict[str, Any]])
+def get_dead_outbox_jobs(
+    kind: Optional[str] = Query(None, description="Only jobs of this kind"),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(is_admin),
+    controller: SystemController = Depends()
+):
+    """
+    Get dead-lettered outbox jobs, newest first
+    """
+    return controller.get_dead_outbox_jobs(kind, limit, current_user)
+
+@router.post("/health/outbox/dead/retry", response_model=Dict[str, Any])
+def retry_dead_outbox_jobs(
+    job_ids: Optional[List[int]] = Query(None, description="Jobs to retry (default: all dead jobs)"),
+    kind: Optional[str] = Query(None, description="Only jobs of this kind"),
+    current_user: User = Depends(is_admin),
+    controller: SystemController = Depends()
+):
+    """
+    Put dead-lettered outbox jobs back in the queue with fresh attempts
+    """
+    return controller.retry_dead_outbox_jobs(job_ids, kind, current_user)
 
 # ===== NOTIFICATION STATUS =====
 
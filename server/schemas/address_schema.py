@@ -13,6 +13,8 @@ class AddressDetail(BaseModel):
     city_name: Optional[str] = None
     state_name: Optional[str] = None
     pincode: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     is_default: bool
     user_id: int
     created_at: datetime
@@ -29,6 +31,8 @@ class AddressBase(BaseModel):
     line1: str
     line2: Optional[str] = None
     area_id: int
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     is_default: bool = False
 
 class AddressCreate(AddressBase):
@@ -39,6 +43,8 @@ class AddressUpdate(BaseModel):
     line1: Optional[str] = None
     line2: Optional[str] = None
     area_id: Optional[int] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     is_default: Optional[bool] = None
 
 class AddressResponse(AddressBase):
@@ -66,6 +72,8 @@ class AreaResponse(BaseModel):
     area_id: int
     area_name: str
     pincode: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     city_id: int
     
     model_config = ConfigDict(from_attributes=True)
@@ -127,6 +127,21 @@ class LocationUpdateResponse(BaseModel):
     longitude: float
 
 
+# Location History (route replay)
+class LocationHistoryPoint(BaseModel):
+    latitude: float
+    longitude: float
+    accuracy: Optional[float] = None
+    recorded_at: datetime
+
+
+class LocationHistoryResponse(BaseModel):
+    delivery_person_id: int
+    since: datetime
+    until: Optional[datetime] = None
+    points: List[LocationHistoryPoint]
+
+
 # Customer Call Response
 class CustomerCallResponse(BaseModel):
     success: bool
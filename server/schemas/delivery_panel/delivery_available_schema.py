@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
+from pydantic import Field
 from datetime import datetime
 
 
@@ -11,6 +12,7 @@ class AvailableDeliveryResponse(BaseModel):
     delivery_address: str
     available_since: datetime
     waiting_time_minutes: float
+    distance_km: Optional[float] = None  # to the drop address, when sorted by distance
 
 
 # class AcceptDeliverySchema(BaseModel):
@@ -25,4 +27,21 @@ class DeliveryActionResponse(BaseModel):
     success: bool
     message: str
     delivery_id: int
-    delivery_person_id: Optional[int] = None
\ No newline at end of file
+    delivery_person_id: Optional[int] = None
+
+
+class ClaimDeliveriesRequest(BaseModel):
+    delivery_ids: List[int] = Field(..., min_length=1, max_length=20)
+
+
+class LostClaim(BaseModel):
+    delivery_id: int
+    reason: str  # not_found, not_available, already_assigned, already_yours
+    assigned_to: Optional[int] = None
+
+
+class ClaimDeliveriesResponse(BaseModel):
+    success: bool
+    delivery_person_id: int
+    claimed: List[int]
+    lost: List[LostClaim]
@@ -159,6 +159,25 @@ class PerformanceMetrics(BaseModel):
     average_delivery_time: float  # in minutes
 
 
+# Composite Dashboard
+class DashboardSectionTiming(BaseModel):
+    section: str
+    status: str  # ok, timeout, error
+    elapsed_ms: float
+    error: Optional[str] = None
+
+
+class DashboardOverviewResponse(BaseModel):
+    stats: Optional[DashboardStats] = None
+    active_deliveries: Optional[ActiveDeliveriesResponse] = None
+    earnings: Optional[EarningsOverviewResponse] = None
+    schedule: Optional[TodayScheduleResponse] = None
+    performance: Optional[PerformanceMetrics] = None
+    partial: bool = False  # some section timed out or failed and is missing
+    sections: List[DashboardSectionTiming] = []
+    generated_at: datetime
+
+
 # General Response
 class DeliveryDashboardResponse(BaseModel):
     success: bool
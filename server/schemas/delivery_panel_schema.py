@@ -238,8 +238,9 @@ class RouteStop(BaseModel):
     address: str
     latitude: Optional[float]
     longitude: Optional[float]
-    distance_from_previous: float
-    estimated_time: str
+    distance_from_previous: Optional[float]  # None when the stop has no coordinates or distance
+    estimated_time: Optional[str]
+    eta: Optional[str] = None
     status: str
 
 
@@ -172,6 +172,7 @@ class DeliveryWrapper(SuccessWrapper):
 
 class DeliveryListWrapper(SuccessWrapper):
     data: List[DeliveryDetail]
+    next_cursor: Optional[str] = None
 
 class DeliveryPersonWrapper(SuccessWrapper):
     data: DeliveryPersonResponse
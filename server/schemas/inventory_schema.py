@@ -299,6 +299,7 @@ class StockMovementListWrapper(BaseModel):
     success: bool
     message: str
     data: List[StockMovementResponse]
+    next_cursor: Optional[str] = None
 
 # --- Stock Summary Schema ---
 class StockSummaryResponse(BaseModel):
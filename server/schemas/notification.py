@@ -50,6 +50,7 @@ class NotificationList(BaseModel):
     notifications: list[NotificationOut]
     total_count: int
     unread_count: int
+    next_cursor: Optional[str] = None
 
 # For unread count
 class UnreadCountResponse(BaseModel):
@@ -20,11 +20,18 @@ class BulkNotificationSend(BaseModel):
     type: NotificationType
     reference_id: Optional[int] = None
 
+class BroadcastMode(str, Enum):
+    FANOUT = "FANOUT"  # one notification row per user, written in chunks
+    FEED = "FEED"      # one broadcast row, copied into each feed when it is read
+
 class NotificationBroadcast(BaseModel):
     title: str
     message: str
     type: NotificationType = NotificationType.SYSTEM
     reference_id: Optional[int] = None
+    mode: BroadcastMode = BroadcastMode.FANOUT
+    run_in_background: bool = False
+    send_email: bool = False  # FANOUT only: feed broadcasts are never emailed
 
 class NotificationUpdateAdmin(BaseModel):
     title: Optional[str] = None
@@ -37,6 +44,24 @@ class DeleteOldNotifications(BaseModel):
     confirm: bool = False
 
 # Response schemas
+class BroadcastProgress(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    broadcast_id: int
+    title: str
+    type: NotificationType
+    mode: BroadcastMode
+    status: str
+    sent_count: int
+    send_email: Optional[bool] = False
+    target_count: Optional[int] = None
+    last_user_id: int
+    max_user_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
 class NotificationStatsResponse(BaseModel):
     total_notifications: int
     total_unread: int
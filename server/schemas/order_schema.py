@@ -94,6 +94,7 @@ class OrderWrapper(SuccessWrapper):
 
 class OrderListWrapper(SuccessWrapper):
     data: List[OrderDetail]
+    next_cursor: Optional[str] = None
 
 class OrderReturnWrapper(SuccessWrapper):
     data: OrderReturnResponse
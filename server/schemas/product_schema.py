@@ -146,10 +146,11 @@ class ProductWithVariantsResponse(BaseModel):
 
 class PaginatedProductsResponse(BaseModel):
     items: List[Dict[str, Any]]
-    total: int
+    total: Optional[int] = None  # Not counted in cursor mode
     page: int
     per_page: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 class ProductSingleCreationResponse(BaseModel):
     product_id: int
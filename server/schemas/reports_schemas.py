@@ -17,9 +17,14 @@ class ReportType(str, Enum):
 class ReportFormat(str, Enum):
     JSON = "json"
     CSV = "csv"
+    NDJSON = "ndjson"
     PDF = "pdf"
     EXCEL = "excel"
 
+class ExportDataset(str, Enum):
+    ORDERS = "orders"
+    ORDER_ITEMS = "order-items"
+
 class TimePeriod(str, Enum):
     DAILY = "daily"
     WEEKLY = "weekly"
@@ -125,13 +125,22 @@ class ApiEndpointUsage(BaseModel):
     method: str
     request_count: int
     avg_response_time: float
+    p50_response_time: float = 0
+    p95_response_time: float = 0
+    p99_response_time: float = 0
     error_rate: float
+    client_error_rate: float = 0
+    avg_request_bytes: int = 0
+    avg_response_bytes: int = 0
 
 class ApiUsageOverview(BaseModel):
     total_requests: int
     endpoints: List[ApiEndpointUsage]
     peak_hour: str
+    peak_hour_requests: int = 0
     avg_response_time: float
+    p95_response_time: float = 0
+    hours: int = 24
 
 # ===== NOTIFICATION STATUS =====
 class NotificationStatus(BaseModel):
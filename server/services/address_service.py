@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from repositories.address_repository import AddressRepository
 from schemas.address_schema import AddressCreate
+from utils.cache import cached, TAG_ADDRESS_HIERARCHY
 from typing import List, Dict, Any
 
 class AddressService:
@@ -31,6 +32,8 @@ class AddressService:
             "area_id": area.area_id,
             "area_name": area.area_name,
             "pincode": area.pincode,
+            "latitude": area.latitude,
+            "longitude": area.longitude,
             "city_id": area.city_id
         }
     
@@ -46,16 +49,20 @@ class AddressService:
             "city_name": address.area.city.city_name if address.area and address.area.city else None,
             "state_name": address.area.city.state.state_name if address.area and address.area.city and address.area.city.state else None,
             "pincode": address.area.pincode if address.area else None,
+            "latitude": address.latitude,
+            "longitude": address.longitude,
             "is_default": address.is_default,
             "user_id": address.user_id,
             "created_at": address.created_at
         }
     
+    @cached("address.states", ttl=3600, tags=(TAG_ADDRESS_HIERARCHY,))
     def get_all_states(self) -> List[Dict[str, Any]]:
         """Get all states"""
         states = self.repository.get_all_states(self.db)
         return [self.serialize_state(state) for state in states]
     
+    @cached("address.cities", ttl=3600, tags=(TAG_ADDRESS_HIERARCHY,))
     def get_cities_by_state(self, state_id: int) -> List[Dict[str, Any]]:
         """Get cities by state ID"""
         state = self.repository.get_state_by_id(self.db, state_id)
@@ -65,6 +72,7 @@ class AddressService:
         cities = self.repository.get_cities_by_state(self.db, state_id)
         return [self.serialize_city(city) for city in cities]
     
+    @cached("address.areas", ttl=3600, tags=(TAG_ADDRESS_HIERARCHY,))
     def get_areas_by_city(self, city_id: int) -> List[Dict[str, Any]]:
         """Get areas by city ID"""
         city = self.repository.get_city_by_id(self.db, city_id)
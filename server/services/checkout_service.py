@@ -1,8 +1,12 @@
 from sqlalchemy.orm import Session
 from decimal import Decimal
+from datetime import datetime
 from repositories.checkout_repository import CheckoutRepository
+from repositories.outbox_repository import OutboxRepository, JOB_ORDER_CONFIRMATION_EMAIL
+from services.inventory.stock_reservation_service import StockReservationService
 from models.order.order import Order
 from models.order.order_item import OrderItem
+from models.order.order_history import OrderHistory
 
 class CheckoutService:
 
@@ -67,7 +71,8 @@ class CheckoutService:
         }
 
     @staticmethod
-    def confirm_order(db: Session, user_id: int, data):
+    def confirm_order(db: Session, user_id: int, data) -> int:
+        """Turn the cart into an order and return its order_id"""
         summary = CheckoutService.generate_checkout_summary(
             db,
             user_id,
@@ -75,6 +80,23 @@ class CheckoutService:
             data.coupon_code
         )
 
+        try:
+            return CheckoutService._place_order(db, user_id, data, summary)
+        except Exception:
+            db.rollback()
+            raise
+
+    @staticmethod
+    def _place_order(db: Session, user_id: int, data, summary: dict):
+        # Lock, validate and take stock for every line at once (see StockReservationService)
+        stock = StockReservationService(db)
+        quantities = stock.merge_quantities(
+            (item["variant_id"], item["quantity"]) for item in summary["items"]
+        )
+        stock.lock(quantities)
+        stock.reserve(quantities)
+
+        placed_at = datetime.now()
         order = Order(
             user_id=user_id,
             address_id=data.address_id,
@@ -86,18 +108,27 @@ class CheckoutService:
             coupon_code=data.coupon_code,
             payment_status="PENDING",
             order_status="PLACED",
+            placed_at=placed_at,
+            histories=[OrderHistory(status="PLACED", updated_by=user_id, updated_at=placed_at)],
         )
 
-        # OrderItems
+        # OrderItems, one per variant (order_item is keyed by order + variant)
+        prices = {item["variant_id"]: item["price"] for item in summary["items"]}
         order_items = []
-        for item in summary["items"]:
+        for variant_id, quantity in quantities.items():
             order_items.append(
                 OrderItem(
-                    variant_id=item["variant_id"],
-                    quantity=item["quantity"],
-                    price=item["price"],
-                    total=item["total"],
+                    variant_id=variant_id,
+                    quantity=quantity,
+                    price=prices[variant_id],
+                    total=prices[variant_id] * quantity,
                 )
             )
 
-        return CheckoutRepository.create_order(db, order, order_items)
+        order = CheckoutRepository.create_order(db, order, order_items)
+        stock.record_movements(quantities, order.order_id)
+        order_id = order.order_id  # read before commit expires the instance
+        # Confirmation email commits (or rolls back) together with the order
+        OutboxRepository.enqueue(db, JOB_ORDER_CONFIRMATION_EMAIL, reference_id=order_id)
+        db.commit()
+        return order_id
@@ -1,11 +1,14 @@
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from repositories.delivery_admin_repository import DeliveryAdminRepository
+from repositories.delivery_panel.delivery_event_repository import DeliveryEventRepository
+from services.delivery_panel.delivery_dispatch_service import DeliveryDispatchService
 from models.delivery.delivery import Delivery
 from models.delivery.delivery_person import DeliveryPerson
 from models.order.order import Order
 from models.user import User
 from models.notification import Notification
+from utils.event_hub import DELIVERY_RELEASED
 from datetime import datetime, timedelta
 from sqlalchemy import func, text
 import json
@@ -108,6 +111,18 @@ class DeliveryAdminService:
                 customer_name = f"{order.customer.first_name} {order.customer.last_name}"
                 delivery_address = order.shipping_address or ""
             
+            # Offer to the nearest online riders first; broadcast only when none is located nearby
+            dispatch = DeliveryDispatchService(self.db).offer_delivery(delivery.delivery_id)
+            if dispatch["success"]:
+                return {
+                    "success": True,
+                    "message": "Delivery created and offered to nearest riders",
+                    "delivery_id": delivery.delivery_id,
+                    "notifications_sent": dispatch["notifications_sent"],
+                    "delivery_persons_notified": len(dispatch["offered_to"]),
+                    "offered_to": dispatch["offered_to"]
+                }
+            
             # Auto-send notifications to all available delivery persons
             available_persons = self.getAvailableDeliveryPersons()
             notifications_sent = []
@@ -281,6 +296,10 @@ class DeliveryAdminService:
             self.db.rollback()
             raise HTTPException(500, f"Failed to send notification: {str(e)}")
     
+    def dispatchDelivery(self, delivery_id):
+        """Admin (re)offers a pool delivery to the nearest riders not yet offered it"""
+        return DeliveryDispatchService(self.db).offer_delivery(delivery_id)
+    
     def cancelDeliveryAdmin(self, delivery_id):
         """Admin cancels delivery (makes it available again)"""
         try:
@@ -293,17 +312,24 @@ class DeliveryAdminService:
                 raise HTTPException(404, "Delivery not found")
             
             # Make delivery available again
+            audience = DeliveryEventRepository.get_audience(self.db, [delivery_id])
             delivery.status = "AVAILABLE"
             delivery.is_available = True
             delivery.delivery_person_id = None
             delivery.available_since = datetime.utcnow()
+            DeliveryEventRepository.stage_events(
+                self.db, DELIVERY_RELEASED, audience, roles=("delivery",), status="AVAILABLE", delivery_person_id=None
+            )
             
             self.db.commit()
             
+            dispatch = DeliveryDispatchService(self.db).offer_delivery(delivery_id)
+            
             return {
                 "success": True,
                 "message": "Delivery cancelled and made available again",
-                "delivery_id": delivery_id
+                "delivery_id": delivery_id,
+                "offered_to": dispatch["offered_to"]
             }
             
         except Exception as e:
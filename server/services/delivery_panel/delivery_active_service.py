@@ -10,8 +10,10 @@ from schemas.delivery_panel.delivery_active_schema import (
     DeliveryAddress, OrderInfo, DeliveryResponse, StatusUpdateRequest,
     LocationUpdateResponse, CustomerCallResponse, NavigationDataResponse,
     SuccessResponse, DeliveryStatistics, DeliveryStatus, PaymentType,
-    StatusTransitionResponse, ProgressUpdateRequest
+    StatusTransitionResponse, ProgressUpdateRequest, LocationHistoryResponse,
+    LocationHistoryPoint
 )
+from repositories.delivery_panel.delivery_location_repository import DeliveryLocationRepository
 
 from models.delivery.delivery import Delivery as DeliveryModel
 from models.delivery.delivery_person import DeliveryPerson
@@ -290,6 +292,21 @@ class DeliveryActiveService:
                 longitude=longitude
             )
     
+    def get_location_history(
+        self,
+        delivery_person_id: int,
+        since: datetime,
+        until: Optional[datetime] = None
+    ) -> LocationHistoryResponse:
+        """Recorded positions of the delivery person for route replay"""
+        points = DeliveryLocationRepository.get_location_history(self.db, delivery_person_id, since, until)
+        return LocationHistoryResponse(
+            delivery_person_id=delivery_person_id,
+            since=since,
+            until=until,
+            points=[LocationHistoryPoint(**point) for point in points]
+        )
+    
     # ===== CUSTOMER CALL =====
     
     def get_customer_contact_info(
@@ -1,183 +1,155 @@
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from datetime import datetime
+from datetime import datetime, timezone
+
+from repositories.delivery_panel.delivery_available_repository import DeliveryAvailableRepository
+from repositories.delivery_panel.delivery_location_repository import DeliveryLocationRepository
+from utils.available_feed import available_feed
+from utils.route_planner import haversine_km
 
 
 class DeliveryAvailableService:
 
     def __init__(self, db: Session):
         self.db = db
+        self.repository = DeliveryAvailableRepository()
 
-    def fetchAvailableDeliveries(self):
+    def fetchAvailableDeliveries(self, delivery_person_id=None, sort="time"):
         """Fetch available deliveries for delivery person"""
+        return self.fetchAvailableFeed(delivery_person_id, sort)["deliveries"]
+
+    def fetchAvailableFeed(self, delivery_person_id=None, sort="time", if_none_match=None, since=None):
+        """
+        Available deliveries from the shared pool snapshot.
+
+        not_modified is set (and deliveries left empty) when the client's
+        If-None-Match etag or since timestamp shows it already has this feed, so
+        idle polls are answered without a database query.
+        """
+        position = None
+        if sort == "distance" and delivery_person_id is not None:
+            location = DeliveryLocationRepository.get_current_location(self.db, delivery_person_id)
+            try:
+                position = (float(location["lat"]), float(location["lng"]))
+            except (KeyError, TypeError, ValueError):
+                position = None
+
         try:
-            results = self.db.execute(
-                text("""
-                SELECT 
-                    d.delivery_id,
-                    d.order_id,
-                    d.status,
-                    d.available_since,
-                    d.assigned_at
-                FROM delivery d
-                WHERE d.status = 'AVAILABLE'
-                  AND d.is_available = true
-                ORDER BY d.available_since ASC
-                """)
-            ).fetchall()
-            
-            deliveries = []
-            for row in results:
-                delivery_id, order_id, status, available_since, assigned_at = row
-                
-                # Get customer details
-                order_result = self.db.execute(
-                    text("""
-                    SELECT 
-                        u.first_name,
-                        u.last_name,
-                        o.address_id
-                    FROM "order" o
-                    JOIN "user" u ON o.user_id = u.user_id
-                    WHERE o.order_id = :order_id
-                    """),
-                    {"order_id": order_id}
-                ).fetchone()
-                
-                if order_result:
-                    customer_name = f"{order_result[0]} {order_result[1]}"
-                    address_id = order_result[2]
-                    
-                    # Get address details
-                    if address_id:
-                        address_result = self.db.execute(
-                            text("""
-                            SELECT 
-                                a.line1,
-                                a.line2,
-                                ar.area_name,
-                                c.city_name,
-                                s.state_name
-                            FROM address a
-                            JOIN area ar ON a.area_id = ar.area_id
-                            JOIN city c ON ar.city_id = c.city_id
-                            JOIN state s ON c.state_id = s.state_id
-                            WHERE a.address_id = :address_id
-                            """),
-                            {"address_id": address_id}
-                        ).fetchone()
-                        
-                        if address_result:
-                            # Build address string
-                            parts = []
-                            if address_result[0]:
-                                parts.append(address_result[0])
-                            if address_result[1]:
-                                parts.append(address_result[1])
-                            if address_result[2]:
-                                parts.append(f"{address_result[2]}")
-                            if address_result[3]:
-                                parts.append(f"{address_result[3]}")
-                            if address_result[4]:
-                                parts.append(f"{address_result[4]}")
-                            
-                            delivery_address = ", ".join(parts) if parts else "Address not available"
-                        else:
-                            delivery_address = "Address not available"
-                    else:
-                        delivery_address = "No address specified"
-                else:
-                    customer_name = "Customer"
-                    delivery_address = "Address not available"
-                
-                deliveries.append({
-                    "delivery_id": delivery_id,
-                    "order_id": order_id,  # INTEGER
-                    "status": status,
-                    "customer_name": customer_name,
-                    "delivery_address": delivery_address,
-                    "available_since": available_since,
-                    "waiting_time_minutes": (
-                        (datetime.utcnow() - available_since).total_seconds() / 60
-                        if available_since else 0
-                    )
-                })
-            
-            return deliveries
-            
+            pool, etag, changed_at = available_feed.get(lambda: self.repository.get_available_deliveries(self.db))
         except Exception as e:
             print(f"Error fetching available deliveries: {e}")
-            return []
+            return {"deliveries": [], "etag": None, "changed_at": None, "not_modified": False}
+
+        # Distance order depends on where the rider is, so it is part of the tag (~1 km grid)
+        if position is not None:
+            etag = f'{etag[:-1]}@{position[0]:.2f},{position[1]:.2f}"'
+
+        if self._is_current(etag, changed_at, if_none_match, since):
+            return {"deliveries": [], "etag": etag, "changed_at": changed_at, "not_modified": True}
+
+        now = datetime.utcnow()
+        deliveries = []
+        for row in pool:
+            distance_km = None
+            if position is not None and row["latitude"] is not None and row["longitude"] is not None:
+                distance_km = round(haversine_km(position[0], position[1], row["latitude"], row["longitude"]), 2)
+            deliveries.append({
+                "delivery_id": row["delivery_id"],
+                "order_id": row["order_id"],  # INTEGER
+                "status": row["status"],
+                "customer_name": row["customer_name"],
+                "delivery_address": row["delivery_address"],
+                "available_since": row["available_since"],
+                "waiting_time_minutes": (
+                    (now - row["available_since"]).total_seconds() / 60
+                    if row["available_since"] else 0
+                ),
+                "distance_km": distance_km
+            })
+
+        if position is not None:
+            # Deliveries without coordinates go last, oldest first (sort is stable)
+            deliveries.sort(key=lambda delivery: (delivery["distance_km"] is None, delivery["distance_km"] or 0))
+
+        return {"deliveries": deliveries, "etag": etag, "changed_at": changed_at, "not_modified": False}
+
+    @staticmethod
+    def _is_current(etag, changed_at, if_none_match, since):
+        if if_none_match:
+            tags = {tag.strip() for tag in if_none_match.split(",")}
+            return "*" in tags or etag in tags or f"W/{etag}" in tags
+        if since is not None and changed_at is not None:
+            if since.tzinfo is not None:
+                since = since.astimezone(timezone.utc).replace(tzinfo=None)
+            return changed_at <= since
+        return False
 
     def assignDeliveryToPerson(self, delivery_id, delivery_person_id):
-        """Assign delivery to delivery person with transaction lock"""
-        try:
-            # Start transaction with row lock
-            self.db.execute(text("BEGIN"))
-            
-            # Check if delivery is still available (with lock)
-            result = self.db.execute(
-                text("""
-                SELECT status, is_available, delivery_person_id 
-                FROM delivery 
-                WHERE delivery_id = :delivery_id 
-                FOR UPDATE
-                """),
-                {"delivery_id": delivery_id}
-            ).fetchone()
-            
-            if not result:
-                self.db.execute(text("ROLLBACK"))
-                raise HTTPException(404, "Delivery not found")
-            
-            status, is_available, current_person_id = result
-            
-            # Check if already assigned
-            if current_person_id:
-                self.db.execute(text("ROLLBACK"))
-                return {
-                    "success": False,
-                    "message": "Delivery already assigned to another person",
-                    "assigned_to": current_person_id
-                }
-            
-            if status != "AVAILABLE" or not is_available:
-                self.db.execute(text("ROLLBACK"))
-                return {
-                    "success": False,
-                    "message": "Delivery is no longer available"
-                }
-            
-            # Assign delivery
-            self.db.execute(
-                text("""
-                UPDATE delivery 
-                SET delivery_person_id = :dp_id,
-                    status = 'ASSIGNED',
-                    is_available = false,
-                    assigned_at = :now
-                WHERE delivery_id = :delivery_id
-                """),
-                {
-                    "dp_id": delivery_person_id,
-                    "delivery_id": delivery_id,
-                    "now": datetime.utcnow()
-                }
-            )
-            
-            self.db.execute(text("COMMIT"))
-            
+        """Assign delivery to delivery person; only one concurrent claim can win"""
+        result = self.claimDeliveries([delivery_id], delivery_person_id)
+        
+        if result["claimed"]:
             return {
                 "success": True,
                 "message": "Delivery accepted successfully",
                 "delivery_id": delivery_id,
                 "delivery_person_id": delivery_person_id
             }
-            
+        
+        lost = result["lost"][0]
+        if lost["reason"] == "not_found":
+            raise HTTPException(404, "Delivery not found")
+        if lost["reason"] == "already_yours":
+            return {
+                "success": False,
+                "message": "Delivery already accepted by you",
+                "assigned_to": lost["assigned_to"]
+            }
+        if lost["reason"] == "already_assigned":
+            return {
+                "success": False,
+                "message": "Delivery already assigned to another person",
+                "assigned_to": lost["assigned_to"]
+            }
+        return {
+            "success": False,
+            "message": "Delivery is no longer available"
+        }
+
+    def claimDeliveries(self, delivery_ids, delivery_person_id):
+        """Claim several pool deliveries at once; reports which were won and which were lost"""
+        delivery_ids = list(dict.fromkeys(delivery_ids))
+        try:
+            won = self.repository.claim_deliveries(self.db, delivery_ids, delivery_person_id)
+            self.db.commit()
         except Exception as e:
-            self.db.execute(text("ROLLBACK"))
+            self.db.rollback()
             raise HTTPException(500, f"Failed to accept delivery: {str(e)}")
+        
+        won_ids = set(won)
+        lost_ids = [delivery_id for delivery_id in delivery_ids if delivery_id not in won_ids]
+        lost = []
+        if lost_ids:
+            states = self.repository.get_claim_states(self.db, lost_ids)
+            for delivery_id in lost_ids:
+                status, assigned_to = states.get(delivery_id, (None, None))
+                if status is None:
+                    reason = "not_found"
+                elif assigned_to == delivery_person_id:
+                    reason = "already_yours"
+                elif assigned_to:
+                    reason = "already_assigned"
+                else:
+                    reason = "not_available"
+                lost.append({"delivery_id": delivery_id, "reason": reason, "assigned_to": assigned_to})
+        
+        return {
+            "success": bool(won),
+            "delivery_person_id": delivery_person_id,
+            "claimed": won,
+            "lost": lost
+        }
 
     def cancelDelivery(self, delivery_id, delivery_person_id):
         """Cancel delivery by delivery person"""
@@ -214,23 +186,8 @@ class DeliveryAvailableService:
                     "message": f"Cannot cancel delivery with status: {status}"
                 }
             
-            # Cancel and make available again
-            self.db.execute(
-                text("""
-                UPDATE delivery 
-                SET status = 'AVAILABLE',
-                    is_available = true,
-                    delivery_person_id = NULL,
-                    available_since = :now
-                WHERE delivery_id = :delivery_id
-                """),
-                {
-                    "delivery_id": delivery_id,
-                    "now": datetime.utcnow()
-                }
-            )
-            
-            self.db.execute(text("COMMIT"))
+            # Cancel and make available again (commits, then tells the pool it is back)
+            self.repository.cancel_delivery(self.db, delivery_id)
             
             return {
                 "success": True,
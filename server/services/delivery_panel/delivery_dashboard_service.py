@@ -6,11 +6,15 @@ from schemas.delivery_panel.delivery_dashboard_schema import (
     EarningsOverviewResponse, EarningsPeriod, TodayScheduleResponse,
     Shift, NextDelivery, NavigationResponse, PerformanceMetrics,
     DeliveryDashboardResponse, DeliveryStatus, QRVerifyRequest,
-    IssueReportRequest, PODUploadRequest, StatusUpdateRequest
+    IssueReportRequest, PODUploadRequest, StatusUpdateRequest,
+    DashboardOverviewResponse, DashboardSectionTiming
 )
-from datetime import datetime
+from datetime import datetime, date
 import json
 
+from config.database import SessionLocal
+from utils.section_loader import load_sections, SECTION_TIMEOUT_SECONDS
+
 from models.delivery.delivery import Delivery
 from models.order.order import Order
 
@@ -32,6 +36,10 @@ class DeliveryDashboardService:
     def get_active_deliveries(self, delivery_person_id: int) -> ActiveDeliveriesResponse:
         """Get active deliveries"""
         orders_data = self.repository.get_active_deliveries(self.db, delivery_person_id)
+        return self._active_deliveries_response(orders_data)
+    
+    @staticmethod
+    def _active_deliveries_response(orders_data: List[Dict[str, Any]]) -> ActiveDeliveriesResponse:
         orders = [DeliveryOrder(**order) for order in orders_data]
         return ActiveDeliveriesResponse(active_orders=orders)
     
@@ -40,6 +48,10 @@ class DeliveryDashboardService:
     def get_earnings_overview(self, delivery_person_id: int) -> EarningsOverviewResponse:
         """Get earnings overview"""
         earnings_data = self.repository.get_earnings_overview(self.db, delivery_person_id)
+        return self._earnings_response(earnings_data)
+    
+    @staticmethod
+    def _earnings_response(earnings_data: Dict[str, Any]) -> EarningsOverviewResponse:
         periods = [EarningsPeriod(**period) for period in earnings_data["periods"]]
         return EarningsOverviewResponse(
             periods=periods,
@@ -51,7 +63,10 @@ class DeliveryDashboardService:
     def get_today_schedule(self, delivery_person_id: int) -> TodayScheduleResponse:
         """Get today's schedule"""
         schedule_data = self.repository.get_today_schedule(self.db, delivery_person_id)
-        
+        return self._schedule_response(schedule_data)
+    
+    @staticmethod
+    def _schedule_response(schedule_data: Dict[str, Any]) -> TodayScheduleResponse:
         shifts = [Shift(**shift) for shift in schedule_data["upcoming_shifts"]]
         next_delivery = NextDelivery(**schedule_data["next_delivery"])
         
@@ -61,6 +76,60 @@ class DeliveryDashboardService:
             next_delivery=next_delivery
         )
     
+    # ===== COMPOSITE DASHBOARD =====
+    
+    def get_dashboard_overview(
+        self,
+        delivery_person_id: int,
+        timeout: float = SECTION_TIMEOUT_SECONDS
+    ) -> DashboardOverviewResponse:
+        """
+        Every dashboard section in one response.
+        
+        Today's delivery set is read once and feeds both the stats and the schedule;
+        the other sections load concurrently, each on its own session. Sections that
+        miss the timeout are left out and the response is marked partial.
+        """
+        repository = self.repository
+        today = date.today()
+        
+        def load_today(db: Session) -> Dict[str, Any]:
+            deliveries = repository.get_dashboard_deliveries(db, delivery_person_id, today)
+            return {
+                "deliveries": deliveries,
+                "rating_summary": repository.get_rating_summary(db, delivery_person_id),
+                "schedule": repository.build_today_schedule(deliveries, today)
+            }
+        
+        results, timings = load_sections({
+            "today": load_today,
+            "active_deliveries": lambda db: repository.get_active_deliveries(db, delivery_person_id),
+            "earnings": lambda db: repository.get_earnings_overview(db, delivery_person_id),
+            "performance": lambda db: repository.get_performance_metrics(db, delivery_person_id)
+        }, SessionLocal, timeout)
+        
+        overview = DashboardOverviewResponse(
+            sections=[DashboardSectionTiming(**timing) for timing in timings],
+            generated_at=datetime.now()
+        )
+        if "today" in results:
+            overview.schedule = self._schedule_response(results["today"]["schedule"])
+            # Stats take today's earnings from the earnings section rather than re-summing them
+            if "earnings" in results:
+                rating, total_reviews = results["today"]["rating_summary"]
+                overview.stats = DashboardStats(**repository.build_dashboard_stats(
+                    results["today"]["deliveries"], today,
+                    results["earnings"]["periods"][0]["amount"], rating, total_reviews
+                ))
+        if "active_deliveries" in results:
+            overview.active_deliveries = self._active_deliveries_response(results["active_deliveries"])
+        if "earnings" in results:
+            overview.earnings = self._earnings_response(results["earnings"])
+        if "performance" in results:
+            overview.performance = PerformanceMetrics(**results["performance"])
+        overview.partial = len(results) < len(timings)
+        return overview
+    
     # ===== DELIVERY STATUS UPDATES =====
     
     def update_delivery_status(
@@ -0,0 +1,147 @@
+import os
+import time
+import threading
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional
+
+from repositories.delivery_panel.delivery_dispatch_repository import DeliveryDispatchRepository
+from utils.location_buffer import location_buffer
+from utils.rider_index import rider_index
+
+# Riders offered each new delivery, and how far away a rider may be to get an offer
+DISPATCH_OFFER_COUNT = int(os.getenv("DISPATCH_OFFER_COUNT", "3"))
+DISPATCH_MAX_KM = float(os.getenv("DISPATCH_MAX_KM", "15"))
+# Seconds before the rider index is reloaded from the database, to pick up riders
+# moved, brought online or taken offline through other workers
+DISPATCH_INDEX_REFRESH_SECONDS = float(os.getenv("DISPATCH_INDEX_REFRESH_SECONDS", "60"))
+
+_index_loaded_at: Optional[float] = None
+_index_load_lock = threading.Lock()
+
+
+class DeliveryDispatchService:
+    """
+    Push dispatch: offer pool deliveries to the nearest online riders.
+
+    The rider index lives in this process and is filled from the database on
+    first use, then follows committed rider changes of this process (see
+    register_dispatch_listeners) and is reloaded every
+    DISPATCH_INDEX_REFRESH_SECONDS for changes made by other workers. Riders it
+    picks are re-checked against the database before they get an offer. Riders
+    in a delivery's rejected_by, or already in offered_to, are never offered it
+    again.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repository = DeliveryDispatchRepository
+
+    def ensure_index_loaded(self) -> None:
+        """Load the rider index on first use and reload it once it is older than
+        DISPATCH_INDEX_REFRESH_SECONDS; only the first load makes callers wait"""
+        global _index_loaded_at
+        loaded_at = _index_loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < DISPATCH_INDEX_REFRESH_SECONDS:
+            return
+        if not _index_load_lock.acquire(blocking=loaded_at is None):
+            return  # another request is refreshing; the current index is good enough meanwhile
+        try:
+            if _index_loaded_at is not None and time.monotonic() - _index_loaded_at < DISPATCH_INDEX_REFRESH_SECONDS:
+                return
+            riders = self.repository.get_dispatchable_riders(self.db)
+            # The database lags this process's own pings by up to a flush interval
+            fresh = location_buffer.latest_many([rider[0] for rider in riders])
+            rider_index.replace_all(
+                (rider_id, fresh[rider_id].latitude, fresh[rider_id].longitude) if rider_id in fresh else (rider_id, lat, lng)
+                for rider_id, lat, lng in riders
+            )
+            if _index_loaded_at is None:
+                print(f"✅ Rider index loaded ({len(riders)} online riders)")
+            _index_loaded_at = time.monotonic()
+        finally:
+            _index_load_lock.release()
+
+    def find_nearest_riders(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int = DISPATCH_OFFER_COUNT,
+        exclude: Optional[set] = None
+    ) -> List[Dict[str, Any]]:
+        """Up to k nearest riders that the database still shows online and active"""
+        self.ensure_index_loaded()
+        exclude = set(exclude or ())
+        found = []
+        while len(found) < k:
+            candidates = rider_index.nearest(latitude, longitude, k - len(found), exclude=exclude, max_km=DISPATCH_MAX_KM)
+            if not candidates:
+                break
+            dispatchable = self.repository.get_dispatchable_ids(self.db, [rider_id for rider_id, _ in candidates])
+            for delivery_person_id, distance in candidates:
+                exclude.add(delivery_person_id)
+                if delivery_person_id in dispatchable:
+                    found.append({"delivery_person_id": delivery_person_id, "distance_km": round(distance, 2)})
+                else:
+                    # Went offline or inactive through another worker
+                    rider_index.remove(delivery_person_id)
+        return found
+
+    def offer_delivery(self, delivery_id: int, k: int = DISPATCH_OFFER_COUNT) -> Dict[str, Any]:
+        """Offer a pool delivery to the k nearest riders it has not been offered to yet"""
+        try:
+            delivery = self.repository.get_available_delivery(self.db, delivery_id)
+            if not delivery:
+                raise HTTPException(404, "Delivery not found in the available pool")
+
+            latitude, longitude = self.repository.get_pickup_point(self.db, delivery)
+            exclude = set(delivery.rejected_by or []) | set(delivery.offered_to or [])
+            riders = self.find_nearest_riders(latitude, longitude, k, exclude)
+
+            notified = 0
+            if riders:
+                notified = self.repository.record_offer(
+                    self.db, delivery, [rider["delivery_person_id"] for rider in riders]
+                )
+            self.db.commit()
+
+            return {
+                "success": bool(riders),
+                "message": f"Delivery offered to {len(riders)} nearby riders" if riders else "No eligible rider nearby",
+                "delivery_id": delivery_id,
+                "offered_to": riders,
+                "notifications_sent": notified
+            }
+
+        except HTTPException:
+            self.db.rollback()
+            raise
+        except Exception as e:
+            self.db.rollback()
+            raise HTTPException(500, f"Failed to dispatch delivery: {str(e)}")
+
+    def reject_offer(self, delivery_id: int, delivery_person_id: int) -> Dict[str, Any]:
+        """Rider declines an offer; the delivery moves on to the next nearest rider"""
+        try:
+            delivery = self.repository.get_available_delivery(self.db, delivery_id)
+            if not delivery:
+                raise HTTPException(404, "Delivery not found in the available pool")
+            if delivery_person_id not in (delivery.offered_to or []):
+                raise HTTPException(403, "Delivery was not offered to this delivery person")
+
+            self.repository.record_rejection(self.db, delivery, delivery_person_id)
+            self.db.commit()
+        except HTTPException:
+            self.db.rollback()
+            raise
+        except Exception as e:
+            self.db.rollback()
+            raise HTTPException(500, f"Failed to reject delivery: {str(e)}")
+
+        next_offer = self.offer_delivery(delivery_id, k=1)
+        return {
+            "success": True,
+            "message": "Delivery offer rejected",
+            "delivery_id": delivery_id,
+            "reoffered_to": next_offer["offered_to"]
+        }
@@ -9,6 +9,7 @@ from sqlalchemy import func
 from repositories.delivery_panel.delivery_earnings_repository import DeliveryEarningsRepository
 from models.delivery.delivery_earnings import DeliveryEarnings
 from models.delivery.delivery import Delivery
+from utils.date_range import between_days
 
 # Import schemas
 from schemas.delivery_panel.delivery_earnings_schema import (
@@ -573,8 +574,7 @@ class DeliveryEarningsService:
                 func.coalesce(func.sum(DeliveryEarnings.amount), 0)
             ).join(Delivery).filter(
                 Delivery.delivery_person_id == delivery_person_id,
-                func.date(DeliveryEarnings.earned_at) >= start_date,
-                func.date(DeliveryEarnings.earned_at) <= end_date
+                between_days(DeliveryEarnings.earned_at, start_date, end_date)
             )
             
             earnings = float(query.scalar() or 0)
@@ -582,8 +582,7 @@ class DeliveryEarningsService:
             # Get deliveries for period
             deliveries = self.db.query(Delivery).filter(
                 Delivery.delivery_person_id == delivery_person_id,
-                func.date(Delivery.delivered_at) >= start_date,
-                func.date(Delivery.delivered_at) <= end_date,
+                between_days(Delivery.delivered_at, start_date, end_date),
                 Delivery.status == "DELIVERED"
             ).count()
             
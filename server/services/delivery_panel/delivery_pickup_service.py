@@ -12,6 +12,7 @@ from schemas.delivery_panel.delivery_pickup_schema import (
 )
 from models.delivery.delivery import Delivery
 from models.order.order import Order
+from utils.route_planner import plan_route, travel_minutes
 
 
 class DeliveryPickupService:
@@ -426,22 +427,30 @@ class DeliveryPickupService:
         if not pickups_data:
             return []
         
-        # Sort by distance (simple optimization)
-        pickups_with_distance = []
-        for pickup in pickups_data:
-            distance_info = pickup.get("distance_info", {})
-            distance_km = distance_info.get("distance_km", 999)
-            pickups_with_distance.append((pickup, distance_km))
-        
-        # Sort by distance
-        pickups_with_distance.sort(key=lambda x: x[1])
+        # Plan the visiting order from the rider's position over the pickup coordinates,
+        # keeping expected pickup times as deadlines
+        start = self.repository.get_current_coordinates(self.db, delivery_person_id)
+        plan = plan_route(
+            [
+                {
+                    "latitude": pickup["pickup_location"]["latitude"],
+                    "longitude": pickup["pickup_location"]["longitude"],
+                    "deadline": pickup.get("expected_pickup_time")
+                }
+                for pickup in pickups_data
+            ],
+            start=start
+        )
         
         # Build route with sequence
         route = []
         sequence = 1
         
-        for pickup_data, distance in pickups_with_distance:
+        for position, index in enumerate(plan["order"]):
+            pickup_data = pickups_data[index]
             location = pickup_data["pickup_location"]
+            distance = plan["legs_km"][position]
+            eta = plan["etas"][position]
             
             route_point = {
                 "sequence": sequence,
@@ -449,8 +458,9 @@ class DeliveryPickupService:
                 "order_id": pickup_data["order_id"],
                 "location_name": location["name"],
                 "address": f"{location['address_line1']}, {location['area_name']}",
-                "distance_km": distance,
-                "estimated_minutes": pickup_data.get("distance_info", {}).get("estimated_minutes", 15),
+                "distance_km": round(distance, 2),
+                "estimated_minutes": int(round(travel_minutes(distance))),
+                "eta": eta.strftime("%I:%M %p"),
                 "vendor_name": pickup_data["vendor"]["vendor_name"],
                 "items_count": pickup_data["total_items"],
                 "priority": pickup_data["priority"]
@@ -4,6 +4,7 @@ from fastapi import HTTPException, status
 from repositories.delivery_person_repository import DeliveryPersonRepository
 from repositories.user_repository import UserRepository
 from schemas.delivery_schema import DeliveryPersonCreate
+from config.dependencies import invalidate_principal
 from typing import Dict, Any
 
 class DeliveryPersonService:
@@ -39,6 +40,7 @@ class DeliveryPersonService:
         }
         
         delivery_person = self.repository.create_delivery_person(self.db, delivery_person_data)
+        invalidate_principal(delivery_data.user_id)
         return self._serialize_delivery_person(delivery_person)
     
     def get_all_delivery_persons(self, page: int = 1, per_page: int = 20, status: str = None) -> Dict[str, Any]:
@@ -82,6 +84,7 @@ class DeliveryPersonService:
                 detail="Delivery person not found"
             )
         
+        invalidate_principal(delivery_person.user_id)
         return self._serialize_delivery_person(delivery_person)
     
     def update_delivery_person_rating(self, delivery_person_id: int, rating: float) -> Dict[str, Any]:
@@ -103,9 +103,15 @@ class DeliveryService:
         """Get earnings summary for delivery person"""
         return self.repository.get_delivery_person_earnings(self.db, delivery_person_id)
     
-    def get_all_deliveries(self, page: int = 1, per_page: int = 20, status: Optional[str] = None) -> Dict[str, Any]:
+    def get_all_deliveries(
+        self,
+        page: int = 1,
+        per_page: int = 20,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Get all deliveries"""
-        result = self.repository.get_all_deliveries(self.db, page, per_page, status)
+        result = self.repository.get_all_deliveries(self.db, page, per_page, status, cursor)
         
         deliveries_data = [
             self._serialize_delivery(delivery) for delivery in result["deliveries"]
@@ -113,7 +119,8 @@ class DeliveryService:
         
         return {
             "deliveries": deliveries_data,
-            "total_deliveries": result["total_deliveries"]
+            "total_deliveries": result["total_deliveries"],
+            "next_cursor": result.get("next_cursor")
         }
     
     def get_delivery_by_order_id(self, order_id: int) -> Dict[str, Any]:
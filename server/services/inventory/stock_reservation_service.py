@@ -0,0 +1,97 @@
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from repositories.inventory.stock_repository import StockRepository
+from models.product_catalog.product_variant import ProductVariant
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple
+
+# Stock movement bookkeeping for order reservations
+MOVEMENT_RESERVE = "OUT"
+MOVEMENT_RELEASE = "RETURN"
+REFERENCE_ORDER = "ORDER"
+
+
+class StockReservationService:
+    """
+    Takes and gives back stock for orders without overselling.
+
+    Variant rows are locked in variant_id order (SELECT ... FOR UPDATE on PostgreSQL)
+    and stock is then taken with a single conditional UPDATE, so two concurrent
+    orders can never both pass the check for the last unit. Nothing here commits;
+    the caller's transaction decides whether the reservation sticks.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repository = StockRepository()
+
+    @staticmethod
+    def merge_quantities(items: Iterable[Tuple[int, int]]) -> Dict[int, int]:
+        """Sum (variant_id, quantity) pairs per variant, keeping first-seen order"""
+        quantities: Dict[int, int] = OrderedDict()
+        for variant_id, quantity in items:
+            quantities[variant_id] = quantities.get(variant_id, 0) + int(quantity)
+        return quantities
+
+    def lock(self, quantities: Dict[int, int]) -> Dict[int, ProductVariant]:
+        """Lock and validate the variants of an order; raises on a missing variant or short stock"""
+        variants = {
+            variant.variant_id: variant
+            for variant in self.repository.lock_variants(self.db, sorted(quantities))
+        }
+
+        for variant_id, quantity in quantities.items():
+            variant = variants.get(variant_id)
+            if not variant:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Variant {variant_id} not found"
+                )
+            if quantity <= 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid quantity for variant {variant_id}"
+                )
+            if (variant.stock_quantity or 0) < quantity:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Insufficient stock for variant {variant_id}"
+                )
+
+        return variants
+
+    def reserve(self, quantities: Dict[int, int]) -> None:
+        """Atomically take stock for every variant, or fail the whole order"""
+        reserved = set(self.repository.decrement_stock(self.db, quantities))
+        missing = [variant_id for variant_id in quantities if variant_id not in reserved]
+        if missing:
+            # Lost a race with another order (only possible without row locks, e.g. SQLite)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Insufficient stock for variant {missing[0]}"
+            )
+
+    def release(self, quantities: Dict[int, int]) -> None:
+        """Give stock back (order cancelled)"""
+        self.repository.increment_stock(self.db, quantities)
+
+    def record_movements(
+        self,
+        quantities: Dict[int, int],
+        order_id: int,
+        movement_type: str = MOVEMENT_RESERVE,
+        remark: str = "Reserved for order"
+    ) -> None:
+        """One stock movement row per variant, inserted in a single statement"""
+        movements: List[dict] = [
+            {
+                "variant_id": variant_id,
+                "movement_type": movement_type,
+                "reference_type": REFERENCE_ORDER,
+                "reference_id": order_id,
+                "quantity": quantity,
+                "remark": remark
+            }
+            for variant_id, quantity in quantities.items()
+        ]
+        self.repository.bulk_create_stock_movements(self.db, movements)
@@ -4,7 +4,9 @@ from fastapi import HTTPException, status
 from repositories.inventory.stock_repository import StockRepository
 from repositories.product_catalog.variant_repository import VariantRepository
 from decimal import Decimal
-from typing import List, Dict, Any
+from operator import attrgetter
+from typing import List, Dict, Any, Optional
+from utils.pagination import split_page
 
 class StockService:
     
@@ -13,10 +15,15 @@ class StockService:
         self.repository = StockRepository()
         self.variant_repo = VariantRepository()
     
-    def get_stock_movements(self, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
-        """Get all stock movements"""
-        movements = self.repository.get_all_stock_movements(self.db, skip, limit)
-        return [self._serialize_stock_movement(movement) for movement in movements]
+    def get_stock_movements(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Get all stock movements plus the cursor for the next page"""
+        # One row past the page tells whether there is a next page
+        movements = self.repository.get_all_stock_movements(self.db, skip, limit + 1, cursor)
+        movements, next_cursor = split_page(movements, limit, attrgetter("moved_at", "movement_id"))
+        return {
+            "movements": [self._serialize_stock_movement(movement) for movement in movements],
+            "next_cursor": next_cursor
+        }
     
     def get_stock_summary(self) -> List[Dict[str, Any]]:
         """Get current stock summary"""
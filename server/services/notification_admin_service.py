@@ -2,10 +2,25 @@ from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from repositories.notification_admin_repository import NotificationAdminRepository
 from repositories.notification_repository import NotificationRepository
+from repositories.outbox_repository import NOTIFICATION_EMAILS_ENABLED
+from repositories.notification_retention_repository import (
+    NotificationRetentionRepository,
+    purge_notifications,
+    retention_metrics,
+    NOTIFICATION_RETENTION_DAYS
+)
+from repositories.notification_broadcast_repository import (
+    NotificationBroadcastRepository,
+    run_broadcast,
+    start_broadcast,
+    BROADCAST_COMPLETED
+)
+from models.notification import BROADCAST_FANOUT
 from schemas.notification import NotificationCreate, NotificationOut
 from schemas.notification_admin import (
     NotificationSearchQuery,
     NotificationBroadcast,
+    BroadcastProgress,
     NotificationUpdateAdmin,
     DeleteOldNotifications,
     NotificationStatsResponse,
@@ -13,7 +28,6 @@ from schemas.notification_admin import (
     NotificationWithUser,
     NotificationListAdmin
 )
-from models.notification import Notification as NotificationModel
 from models.user import User
 
 class NotificationAdminService:
@@ -216,10 +230,7 @@ class NotificationAdminService:
             reference_id=reference_id
         )
         
-        db_notification = self.repo.create_notification(self.db, notification_data)
-        
-        # TODO: Integrate with email service
-        # self._send_email_notification(db_notification)
+        db_notification = self.repo.create_notification(self.db, notification_data, send_email=NOTIFICATION_EMAILS_ENABLED)
         
         return NotificationOut.model_validate(db_notification)
     
@@ -232,47 +243,52 @@ class NotificationAdminService:
         reference_id: Optional[int] = None
     ) -> List[NotificationOut]:
         """Send notifications to multiple selected users"""
-        from schemas.notification import BulkNotificationCreate
-        
-        bulk_data = BulkNotificationCreate(
-            user_ids=user_ids,
-            title=title,
-            message=message,
-            type=type,
-            reference_id=reference_id
+        # Same INSERT ... SELECT path as broadcasts, in batches of user ids
+        db_notifications = self.repo.create_notifications_for_users(
+            self.db, user_ids, title, message, type, reference_id, send_email=NOTIFICATION_EMAILS_ENABLED
         )
         
-        # Use the existing bulk notification method
-        notifications_data = []
-        for user_id in bulk_data.user_ids:
-            notification_dict = {
-                'user_id': user_id,
-                'title': bulk_data.title,
-                'message': bulk_data.message,
-                'type': bulk_data.type,
-                'reference_id': bulk_data.reference_id
-            }
-            notifications_data.append(notification_dict)
-        
-        db_notifications = self.repo.create_bulk_notifications(self.db, notifications_data)
-        
-        # TODO: Integrate with email service for bulk notifications
-        
         return [NotificationOut.model_validate(notification) for notification in db_notifications]
     
-    def send_notification_to_all_users(self, broadcast: NotificationBroadcast) -> int:
+    def send_notification_to_all_users(self, broadcast: NotificationBroadcast) -> BroadcastProgress:
         """Broadcast notification to all users"""
-        count = self.admin_repo.send_notification_to_all_users(
+        record = NotificationBroadcastRepository.create_broadcast(
             self.db,
             broadcast.title,
             broadcast.message,
             broadcast.type,
-            broadcast.reference_id
+            broadcast.reference_id,
+            mode=broadcast.mode.value,
+            send_email=broadcast.send_email
         )
         
-        # TODO: Integrate with email service for broadcast
+        # FEED broadcasts are done here; users pick them up when reading notifications
+        if record.mode == BROADCAST_FANOUT:
+            if broadcast.run_in_background:
+                start_broadcast(record.broadcast_id)
+            else:
+                record = run_broadcast(self.db, record.broadcast_id)
+        
+        return BroadcastProgress.model_validate(record)
+    
+    def get_broadcast(self, broadcast_id: int) -> Optional[BroadcastProgress]:
+        """Progress of a broadcast"""
+        record = NotificationBroadcastRepository.get_broadcast(self.db, broadcast_id)
+        return BroadcastProgress.model_validate(record) if record else None
+    
+    def resume_broadcast(self, broadcast_id: int, run_in_background: bool = False) -> Optional[BroadcastProgress]:
+        """Continue an interrupted or failed fan-out from its last written user"""
+        record = NotificationBroadcastRepository.get_broadcast(self.db, broadcast_id)
+        if record is None:
+            return None
+        
+        if record.mode == BROADCAST_FANOUT and record.status != BROADCAST_COMPLETED:
+            if run_in_background:
+                start_broadcast(broadcast_id)
+            else:
+                record = run_broadcast(self.db, broadcast_id)
         
-        return count
+        return BroadcastProgress.model_validate(record)
     
     def mark_notification_read_by_admin(self, notification_id: int) -> Optional[NotificationOut]:
         """Admin can mark any notification as read"""
@@ -301,11 +317,17 @@ class NotificationAdminService:
         """Admin can delete any notification"""
         return self.admin_repo.delete_notification_by_admin(self.db, notification_id)
     
-    def delete_old_notifications(self, days: int = 30) -> int:
-        """Delete notifications older than specified days"""
-        return self.admin_repo.delete_old_notifications(self.db, days)
+    def delete_old_notifications(self, days: int = 30, archive: bool = False) -> Optional[Dict[str, Any]]:
+        """Purge notifications older than specified days (expired partitions dropped, the rest
+        deleted in throttled chunks); returns the run summary, None when a purge is already running"""
+        return purge_notifications(days, archive=archive)
     
-    def _send_email_notification(self, notification: NotificationModel):
-        """Internal method to send email notifications"""
-        # TODO: Integrate with email service
-        pass
\ No newline at end of file
+    def get_retention_status(self) -> Dict[str, Any]:
+        """Partition layout and purge metrics"""
+        return {
+            "partitioned": NotificationRetentionRepository.is_partitioned(self.db),
+            "partitions": NotificationRetentionRepository.get_partitions(self.db),
+            "detached_partitions": NotificationRetentionRepository.get_detached_partitions(self.db),
+            "scheduled_retention_days": NOTIFICATION_RETENTION_DAYS,
+            "metrics": retention_metrics.snapshot()
+        }
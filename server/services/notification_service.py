@@ -1,13 +1,17 @@
 from sqlalchemy.orm import Session
+from operator import attrgetter
 from typing import List, Optional
 from repositories.notification_repository import NotificationRepository
+from repositories.notification_broadcast_repository import NotificationBroadcastRepository
+from repositories.outbox_repository import NOTIFICATION_EMAILS_ENABLED
 from schemas.notification import (
     NotificationCreate, 
     NotificationOut, 
     BulkNotificationCreate,
     NotificationList
 )
-from models.notification import Notification as NotificationModel
+from utils.pagination import split_page
+from utils.event_hub import event_hub, make_event, NOTIFICATION_CREATED
 
 class NotificationService:
     
@@ -32,50 +36,49 @@ class NotificationService:
             reference_id=reference_id
         )
         
-        db_notification = self.repository.create_notification(self.db, notification_data)
+        db_notification = self.repository.create_notification(self.db, notification_data, send_email=NOTIFICATION_EMAILS_ENABLED)
+        notification = NotificationOut.model_validate(db_notification)
+        self._publish([notification])
         
-        # TODO: Integrate with email service here
-        # self._send_email_notification(db_notification)
-        
-        return NotificationOut.model_validate(db_notification)
+        return notification
 
     def send_bulk_notifications(self, bulk_data: BulkNotificationCreate) -> List[NotificationOut]:
         """Send notifications to multiple users"""
-        notifications_data = []
-        for user_id in bulk_data.user_ids:
-            notification_dict = {
-                'user_id': user_id,
-                'title': bulk_data.title,
-                'message': bulk_data.message,
-                'type': bulk_data.type,
-                'reference_id': bulk_data.reference_id
-            }
-            notifications_data.append(notification_dict)
-        
-        db_notifications = self.repository.create_bulk_notifications(self.db, notifications_data)
-        
-        # TODO: Integrate with email service for bulk notifications
-        # for notification in db_notifications:
-        #     self._send_email_notification(notification)
+        db_notifications = self.repository.create_notifications_for_users(
+            self.db,
+            bulk_data.user_ids,
+            bulk_data.title,
+            bulk_data.message,
+            bulk_data.type,
+            bulk_data.reference_id,
+            send_email=NOTIFICATION_EMAILS_ENABLED
+        )
+        notifications = [NotificationOut.model_validate(notification) for notification in db_notifications]
+        self._publish(notifications)
         
-        return [NotificationOut.model_validate(notification) for notification in db_notifications]
+        return notifications
 
     def get_user_notifications(
         self, 
         user_id: int, 
         skip: int = 0, 
         limit: int = 50,
-        is_read: Optional[bool] = None
+        is_read: Optional[bool] = None,
+        cursor: Optional[str] = None
     ) -> NotificationList:
         """Get all notifications for a user with pagination"""
-        notifications = self.repository.get_user_notifications(self.db, user_id, skip, limit, is_read)
+        NotificationBroadcastRepository.merge_feed_broadcasts(self.db, user_id)
+        # One row past the page tells whether there is a next page
+        notifications = self.repository.get_user_notifications(self.db, user_id, skip, limit + 1, is_read, cursor)
+        notifications, next_cursor = split_page(notifications, limit, attrgetter("created_at", "notification_id"))
         total_count = self.repository.get_total_count(self.db, user_id)
         unread_count = self.repository.get_unread_count(self.db, user_id)
         
         return NotificationList(
             notifications=[NotificationOut.model_validate(notification) for notification in notifications],
             total_count=total_count,
-            unread_count=unread_count
+            unread_count=unread_count,
+            next_cursor=next_cursor
         )
 
     def mark_notification_read(self, notification_id: int, user_id: int) -> Optional[NotificationOut]:
@@ -89,6 +92,7 @@ class NotificationService:
 
     def get_unread_count(self, user_id: int) -> int:
         """Get unread notification count for a user"""
+        NotificationBroadcastRepository.merge_feed_broadcasts(self.db, user_id)
         return self.repository.get_unread_count(self.db, user_id)
 
     def delete_notification(self, notification_id: int, user_id: int) -> bool:
@@ -99,13 +103,10 @@ class NotificationService:
         """Delete all notifications for a user"""
         return self.repository.delete_all_notifications(self.db, user_id)
 
-    def _send_email_notification(self, notification: NotificationModel):
-        """Internal method to send email notifications (to be implemented)"""
-        # TODO: Integrate with your email service
-        # Example:
-        # email_service.send_notification_email(
-        #     user_email=notification.user.email,
-        #     subject=notification.title,
-        #     message=notification.message
-        # )
-        pass
\ No newline at end of file
+    def _publish(self, notifications: List[NotificationOut]):
+        """Push created notifications to their users' open WebSocket / SSE connections
+        (the repository has already committed them)"""
+        for notification in notifications:
+            event_hub.publish(make_event(
+                NOTIFICATION_CREATED, notification.model_dump(mode="json"), [notification.user_id]
+            ))
@@ -5,6 +5,7 @@ from repositories.order_repository import OrderRepository
 from repositories.user_repository import UserRepository
 from repositories.address_repository import AddressRepository
 from repositories.product_catalog.variant_repository import VariantRepository
+from services.inventory.stock_reservation_service import StockReservationService, MOVEMENT_RELEASE
 from schemas.order_schema import OrderCreate
 from datetime import datetime
 from decimal import Decimal
@@ -18,37 +19,42 @@ class OrderService:
         self.user_repo = UserRepository()
         self.address_repo = AddressRepository()
         self.variant_repo = VariantRepository()
+        self.stock = StockReservationService(db)
     
     def create_order(self, order_data: OrderCreate, user_id: int) -> Dict[str, Any]:
+        """Place an order.
+
+        The statement count does not grow with the number of lines: variants are
+        locked and loaded in one query, stock is taken in one UPDATE, and items,
+        history and stock movements are inserted in batches. The response is
+        built from the objects in memory instead of re-querying the order.
+        """
         try:
-            # Validate address
-            address = self.address_repo.get_address_by_id(self.db, order_data.address_id)
+            # Validate address (area/city/state come along for the response)
+            address = self.address_repo.get_address_with_location(self.db, order_data.address_id)
             if not address or address.user_id != user_id:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Address not found"
                 )
 
-            # Validate items and calculate totals
-            subtotal = Decimal('0')
-            validated_items = []  # list of tuples (variant_obj, quantity)
-            
-            for item in order_data.items:
-                variant = self.variant_repo.get_variant_by_id(self.db, item['variant_id'])
-                if not variant:
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail=f"Variant {item['variant_id']} not found"
-                    )
-                if variant.stock_quantity < item['quantity']:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Insufficient stock for variant {item['variant_id']}"
-                    )
+            # Lock the variants (in id order) and validate stock for the whole order
+            quantities = self.stock.merge_quantities(
+                (item['variant_id'], item['quantity']) for item in order_data.items
+            )
+            if not quantities:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Order has no items"
+                )
+            variants = self.stock.lock(quantities)
 
-                item_total = Decimal(str(variant.price)) * Decimal(int(item['quantity']))
-                subtotal += item_total
-                validated_items.append((variant, int(item['quantity'])))
+            # Calculate totals in one pass (repeated lines of a variant are merged)
+            subtotal = Decimal('0')
+            line_totals = {}
+            for variant_id, qty in quantities.items():
+                line_totals[variant_id] = Decimal(str(variants[variant_id].price)) * qty
+                subtotal += line_totals[variant_id]
 
             # IMPORTANT: Use the calculated subtotal, not from order_data
             # Use order_data for other amounts but calculate total based on our calculations
@@ -58,9 +64,15 @@ class OrderService:
             
             # Calculate total from our calculated subtotal
             calculated_total = subtotal + tax_amount + delivery_fee - discount_amount
-            
-            # Create Order model instance
+
+            # Take the stock: one conditional UPDATE for all variants, fails the order on a lost race
+            self.stock.reserve(quantities)
+
+            # Build the order graph; one flush inserts the order, its items and its history
             from models.order.order import Order as OrderModel
+            from models.order.order_item import OrderItem as OrderItemModel
+            from models.order.order_history import OrderHistory as OrderHistoryModel
+            placed_at = datetime.now()
             new_order_model = OrderModel(
                 user_id=user_id,
                 address_id=order_data.address_id,
@@ -71,43 +83,38 @@ class OrderService:
                 total_amount=calculated_total,  # Use calculated total
                 coupon_code=order_data.coupon_code,
                 order_status="PLACED",
-                payment_status="PENDING"
+                payment_status="PENDING",
+                placed_at=placed_at,
+                items=[
+                    OrderItemModel(
+                        variant_id=variant_id,
+                        quantity=qty,
+                        price=variants[variant_id].price,
+                        total=line_totals[variant_id]
+                    )
+                    for variant_id, qty in quantities.items()
+                ],
+                histories=[
+                    OrderHistoryModel(status="PLACED", updated_by=user_id, updated_at=placed_at)
+                ]
             )
-
-            # Persist order - pass model instance
             self.db.add(new_order_model)
-            self.db.flush()  # Get order_id
-
-            # Create order items and decrement stock
-            from models.order.order_item import OrderItem as OrderItemModel
-            for variant_obj, qty in validated_items:
-                oi = OrderItemModel(
-                    order_id=new_order_model.order_id,
-                    variant_id=variant_obj.variant_id,
-                    quantity=qty,
-                    price=variant_obj.price,
-                    total=variant_obj.price * qty
-                )
-                self.db.add(oi)
+            self.db.flush()
+            self.stock.record_movements(quantities, new_order_model.order_id)
 
-                # Update stock
-                variant_obj.stock_quantity -= qty
-                self.db.add(variant_obj)
-
-            # Create initial history
-            from models.order.order_history import OrderHistory as OrderHistoryModel
-            history = OrderHistoryModel(
-                order_id=new_order_model.order_id,
-                status="PLACED",
-                updated_by=user_id
-            )
-            self.db.add(history)
+            # Serialize before commit expires the instances
+            context = {
+                "variants": variants,
+                "products": self.variant_repo.get_products_by_ids(
+                    self.db, [variant.product_id for variant in variants.values()]
+                ),
+                "address": address,
+                "users": {user_id: self.user_repo.get_user_by_id(self.db, user_id)}
+            }
+            result = self._serialize_order(new_order_model, context)
 
-            # Commit everything
             self.db.commit()
-            self.db.refresh(new_order_model)
-
-            return self._serialize_order(new_order_model)
+            return result
 
         except HTTPException:
             self.db.rollback()
@@ -117,17 +124,18 @@ class OrderService:
             self.db.rollback()
             raise HTTPException(status_code=500, detail="Order creation failed")
 
-    def get_user_orders(self, user_id: int, page: int = 1, per_page: int = 20) -> Dict[str, Any]:
+    def get_user_orders(self, user_id: int, page: int = 1, per_page: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
         """Get all orders for a user"""
         try:
             # Call repository method
-            result = self.repository.get_orders_by_user_id(self.db, user_id, page, per_page)
+            result = self.repository.get_orders_by_user_id(self.db, user_id, page, per_page, cursor)
             
             if not result:
                 return {
                     "orders": [],
                     "total_orders": 0,
-                    "total_pages": 0
+                    "total_pages": 0,
+                    "next_cursor": None
                 }
             
             # Serialize each order
@@ -157,8 +165,11 @@ class OrderService:
             return {
                 "orders": orders_data,
                 "total_orders": result["total_orders"],
-                "total_pages": result["total_pages"]
+                "total_pages": result["total_pages"],
+                "next_cursor": result["next_cursor"]
             }
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"🔥 Error in get_user_orders: {str(e)}")
             raise HTTPException(
@@ -198,23 +209,30 @@ class OrderService:
                 detail="Cannot cancel shipped or delivered order"
             )
         
+        if order.order_status == "CANCELLED":
+            # Stock was already given back; cancelling twice would restock twice
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Order is already cancelled"
+            )
+        
         # Update order status
         order.order_status = "CANCELLED"
         
         # Restore stock
-        items = order.items
-        for item in items:
-            variant = self.variant_repo.get_variant_by_id(self.db, item.variant_id)
-            if variant:
-                variant.stock_quantity += item.quantity
+        quantities = self.stock.merge_quantities(
+            (item.variant_id, item.quantity) for item in order.items if item.variant_id
+        )
+        self.stock.release(quantities)
+        self.stock.record_movements(quantities, order_id, MOVEMENT_RELEASE, "Released by order cancellation")
         
         # Add history
-        history_data = {
-            "order_id": order_id,
-            "status": "CANCELLED",
-            "updated_by": user_id
-        }
-        self.repository.create_order_history(self.db, history_data)
+        from models.order.order_history import OrderHistory as OrderHistoryModel
+        self.repository.create_order_history(self.db, OrderHistoryModel(
+            order_id=order_id,
+            status="CANCELLED",
+            updated_by=user_id
+        ))
         
         self.db.commit()
         return {"message": "Order cancelled successfully"}
@@ -321,9 +339,15 @@ class OrderService:
             "items": return_items
         }
     
-    def get_all_orders(self, page: int = 1, per_page: int = 20, status: Optional[str] = None) -> Dict[str, Any]:
+    def get_all_orders(
+        self,
+        page: int = 1,
+        per_page: int = 20,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Get all orders"""
-        result = self.repository.get_all_orders(self.db, page, per_page, status)
+        result = self.repository.get_all_orders(self.db, page, per_page, status, cursor)
         
         orders_data = [
             self._serialize_order(order) for order in result["orders"]
@@ -332,7 +356,8 @@ class OrderService:
         return {
             "orders": orders_data,
             "total_orders": result["total_orders"],
-            "total_pages": result["total_pages"]
+            "total_pages": result["total_pages"],
+            "next_cursor": result["next_cursor"]
         }
     
     def update_order_status(self, order_id: int, status: str, admin_id: int) -> Dict[str, Any]:
@@ -357,9 +382,12 @@ class OrderService:
         
         return self._serialize_order(order)
     
-    def _serialize_order_item(self, item: OrderItem) -> Dict[str, Any]:
+    def _serialize_order_item(self, item: OrderItem, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Serialize order item with product details"""
-        variant = self.variant_repo.get_variant_by_id(self.db, item.variant_id)
+        if context:
+            variant = context["variants"].get(item.variant_id)
+        else:
+            variant = self.variant_repo.get_variant_by_id(self.db, item.variant_id)
         
         # Handle case where variant might not exist
         product_name = "Unknown Product"
@@ -367,8 +395,9 @@ class OrderService:
         
         if variant:
             variant_name = variant.variant_name
-            if variant.product:
-                product_name = variant.product.product_name
+            product = context["products"].get(variant.product_id) if context else variant.product
+            if product:
+                product_name = product.product_name
         
         return {
             "variant_id": item.variant_id,
@@ -380,9 +409,12 @@ class OrderService:
         }
 
     
-    def _serialize_order_history(self, history: OrderHistory) -> Dict[str, Any]:
+    def _serialize_order_history(self, history: OrderHistory, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Serialize order history"""
-        user = self.user_repo.get_user_by_id(self.db, history.updated_by)
+        if context and history.updated_by in context["users"]:
+            user = context["users"][history.updated_by]
+        else:
+            user = self.user_repo.get_user_by_id(self.db, history.updated_by)
         return {
             "history_id": history.history_id,
             "status": history.status,
@@ -390,9 +422,16 @@ class OrderService:
             "updated_by_name": f"{user.first_name} {user.last_name}" if user else "System"
         }
     
-    def _serialize_order(self, order: Order) -> Dict[str, Any]:
-        """Serialize order with all related data"""
-        address = self.address_repo.get_address_by_id(self.db, order.address_id)
+    def _serialize_order(self, order: Order, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Serialize order with all related data.
+
+        context (variants, products, address, users) lets a caller that already
+        holds the related rows skip the per-item lookups.
+        """
+        if context:
+            address = context["address"]
+        else:
+            address = self.address_repo.get_address_by_id(self.db, order.address_id)
         
         items = order.items
         histories = order.histories
@@ -407,8 +446,8 @@ class OrderService:
             "delivery_fee": float(order.delivery_fee),
             "tax_amount": float(order.tax_amount),
             "placed_at": order.placed_at,
-            "items": [self._serialize_order_item(item) for item in items],
-            "histories": [self._serialize_order_history(history) for history in histories],
+            "items": [self._serialize_order_item(item, context) for item in items],
+            "histories": [self._serialize_order_history(history, context) for history in histories],
             "address": {
                 "address_id": address.address_id,
                 "line1": address.line1,
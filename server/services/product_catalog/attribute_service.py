@@ -4,6 +4,7 @@ from repositories.product_catalog.attribute_repository import AttributeRepositor
 from schemas.product_catalog_schema import AttributeCreate
 from models.product_catalog.product_attribute import ProductAttribute
 from models.product_catalog.attribute_variant import AttributeVariant
+from utils.cache import cached, invalidate_tags, TAG_ATTRIBUTES
 from typing import List, Dict, Any
 
 class AttributeService:
@@ -12,6 +13,7 @@ class AttributeService:
         self.db = db
         self.repository = AttributeRepository()
     
+    @cached("attributes.all", ttl=600, tags=(TAG_ATTRIBUTES,))
     def get_all_attributes(self) -> List[Dict[str, Any]]:
         """Get all attributes"""
         attributes = self.repository.get_all_attributes(self.db)
@@ -29,6 +31,7 @@ class AttributeService:
             raise HTTPException(status_code=400, detail="Attribute already exists")
         
         new_attribute = self.repository.create_attribute(self.db, attribute_data.model_dump())
+        invalidate_tags(TAG_ATTRIBUTES)
         return {"attribute_id": new_attribute.attribute_id, "attribute_name": new_attribute.attribute_name}
     
     def assign_attribute_to_variant(self, variant_id: int, attribute_id: int, value: str) -> Dict[str, str]:
@@ -76,6 +79,7 @@ class AttributeService:
         updated_attribute = self.repository.update_attribute(
             self.db, attribute, attribute_data.model_dump()
         )
+        invalidate_tags(TAG_ATTRIBUTES)
         return {"attribute_id": updated_attribute.attribute_id, "attribute_name": updated_attribute.attribute_name}
     
     def delete_attribute(self, attribute_id: int) -> Dict[str, str]:
@@ -98,4 +102,5 @@ class AttributeService:
             )
         
         self.repository.delete_attribute(self.db, attribute, attribute_id)
+        invalidate_tags(TAG_ATTRIBUTES)
         return {"message": "Attribute deleted successfully"}
\ No newline at end of file
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from repositories.product_catalog.brand_repository import BrandRepository
 from schemas.product_catalog_schema import BrandCreate
+from utils.cache import cached, invalidate_tags, TAG_BRANDS, TAG_PRODUCTS
 from typing import List, Dict, Any
 
 class BrandService:
@@ -10,6 +11,7 @@ class BrandService:
         self.db = db
         self.repository = BrandRepository()
     
+    @cached("brands.all", ttl=600, tags=(TAG_BRANDS,))
     def get_all_brands(self) -> List[Dict[str, Any]]:
         """Get all brands"""
         brands = self.repository.get_all_brands(self.db)
@@ -30,6 +32,7 @@ class BrandService:
             raise HTTPException(status_code=400, detail="Brand already exists")
         
         new_brand = self.repository.create_brand(self.db, brand_data.model_dump())
+        invalidate_tags(TAG_BRANDS, TAG_PRODUCTS)
         return {"brand_id": new_brand.brand_id, "brand_name": new_brand.brand_name}
     
     def update_brand(self, brand_id: int, update_data: dict) -> Dict[str, Any]:
@@ -39,6 +42,7 @@ class BrandService:
             raise HTTPException(status_code=404, detail="Brand not found")
         
         updated_brand = self.repository.update_brand(self.db, brand, update_data)
+        invalidate_tags(TAG_BRANDS, TAG_PRODUCTS)
         return {"brand_id": updated_brand.brand_id, "brand_name": updated_brand.brand_name}
     
     def delete_brand(self, brand_id: int) -> Dict[str, str]:
@@ -48,4 +52,5 @@ class BrandService:
             raise HTTPException(status_code=404, detail="Brand not found")
         
         self.repository.delete_brand(self.db, brand)
+        invalidate_tags(TAG_BRANDS, TAG_PRODUCTS)
         return {"message": "Brand deleted successfully"}
\ No newline at end of file
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from repositories.product_catalog.category_repository import CategoryRepository
 from schemas.product_catalog_schema import CategoryCreate, SubCategoryCreate
+from utils.cache import cached, invalidate_tags, TAG_CATEGORIES, TAG_PRODUCTS
 from typing import List, Dict, Any
 
 class CategoryService:
@@ -10,6 +11,7 @@ class CategoryService:
         self.db = db
         self.repository = CategoryRepository()
     
+    @cached("categories.all", ttl=600, tags=(TAG_CATEGORIES,))
     def get_all_categories(self) -> List[Dict[str, Any]]:
         """Get all categories"""
         categories = self.repository.get_all_categories(self.db)
@@ -32,6 +34,7 @@ class CategoryService:
             "description": category.description
         }
     
+    @cached("subcategories.all", ttl=600, tags=(TAG_CATEGORIES,))
     def get_all_subcategories(self) -> List[Dict[str, Any]]:
         """Get all subcategories with category details"""
         subcategories = self.repository.get_all_subcategories(self.db)
@@ -68,6 +71,7 @@ class CategoryService:
             "category_description": category.description if category else None
         }
 
+    @cached("categories.with_subcategories", ttl=600, tags=(TAG_CATEGORIES,))
     def get_category_with_subcategories(self, category_id: int) -> Dict[str, Any]:
         """Get category with all its subcategories"""
         category = self.repository.get_category_by_id(self.db, category_id)
@@ -98,6 +102,7 @@ class CategoryService:
             raise HTTPException(status_code=400, detail="Category already exists")
         
         new_category = self.repository.create_category(self.db, category_data.model_dump())
+        invalidate_tags(TAG_CATEGORIES, TAG_PRODUCTS)
         return {
             "category_id": new_category.category_id,
             "category_name": new_category.category_name,
@@ -111,6 +116,7 @@ class CategoryService:
             raise HTTPException(status_code=404, detail="Category not found")
         
         updated_category = self.repository.update_category(self.db, category, update_data)
+        invalidate_tags(TAG_CATEGORIES, TAG_PRODUCTS)
         return {
             "category_id": updated_category.category_id,
             "category_name": updated_category.category_name,
@@ -124,11 +130,13 @@ class CategoryService:
             raise HTTPException(status_code=404, detail="Category not found")
         
         self.repository.delete_category(self.db, category)
+        invalidate_tags(TAG_CATEGORIES, TAG_PRODUCTS)
         return {"message": "Category deleted successfully"}
     
     def create_subcategory(self, subcategory_data: SubCategoryCreate) -> Dict[str, Any]:
         """Create new subcategory"""
         new_subcategory = self.repository.create_subcategory(self.db, subcategory_data.model_dump())
+        invalidate_tags(TAG_CATEGORIES, TAG_PRODUCTS)
         return {
             "sub_category_id": new_subcategory.sub_category_id,
             "sub_category_name": new_subcategory.sub_category_name,
@@ -143,6 +151,7 @@ class CategoryService:
             raise HTTPException(status_code=404, detail="Subcategory not found")
         
         updated_subcategory = self.repository.update_subcategory(self.db, subcategory, update_data)
+        invalidate_tags(TAG_CATEGORIES, TAG_PRODUCTS)
         return {
             "sub_category_id": updated_subcategory.sub_category_id,
             "sub_category_name": updated_subcategory.sub_category_name,
@@ -157,6 +166,7 @@ class CategoryService:
             raise HTTPException(status_code=404, detail="Subcategory not found")
         
         self.repository.delete_subcategory(self.db, subcategory)
+        invalidate_tags(TAG_CATEGORIES, TAG_PRODUCTS)
         return {"message": "Subcategory deleted successfully"}
     
     
\ No newline at end of file
@@ -0,0 +1,75 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import case, literal
+from repositories.product_catalog.product_search_repository import ProductSearchRepository
+from models.product_catalog.product import Product
+from utils.search_index import InMemorySearchIndex, tokenize
+from typing import List, Optional, Tuple
+
+# Process-wide fallback index for databases without full-text search (SQLite tests).
+# Built lazily from the product table and kept current by the product write paths.
+_memory_index = InMemorySearchIndex()
+
+# Upper bound on fallback matches pushed back into SQL as an IN list
+MAX_MEMORY_MATCHES = 1000
+
+
+class ProductSearchService:
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repository = ProductSearchRepository
+
+    @property
+    def uses_database_index(self) -> bool:
+        return self.repository.is_postgres(self.db)
+
+    def _memory(self) -> InMemorySearchIndex:
+        if not _memory_index.loaded:
+            _memory_index.rebuild(self.repository.get_search_documents(self.db))
+        return _memory_index
+
+    # ==================== QUERYING ====================
+
+    def match(self, query_text: str) -> Optional[Tuple[object, object]]:
+        """(filter, rank) SQL expressions for products matching query_text.
+
+        Returns None when the text has no searchable tokens.
+        """
+        if self.uses_database_index:
+            return self.repository.build_match_clauses(query_text, self.repository.has_trigram(self.db))
+
+        if not tokenize(query_text):
+            return None
+
+        ranked = self._memory().search(query_text, limit=MAX_MEMORY_MATCHES)
+        if not ranked:
+            return Product.product_id.in_([]), literal(0)
+
+        scores = {doc_id: score for doc_id, score in ranked}
+        rank = case(scores, value=Product.product_id, else_=0)
+        return Product.product_id.in_(list(scores)), rank
+
+    def suggest(self, query_text: str, limit: int = 10) -> List[str]:
+        """Product names for autocomplete (prefix + typo tolerant)"""
+        if self.uses_database_index:
+            return self.repository.suggest_names(self.db, query_text, limit)
+        return self._memory().suggest(query_text, limit)
+
+    def record_search(self, query_text: str, results_count: int, user_id: Optional[int] = None) -> None:
+        """Log a catalog search; never fails the search itself"""
+        try:
+            self.repository.record_search(self.db, query_text, results_count, user_id)
+        except Exception as e:
+            self.db.rollback()
+            print(f"⚠️ Failed to record search '{query_text}': {e}")
+
+    # ==================== INDEX MAINTENANCE ====================
+    # PostgreSQL maintains its expression index itself; these keep the fallback current.
+
+    def index_product(self, product: Product) -> None:
+        if _memory_index.loaded:
+            _memory_index.add(product.product_id, product.product_name, product.description)
+
+    def remove_product(self, product_id: int) -> None:
+        if _memory_index.loaded:
+            _memory_index.remove(product_id)
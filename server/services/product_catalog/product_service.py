@@ -1,11 +1,14 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from repositories.product_catalog.product_repository import ProductRepository
+from services.product_catalog.product_search_service import ProductSearchService
 from schemas.product_schema import ProductCreate
 from typing import List, Dict, Any, Optional
 from decimal import Decimal
 import math
-from sqlalchemy import or_, desc, asc
+from sqlalchemy import or_, and_, desc, asc
+from utils.pagination import Paginator, apply_cursor, split_page
+from utils.cache import cached, invalidate_tags, TAG_PRODUCTS
 
 # Import the required models
 from models.product_catalog.product import Product
@@ -20,6 +23,7 @@ class ProductService:
     def __init__(self, db: Session):
         self.db = db
         self.repository = ProductRepository
+        self.search = ProductSearchService(db)
     
     def calculate_final_price(self, variant) -> Decimal:
         """Calculate final price after discount"""
@@ -30,6 +34,170 @@ class ProductService:
             final_price = max(variant.price - variant.discount_value, Decimal("0.00"))
         return final_price
     
+    # ==================== CATALOG FILTERS & SORTS ====================
+    
+    # Sorts evaluated on the default variant; price_low/price_high are kept as aliases
+    VARIANT_SORTS = ("price_asc", "price_low", "price_desc", "price_high", "discount_desc")
+    
+    def _resolve_sort(self, sort_by: str):
+        """Map a sort_by option to (sort expression, descending)"""
+        if sort_by in ("price_asc", "price_low"):
+            return ProductVariant.final_price, False
+        if sort_by in ("price_desc", "price_high"):
+            return ProductVariant.final_price, True
+        if sort_by == "discount_desc":
+            return ProductVariant.discount_percentage, True
+        if sort_by == "name_asc":
+            return Product.product_name, False
+        if sort_by == "name_desc":
+            return Product.product_name, True
+        return Product.created_at, True  # "newest" default
+    
+    def _join_default_variant(self, query):
+        """Join each product to its default variant (products without one drop out)"""
+        return query.join(
+            ProductVariant,
+            and_(
+                ProductVariant.product_id == Product.product_id,
+                ProductVariant.is_default == True
+            )
+        )
+    
+    def _apply_variant_filters(
+        self,
+        query,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        has_discount: Optional[bool] = None,
+        min_discount_percentage: Optional[float] = None,
+        discount_type: Optional[str] = None
+    ):
+        """Apply price/discount filters against the joined default variant"""
+        if min_price is not None:
+            query = query.filter(ProductVariant.final_price >= min_price)
+        
+        if max_price is not None:
+            query = query.filter(ProductVariant.final_price <= max_price)
+        
+        if has_discount is True:
+            query = query.filter(ProductVariant.final_price < ProductVariant.price)
+        elif has_discount is False:
+            query = query.filter(ProductVariant.final_price >= ProductVariant.price)
+        
+        if min_discount_percentage is not None:
+            query = query.filter(ProductVariant.discount_percentage >= min_discount_percentage)
+        
+        if discount_type and discount_type.upper() in ("PERCENT", "FLAT", "NONE"):
+            query = query.filter(ProductVariant.discount_type == discount_type.upper())
+        
+        return query
+    
+    # ==================== LISTING ENGINE ====================
+    
+    def _load_listing_context(self, products: List[Product], fallback_to_any_variant: bool = True) -> Dict[str, Any]:
+        """Batch-load display variants, images, brands and category lineage for a page of products.
+        
+        Costs a fixed number of queries (at most five) no matter how many products are passed in.
+        """
+        product_ids = [product.product_id for product in products]
+        
+        variants = self.repository.get_listing_variants(self.db, product_ids, fallback_to_any_variant)
+        images = self.repository.get_images_for_variants(
+            self.db, [variant.variant_id for variant in variants.values()]
+        )
+        brands = self.repository.get_brands_by_ids(self.db, [product.brand_id for product in products])
+        lineage = self.repository.get_category_lineage(self.db, [product.sub_category_id for product in products])
+        
+        return {
+            "variants": variants,
+            "images": images,
+            "brands": brands,
+            "lineage": lineage
+        }
+    
+    def _serialize_listing_variant(self, variant: Optional[ProductVariant], images: List[ProductImage]) -> Dict[str, Any]:
+        """Serialize the display variant of a listing item"""
+        if not variant:
+            return {
+                "variant_id": 0,
+                "variant_name": None,
+                "price": 0.0,
+                "final_price": 0.0,
+                "discount_type": "NONE",
+                "discount_value": 0.0,
+                "stock_quantity": 0,
+                "status": "INACTIVE",
+                "images": []
+            }
+        
+        final_price = self.calculate_final_price(variant)
+        
+        return {
+            "variant_id": variant.variant_id,
+            "variant_name": variant.variant_name,
+            "price": float(variant.price),
+            "final_price": float(final_price),
+            "discount_type": variant.discount_type,
+            "discount_value": float(variant.discount_value),
+            "stock_quantity": variant.stock_quantity,
+            "status": variant.status,
+            "images": [
+                {
+                    "image_id": img.image_id,
+                    "url": img.url,
+                    "is_default": img.is_default
+                } for img in images
+            ]
+        }
+    
+    def _build_listing_items(
+        self,
+        products: List[Product],
+        fallback_to_any_variant: bool = False,
+        include_created_at: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Build listing items for a page of products without per-row queries.
+        
+        With fallback_to_any_variant, products without a default variant use their first
+        variant (or an empty placeholder); otherwise they are skipped.
+        """
+        context = self._load_listing_context(products, fallback_to_any_variant)
+        
+        items = []
+        for product in products:
+            variant = context["variants"].get(product.product_id)
+            if not variant and not fallback_to_any_variant:
+                continue
+            
+            images = context["images"].get(variant.variant_id, []) if variant else []
+            brand = context["brands"].get(product.brand_id)
+            subcategory, category = context["lineage"].get(product.sub_category_id, (None, None))
+            
+            item = {
+                "product_id": product.product_id,
+                "product_name": product.product_name,
+                "description": product.description,
+                "brand": {
+                    "brand_id": brand.brand_id if brand else None,
+                    "brand_name": brand.brand_name if brand else None
+                },
+                "category": {
+                    "category_id": category.category_id if category else None,
+                    "category_name": category.category_name if category else None
+                },
+                "subcategory": {
+                    "sub_category_id": subcategory.sub_category_id if subcategory else None,
+                    "sub_category_name": subcategory.sub_category_name if subcategory else None
+                }
+            }
+            if include_created_at:
+                item["created_at"] = product.created_at
+            item["default_variant"] = self._serialize_listing_variant(variant, images)
+            
+            items.append(item)
+        
+        return items
+    
     def get_all_products(
         self,
         page: int = 1,
@@ -44,17 +212,20 @@ class ProductService:
         search: Optional[str] = None,
         has_discount: Optional[bool] = None,
         min_discount_percentage: Optional[float] = None,
-        discount_type: Optional[str] = None
+        discount_type: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Get all products with filters and pagination - SIMPLIFIED"""
+        """Get all products with filters and pagination - SIMPLIFIED
+        
+        Passing a cursor (the next_cursor of a previous page) switches to keyset
+        pagination: no OFFSET scan and no total count.
+        """
         
         print(f"🔍 SERVICE: Getting all products")
         
         # Start with ALL products - no variant join
         query = self.db.query(Product)
         
-        print(f"🔍 SERVICE: Total products in DB: {query.count()}")
-
         # Apply product-level filters ONLY
         if category_id:
             query = query.join(SubCategory).filter(SubCategory.category_id == category_id)
@@ -70,125 +241,102 @@ class ProductService:
             except ValueError:
                 pass
         
-        if search and search.strip():
-            search_clean = search.strip()
-            search_pattern = f"%{search_clean}%"
-            query = query.filter(
-                or_(
-                    Product.product_name.ilike(search_pattern),
-                    Product.description.ilike(search_pattern)
+        search_clean = search.strip() if search else ""
+        search_rank = None
+        if search_clean:
+            # Ranked full-text match (tsvector + pg_trgm, or the in-memory index)
+            match = self.search.match(search_clean)
+            if match:
+                search_filter, search_rank = match
+                query = query.filter(search_filter)
+            else:
+                # Nothing tokenizable (e.g. only punctuation) - plain substring match
+                search_pattern = f"%{search_clean}%"
+                query = query.filter(
+                    or_(
+                        Product.product_name.ilike(search_pattern),
+                        Product.description.ilike(search_pattern)
+                    )
                 )
-            )
         
-        # Get total count BEFORE pagination
-        total = query.count()
-        total_pages = math.ceil(total / per_page) if per_page > 0 else 0
-        
-        print(f"🔍 SERVICE: Found {total} products after product filters")
-        
-        if total == 0:
-            return {
-                "items": [],
-                "total": 0,
-                "page": page,
-                "per_page": per_page,
-                "total_pages": 0
-            }
-        
-        # Apply sorting
-        if sort_by == "name_asc":
-            query = query.order_by(asc(Product.product_name))
-        elif sort_by == "name_desc":
-            query = query.order_by(desc(Product.product_name))
-        else:  # "newest" default
-            query = query.order_by(desc(Product.created_at))
-        
-        # Get paginated products
-        offset = (page - 1) * per_page
-        products = query.offset(offset).limit(per_page).all()
+        # Price/discount filters and sorts are evaluated in SQL on the default variant
+        sort_column, descending = self._resolve_sort(sort_by)
+        if sort_by == "relevance" and search_rank is not None:
+            sort_column, descending = search_rank, True
+        
+        needs_variant = (
+            any(value is not None for value in (min_price, max_price, has_discount, min_discount_percentage))
+            or bool(discount_type)
+            or sort_by in self.VARIANT_SORTS
+        )
+        if needs_variant:
+            query = self._join_default_variant(query)
+            query = self._apply_variant_filters(
+                query,
+                min_price=min_price,
+                max_price=max_price,
+                has_discount=has_discount,
+                min_discount_percentage=min_discount_percentage,
+                discount_type=discount_type
+            )
         
-        print(f"🔍 SERVICE: Retrieved {len(products)} products for page {page}")
+        # Carry the sort key on each row so the next cursor can be built from it
+        query = query.add_columns(sort_column.label("sort_key"))
+        row_key = lambda row: (row.sort_key, row[0].product_id)
         
-        # Build response - IGNORE variant filters for now
-        items = []
-        for product in products:
-            # Get ANY variant for display (or create dummy if none)
-            variant = self.repository.get_default_variant(self.db, product.product_id)
+        if cursor:
+            result = Paginator(query, per_page=per_page).cursor_paginate(
+                sort_column, Product.product_id, cursor, descending, row_key=row_key
+            )
+            products = [row[0] for row in result["items"]]
+            total = None
+            total_pages = None
+            next_cursor = result["next_cursor"]
+        else:
+            # Get total count BEFORE pagination
+            total = query.count()
+            total_pages = math.ceil(total / per_page) if per_page > 0 else 0
             
-            # If no default variant, get ANY variant
-            if not variant:
-                variants = self.repository.get_product_variants(self.db, product.product_id)
-                variant = variants[0] if variants else None
+            print(f"🔍 SERVICE: Found {total} products after product filters")
             
-            # If still no variant, create a dummy for display
-            if not variant:
-                print(f"⚠️ Product {product.product_id} has no variants - showing with empty variant")
-                variant_data = {
-                    "variant_id": 0,
-                    "variant_name": None,
-                    "price": 0.0,
-                    "final_price": 0.0,
-                    "discount_type": "NONE",
-                    "discount_value": 0.0,
-                    "stock_quantity": 0,
-                    "status": "INACTIVE",
-                    "images": []
-                }
-            else:
-                # Get variant images
-                images = self.repository.get_variant_images(self.db, variant.variant_id)
-                final_price = self.calculate_final_price(variant)
-                
-                variant_data = {
-                    "variant_id": variant.variant_id,
-                    "variant_name": variant.variant_name,
-                    "price": float(variant.price),
-                    "final_price": float(final_price),
-                    "discount_type": variant.discount_type,
-                    "discount_value": float(variant.discount_value),
-                    "stock_quantity": variant.stock_quantity,
-                    "status": variant.status,
-                    "images": [
-                        {
-                            "image_id": img.image_id,
-                            "url": img.url,
-                            "is_default": img.is_default
-                        } for img in images
-                    ]
-                }
+            if search_clean and page == 1:
+                self.search.record_search(search_clean, total)
             
-            # Get brand, category, subcategory
-            brand = self.repository.get_brand_by_id(self.db, product.brand_id)
-            subcategory = self.repository.get_subcategory_by_id(self.db, product.sub_category_id)
-            category = self.repository.get_category_by_id(self.db, subcategory.category_id) if subcategory else None
+            if total == 0:
+                return {
+                    "items": [],
+                    "total": 0,
+                    "page": page,
+                    "per_page": per_page,
+                    "total_pages": 0,
+                    "next_cursor": None
+                }
             
-            items.append({
-                "product_id": product.product_id,
-                "product_name": product.product_name,
-                "description": product.description,
-                "brand": {
-                    "brand_id": brand.brand_id if brand else None,
-                    "brand_name": brand.brand_name if brand else None
-                },
-                "category": {
-                    "category_id": category.category_id if category else None,
-                    "category_name": category.category_name if category else None
-                },
-                "subcategory": {
-                    "sub_category_id": subcategory.sub_category_id if subcategory else None,
-                    "sub_category_name": subcategory.sub_category_name if subcategory else None
-                },
-                "default_variant": variant_data
-            })
+            # Get paginated products
+            offset = (page - 1) * per_page
+            rows = apply_cursor(query, sort_column, Product.product_id, None, descending) \
+                .offset(offset).limit(per_page + 1).all()
+            rows, next_cursor = split_page(rows, per_page, row_key)
+            products = [row[0] for row in rows]
+        
+        print(f"🔍 SERVICE: Retrieved {len(products)} products for page {page}")
+        
+        # Build response - variants, images, brands and categories are batch-loaded
+        items = self._build_listing_items(
+            products,
+            fallback_to_any_variant=True,
+            include_created_at=False
+        )
         
         print(f"🔍 SERVICE: Built {len(items)} items")
         
         return {
             "items": items,
-            "total": total,  # Return ALL products count
+            "total": total,  # Return ALL products count (None in cursor mode)
             "page": page,
             "per_page": per_page,
-            "total_pages": total_pages
+            "total_pages": total_pages,
+            "next_cursor": next_cursor
         }
     
     def get_product_suggestions(self, query_text: str, limit: int = 10) -> List[str]:
@@ -196,11 +344,7 @@ class ProductService:
         if not query_text or not query_text.strip():
             return []
         
-        search_clean = query_text.strip()
-        search_pattern = f"%{search_clean}%"
-        
-        products = self.repository.search_products_by_name(self.db, search_pattern, limit)
-        return [r[0] for r in products]
+        return self.search.suggest(query_text.strip(), limit)
     
     def get_product_by_id(self, product_id: int) -> Dict[str, Any]:
         """Get product with all variants"""
@@ -265,6 +409,8 @@ class ProductService:
             **product_data.model_dump(exclude_unset=True),
             "created_at": datetime.now()
         })
+        self.search.index_product(new_product)
+        invalidate_tags(TAG_PRODUCTS)
         
         return {
             "product_id": new_product.product_id,
@@ -282,6 +428,8 @@ class ProductService:
             raise HTTPException(status_code=404, detail="Product not found")
         
         updated_product = self.repository.update_product(self.db, product, update_data)
+        self.search.index_product(updated_product)
+        invalidate_tags(TAG_PRODUCTS)
         
         return {
             "product_id": updated_product.product_id,
@@ -299,10 +447,13 @@ class ProductService:
             raise HTTPException(status_code=404, detail="Product not found")
         
         self.repository.delete_product(self.db, product)
+        self.search.remove_product(product_id)
+        invalidate_tags(TAG_PRODUCTS)
         return {"message": "Product deleted successfully"}
 
     # Add to your existing ProductService class
 
+    @cached("products.new_arrivals", ttl=120, tags=(TAG_PRODUCTS,))
     def get_new_arrivals(
         self,
         days: int = 7,
@@ -318,11 +469,11 @@ class ProductService:
         if category_id:
             query = query.join(SubCategory).filter(SubCategory.category_id == category_id)
         
-        # Apply sorting
-        if sort_by == "price_low":
-            query = query.order_by(asc(ProductVariant.price), asc(Product.product_id))
-        elif sort_by == "price_high":
-            query = query.order_by(desc(ProductVariant.price), asc(Product.product_id))
+        # Apply sorting (price sorts use the default variant's final price in SQL)
+        if sort_by in ("price_asc", "price_low"):
+            query = self._join_default_variant(query).order_by(asc(ProductVariant.final_price), asc(Product.product_id))
+        elif sort_by in ("price_desc", "price_high"):
+            query = self._join_default_variant(query).order_by(desc(ProductVariant.final_price), asc(Product.product_id))
         elif sort_by == "rating":
             # You can implement rating sorting when you have ratings
             query = query.order_by(desc(Product.created_at), asc(Product.product_id))
@@ -348,54 +499,7 @@ class ProductService:
         products = query.offset(offset).limit(per_page).all()
         
         # Build response
-        items = []
-        for product in products:
-            default_variant = self.repository.get_default_variant(self.db, product.product_id)
-            if not default_variant:
-                continue
-            
-            images = self.repository.get_variant_images(self.db, default_variant.variant_id)
-            brand = self.repository.get_brand_by_id(self.db, product.brand_id)
-            subcategory = self.repository.get_subcategory_by_id(self.db, product.sub_category_id)
-            category = self.repository.get_category_by_id(self.db, subcategory.category_id) if subcategory else None
-            
-            final_price = self.calculate_final_price(default_variant)
-            
-            items.append({
-                "product_id": product.product_id,
-                "product_name": product.product_name,
-                "description": product.description,
-                "brand": {
-                    "brand_id": brand.brand_id if brand else None,
-                    "brand_name": brand.brand_name if brand else None
-                },
-                "category": {
-                    "category_id": category.category_id if category else None,
-                    "category_name": category.category_name if category else None
-                },
-                "subcategory": {
-                    "sub_category_id": subcategory.sub_category_id if subcategory else None,
-                    "sub_category_name": subcategory.sub_category_name if subcategory else None
-                },
-                "created_at": product.created_at,
-                "default_variant": {
-                    "variant_id": default_variant.variant_id,
-                    "variant_name": default_variant.variant_name,
-                    "price": float(default_variant.price),
-                    "final_price": float(final_price),
-                    "discount_type": default_variant.discount_type,
-                    "discount_value": float(default_variant.discount_value),
-                    "stock_quantity": default_variant.stock_quantity,
-                    "status": default_variant.status,
-                    "images": [
-                        {
-                            "image_id": img.image_id,
-                            "url": img.url,
-                            "is_default": img.is_default
-                        } for img in images
-                    ]
-                }
-            })
+        items = self._build_listing_items(products, fallback_to_any_variant=False)
         
         return {
             "items": items,
@@ -406,17 +510,20 @@ class ProductService:
             "days": days
         }
 
+    @cached("products.trending", ttl=120, tags=(TAG_PRODUCTS,))
     def get_trending_products(self, limit: int = 6) -> List[Dict[str, Any]]:
         """Get trending products"""
         products = self.repository.get_trending_products_query(self.db, limit).all()
         
+        context = self._load_listing_context(products, fallback_to_any_variant=False)
+        
         trending_items = []
         for product in products:
-            default_variant = self.repository.get_default_variant(self.db, product.product_id)
+            default_variant = context["variants"].get(product.product_id)
             if not default_variant:
                 continue
             
-            images = self.repository.get_variant_images(self.db, default_variant.variant_id)
+            images = context["images"].get(default_variant.variant_id, [])
             final_price = self.calculate_final_price(default_variant)
             
             trending_items.append({
@@ -447,11 +554,11 @@ class ProductService:
         """Get products by category name"""
         query = self.repository.get_products_by_category_name(self.db, category_name)
         
-        # Apply sorting
-        if sort_by == "price_low":
-            query = query.order_by(asc(ProductVariant.price), asc(Product.product_id))
-        elif sort_by == "price_high":
-            query = query.order_by(desc(ProductVariant.price), asc(Product.product_id))
+        # Apply sorting (price sorts use the default variant's final price in SQL)
+        if sort_by in ("price_asc", "price_low"):
+            query = self._join_default_variant(query).order_by(asc(ProductVariant.final_price), asc(Product.product_id))
+        elif sort_by in ("price_desc", "price_high"):
+            query = self._join_default_variant(query).order_by(desc(ProductVariant.final_price), asc(Product.product_id))
         elif sort_by == "rating":
             query = query.order_by(desc(Product.created_at), asc(Product.product_id))
         else:  # newest
@@ -475,55 +582,8 @@ class ProductService:
         offset = (page - 1) * per_page
         products = query.offset(offset).limit(per_page).all()
         
-        # Build response (similar to get_all_products)
-        items = []
-        for product in products:
-            default_variant = self.repository.get_default_variant(self.db, product.product_id)
-            if not default_variant:
-                continue
-            
-            images = self.repository.get_variant_images(self.db, default_variant.variant_id)
-            brand = self.repository.get_brand_by_id(self.db, product.brand_id)
-            subcategory = self.repository.get_subcategory_by_id(self.db, product.sub_category_id)
-            category = self.repository.get_category_by_id(self.db, subcategory.category_id) if subcategory else None
-            
-            final_price = self.calculate_final_price(default_variant)
-            
-            items.append({
-                "product_id": product.product_id,
-                "product_name": product.product_name,
-                "description": product.description,
-                "brand": {
-                    "brand_id": brand.brand_id if brand else None,
-                    "brand_name": brand.brand_name if brand else None
-                },
-                "category": {
-                    "category_id": category.category_id if category else None,
-                    "category_name": category.category_name if category else None
-                },
-                "subcategory": {
-                    "sub_category_id": subcategory.sub_category_id if subcategory else None,
-                    "sub_category_name": subcategory.sub_category_name if subcategory else None
-                },
-                "created_at": product.created_at,
-                "default_variant": {
-                    "variant_id": default_variant.variant_id,
-                    "variant_name": default_variant.variant_name,
-                    "price": float(default_variant.price),
-                    "final_price": float(final_price),
-                    "discount_type": default_variant.discount_type,
-                    "discount_value": float(default_variant.discount_value),
-                    "stock_quantity": default_variant.stock_quantity,
-                    "status": default_variant.status,
-                    "images": [
-                        {
-                            "image_id": img.image_id,
-                            "url": img.url,
-                            "is_default": img.is_default
-                        } for img in images
-                    ]
-                }
-            })
+        # Build response (same listing engine as get_all_products)
+        items = self._build_listing_items(products, fallback_to_any_variant=False)
         
         return {
             "items": items,
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from repositories.product_catalog.variant_repository import VariantRepository
 from schemas.product_schema import VariantCreate, VariantUpdate
+from utils.cache import invalidate_tags, TAG_PRODUCTS
 from typing import List, Dict, Any, Optional
 from decimal import Decimal
 from datetime import datetime
@@ -129,6 +130,7 @@ class VariantService:
             "is_default": final_is_default
         })
         
+        invalidate_tags(TAG_PRODUCTS)
         return self.serialize_variant(new_variant, include_details=True)
     
     def update_variant(self, variant_id: int, update_data: VariantUpdate) -> Dict[str, Any]:
@@ -143,6 +145,7 @@ class VariantService:
         
         update_dict = update_data.model_dump(exclude_unset=True)
         updated_variant = self.repository.update_variant(self.db, variant, update_dict)
+        invalidate_tags(TAG_PRODUCTS)
         
         return self.serialize_variant(updated_variant, include_details=True)
     
@@ -167,6 +170,7 @@ class VariantService:
                 self.repository.update_variant(self.db, another_variant, {"is_default": True})
         
         self.repository.delete_variant(self.db, variant)
+        invalidate_tags(TAG_PRODUCTS)
         return {"message": "Variant deleted successfully"}
     
     def update_variant_stock(self, variant_id: int, quantity: int) -> Dict[str, Any]:
@@ -184,6 +188,7 @@ class VariantService:
             update_data["status"] = "ACTIVE"
         
         updated_variant = self.repository.update_variant(self.db, variant, update_data)
+        invalidate_tags(TAG_PRODUCTS)
         return self.serialize_variant(updated_variant)
     
     def update_variant_price(self, variant_id: int, price: Decimal) -> Dict[str, Any]:
@@ -193,6 +198,7 @@ class VariantService:
             raise HTTPException(status_code=404, detail="Variant not found")
         
         updated_variant = self.repository.update_variant(self.db, variant, {"price": price})
+        invalidate_tags(TAG_PRODUCTS)
         return self.serialize_variant(updated_variant)
     
     def set_variant_discount(self, variant_id: int, discount_type: str, discount_value: Decimal) -> Dict[str, Any]:
@@ -210,6 +216,7 @@ class VariantService:
         }
         
         updated_variant = self.repository.update_variant(self.db, variant, update_data)
+        invalidate_tags(TAG_PRODUCTS)
         return self.serialize_variant(updated_variant)
     
     def update_variant_status(self, variant_id: int, status: str) -> Dict[str, Any]:
@@ -222,6 +229,7 @@ class VariantService:
             raise HTTPException(status_code=400, detail="Invalid status")
         
         updated_variant = self.repository.update_variant(self.db, variant, {"status": status})
+        invalidate_tags(TAG_PRODUCTS)
         return self.serialize_variant(updated_variant)
     
     def set_default_variant(self, product_id: int, variant_id: int) -> Dict[str, str]:
@@ -235,6 +243,7 @@ class VariantService:
         
         # Set the specified variant as default
         self.repository.update_variant(self.db, variant, {"is_default": True})
+        invalidate_tags(TAG_PRODUCTS)
         
         return {"message": "Default variant updated successfully"}
 
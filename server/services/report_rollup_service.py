@@ -0,0 +1,87 @@
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional
+
+from repositories.report_rollup_repository import ReportRollupRepository, ROLLUP_KINDS, first_open_day
+
+# Days rebuilt per transaction during a backfill
+BACKFILL_CHUNK_DAYS = 31
+
+
+class ReportRollupService:
+    """Backfill and inspect the daily report rollups.
+
+    Reports keep the rollups current on their own (stale days are rebuilt on read);
+    a backfill just moves that cost out of the first request after a deploy or a
+    catalog reorganisation (rollups attribute sales to the product's category and
+    brand at build time).
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repository = ReportRollupRepository
+
+    def backfill(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        kinds: Optional[Iterable[str]] = None
+    ) -> Dict:
+        """Rebuild every closed day in the range (default: all history) for the given kinds"""
+        kinds = list(kinds or ROLLUP_KINDS)
+        unknown = [kind for kind in kinds if kind not in ROLLUP_KINDS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown rollup kind: {unknown[0]}"
+            )
+        if start_date and end_date and start_date > end_date:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="start_date must be on or before end_date"
+            )
+
+        # Open days are never materialized; reports read them raw
+        last_closed = first_open_day() - timedelta(days=1)
+        summary = {}
+        for kind in kinds:
+            first = start_date or self.repository.first_activity_day(self.db, kind)
+            last = min(end_date or last_closed, last_closed)
+            if first is None or first > last:
+                summary[kind] = {"days": 0, "rows": 0}
+                continue
+
+            days = rows = 0
+            chunk_start = first
+            while chunk_start <= last:
+                chunk_end = min(chunk_start + timedelta(days=BACKFILL_CHUNK_DAYS - 1), last)
+                try:
+                    rows += self.repository.rebuild(self.db, kind, chunk_start, chunk_end)
+                    self.db.commit()
+                except Exception:
+                    self.db.rollback()
+                    raise
+                days += (chunk_end - chunk_start).days + 1
+                chunk_start = chunk_end + timedelta(days=1)
+
+            print(f"✅ Rebuilt {kind} rollups for {first} to {last} ({days} days, {rows} rows)")
+            summary[kind] = {"start_date": first, "end_date": last, "days": days, "rows": rows}
+
+        return summary
+
+    def refresh(self) -> Dict[str, int]:
+        """Rebuild only stale or missing days, for all history"""
+        last_closed = first_open_day() - timedelta(days=1)
+        rebuilt = {}
+        for kind in ROLLUP_KINDS:
+            first = self.repository.first_activity_day(self.db, kind)
+            rebuilt[kind] = self.repository.ensure_current(self.db, kind, first, last_closed) if first else 0
+        return rebuilt
+
+    def get_status(self) -> Dict:
+        counts = self.repository.get_day_counts(self.db)
+        return {
+            kind: counts.get(kind, {"tracked_days": 0, "stale_days": 0, "last_day": None})
+            for kind in ROLLUP_KINDS
+        }
@@ -1,12 +1,14 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 from datetime import datetime, date
 from sqlalchemy.inspection import inspect
 import csv
 import io
 import json
 
+from config.database import SessionLocal
 from repositories.reports_repository import ReportsRepository
+from utils.export_stream import encode_rows, iter_ndjson, EXPORT_BATCH_SIZE
 from schemas.reports_schemas import (
     # Product Reports
     ProductPerformance, TopSellingProduct, ProductConversionRate,
@@ -36,9 +38,16 @@ from schemas.reports_schemas import (
     AdminActivity, NotificationReport,
     
     # Response schemas
-    ReportResponse, ReportExportResponse, ReportType, ReportFormat, DateRange
+    ReportResponse, ReportExportResponse, ReportType, ReportFormat, DateRange, ExportDataset
 )
 
+# Datasets exported row by row straight from a database cursor, with the schema of their rows
+STREAMING_EXPORTS = {
+    ExportDataset.ORDERS: (ReportsRepository.stream_all_orders, OrderDetail),
+    ExportDataset.ORDER_ITEMS: (ReportsRepository.stream_order_items_detail, OrderItemDetail),
+}
+STREAMING_FORMATS = (ReportFormat.CSV, ReportFormat.NDJSON, ReportFormat.JSON)
+
 class ReportsService:
     
     def __init__(self, db: Session):
@@ -413,8 +422,36 @@ class ReportsService:
         if format == ReportFormat.CSV:
             return self._to_csv(data), "text/csv"
 
+        if format == ReportFormat.NDJSON:
+            return b"".join(iter_ndjson(data)), "application/x-ndjson"
+
         return self._to_json(data), "application/json"
 
+    def stream_export(
+        self,
+        dataset: ExportDataset,
+        format: ReportFormat,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        compress: bool = False
+    ) -> Tuple[Iterator[bytes], str, str]:
+        """(byte chunks, media type, file extension) for a dataset, encoded while it is read"""
+        if format not in STREAMING_FORMATS:
+            raise ValueError(f"Streaming export supports csv, ndjson and json, not {format.value}")
+
+        stream, row_schema = STREAMING_EXPORTS[dataset]
+
+        def rows():
+            # The body is produced after the endpoint returns, so the cursor gets
+            # its own session instead of the request's
+            db = SessionLocal()
+            try:
+                yield from stream(db, start_date, end_date, EXPORT_BATCH_SIZE)
+            finally:
+                db.close()
+
+        return encode_rows(rows(), format.value, compress, fieldnames=list(row_schema.model_fields))
+
     def _to_csv(self, data):
         if not data:
             return b""
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from repositories.role_repository import RoleRepository
 from schemas.role_schema import RoleCreate
+from config.dependencies import invalidate_principal
 from typing import List, Dict, Any
 
 class RoleService:
@@ -65,6 +66,7 @@ class RoleService:
             raise HTTPException(status_code=404, detail="Role not found")
         
         updated_role = self.repository.update_role(self.db, role, update_data)
+        invalidate_principal()  # role names are cached on every holder's principal
         return self.serialize_role(updated_role)
     
     def delete_role(self, role_id: int) -> Dict[str, str]:
@@ -98,6 +100,7 @@ class RoleService:
             raise HTTPException(status_code=400, detail="Role already assigned to user")
         
         self.repository.create_user_role(self.db, user_id, role_id)
+        invalidate_principal(user_id)
         return {"message": "Role assigned successfully"}
     
     def remove_role_from_user(self, user_id: int, role_id: int) -> Dict[str, str]:
@@ -107,6 +110,7 @@ class RoleService:
             raise HTTPException(status_code=404, detail="Role not assigned to this user")
         
         self.repository.delete_user_role(self.db, user_role)
+        invalidate_principal(user_id)
         return {"message": "Role removed from user successfully"}
     
     def get_user_roles(self, user_id: int) -> List[Dict[str, Any]]:
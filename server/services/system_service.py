@@ -31,6 +31,10 @@ from schemas.system import (
 from datetime import datetime, timedelta
 from models.user import User
 from models.role import Role, UserRole
+from utils.cache import cache
+from utils.mail_transport import get_transport
+from repositories.outbox_repository import OutboxRepository, outbox_metrics, outbox_pool
+from repositories.request_metrics_repository import flush_request_metrics
 
 class SystemService:
     
@@ -290,9 +294,11 @@ class SystemService:
             time_period=summary_data["time_period"]
         )
     
-    def get_api_usage_overview(self) -> ApiUsageOverview:
+    def get_api_usage_overview(self, hours: int = 24) -> ApiUsageOverview:
         """Get API usage overview"""
-        usage_data = self.repository.get_api_usage_overview(self.db)
+        # Include this process's traffic since its last periodic flush
+        flush_request_metrics()
+        usage_data = self.repository.get_api_usage_overview(self.db, hours)
         
         endpoints = [
             ApiEndpointUsage(
@@ -300,7 +306,13 @@ class SystemService:
                 method=endpoint.get("method", "GET"),
                 request_count=endpoint.get("request_count", 0),
                 avg_response_time=endpoint.get("avg_response_time", 0),
-                error_rate=endpoint.get("error_rate", 0)
+                p50_response_time=endpoint.get("p50_response_time", 0),
+                p95_response_time=endpoint.get("p95_response_time", 0),
+                p99_response_time=endpoint.get("p99_response_time", 0),
+                error_rate=endpoint.get("error_rate", 0),
+                client_error_rate=endpoint.get("client_error_rate", 0),
+                avg_request_bytes=endpoint.get("avg_request_bytes", 0),
+                avg_response_bytes=endpoint.get("avg_response_bytes", 0)
             )
             for endpoint in usage_data.get("endpoints", [])
         ]
@@ -309,9 +321,53 @@ class SystemService:
             total_requests=usage_data.get("total_requests", 0),
             endpoints=endpoints,
             peak_hour=usage_data.get("peak_hour", "00:00"),
-            avg_response_time=usage_data.get("avg_response_time", 0)
+            peak_hour_requests=usage_data.get("peak_hour_requests", 0),
+            avg_response_time=usage_data.get("avg_response_time", 0),
+            p95_response_time=usage_data.get("p95_response_time", 0),
+            hours=usage_data.get("hours", hours)
         )
     
+    def get_cache_metrics(self) -> Dict[str, Any]:
+        """Response cache backend info and hit/miss counters per namespace"""
+        return cache.metrics()
+    
+    def clear_cache(self, reset_stats: bool = False) -> Dict[str, Any]:
+        """Drop every cached response (and optionally the counters)"""
+        cache.clear()
+        if reset_stats:
+            cache.stats.reset()
+        return {"message": "Cache cleared", "stats_reset": reset_stats}
+    
+    def get_outbox_metrics(self) -> Dict[str, Any]:
+        """Queue depth from the database, throughput of this process's workers"""
+        return {
+            "transport": get_transport().name,
+            "workers": outbox_pool.workers,
+            "workers_running": outbox_pool.running,
+            "queue": OutboxRepository.get_queue_stats(self.db),
+            "throughput": outbox_metrics.snapshot()
+        }
+    
+    def get_dead_outbox_jobs(self, kind: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Dead-lettered jobs with their last error"""
+        return [
+            {
+                "job_id": job.job_id,
+                "kind": job.kind,
+                "reference_id": job.reference_id,
+                "attempts": job.attempts,
+                "last_error": job.last_error,
+                "created_at": job.created_at,
+                "processed_at": job.processed_at
+            }
+            for job in OutboxRepository.get_dead_jobs(self.db, kind, limit)
+        ]
+    
+    def retry_dead_outbox_jobs(self, job_ids: Optional[List[int]] = None, kind: Optional[str] = None) -> Dict[str, Any]:
+        """Requeue dead-lettered jobs with fresh attempts"""
+        requeued = OutboxRepository.retry_dead(self.db, job_ids, kind)
+        return {"message": f"{requeued} jobs requeued", "requeued": requeued}
+    
     # ===== NOTIFICATION STATUS =====
     
     def get_notification_delivery_summary(self, days: int = 7) -> NotificationDeliverySummary:
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from repositories.user_repository import UserRepository
+from config.dependencies import invalidate_principal
 from typing import List, Dict, Any
 
 class UserService:
@@ -47,6 +48,7 @@ class UserService:
         filtered_data = {k: v for k, v in update_data.items() if k in allowed_fields}
         
         updated_user = self.repository.update_user(self.db, user, filtered_data)
+        invalidate_principal(user_id)
         return self.serialize_user(updated_user)
     
     def delete_user(self, user_id: int) -> Dict[str, str]:
@@ -56,4 +58,5 @@ class UserService:
             raise HTTPException(status_code=404, detail="User not found")
         
         self.repository.delete_user(self.db, user)
+        invalidate_principal(user_id)
         return {"message": "User deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+
+# The app imports its packages from the server directory and reads its settings
+# from the environment on import, so both are set up before anything is imported
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+
+TEST_DIR = tempfile.mkdtemp(prefix="nexora-tests-")
+os.environ["DB_URI"] = f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}"
+os.environ["OUTBOX_WORKERS"] = "0"
+os.environ["NOTIFICATION_ARCHIVE_DIR"] = os.path.join(TEST_DIR, "archive")
+
+import pytest
+from sqlalchemy import event
+
+from config.database import Base, SessionLocal, engine
+import models.inventory.purchase_return  # referenced by Purchase.returns
+
+engine.echo = False
+
+
+@event.listens_for(engine, "connect")
+def add_concat(dbapi_connection, connection_record):
+    """The reports use PostgreSQL's concat(), which SQLite only has from 3.44"""
+    dbapi_connection.create_function(
+        "concat", -1, lambda *parts: "".join("" if part is None else str(part) for part in parts)
+    )
+
+
+@pytest.fixture
+def db():
+    """A session on freshly created tables, dropped again after the test"""
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def statements():
+    """SQL statements sent to the database while the test runs, in order"""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield executed
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
@@ -0,0 +1,81 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from models.delivery.delivery import Delivery
+from models.delivery.delivery_earnings import DeliveryEarnings
+from models.order.order import Order
+from utils.date_range import between_days, on_day
+
+TODAY = date.today()
+
+RANGES = {
+    "today": (TODAY, TODAY),
+    "week": (TODAY - timedelta(days=6), TODAY),
+    "month": (TODAY.replace(day=1), TODAY),
+}
+
+
+def query_plan(db, stmt):
+    sql = stmt.compile(bind=db.get_bind(), compile_kwargs={"literal_binds": True})
+    rows = db.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + str(sql))
+    return " | ".join(row[-1] for row in rows)
+
+
+def day_filter(column, period):
+    start, end = RANGES[period]
+    return on_day(column, start) if period == "today" else between_days(column, start, end)
+
+
+@pytest.mark.parametrize("period", RANGES)
+def test_rider_delivery_filters_use_the_assigned_at_index(db, period):
+    stmt = select(Delivery.delivery_id).where(
+        Delivery.delivery_person_id == 1, day_filter(Delivery.assigned_at, period),
+    )
+
+    plan = query_plan(db, stmt)
+
+    assert "ix_delivery_person_assigned_at (delivery_person_id=? AND assigned_at>? AND assigned_at<?)" in plan
+
+
+@pytest.mark.parametrize("period", RANGES)
+def test_rider_completed_filters_use_the_delivered_at_index(db, period):
+    stmt = select(func.count(Delivery.delivery_id)).where(
+        Delivery.delivery_person_id == 1, day_filter(Delivery.delivered_at, period),
+    )
+
+    plan = query_plan(db, stmt)
+
+    assert "ix_delivery_person_delivered_at (delivery_person_id=? AND delivered_at>? AND delivered_at<?)" in plan
+
+
+@pytest.mark.parametrize("period", RANGES)
+def test_earnings_filters_use_the_earned_at_index(db, period):
+    stmt = select(func.sum(DeliveryEarnings.amount)).where(
+        DeliveryEarnings.delivery_person_id == 1, day_filter(DeliveryEarnings.earned_at, period),
+    )
+
+    plan = query_plan(db, stmt)
+
+    assert "ix_delivery_earnings_person_earned_at (delivery_person_id=? AND earned_at>? AND earned_at<?)" in plan
+
+
+@pytest.mark.parametrize("period", RANGES)
+def test_order_history_filters_use_the_placed_at_index(db, period):
+    stmt = select(Order.order_id).where(Order.user_id == 1, day_filter(Order.placed_at, period))
+
+    plan = query_plan(db, stmt)
+
+    assert "ix_order_user_placed_at (user_id=? AND placed_at>? AND placed_at<?)" in plan
+
+
+def test_wrapping_the_column_in_date_loses_the_range_seek(db):
+    # The form the half-open ranges replaced: the index can only seek on the rider
+    stmt = select(Delivery.delivery_id).where(
+        Delivery.delivery_person_id == 1, func.date(Delivery.assigned_at) == TODAY,
+    )
+
+    plan = query_plan(db, stmt)
+
+    assert "assigned_at>?" not in plan
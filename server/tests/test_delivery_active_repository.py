@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from models.address import Address, Area, City, State
+from models.delivery.delivery import Delivery
+from models.delivery.delivery_person import DeliveryPerson
+from models.order.order import Order
+from models.user import User
+from repositories.delivery_panel.delivery_active_repository import DeliveryActiveRepository
+
+OWNER, OTHER = 1, 2
+
+
+@pytest.fixture
+def delivery(db):
+    """One ASSIGNED delivery of rider OWNER; rider OTHER has none"""
+    db.add_all([
+        User(user_id=1, username="customer", email="customer@example.com", password_hash="x",
+             first_name="Casey", last_name="Customer", phone="9800000000"),
+        User(user_id=2, username="rider1", email="rider1@example.com", password_hash="x", first_name="R", last_name="One"),
+        User(user_id=3, username="rider2", email="rider2@example.com", password_hash="x", first_name="R", last_name="Two"),
+        State(state_id=1, state_name="State"),
+        City(city_id=1, city_name="City", state_id=1),
+        Area(area_id=1, area_name="Area", pincode="44600", city_id=1),
+    ])
+    db.flush()
+    db.add_all([
+        Address(address_id=1, user_id=1, address_type="Home", line1="Main road", area_id=1),
+        DeliveryPerson(delivery_person_id=OWNER, user_id=2),
+        DeliveryPerson(delivery_person_id=OTHER, user_id=3),
+    ])
+    db.flush()
+    db.add(Order(order_id=1, user_id=1, address_id=1, subtotal=100, total_amount=Decimal("100"), placed_at=datetime.now()))
+    db.flush()
+    row = Delivery(
+        order_id=1,
+        delivery_person_id=OWNER,
+        status="ASSIGNED",
+        assigned_at=datetime.now(),
+        expected_delivery_time=datetime.now() + timedelta(hours=1)
+    )
+    db.add(row)
+    db.commit()
+    return row.delivery_id
+
+
+def test_customer_contact_is_only_visible_to_the_assigned_rider(db, delivery):
+    assert DeliveryActiveRepository.get_customer_contact_info(db, delivery, OWNER) is not None
+    assert DeliveryActiveRepository.get_customer_contact_info(db, delivery, OTHER) is None
+
+
+def test_navigation_data_is_only_visible_to_the_assigned_rider(db, delivery):
+    assert DeliveryActiveRepository.get_delivery_navigation_data(db, delivery, OWNER) is not None
+    assert DeliveryActiveRepository.get_delivery_navigation_data(db, delivery, OTHER) is None
+
+
+def test_other_rider_cannot_change_the_status(db, delivery):
+    assert DeliveryActiveRepository.validate_status_transition(db, delivery, OTHER, "PICKED_UP")["valid"] is False
+    assert DeliveryActiveRepository.update_delivery_status(db, delivery, "PICKED_UP", OTHER) is False
+
+    db.expire_all()
+    assert db.get(Delivery, delivery).status == "ASSIGNED"
+
+
+def test_statistics_count_only_the_riders_own_deliveries(db, delivery):
+    assert DeliveryActiveRepository.get_delivery_statistics(db, OWNER)["total_active"] == 1
+    assert DeliveryActiveRepository.get_delivery_statistics(db, OTHER)["total_active"] == 0
+
+
+def add_active_delivery(db, order_id):
+    db.add(Order(order_id=order_id, user_id=1, address_id=1, subtotal=100, total_amount=Decimal("100"), placed_at=datetime.now()))
+    db.flush()
+    db.add(Delivery(
+        order_id=order_id,
+        delivery_person_id=OWNER,
+        status="PICKED_UP",
+        assigned_at=datetime.now(),
+        expected_delivery_time=datetime.now() + timedelta(hours=1)
+    ))
+    db.commit()
+
+
+@pytest.mark.parametrize("load", [
+    DeliveryActiveRepository.get_active_deliveries,
+    DeliveryActiveRepository.get_todays_deliveries,
+    lambda db, person_id: DeliveryActiveRepository.get_deliveries_by_status(db, person_id, "PICKED_UP"),
+])
+def test_delivery_lists_take_the_same_statements_for_one_or_many_rows(db, delivery, statements, load):
+    add_active_delivery(db, 2)
+    db.expire_all()
+    statements.clear()
+    few = load(db, OWNER)
+    one_row = len(statements)
+
+    for order_id in range(3, 12):
+        add_active_delivery(db, order_id)
+    db.expire_all()
+    statements.clear()
+    many = load(db, OWNER)
+
+    assert len(many) > len(few)
+    assert len(statements) == one_row
@@ -0,0 +1,88 @@
+import threading
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from config.database import SessionLocal
+from models.address import Address, Area, City, State
+from models.analytics.report_rollups import ReportRollupDay
+from models.delivery.delivery import Delivery
+from models.delivery.delivery_person import DeliveryPerson
+from models.order.order import Order
+from models.user import User
+from repositories.delivery_panel.delivery_available_repository import DeliveryAvailableRepository
+from repositories.report_rollup_repository import ROLLUP_DELIVERY
+
+RIDERS = 8
+
+
+@pytest.fixture
+def pool_delivery(db):
+    """One delivery in the pool, created three days ago, and RIDERS riders"""
+    db.add_all([
+        User(user_id=1, username="customer", email="customer@example.com", password_hash="x", first_name="C", last_name="Ustomer"),
+        State(state_id=1, state_name="State"),
+        City(city_id=1, city_name="City", state_id=1),
+        Area(area_id=1, area_name="Area", pincode="44600", city_id=1),
+    ])
+    db.add_all([
+        User(user_id=rider + 1, username=f"rider{rider}", email=f"rider{rider}@example.com", password_hash="x", first_name="R", last_name=str(rider))
+        for rider in range(1, RIDERS + 1)
+    ])
+    db.flush()
+    db.add(Address(address_id=1, user_id=1, address_type="Home", line1="Main road", area_id=1))
+    db.add_all([DeliveryPerson(delivery_person_id=rider, user_id=rider + 1) for rider in range(1, RIDERS + 1)])
+    db.flush()
+    db.add(Order(order_id=1, user_id=1, address_id=1, subtotal=100, total_amount=Decimal("100"), placed_at=datetime.now()))
+    db.flush()
+    created = datetime.now() - timedelta(days=3)
+    row = Delivery(order_id=1, status="AVAILABLE", is_available=True, assigned_at=created, available_since=created)
+    db.add(row)
+    db.commit()
+    return row.delivery_id
+
+
+def test_concurrent_claims_have_exactly_one_winner(db, pool_delivery):
+    barrier = threading.Barrier(RIDERS)
+    winners, errors = [], []
+
+    def claim(rider: int) -> None:
+        session = SessionLocal()
+        try:
+            barrier.wait()
+            won = DeliveryAvailableRepository().claim_deliveries(session, [pool_delivery], rider)
+            session.commit()
+            if won:
+                winners.append(rider)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=claim, args=(rider,)) for rider in range(1, RIDERS + 1)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(winners) == 1
+    db.expire_all()
+    delivery = db.get(Delivery, pool_delivery)
+    assert (delivery.status, delivery.delivery_person_id) == ("ASSIGNED", winners[0])
+
+
+def test_claim_marks_the_closed_day_it_leaves_after_commit(db, pool_delivery):
+    def versions():
+        rows = db.query(ReportRollupDay.day, ReportRollupDay.version).filter(ReportRollupDay.kind == ROLLUP_DELIVERY)
+        return dict(rows.all())
+
+    created_day = (datetime.now() - timedelta(days=3)).date()
+    before = versions()
+
+    assert DeliveryAvailableRepository().claim_deliveries(db, [pool_delivery], 1) == [pool_delivery]
+    assert versions() == before
+
+    db.commit()
+    assert versions() == {created_day: before[created_day] + 1}
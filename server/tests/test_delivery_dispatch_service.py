@@ -0,0 +1,60 @@
+import pytest
+
+import services.delivery_panel.delivery_dispatch_service as dispatch
+from models.delivery.delivery_person import DeliveryPerson
+from models.user import User
+from services.delivery_panel.delivery_dispatch_service import DeliveryDispatchService
+from utils.rider_index import rider_index
+
+PICKUP = (27.70, 85.30)
+
+
+@pytest.fixture
+def riders(db):
+    """Riders 1-3 near the pickup, nearest first; 1 and 2 online, 3 offline"""
+    db.add_all([
+        User(user_id=rider, username=f"rider{rider}", email=f"rider{rider}@example.com", password_hash="x", first_name="R", last_name=str(rider))
+        for rider in (1, 2, 3)
+    ])
+    db.flush()
+    db.add_all([
+        DeliveryPerson(delivery_person_id=rider, user_id=rider, status="ACTIVE", is_online=rider != 3,
+                       current_location={"lat": PICKUP[0] + rider * 0.001, "lng": PICKUP[1]})
+        for rider in (1, 2, 3)
+    ])
+    db.commit()
+    dispatch._index_loaded_at = None
+    yield
+    dispatch._index_loaded_at = None
+    rider_index.replace_all([])
+
+
+def set_online(db, rider, online):
+    """Change a rider the way another worker would: the database moves, this process's index does not"""
+    db.query(DeliveryPerson).filter(DeliveryPerson.delivery_person_id == rider).update(
+        {"is_online": online}, synchronize_session=False
+    )
+    db.commit()
+
+
+def nearest(db, k=2):
+    return [rider["delivery_person_id"] for rider in DeliveryDispatchService(db).find_nearest_riders(*PICKUP, k=k)]
+
+
+def test_rider_gone_offline_elsewhere_gets_no_offer(db, riders):
+    assert nearest(db) == [1, 2]
+
+    set_online(db, 1, False)
+
+    assert nearest(db) == [2]
+    assert 1 not in rider_index
+
+
+def test_index_reload_picks_up_riders_from_other_workers(db, riders):
+    assert nearest(db, k=3) == [1, 2]
+
+    set_online(db, 3, True)
+    assert nearest(db, k=3) == [1, 2]
+
+    dispatch._index_loaded_at -= dispatch.DISPATCH_INDEX_REFRESH_SECONDS
+    assert nearest(db, k=3) == [1, 2, 3]
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.delivery.delivery_person import DeliveryPerson
+from models.user import User
+from repositories.delivery_panel.delivery_location_repository import DeliveryLocationRepository
+from utils.location_buffer import LOCATION_FLUSH_SECONDS, LocationFix, location_buffer
+
+RIDER = 1
+
+
+@pytest.fixture
+def rider(db):
+    db.add(User(user_id=1, username="rider", email="rider@example.com", password_hash="x", first_name="R", last_name="Ider"))
+    db.flush()
+    db.add(DeliveryPerson(delivery_person_id=RIDER, user_id=1))
+    db.commit()
+    yield RIDER
+    location_buffer.drain()
+    location_buffer._latest.pop(RIDER, None)
+
+
+def stored_location(db):
+    db.expire_all()
+    return db.get(DeliveryPerson, RIDER).current_location
+
+
+def test_older_fix_does_not_overwrite_a_newer_one(db, rider):
+    now = datetime.now()
+    DeliveryLocationRepository.bulk_update_locations(db, [LocationFix(RIDER, 27.7, 85.3, recorded_at=now)])
+    db.commit()
+
+    DeliveryLocationRepository.bulk_update_locations(db, [LocationFix(RIDER, 27.1, 85.1, recorded_at=now - timedelta(seconds=10))])
+    db.commit()
+    assert stored_location(db)["lat"] == 27.7
+
+    DeliveryLocationRepository.bulk_update_locations(db, [LocationFix(RIDER, 27.9, 85.9, recorded_at=now + timedelta(seconds=10))])
+    db.commit()
+    assert stored_location(db)["lat"] == 27.9
+
+
+def test_buffered_fix_is_served_only_while_fresh(db, rider):
+    fix = LocationFix(RIDER, 27.7, 85.3)
+    location_buffer.record(fix)
+    assert DeliveryLocationRepository.get_current_location(db, RIDER)["lat"] == 27.7
+
+    # Flushed, then the rider's pings moved to another worker, which wrote a newer fix
+    location_buffer.drain()
+    fix.received_at -= LOCATION_FLUSH_SECONDS + 1
+    db.query(DeliveryPerson).update({"current_location": LocationFix(RIDER, 28.2, 84.0).as_location()})
+    db.commit()
+
+    assert DeliveryLocationRepository.get_current_location(db, RIDER)["lat"] == 28.2
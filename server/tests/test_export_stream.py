@@ -0,0 +1,25 @@
+from utils.export_stream import encode_rows
+
+
+def test_csv_without_rows_is_just_the_header():
+    chunks, media_type, _ = encode_rows(iter([]), "csv", fieldnames=["order_id", "total_amount"])
+
+    assert b"".join(chunks) == b"order_id,total_amount\r\n"
+    assert media_type == "text/csv"
+
+
+def test_csv_header_is_sent_before_the_first_row_is_read():
+    def rows():
+        raise AssertionError("rows read before the header was sent")
+        yield
+
+    chunks, _, _ = encode_rows(rows(), "csv", fieldnames=["order_id"])
+
+    assert next(chunks) == b"order_id\r\n"
+
+
+def test_csv_columns_follow_the_rows_without_fieldnames():
+    chunks, _, _ = encode_rows(iter([{"a": 1, "b": 2}]), "csv")
+
+    assert b"".join(chunks) == b"a,b\r\n1,2\r\n"
+
@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from models.notification import Notification, NotificationBroadcast, NotificationType, BROADCAST_FEED
+from models.user import User
+
+
+@pytest.fixture
+def broadcast(db):
+    db.add(User(user_id=1, username="user", email="user@example.com", password_hash="x", first_name="U", last_name="Ser"))
+    db.add(NotificationBroadcast(broadcast_id=1, title="Sale", message="Everything 10% off", type=NotificationType.SYSTEM, mode=BROADCAST_FEED))
+    db.commit()
+    return db.get(NotificationBroadcast, 1)
+
+
+def copy_of(broadcast):
+    """A user's copy of a broadcast, as the fan-out and the feed merge both write it"""
+    return Notification(user_id=1, title=broadcast.title, message=broadcast.message, type=broadcast.type,
+                        broadcast_id=broadcast.broadcast_id, created_at=broadcast.created_at)
+
+
+def test_unique_broadcast_index_includes_the_partition_key():
+    index = next(index for index in Notification.__table__.indexes if index.name == "ux_notifications_user_broadcast")
+
+    assert index.unique
+    assert "created_at" in [column.name for column in index.columns]
+
+
+def test_second_copy_of_a_broadcast_is_rejected(db, broadcast):
+    db.add(copy_of(broadcast))
+    db.commit()
+
+    db.add(copy_of(broadcast))
+    with pytest.raises(IntegrityError):
+        db.commit()
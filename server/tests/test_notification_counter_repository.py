@@ -0,0 +1,76 @@
+import pytest
+
+from models.notification import Notification, NotificationType
+from models.user import User
+from repositories.notification_counter_repository import NotificationCounterRepository, forget_counts
+from repositories.notification_repository import NotificationRepository
+
+LIGHT, HEAVY = 1, 2
+
+
+@pytest.fixture
+def users(db):
+    """User LIGHT with a handful of notifications, HEAVY with thousands"""
+    forget_counts([None])
+    db.add_all([
+        User(user_id=LIGHT, username="light", email="light@example.com", password_hash="x", first_name="L", last_name="Ight"),
+        User(user_id=HEAVY, username="heavy", email="heavy@example.com", password_hash="x", first_name="H", last_name="Eavy"),
+    ])
+    db.flush()
+    for user_id, count in ((LIGHT, 5), (HEAVY, 5000)):
+        db.add_all([
+            Notification(user_id=user_id, title="Order update", message=f"Update {n}", type=NotificationType.SYSTEM, is_read=n % 2 == 0)
+            for n in range(count)
+        ])
+    db.commit()
+    yield
+    forget_counts([None])
+
+
+def counts_match_rows(db, user_id):
+    db.expire_all()
+    forget_counts([user_id])
+    counts = NotificationCounterRepository.get_counts(db, user_id)
+    return (counts["unread_count"], counts["total_count"]) == NotificationCounterRepository.count_from_rows(db, user_id)
+
+
+@pytest.mark.parametrize("user_id", [LIGHT, HEAVY])
+def test_bell_lookup_does_not_count_notification_rows(db, users, statements, user_id):
+    NotificationRepository.get_unread_count(db, user_id)  # first read seeds the counter row
+    forget_counts([user_id])
+    statements.clear()
+    miss = NotificationRepository.get_unread_count(db, user_id)
+    miss_statements = list(statements)
+
+    statements.clear()
+    hit = NotificationRepository.get_unread_count(db, user_id)
+
+    assert statements == []
+    assert len(miss_statements) == 1
+    assert "notification_counters" in miss_statements[0] and "FROM notifications" not in miss_statements[0]
+    assert miss == hit == NotificationCounterRepository.count_from_rows(db, user_id)[0]
+
+
+def test_counters_follow_single_writes(db, users):
+    notification = db.query(Notification).filter(Notification.user_id == LIGHT, Notification.is_read == False).first()
+
+    NotificationRepository.mark_as_read(db, notification.notification_id, LIGHT)
+    assert counts_match_rows(db, LIGHT)
+
+    NotificationRepository.delete_notification(db, notification.notification_id, LIGHT)
+    assert counts_match_rows(db, LIGHT)
+
+    db.add(Notification(user_id=LIGHT, title="New", message="Fresh", type=NotificationType.SYSTEM))
+    db.commit()
+    assert counts_match_rows(db, LIGHT)
+
+
+def test_counters_follow_bulk_writes(db, users):
+    NotificationRepository.mark_all_as_read(db, HEAVY)
+    assert counts_match_rows(db, HEAVY)
+    assert NotificationRepository.get_unread_count(db, HEAVY) == 0
+
+    NotificationRepository.delete_all_notifications(db, HEAVY)
+    assert counts_match_rows(db, HEAVY)
+    assert NotificationRepository.get_total_count(db, HEAVY) == 0
+    assert counts_match_rows(db, LIGHT)
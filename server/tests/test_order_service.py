@@ -0,0 +1,85 @@
+from decimal import Decimal
+
+import pytest
+
+from models.address import Address, Area, City, State
+from models.cart import Cart
+from models.order.order import Order
+from models.product_catalog.category import Category
+from models.product_catalog.product import Product
+from models.product_catalog.product_variant import ProductVariant
+from models.product_catalog.sub_category import SubCategory
+from models.user import User
+from schemas.checkout_schema import ConfirmCheckoutRequest
+from schemas.order_schema import OrderCreate
+from services.checkout_service import CheckoutService
+from services.order_service import OrderService
+
+VARIANTS, STOCK = 100, 1000
+
+
+@pytest.fixture
+def shop(db):
+    """One customer with an address, and VARIANTS variants of STOCK units each"""
+    db.add_all([
+        User(user_id=1, username="customer", email="customer@example.com", password_hash="x", first_name="C", last_name="Ustomer"),
+        Category(category_id=1, category_name="Category"),
+        State(state_id=1, state_name="State"),
+        City(city_id=1, city_name="City", state_id=1),
+        Area(area_id=1, area_name="Area", pincode="44600", city_id=1),
+    ])
+    db.flush()
+    db.add(SubCategory(sub_category_id=1, sub_category_name="Sub", category_id=1))
+    db.add(Address(address_id=1, user_id=1, address_type="Home", line1="Main road", area_id=1))
+    db.flush()
+    db.add_all([Product(product_id=product_id, product_name=f"Product {product_id}", sub_category_id=1) for product_id in range(1, VARIANTS + 1)])
+    db.flush()
+    db.add_all([
+        ProductVariant(variant_id=variant_id, product_id=variant_id, price=Decimal("10"), stock_quantity=STOCK, is_default=True)
+        for variant_id in range(1, VARIANTS + 1)
+    ])
+    db.commit()
+
+
+def order_statements(db, statements, lines):
+    order = OrderCreate(
+        address_id=1,
+        subtotal=10 * lines,
+        total_amount=10 * lines,
+        items=[{"variant_id": variant_id, "quantity": 1} for variant_id in range(1, lines + 1)],
+    )
+    db.expire_all()
+    statements.clear()
+    OrderService(db).create_order(order, 1)
+    return len(statements)
+
+
+def checkout_statements(db, statements, lines):
+    db.add_all([Cart(user_id=1, variant_id=variant_id, price=Decimal("10"), quantity=2) for variant_id in range(1, lines + 1)])
+    db.commit()
+    db.expire_all()
+    statements.clear()
+    CheckoutService.confirm_order(db, 1, ConfirmCheckoutRequest(address_id=1))
+    count = len(statements)
+    db.query(Cart).delete()
+    db.commit()
+    return count
+
+
+def test_create_order_takes_a_fixed_number_of_statements(db, shop, statements):
+    counts = {lines: order_statements(db, statements, lines) for lines in (1, 10, VARIANTS)}
+
+    assert len(set(counts.values())) == 1, counts
+    assert db.query(Order).count() == 3
+    db.expire_all()
+    assert db.get(ProductVariant, 1).stock_quantity == STOCK - 3
+    assert db.get(ProductVariant, VARIANTS).stock_quantity == STOCK - 1
+
+
+def test_checkout_takes_a_fixed_number_of_statements(db, shop, statements):
+    counts = {lines: checkout_statements(db, statements, lines) for lines in (1, 10, VARIANTS)}
+
+    assert len(set(counts.values())) == 1, counts
+    db.expire_all()
+    assert db.get(ProductVariant, 1).stock_quantity == STOCK - 6
+    assert db.get(ProductVariant, VARIANTS).stock_quantity == STOCK - 2
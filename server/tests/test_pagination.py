@@ -0,0 +1,77 @@
+from operator import attrgetter
+
+import pytest
+
+from models.product_catalog.category import Category
+from models.product_catalog.product import Product
+from models.product_catalog.sub_category import SubCategory
+from services.product_catalog.product_service import ProductService
+from utils.pagination import Paginator, decode_cursor, split_page
+
+
+@pytest.fixture
+def products(db):
+    """12 products; 1-8 stamped by the server default (same second, no fractional
+    seconds on SQLite), 9-12 written with microseconds inside that second"""
+    db.add_all([Category(category_id=1, category_name="Category"), SubCategory(sub_category_id=1, sub_category_name="Sub", category_id=1)])
+    db.flush()
+    db.add_all([Product(product_id=product_id, product_name=f"Product {product_id}", sub_category_id=1) for product_id in range(1, 9)])
+    db.commit()
+    second = db.get(Product, 1).created_at
+    db.add_all([
+        Product(product_id=product_id, product_name=f"Product {product_id}", sub_category_id=1,
+                created_at=second.replace(microsecond=product_id * 1000))
+        for product_id in range(9, 13)
+    ])
+    db.commit()
+    return second
+
+
+def test_cursor_pages_through_rows_sharing_a_second(db, products):
+    seen, cursor = [], None
+    for _ in range(5):
+        page = Paginator(db.query(Product), per_page=5).cursor_paginate(Product.created_at, Product.product_id, cursor)
+        seen.extend(product.product_id for product in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == [12, 11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1]
+
+
+def test_newest_products_listing_advances_with_its_cursor(db, products):
+    service = ProductService(db)
+    seen, cursor = [], None
+    for _ in range(5):
+        page = service.get_all_products(per_page=5, sort_by="newest", cursor=cursor)
+        seen.extend(item["product_id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert sorted(seen) == list(range(1, 13))
+    assert len(seen) == len(set(seen))
+
+
+def test_split_page_sets_a_cursor_only_when_the_extra_row_exists(db, products):
+    rows = db.query(Product).order_by(Product.product_id).all()
+
+    page, cursor = split_page(rows[:6], 6, attrgetter("created_at", "product_id"))
+    assert len(page) == 6 and cursor is None
+
+    page, cursor = split_page(rows[:7], 6, attrgetter("created_at", "product_id"))
+    assert [product.product_id for product in page] == [1, 2, 3, 4, 5, 6]
+    assert decode_cursor(cursor)[1] == 6
+
+
+def test_full_last_page_has_no_cursor(db, products):
+    service = ProductService(db)
+
+    first = service.get_all_products(page=1, per_page=6, sort_by="newest")
+    last = service.get_all_products(page=2, per_page=6, sort_by="newest")
+
+    assert len(first["items"]) == 6 and first["next_cursor"] is not None
+    assert len(last["items"]) == 6 and last["next_cursor"] is None
+    cursor_page = service.get_all_products(per_page=6, sort_by="newest", cursor=first["next_cursor"])
+    assert [item["product_id"] for item in cursor_page["items"]] == [item["product_id"] for item in last["items"]]
+    assert cursor_page["next_cursor"] is None
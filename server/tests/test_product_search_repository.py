@@ -0,0 +1,35 @@
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from models.product_catalog.product import Product
+from repositories.product_catalog.product_search_repository import ProductSearchRepository
+
+
+def compile_postgres(clauses) -> str:
+    match_filter, rank = clauses
+    statement = select(Product.product_id).where(match_filter).order_by(rank.desc())
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_match_without_pg_trgm_uses_no_trigram_functions():
+    sql = compile_postgres(ProductSearchRepository.build_match_clauses("runing shoes", trigram=False))
+
+    assert "similarity" not in sql
+    assert " % " not in sql
+    assert "ILIKE" in sql
+    assert "ts_rank" in sql
+
+
+def test_match_with_pg_trgm_keeps_typo_tolerance():
+    sql = compile_postgres(ProductSearchRepository.build_match_clauses("runing shoes", trigram=True))
+
+    assert "similarity(product.product_name" in sql
+    assert "ts_rank" in sql
+
+
+def test_no_trigram_support_outside_postgres(db):
+    assert ProductSearchRepository.has_trigram(db) is False
+
+
+def test_text_without_tokens_matches_nothing():
+    assert ProductSearchRepository.build_match_clauses("  !? ", trigram=False) is None
@@ -0,0 +1,64 @@
+from decimal import Decimal
+
+import pytest
+
+from models.product_catalog.category import Category
+from models.product_catalog.product import Product
+from models.product_catalog.product_brand import ProductBrand
+from models.product_catalog.product_image import ProductImage
+from models.product_catalog.product_variant import ProductVariant
+from models.product_catalog.sub_category import SubCategory
+from services.product_catalog.product_service import ProductService
+
+PRODUCTS = 100
+
+
+@pytest.fixture
+def catalog(db):
+    """PRODUCTS products spread over two brands, each with a default variant and image"""
+    db.add_all([
+        Category(category_id=1, category_name="Grocery"),
+        SubCategory(sub_category_id=1, sub_category_name="Snacks", category_id=1),
+        ProductBrand(brand_id=1, brand_name="Brand A"),
+        ProductBrand(brand_id=2, brand_name="Brand B"),
+    ])
+    db.flush()
+    for product_id in range(1, PRODUCTS + 1):
+        db.add(Product(product_id=product_id, product_name=f"Product {product_id}", brand_id=product_id % 2 + 1, sub_category_id=1))
+    db.flush()
+    for product_id in range(1, PRODUCTS + 1):
+        db.add(ProductVariant(variant_id=product_id, product_id=product_id, price=Decimal("100"), stock_quantity=5, is_default=True))
+    db.flush()
+    for product_id in range(1, PRODUCTS + 1):
+        db.add(ProductImage(variant_id=product_id, url=f"https://img.example.com/{product_id}.jpg", is_default=True))
+    db.commit()
+
+
+def listing_statements(db, statements, load, per_page):
+    db.expire_all()
+    statements.clear()
+    page = load(ProductService(db), per_page)
+    assert len(page["items"]) == per_page
+    return len(statements)
+
+
+@pytest.mark.parametrize("load", [
+    lambda service, per_page: service.get_all_products(per_page=per_page),
+    lambda service, per_page: service.get_all_products(per_page=per_page, sort_by="price_asc"),
+    lambda service, per_page: service.get_products_by_category_name("Grocery", per_page=per_page),
+])
+def test_listing_query_count_does_not_grow_with_page_size(db, catalog, statements, load):
+    counts = {per_page: listing_statements(db, statements, load, per_page) for per_page in (5, 50, PRODUCTS)}
+
+    assert len(set(counts.values())) == 1, counts
+
+
+def test_listing_items_carry_the_batch_loaded_details(db, catalog):
+    items = ProductService(db).get_all_products(per_page=10, sort_by="price_asc")["items"]
+
+    assert len(items) == 10
+    for item in items:
+        assert item["brand"]["brand_name"] in ("Brand A", "Brand B")
+        assert item["category"]["category_name"] == "Grocery"
+        assert item["default_variant"]["variant_id"] == item["product_id"]
+        assert item["default_variant"]["images"][0]["url"].endswith(f"/{item['product_id']}.jpg")
@@ -0,0 +1,39 @@
+from decimal import Decimal
+
+import pytest
+
+from models.product_catalog.category import Category
+from models.product_catalog.product import Product
+from models.product_catalog.product_variant import ProductVariant
+from models.product_catalog.sub_category import SubCategory
+
+
+@pytest.fixture
+def variants(db):
+    """One variant per discount shape, including a FLAT discount above the price"""
+    db.add_all([Category(category_id=1, category_name="Category"), SubCategory(sub_category_id=1, sub_category_name="Sub", category_id=1)])
+    db.flush()
+    db.add(Product(product_id=1, product_name="Product", sub_category_id=1))
+    db.flush()
+    db.add_all([
+        ProductVariant(variant_id=1, product_id=1, price=Decimal("200"), discount_type="PERCENT", discount_value=Decimal("15")),
+        ProductVariant(variant_id=2, product_id=1, price=Decimal("200"), discount_type="FLAT", discount_value=Decimal("50")),
+        ProductVariant(variant_id=3, product_id=1, price=Decimal("40"), discount_type="FLAT", discount_value=Decimal("60")),
+        ProductVariant(variant_id=4, product_id=1, price=Decimal("200"), discount_type="NONE", discount_value=Decimal("0")),
+    ])
+    db.commit()
+
+
+def test_sql_discount_percentage_matches_python(db, variants):
+    rows = db.query(ProductVariant, ProductVariant.discount_percentage).order_by(ProductVariant.variant_id).all()
+
+    for variant, sql_percentage in rows:
+        assert Decimal(str(sql_percentage)) == pytest.approx(variant.discount_percentage)
+    assert Decimal(str(rows[2][1])) == 100
+
+
+def test_sql_final_price_matches_python(db, variants):
+    rows = db.query(ProductVariant, ProductVariant.final_price).order_by(ProductVariant.variant_id).all()
+
+    for variant, sql_price in rows:
+        assert Decimal(str(sql_price)) == pytest.approx(variant.final_price)
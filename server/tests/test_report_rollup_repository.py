@@ -0,0 +1,67 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from models.address import Address, Area, City, State
+from models.analytics.report_rollups import DailySalesRollup, ReportRollupDay
+from models.order.order import Order
+from models.user import User
+from repositories.report_rollup_repository import ROLLUP_SALES, ReportRollupRepository, first_open_day
+
+
+@pytest.fixture
+def customer(db):
+    db.add_all([
+        User(user_id=1, username="customer", email="customer@example.com", password_hash="x", first_name="C", last_name="Ustomer"),
+        State(state_id=1, state_name="State"),
+        City(city_id=1, city_name="City", state_id=1),
+        Area(area_id=1, area_name="Area", pincode="44600", city_id=1),
+    ])
+    db.flush()
+    db.add(Address(address_id=1, user_id=1, address_type="Home", line1="Main road", area_id=1))
+    db.commit()
+
+
+def place_order(db, order_id, placed_at):
+    db.add(Order(order_id=order_id, user_id=1, address_id=1, subtotal=100, total_amount=Decimal("100"), placed_at=placed_at))
+    db.commit()
+
+
+def test_current_writes_leave_the_rollup_day_table_alone(db, customer):
+    place_order(db, 1, datetime.now())
+
+    order = db.get(Order, 1)
+    order.total_amount = Decimal("90")
+    db.commit()
+
+    assert db.query(ReportRollupDay).count() == 0
+
+
+def test_edits_to_a_closed_day_mark_it_stale(db, customer):
+    placed_at = datetime.now() - timedelta(days=3)
+    place_order(db, 1, placed_at)
+
+    order = db.get(Order, 1)
+    order.total_amount = Decimal("90")
+    db.commit()
+
+    marked = db.query(ReportRollupDay).filter(ReportRollupDay.kind == ROLLUP_SALES).all()
+    assert [(row.day, row.built_version < row.version) for row in marked] == [(placed_at.date(), True)]
+
+
+def test_yesterday_stays_open_just_after_midnight():
+    assert first_open_day(datetime(2026, 1, 2, 0, 1)) == date(2026, 1, 1)
+    assert first_open_day(datetime(2026, 1, 2, 0, 10)) == date(2026, 1, 2)
+
+
+def test_report_totals_cover_closed_and_open_days(db, customer):
+    place_order(db, 1, datetime.now() - timedelta(days=3))
+    place_order(db, 2, datetime.now())
+    db.query(Order).update({"order_status": "DELIVERED"})
+    db.commit()
+
+    totals = ReportRollupRepository.aggregate(db, ROLLUP_SALES, DailySalesRollup, (), ("order_count", "revenue"))
+
+    assert totals[()]["order_count"] == 2
+    assert Decimal(str(totals[()]["revenue"])) == 200
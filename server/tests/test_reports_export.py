@@ -0,0 +1,68 @@
+import tracemalloc
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert
+
+from models.address import Address, Area, City, State
+from models.order.order import Order
+from models.user import User
+from repositories.reports_repository import ReportsRepository
+from utils.export_stream import encode_rows
+
+
+@pytest.fixture
+def customer(db):
+    db.add_all([
+        User(user_id=1, username="customer", email="customer@example.com", password_hash="x", first_name="C", last_name="Ustomer"),
+        State(state_id=1, state_name="State"),
+        City(city_id=1, city_name="City", state_id=1),
+        Area(area_id=1, area_name="Area", pincode="44600", city_id=1),
+    ])
+    db.flush()
+    db.add(Address(address_id=1, user_id=1, address_type="Home", line1="Main road", area_id=1))
+    db.commit()
+
+
+def add_orders(db, first, last):
+    db.execute(insert(Order), [
+        {"order_id": order_id, "user_id": 1, "address_id": 1, "subtotal": 100, "total_amount": Decimal("100"), "placed_at": datetime.now()}
+        for order_id in range(first, last + 1)
+    ])
+    db.commit()
+
+
+def streamed_export_peak(db, export_format, compress=False):
+    """Peak traced memory of streaming the all-orders report, and its size in bytes"""
+    db.expire_all()
+    size = 0
+    tracemalloc.start()
+    try:
+        chunks, _, _ = encode_rows(ReportsRepository.stream_all_orders(db), export_format, compress=compress)
+        for chunk in chunks:
+            size += len(chunk)
+        return tracemalloc.get_traced_memory()[1], size
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("export_format, compress", [("csv", False), ("ndjson", True)])
+def test_streamed_export_memory_stays_flat_as_rows_grow(db, customer, export_format, compress):
+    # Past one fetch batch (1000 rows) the peak is steady, so 5x the rows must not move it
+    add_orders(db, 1, 2000)
+    small_peak, small_size = streamed_export_peak(db, export_format, compress)
+    add_orders(db, 2001, 10000)
+    large_peak, large_size = streamed_export_peak(db, export_format, compress)
+
+    assert large_size > 4 * small_size
+    assert large_peak < 1.5 * small_peak, (small_peak, large_peak)
+
+
+def test_streamed_export_matches_the_report_rows(db, customer):
+    add_orders(db, 1, 3)
+
+    streamed = list(ReportsRepository.stream_all_orders(db))
+
+    assert streamed == ReportsRepository.report_all_orders(db)
+    assert streamed[0]["customer_name"] == "C Ustomer"
@@ -0,0 +1,105 @@
+import asyncio
+import statistics
+from time import perf_counter
+from types import SimpleNamespace
+
+import pytest
+
+from utils.request_metrics import (
+    UNMATCHED_ROUTE,
+    RequestMetrics,
+    RequestMetricsMiddleware,
+    histogram_quantile,
+    render_prometheus,
+)
+
+ROUTE = SimpleNamespace(path="/api/v1/products/{product_id}")
+
+
+async def routed_app(scope, receive, send):
+    """Reads the body and answers 200, routed like a FastAPI path operation"""
+    scope["route"] = ROUTE
+    await receive()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"hello"})
+
+
+async def failing_app(scope, receive, send):
+    raise RuntimeError("boom")
+
+
+async def receive():
+    return {"type": "http.request", "body": b"12345678", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+def http_scope(path="/api/v1/products/7"):
+    return {"type": "http", "method": "GET", "path": path, "root_path": ""}
+
+
+def test_finished_requests_are_folded_into_route_totals():
+    metrics = RequestMetrics()
+    app = RequestMetricsMiddleware(routed_app, metrics)
+
+    for _ in range(3):
+        asyncio.run(app(http_scope(), receive, send))
+
+    stats = metrics.totals()[("GET", ROUTE.path)]
+    assert stats.count == 3 and stats.statuses == {200: 3}
+    assert stats.request_bytes == 24 and stats.response_bytes == 15
+    assert metrics.info()["in_flight"] == 0
+    assert f'http_requests_total{{method="GET",route="{ROUTE.path}",status="200"}} 3' in render_prometheus(metrics)
+
+
+def test_an_exception_is_recorded_as_an_unmatched_500():
+    metrics = RequestMetrics()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(RequestMetricsMiddleware(failing_app, metrics)(http_scope("/nowhere"), receive, send))
+
+    stats = metrics.totals()[("GET", UNMATCHED_ROUTE)]
+    assert stats.errors == 1 and stats.statuses == {500: 1}
+
+
+def test_a_full_ring_counts_an_overflow_and_keeps_the_newest():
+    metrics = RequestMetrics(buffer_size=2)
+    app = RequestMetricsMiddleware(routed_app, metrics)
+
+    for _ in range(5):
+        asyncio.run(app(http_scope(), receive, send))
+
+    assert metrics.collect() == 2
+    assert metrics.info()["overflows"] == 1
+
+
+def test_quantiles_interpolate_inside_the_bucket():
+    assert histogram_quantile(0.5, [(10, 100)]) == pytest.approx(7.5 + 2.5 * 0.5)
+    assert histogram_quantile(0.99, [(float("inf"), 1)]) == 30000
+    assert histogram_quantile(0.5, []) == 0.0
+
+
+def test_middleware_overhead_is_under_fifty_microseconds():
+    metrics = RequestMetrics(buffer_size=100_000)
+    wrapped = RequestMetricsMiddleware(routed_app, metrics)
+    requests = 5000
+
+    async def per_request(app):
+        started = perf_counter()
+        for _ in range(requests):
+            await app(http_scope(), receive, send)
+        return (perf_counter() - started) / requests
+
+    async def measure():
+        bare, timed = [], []
+        for _ in range(5):
+            bare.append(await per_request(routed_app))
+            timed.append(await per_request(wrapped))
+            metrics.collect()
+        return statistics.median(timed) - statistics.median(bare)
+
+    overhead = asyncio.run(measure())
+
+    assert overhead < 50e-6, f"{overhead * 1e6:.1f} us per request"
@@ -0,0 +1,54 @@
+import random
+import statistics
+import time
+
+import pytest
+
+from utils.route_planner import haversine_km
+from utils.rider_index import RiderLocationIndex
+
+RIDERS = 10_000
+
+
+@pytest.fixture(scope="module")
+def city():
+    """10k riders spread over a ~30 km square, and 200 query points in it"""
+    rng = random.Random(7)
+    riders = [(rider_id, 27.55 + rng.random() * 0.3, 85.2 + rng.random() * 0.3) for rider_id in range(RIDERS)]
+    index = RiderLocationIndex()
+    index.replace_all(riders)
+    points = [(27.55 + rng.random() * 0.3, 85.2 + rng.random() * 0.3) for _ in range(200)]
+    return index, riders, points
+
+
+def brute_force(riders, lat, lng, k, exclude=(), max_km=None):
+    distances = sorted(
+        (haversine_km(lat, lng, rider_lat, rider_lng), rider_id)
+        for rider_id, rider_lat, rider_lng in riders if rider_id not in exclude
+    )
+    return [(rider_id, distance) for distance, rider_id in distances if max_km is None or distance <= max_km][:k]
+
+
+def test_nearest_matches_brute_force(city):
+    index, riders, points = city
+    for lat, lng in points[:50]:
+        expected = brute_force(riders, lat, lng, 5, exclude={1, 2, 3})
+        found = index.nearest(lat, lng, 5, exclude={1, 2, 3})
+        assert [rider_id for rider_id, _ in found] == [rider_id for rider_id, _ in expected]
+
+
+def test_nearest_respects_max_km_far_from_everyone(city):
+    index, riders, _ = city
+    assert index.nearest(28.5, 86.5, 3, max_km=15) == []
+    assert [r for r, _ in index.nearest(28.0, 85.35, 3)] == [r for r, _ in brute_force(riders, 28.0, 85.35, 3)]
+
+
+def test_nearest_among_10k_riders_is_sub_millisecond(city):
+    index, _, points = city
+    timings = []
+    for lat, lng in points:
+        started = time.perf_counter()
+        index.nearest(lat, lng, 3, max_km=15)
+        timings.append(time.perf_counter() - started)
+
+    assert statistics.median(timings) < 0.001
@@ -0,0 +1,95 @@
+import itertools
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils.route_planner import distance_matrix, plan_route
+
+START = (27.7000, 85.3200)
+NOW = datetime(2026, 1, 1, 12, 0)
+
+
+def random_stops(count, seed, deadlines=False):
+    rng = random.Random(seed)
+    stops = [{"latitude": START[0] + rng.uniform(-0.05, 0.05), "longitude": START[1] + rng.uniform(-0.05, 0.05)} for _ in range(count)]
+    if deadlines:
+        for stop in stops:
+            stop["deadline"] = NOW + timedelta(minutes=rng.uniform(30, 240))
+    return stops
+
+
+def path_km(order, stops):
+    matrix = distance_matrix([START] + [(stop["latitude"], stop["longitude"]) for stop in stops])
+    route = [0] + [index + 1 for index in order]
+    return sum(matrix[route[k - 1]][route[k]] for k in range(1, len(route)))
+
+
+def test_no_stops_is_an_empty_plan():
+    plan = plan_route([], start=START)
+
+    assert plan["order"] == [] and plan["total_km"] == 0.0
+
+
+def test_stops_on_a_line_are_visited_in_line_order():
+    stops = [{"latitude": START[0], "longitude": START[1] + 0.01 * step} for step in (4, 1, 5, 3, 2)]
+
+    plan = plan_route(stops, start=START, start_time=NOW)
+
+    assert plan["order"] == [1, 4, 3, 0, 2]
+    assert plan["total_km"] == pytest.approx(sum(plan["legs_km"]), abs=0.01)
+    assert plan["etas"] == sorted(plan["etas"])
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_small_routes_are_close_to_the_brute_force_optimum(seed):
+    stops = random_stops(7, seed)
+    best = min(path_km(order, stops) for order in itertools.permutations(range(7)))
+
+    plan = plan_route(stops, start=START, start_time=NOW)
+
+    assert sorted(plan["order"]) == list(range(7))
+    assert plan["total_km"] == pytest.approx(path_km(plan["order"], stops), abs=0.01)
+    assert plan["total_km"] <= best * 1.05 + 0.01
+
+
+def test_an_urgent_stop_is_reached_before_its_deadline():
+    near = {"latitude": START[0], "longitude": START[1] + 0.01}
+    urgent = {"latitude": START[0], "longitude": START[1] - 0.03, "deadline": NOW + timedelta(minutes=12)}
+
+    plan = plan_route([near, urgent], start=START, start_time=NOW, speed_kmh=20, service_minutes=5)
+
+    assert plan["order"] == [1, 0]
+    assert plan["late_minutes"] == 0.0
+
+
+def test_deadlines_never_make_a_route_later_than_earliest_deadline_first():
+    stops = random_stops(20, 1, deadlines=True)
+    edf = sorted(range(20), key=lambda index: stops[index]["deadline"])
+
+    plan = plan_route(stops, start=START, start_time=NOW, speed_kmh=20, service_minutes=5)
+
+    elapsed, lateness = 0.0, 0.0
+    matrix = distance_matrix([START] + [(stop["latitude"], stop["longitude"]) for stop in stops])
+    for previous, index in zip([-1] + edf, edf):
+        elapsed += matrix[previous + 1][index + 1] / 20 * 60
+        lateness += max(0.0, elapsed - (stops[index]["deadline"] - NOW).total_seconds() / 60)
+        elapsed += 5
+    assert plan["late_minutes"] <= round(lateness, 1)
+
+
+@pytest.mark.parametrize("deadlines", [False, True])
+def test_fifty_stops_are_planned_within_fifty_ms(deadlines):
+    stops = random_stops(50, 7, deadlines)
+    plan_route(stops, start=START, start_time=NOW)  # warm up
+
+    timings = []
+    for _ in range(5):
+        started = time.perf_counter()
+        plan = plan_route(stops, start=START, start_time=NOW)
+        timings.append(time.perf_counter() - started)
+
+    assert sorted(plan["order"]) == list(range(50))
+    assert statistics.median(timings) < 0.050, timings
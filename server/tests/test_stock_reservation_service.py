@@ -0,0 +1,75 @@
+import threading
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+
+from config.database import SessionLocal
+from models.address import Address, Area, City, State
+from models.product_catalog.category import Category
+from models.product_catalog.product import Product
+from models.product_catalog.product_variant import ProductVariant
+from models.product_catalog.sub_category import SubCategory
+from models.user import User
+from schemas.order_schema import OrderCreate
+from services.order_service import OrderService
+
+STOCK, BUYERS = 3, 10
+
+
+@pytest.fixture
+def variant(db):
+    """A variant with STOCK units, and BUYERS customers each with an address"""
+    db.add_all([
+        Category(category_id=1, category_name="Category"),
+        State(state_id=1, state_name="State"),
+        City(city_id=1, city_name="City", state_id=1),
+        Area(area_id=1, area_name="Area", pincode="44600", city_id=1),
+    ])
+    db.add_all([
+        User(user_id=user_id, username=f"buyer{user_id}", email=f"buyer{user_id}@example.com", password_hash="x", first_name="B", last_name=str(user_id))
+        for user_id in range(1, BUYERS + 1)
+    ])
+    db.flush()
+    db.add(SubCategory(sub_category_id=1, sub_category_name="Sub", category_id=1))
+    db.add_all([
+        Address(address_id=user_id, user_id=user_id, address_type="Home", line1="Main road", area_id=1)
+        for user_id in range(1, BUYERS + 1)
+    ])
+    db.flush()
+    db.add(Product(product_id=1, product_name="Product", sub_category_id=1))
+    db.flush()
+    db.add(ProductVariant(variant_id=1, product_id=1, price=Decimal("100"), stock_quantity=STOCK, is_default=True))
+    db.commit()
+    return 1
+
+
+def test_concurrent_orders_never_oversell(db, variant):
+    barrier = threading.Barrier(BUYERS)
+    placed, refused, errors = [], [], []
+
+    def buy(user_id: int) -> None:
+        session = SessionLocal()
+        try:
+            order = OrderCreate(address_id=user_id, subtotal=100, total_amount=100, items=[{"variant_id": variant, "quantity": 1}])
+            barrier.wait()
+            OrderService(session).create_order(order, user_id)
+            placed.append(user_id)
+        except HTTPException as e:
+            (refused if e.status_code in (400, 409) else errors).append(e)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=buy, args=(user_id,)) for user_id in range(1, BUYERS + 1)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(placed) == STOCK
+    assert len(refused) == BUYERS - STOCK
+    db.expire_all()
+    assert db.get(ProductVariant, variant).stock_quantity == 0
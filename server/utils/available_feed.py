@@ -0,0 +1,78 @@
+import os
+import time
+import hashlib
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Seconds a pool snapshot is served without a rebuild. Commits in this worker
+# invalidate it at once; this bounds how stale other workers can be.
+AVAILABLE_FEED_TTL = int(os.getenv("AVAILABLE_FEED_TTL", "15"))
+
+
+def feed_etag(rows: List[Dict[str, Any]]) -> str:
+    """Content tag of a pool listing; identical pools give the same tag in every worker"""
+    digest = hashlib.sha1()
+    for row in rows:
+        digest.update(f"{row['delivery_id']}:{row['available_since']}:{row['customer_name']}:{row['delivery_address']};".encode())
+    return f'"{digest.hexdigest()[:20]}"'
+
+
+class AvailableFeed:
+    """
+    In-process snapshot of the available-deliveries pool.
+
+    Every rider polls the same pool, so one build serves all of them until a
+    commit changes the pool (see register_available_feed_listeners) or the TTL
+    runs out. changed_at only moves when a rebuild produces a different etag,
+    so clients polling with If-None-Match or since get 304 for unchanged pools.
+    """
+
+    def __init__(self, ttl: int = AVAILABLE_FEED_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._rows: Optional[List[Dict[str, Any]]] = None
+        self._etag: Optional[str] = None
+        self._changed_at: Optional[datetime] = None
+        self._expires_at = 0.0
+        self.builds = 0
+        self.hits = 0
+        self.invalidations = 0
+
+    def get(self, build: Callable[[], List[Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], str, datetime]:
+        """(rows, etag, changed_at), rebuilding with build() when invalidated or expired"""
+        if self._rows is not None and time.monotonic() < self._expires_at:
+            self.hits += 1
+            return self._rows, self._etag, self._changed_at
+        with self._lock:
+            if self._rows is not None and time.monotonic() < self._expires_at:
+                self.hits += 1
+                return self._rows, self._etag, self._changed_at
+            # Set before building so an invalidation during the build forces the next rebuild
+            self._expires_at = time.monotonic() + self.ttl
+            rows = build()
+            etag = feed_etag(rows)
+            if etag != self._etag:
+                self._etag = etag
+                self._changed_at = datetime.utcnow()
+            self._rows = rows
+            self.builds += 1
+            return self._rows, self._etag, self._changed_at
+
+    def invalidate(self) -> None:
+        self._expires_at = 0.0
+        self.invalidations += 1
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "deliveries": len(self._rows) if self._rows is not None else None,
+            "etag": self._etag,
+            "changed_at": self._changed_at,
+            "ttl_seconds": self.ttl,
+            "builds": self.builds,
+            "hits": self.hits,
+            "invalidations": self.invalidations
+        }
+
+
+available_feed = AvailableFeed()
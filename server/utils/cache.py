@@ -0,0 +1,338 @@
+import os
+import copy
+import time
+import pickle
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+# Shared backend (e.g. redis://localhost:6379/0). Unset means in-process only.
+CACHE_URL = os.getenv("CACHE_URL")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+CACHE_DEFAULT_TTL = int(os.getenv("CACHE_DEFAULT_TTL", "300"))
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "nexora")
+
+# Cache tags used by the catalog read paths and invalidated by the matching writes
+TAG_CATEGORIES = "catalog:categories"
+TAG_BRANDS = "catalog:brands"
+TAG_ATTRIBUTES = "catalog:attributes"
+TAG_PRODUCTS = "catalog:products"
+TAG_ADDRESS_HIERARCHY = "address:hierarchy"
+
+_MISSING = object()
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters per namespace and invalidation counters per tag"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0, "sets": 0})
+        self._tags: Dict[str, Dict[str, int]] = defaultdict(lambda: {"invalidations": 0, "entries_dropped": 0})
+
+    def incr(self, namespace: str, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[namespace][counter] += amount
+
+    def tag_invalidated(self, tag: str, dropped: int) -> None:
+        with self._lock:
+            self._tags[tag]["invalidations"] += 1
+            self._tags[tag]["entries_dropped"] += dropped
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._tags.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            namespaces = {}
+            totals = {"hits": 0, "misses": 0, "sets": 0}
+            for namespace, counters in self._counters.items():
+                lookups = counters["hits"] + counters["misses"]
+                namespaces[namespace] = {
+                    **counters,
+                    "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0
+                }
+                for key in totals:
+                    totals[key] += counters[key]
+            tags = {tag: dict(counters) for tag, counters in self._tags.items()}
+
+        lookups = totals["hits"] + totals["misses"]
+        totals["hit_rate"] = round(totals["hits"] / lookups, 4) if lookups else 0.0
+        return {"totals": totals, "namespaces": namespaces, "tags": tags}
+
+
+class CacheBackend(ABC):
+    """Interface every cache backend implements"""
+
+    name = "base"
+
+    @abstractmethod
+    def get(self, key: str) -> Any:
+        """Return the cached value or _MISSING"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: int, tags: Iterable[str] = ()) -> None:
+        """Store value for ttl seconds, indexed under each tag"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Drop one entry if present"""
+
+    @abstractmethod
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Drop every entry carrying any of the tags; returns the number dropped"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every entry"""
+
+    def info(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Bounded in-process LRU cache with per-entry TTL and a tag index.
+
+    Values are deep-copied in and out, so callers can mutate what they get back
+    without corrupting the cached copy.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[str, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._tag_index: Dict[str, set] = defaultdict(set)
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value, _ = entry
+            if expires_at <= time.monotonic():
+                self._drop_unlocked(key)
+                self.expirations += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any, ttl: int, tags: Iterable[str] = ()) -> None:
+        tags = tuple(tags)
+        with self._lock:
+            self._drop_unlocked(key)
+            self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(value), tags)
+            for tag in tags:
+                self._tag_index[tag].add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop_unlocked(oldest)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._drop_unlocked(key)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        dropped = 0
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tag_index.pop(tag, ())):
+                    if key in self._entries:
+                        self._drop_unlocked(key)
+                        dropped += 1
+        return dropped
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tag_index.clear()
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.name,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+    def _drop_unlocked(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Shared cache for multi-worker deployments. Tags are Redis sets of keys, so an
+    invalidation from one worker is seen by all of them.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = CACHE_KEY_PREFIX):
+        import redis  # optional dependency, only needed when CACHE_URL is set
+
+        self.client = redis.Redis.from_url(url)
+        self.client.ping()
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:cache:{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}:tag:{tag}"
+
+    def get(self, key: str) -> Any:
+        raw = self.client.get(self._key(key))
+        if raw is None:
+            return _MISSING
+        return pickle.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: int, tags: Iterable[str] = ()) -> None:
+        full_key = self._key(key)
+        pipe = self.client.pipeline()
+        pipe.set(full_key, pickle.dumps(value), ex=ttl)
+        for tag in tags:
+            pipe.sadd(self._tag_key(tag), full_key)
+            pipe.expire(self._tag_key(tag), ttl * 2)
+        pipe.execute()
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self._key(key))
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        dropped = 0
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            keys = self.client.smembers(tag_key)
+            if keys:
+                dropped += self.client.delete(*keys)
+            self.client.delete(tag_key)
+        return dropped
+
+    def clear(self) -> None:
+        for pattern in (self._key("*"), self._tag_key("*")):
+            keys = list(self.client.scan_iter(match=pattern, count=500))
+            if keys:
+                self.client.delete(*keys)
+
+    def info(self) -> Dict[str, Any]:
+        return {"backend": self.name, "prefix": self.prefix}
+
+
+def _create_backend() -> CacheBackend:
+    if CACHE_URL:
+        try:
+            backend = RedisCacheBackend(CACHE_URL)
+            print(f"✅ Shared cache connected ({CACHE_URL})")
+            return backend
+        except Exception as e:
+            print(f"⚠️ Shared cache unavailable, using in-process cache: {e}")
+    return MemoryCacheBackend()
+
+
+class Cache:
+    """Process-wide cache facade: one backend, shared stats"""
+
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        self.backend = backend or MemoryCacheBackend()
+        self.stats = CacheStats()
+
+    def get(self, namespace: str, key: str) -> Any:
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            print(f"⚠️ Cache read failed for {key}: {e}")
+            value = _MISSING
+        self.stats.incr(namespace, "hits" if value is not _MISSING else "misses")
+        return value
+
+    def set(self, namespace: str, key: str, value: Any, ttl: int, tags: Iterable[str] = ()) -> None:
+        try:
+            self.backend.set(key, value, ttl, tags)
+            self.stats.incr(namespace, "sets")
+        except Exception as e:
+            print(f"⚠️ Cache write failed for {key}: {e}")
+
+    def invalidate_tags(self, *tags: str) -> int:
+        dropped = 0
+        for tag in tags:
+            try:
+                count = self.backend.invalidate_tags((tag,))
+            except Exception as e:
+                print(f"⚠️ Cache invalidation failed for {tag}: {e}")
+                continue
+            self.stats.tag_invalidated(tag, count)
+            dropped += count
+        return dropped
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        try:
+            info = self.backend.info()
+        except Exception as e:
+            info = {"backend": self.backend.name, "error": str(e)}
+        return {**info, **self.stats.snapshot()}
+
+
+cache = Cache(_create_backend())
+
+
+def make_key(namespace: str, args: tuple, kwargs: dict) -> str:
+    """Stable key for a call; long argument lists are hashed"""
+    parts = [repr(a) for a in args] + [f"{k}={kwargs[k]!r}" for k in sorted(kwargs)]
+    signature = ",".join(parts)
+    if len(signature) > 200:
+        signature = hashlib.sha1(signature.encode()).hexdigest()
+    return f"{namespace}({signature})"
+
+
+def cached(namespace: str, ttl: int = CACHE_DEFAULT_TTL, tags: Iterable[str] = ()):
+    """
+    Cache the result of a service method.
+
+    The first positional argument (self, which holds the db session) is not part
+    of the key; the remaining arguments are. Exceptions are never cached.
+    """
+    tags = tuple(tags)
+
+    def decorator(func: Callable):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key = make_key(namespace, args, kwargs)
+            value = cache.get(namespace, key)
+            if value is not _MISSING:
+                return value
+            value = func(self, *args, **kwargs)
+            cache.set(namespace, key, value, ttl, tags)
+            return value
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
+
+
+def invalidate_tags(*tags: str) -> int:
+    """Drop every cached entry carrying any of the tags"""
+    return cache.invalidate_tags(*tags)
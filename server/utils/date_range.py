@@ -0,0 +1,47 @@
+from datetime import date, datetime, time, timedelta
+from typing import Optional, Tuple, Union
+
+from sqlalchemy import and_, true
+from sqlalchemy.sql.elements import ColumnElement
+
+DayLike = Union[date, datetime, str]
+
+
+def as_date(value: Optional[DayLike]) -> Optional[date]:
+    """Calendar day of a date, datetime or ISO date string (as drivers return date() results)"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def day_start(value: DayLike) -> datetime:
+    """Midnight at the start of the day"""
+    return datetime.combine(as_date(value), time.min)
+
+
+def day_bounds(start: DayLike, end: Optional[DayLike] = None) -> Tuple[datetime, datetime]:
+    """Half-open [start 00:00, day after end 00:00) covering whole days start..end (inclusive)"""
+    return day_start(start), day_start(as_date(end if end is not None else start) + timedelta(days=1))
+
+
+def between_days(column, start: Optional[DayLike] = None, end: Optional[DayLike] = None) -> ColumnElement:
+    """Timestamp column falls on a day from start to end, inclusive; either side may be open.
+
+    Same rows as func.date(column) >= start AND func.date(column) <= end, but compares
+    the bare column so an index on it can be used.
+    """
+    conditions = []
+    if start is not None:
+        conditions.append(column >= day_start(start))
+    if end is not None:
+        conditions.append(column < day_start(as_date(end) + timedelta(days=1)))
+    return and_(*conditions) if conditions else true()
+
+
+def on_day(column, day: DayLike) -> ColumnElement:
+    """Timestamp column falls on the given day (index-friendly func.date(column) == day)"""
+    return between_days(column, day, day)
@@ -1,2 +1,7 @@
-def send_email(to_email: str, subject: str, body: str):
-    print(f"send_email -> to: {to_email}, subject: {subject}")
\ No newline at end of file
+from typing import Optional
+from utils.mail_transport import OutgoingEmail, get_transport
+
+def send_email(to_email: str, subject: str, body: str) -> Optional[str]:
+    """Send right away through the configured transport; returns the error, or None when sent.
+    Emails that belong to a database change should go through OutboxRepository.enqueue_email instead."""
+    return get_transport().send_batch([OutgoingEmail(to_email, subject, body)])[0]
@@ -0,0 +1,292 @@
+import os
+import json
+import asyncio
+import itertools
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Shared broker (e.g. redis://localhost:6379/0) so events reach subscribers on every
+# worker. Unset means in-process only.
+EVENTS_URL = os.getenv("EVENTS_URL")
+EVENTS_CHANNEL = os.getenv("EVENTS_CHANNEL", "nexora:events")
+# Events buffered per connection before the oldest are dropped, and idle keep-alive interval
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "100"))
+EVENT_HEARTBEAT_SECONDS = int(os.getenv("EVENT_HEARTBEAT_SECONDS", "25"))
+
+# Event types
+DELIVERY_OFFERED = "delivery.offered"
+DELIVERY_ASSIGNED = "delivery.assigned"
+DELIVERY_RELEASED = "delivery.released"  # back in the available pool
+DELIVERY_STATUS_CHANGED = "delivery.status_changed"
+DELIVERY_CANCELLED = "delivery.cancelled"
+NOTIFICATION_CREATED = "notification.created"
+
+EVENT_TYPES = (
+    DELIVERY_OFFERED,
+    DELIVERY_ASSIGNED,
+    DELIVERY_RELEASED,
+    DELIVERY_STATUS_CHANGED,
+    DELIVERY_CANCELLED,
+    NOTIFICATION_CREATED,
+)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def make_event(
+    event_type: str,
+    data: Dict[str, Any],
+    user_ids: Iterable[int] = (),
+    roles: Iterable[str] = ()
+) -> Dict[str, Any]:
+    """An event for the given users and/or everyone holding one of the roles"""
+    return {
+        "type": event_type,
+        "data": data,
+        "user_ids": sorted({user_id for user_id in user_ids if user_id is not None}),
+        "roles": sorted({role.lower() for role in roles}),
+        "at": datetime.utcnow().isoformat()
+    }
+
+
+class Subscription:
+    """One connected client: its identity, optional type filter and buffered events"""
+
+    __slots__ = ("user_id", "roles", "types", "queue", "dropped")
+
+    def __init__(self, user_id: int, roles: Iterable[str], types: Optional[Iterable[str]] = None):
+        self.user_id = user_id
+        self.roles = tuple(role.lower() for role in roles)
+        self.types = frozenset(types) if types else None
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self.dropped = 0
+
+    def offer(self, item: Dict[str, Any]) -> None:
+        """Buffer an event; a client that stops reading loses its oldest events, not the newest"""
+        if self.types is not None and item["type"] not in self.types:
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(item)
+
+
+class EventBroker(ABC):
+    """Moves published events to the hub of every worker"""
+
+    name = "base"
+    hub: Optional["EventHub"] = None
+
+    def start(self, hub: "EventHub") -> None:
+        """Begin delivering events to hub (called once, from the event loop)"""
+        self.hub = hub
+
+    @abstractmethod
+    def publish(self, item: Dict[str, Any]) -> None:
+        """Send an event; safe to call from any thread"""
+
+
+class InProcessEventBroker(EventBroker):
+    """Single-worker broker: events go straight to this process's hub"""
+
+    name = "memory"
+
+    def publish(self, item: Dict[str, Any]) -> None:
+        if self.hub is not None:  # not started: no client has subscribed yet
+            self.hub.deliver_threadsafe(item)
+
+
+class RedisEventBroker(EventBroker):
+    """
+    Redis pub/sub broker for multi-worker deployments: every worker publishes to
+    one channel and a listener thread per worker feeds its own hub.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, channel: str = EVENTS_CHANNEL):
+        import redis  # optional dependency, only needed when EVENTS_URL is set
+
+        self.client = redis.Redis.from_url(url)
+        self.client.ping()
+        self.channel = channel
+
+    def start(self, hub: "EventHub") -> None:
+        super().start(hub)
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+
+        def listen():
+            for message in pubsub.listen():
+                try:
+                    hub.deliver_threadsafe(json.loads(message["data"]))
+                except Exception as e:
+                    print(f"⚠️ Dropped malformed event: {e}")
+
+        threading.Thread(target=listen, name="event-broker", daemon=True).start()
+
+    def publish(self, item: Dict[str, Any]) -> None:
+        self.client.publish(self.channel, json.dumps(item, default=_json_default))
+
+
+def _create_broker() -> EventBroker:
+    if EVENTS_URL:
+        try:
+            broker = RedisEventBroker(EVENTS_URL)
+            print(f"✅ Event broker connected ({EVENTS_URL})")
+            return broker
+        except Exception as e:
+            print(f"⚠️ Event broker unavailable, using in-process events: {e}")
+    return InProcessEventBroker()
+
+
+class EventHub:
+    """
+    Pub/sub hub for WebSocket and SSE clients of this worker.
+
+    Subscriptions are indexed by user id and by role, so an event only touches the
+    clients it is addressed to. publish() may be called from request threads; fan-out
+    always runs on the event loop that owns the subscriber queues.
+    """
+
+    def __init__(self, broker: Optional[EventBroker] = None):
+        self.broker = broker or InProcessEventBroker()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._start_lock = threading.Lock()
+        self._by_user: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._by_role: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._sequence = itertools.count(1)
+        self.published = 0
+        self.delivered = 0
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        with self._start_lock:
+            if self._loop is None:
+                self._loop = loop
+                self.broker.start(self)
+            elif self._loop is not loop:
+                raise RuntimeError("EventHub is bound to another event loop")
+
+    # ---------- subscribers (event loop only) ----------
+
+    def subscribe(self, user_id: int, roles: Iterable[str], types: Optional[Iterable[str]] = None) -> Subscription:
+        self._ensure_started()
+        subscription = Subscription(user_id, roles, types)
+        self._by_user[user_id].add(subscription)
+        for role in subscription.roles:
+            self._by_role[role].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        for index, key in [(self._by_user, subscription.user_id)] + [(self._by_role, role) for role in subscription.roles]:
+            members = index.get(key)
+            if members is not None:
+                members.discard(subscription)
+                if not members:
+                    del index[key]
+
+    def _deliver(self, item: Dict[str, Any]) -> None:
+        targets: Set[Subscription] = set()
+        for user_id in item.get("user_ids", ()):
+            targets.update(self._by_user.get(user_id, ()))
+        for role in item.get("roles", ()):
+            targets.update(self._by_role.get(role, ()))
+        if not targets:
+            return
+        item = {**item, "id": next(self._sequence)}
+        for subscription in targets:
+            subscription.offer(item)
+        self.delivered += len(targets)
+
+    # ---------- publishers (any thread) ----------
+
+    def deliver_threadsafe(self, item: Dict[str, Any]) -> None:
+        """Hand an event from the broker to this worker's subscribers"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return  # nobody has subscribed in this worker yet
+        loop.call_soon_threadsafe(self._deliver, item)
+
+    def publish(self, item: Dict[str, Any]) -> None:
+        self.published += 1
+        try:
+            self.broker.publish(item)
+        except Exception as e:
+            print(f"⚠️ Event publish failed for {item.get('type')}: {e}")
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "broker": self.broker.name,
+            "connections": sum(len(members) for members in self._by_user.values()),
+            "users": len(self._by_user),
+            "published": self.published,
+            "delivered": self.delivered
+        }
+
+
+event_hub = EventHub(_create_broker())
+
+
+def format_sse(item: Dict[str, Any]) -> str:
+    """Server-Sent Events frame for an event"""
+    payload = json.dumps({"type": item["type"], "data": item["data"], "at": item["at"]}, default=_json_default)
+    return f"id: {item.get('id', '')}\nevent: {item['type']}\ndata: {payload}\n\n"
+
+
+def event_payload(item: Dict[str, Any]) -> str:
+    """WebSocket text frame for an event"""
+    return json.dumps(
+        {"id": item.get("id"), "type": item["type"], "data": item["data"], "at": item["at"]},
+        default=_json_default
+    )
+
+
+# ===== COMMIT-GATED PUBLISHING =====
+# Events raised inside a transaction wait in session.info until it commits, so
+# clients never hear about changes that were rolled back.
+
+_PENDING_KEY = "pending_events"
+
+
+def publish_after_commit(db: Session, item: Dict[str, Any]) -> None:
+    """Publish when db's current transaction commits (right away if none is open)"""
+    if not db.in_transaction():
+        event_hub.publish(item)
+        return
+    db.info.setdefault(_PENDING_KEY, []).append(item)
+
+
+def _publish_pending(session: Session) -> None:
+    for item in session.info.pop(_PENDING_KEY, []):
+        event_hub.publish(item)
+
+
+def _discard_pending(session: Session, previous_transaction) -> None:
+    if not previous_transaction.nested:
+        session.info.pop(_PENDING_KEY, None)
+
+
+def register_event_listeners() -> None:
+    """Publish staged events on commit and drop them on rollback"""
+    for name, listener in (
+        ("after_commit", _publish_pending),
+        ("after_soft_rollback", _discard_pending),
+    ):
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
@@ -0,0 +1,141 @@
+import os
+import io
+import csv
+import json
+import zlib
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Rows encoded per yielded chunk, and rows fetched per round trip by streaming queries
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "500"))
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "json": ("application/json", "json"),
+}
+GZIP_MEDIA_TYPE = "application/gzip"
+
+
+def export_value(value: Any) -> Any:
+    """Plain JSON/CSV friendly value for a column"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    converted = export_value(value)
+    if converted is value:
+        return str(value)
+    return converted
+
+
+def iter_csv(
+    rows: Iterable[Dict[str, Any]],
+    fieldnames: Optional[List[str]] = None,
+    chunk_rows: int = EXPORT_CHUNK_ROWS
+) -> Iterator[bytes]:
+    """CSV with a header row, encoded chunk_rows rows at a time.
+
+    Columns come from fieldnames or the first row; keys missing from a row are
+    left empty and extra keys are dropped. With fieldnames the header is sent
+    before any row is read, so an empty result is still a valid CSV.
+    """
+    buffer = io.StringIO()
+    writer = None
+    pending = 0
+
+    if fieldnames:
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(row.keys()), extrasaction="ignore")
+            writer.writeheader()
+        writer.writerow({key: export_value(value) for key, value in row.items()})
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_ndjson(rows: Iterable[Dict[str, Any]], chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """One JSON object per line"""
+    lines: List[str] = []
+    for row in rows:
+        lines.append(json.dumps(row, default=_json_default))
+        if len(lines) >= chunk_rows:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def iter_json_array(rows: Iterable[Dict[str, Any]], chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """A single JSON array, written element by element"""
+    parts: List[str] = ["["]
+    first = True
+    for row in rows:
+        parts.append(("" if first else ",") + json.dumps(row, default=_json_default))
+        first = False
+        if len(parts) >= chunk_rows:
+            yield "".join(parts).encode("utf-8")
+            parts = []
+    parts.append("]")
+    yield "".join(parts).encode("utf-8")
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip-compress a byte stream incrementally"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+ENCODERS = {
+    "csv": iter_csv,
+    "ndjson": iter_ndjson,
+    "json": iter_json_array,
+}
+
+
+def encode_rows(
+    rows: Iterable[Dict[str, Any]],
+    export_format: str,
+    compress: bool = False,
+    fieldnames: Optional[List[str]] = None
+) -> Tuple[Iterator[bytes], str, str]:
+    """(byte chunks, media type, file extension) for rows in the requested format;
+    fieldnames fixes the CSV columns (and header) up front"""
+    if export_format not in ENCODERS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    media_type, extension = EXPORT_FORMATS[export_format]
+    if export_format == "csv":
+        chunks = iter_csv(rows, fieldnames)
+    else:
+        chunks = ENCODERS[export_format](rows)
+    if compress:
+        return gzip_stream(chunks), GZIP_MEDIA_TYPE, f"{extension}.gz"
+    return chunks, media_type, extension
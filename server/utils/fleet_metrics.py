@@ -0,0 +1,126 @@
+import os
+import time
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+# Seconds a fleet snapshot is served before it is rebuilt, and how many date ranges are kept
+FLEET_METRICS_TTL = int(os.getenv("FLEET_METRICS_TTL", "300"))
+FLEET_METRICS_MAX_RANGES = int(os.getenv("FLEET_METRICS_MAX_RANGES", "16"))
+
+# Per-rider metrics the peer comparison ranks riders on
+FLEET_METRICS = (
+    "on_time_rate",
+    "average_rating",
+    "average_delivery_time",
+    "completed_deliveries",
+    "total_earnings",
+)
+RANK_METRIC = "average_rating"
+
+
+class FleetMetricsSnapshot:
+    """
+    Immutable per-rider metrics for the whole fleet over one date range.
+
+    Every metric is also kept as a sorted list, so a value's percentile and a
+    rider's rank are two binary searches instead of a pass over the fleet.
+    """
+
+    def __init__(self, riders: Dict[int, Dict[str, float]]):
+        self.riders = riders
+        self.built_at = time.monotonic()
+        self._sorted: Dict[str, List[float]] = {
+            metric: sorted(values[metric] for values in riders.values()) for metric in FLEET_METRICS
+        }
+        count = len(riders)
+        self.averages: Dict[str, float] = {
+            metric: (sum(values) / count if count else 0.0) for metric, values in self._sorted.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.riders)
+
+    def metrics_for(self, delivery_person_id: int) -> Optional[Dict[str, float]]:
+        return self.riders.get(delivery_person_id)
+
+    def percentile(self, metric: str, value: float) -> float:
+        """Share of riders below value, counting ties as half (0-100)"""
+        values = self._sorted[metric]
+        if not values:
+            return 50.0
+        less_than = bisect_left(values, value)
+        equal_to = bisect_right(values, value) - less_than
+        return (less_than + 0.5 * equal_to) / len(values) * 100
+
+    def rank(self, value: float, metric: str = RANK_METRIC) -> int:
+        """1-based position of value when riders are ordered best (highest) first; ties share a rank"""
+        values = self._sorted[metric]
+        return len(values) - bisect_right(values, value) + 1
+
+
+class FleetMetricsStore:
+    """
+    Process-wide snapshots keyed by date range, rebuilt once they are older than
+    the TTL. While one request rebuilds an expired snapshot, concurrent requests
+    keep reading the previous one instead of all hitting the database.
+    """
+
+    def __init__(self, ttl: int = FLEET_METRICS_TTL, max_ranges: int = FLEET_METRICS_MAX_RANGES):
+        self.ttl = ttl
+        self.max_ranges = max(1, max_ranges)
+        self._lock = threading.Lock()
+        self._snapshots: "OrderedDict[Hashable, FleetMetricsSnapshot]" = OrderedDict()
+        self._building: Dict[Hashable, threading.Lock] = {}
+
+    def get(self, key: Hashable, build: Callable[[], Dict[int, Dict[str, float]]]) -> FleetMetricsSnapshot:
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None:
+                self._snapshots.move_to_end(key)
+                if time.monotonic() - snapshot.built_at < self.ttl:
+                    return snapshot
+            building = self._building.setdefault(key, threading.Lock())
+
+        if snapshot is not None:
+            # Stale: rebuild unless another request already is, in which case serve what we have
+            if not building.acquire(blocking=False):
+                return snapshot
+        else:
+            building.acquire()
+
+        try:
+            with self._lock:
+                current = self._snapshots.get(key)
+            if current is not None and current is not snapshot and time.monotonic() - current.built_at < self.ttl:
+                return current  # built by the request we waited for
+
+            fresh = FleetMetricsSnapshot(build())
+            with self._lock:
+                self._snapshots[key] = fresh
+                self._snapshots.move_to_end(key)
+                while len(self._snapshots) > self.max_ranges:
+                    oldest, _ = self._snapshots.popitem(last=False)
+                    self._building.pop(oldest, None)
+            return fresh
+        finally:
+            building.release()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+
+    def info(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "ttl": self.ttl,
+                "ranges": [
+                    {"key": repr(key), "riders": len(snapshot), "age_seconds": round(now - snapshot.built_at, 1)}
+                    for key, snapshot in self._snapshots.items()
+                ]
+            }
+
+
+fleet_metrics = FleetMetricsStore()
@@ -0,0 +1,157 @@
+import os
+import time
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional
+
+# Seconds between bulk writes of buffered rider positions
+LOCATION_FLUSH_SECONDS = float(os.getenv("LOCATION_FLUSH_SECONDS", "5"))
+
+
+class LocationFix:
+    """One GPS reading of a rider"""
+
+    __slots__ = ("delivery_person_id", "latitude", "longitude", "accuracy", "recorded_at", "received_at")
+
+    def __init__(
+        self,
+        delivery_person_id: int,
+        latitude: float,
+        longitude: float,
+        accuracy: Optional[float] = None,
+        recorded_at: Optional[datetime] = None
+    ):
+        self.delivery_person_id = delivery_person_id
+        self.latitude = float(latitude)
+        self.longitude = float(longitude)
+        self.accuracy = accuracy
+        self.recorded_at = recorded_at or datetime.now()
+        self.received_at = time.monotonic()
+
+    def as_location(self) -> Dict:
+        """The DeliveryPerson.current_location JSON for this fix"""
+        location = {
+            "lat": self.latitude,
+            "lng": self.longitude,
+            # Fixed width, so stored values order as strings the way they do in time
+            "updated_at": self.recorded_at.isoformat(timespec="microseconds")
+        }
+        if self.accuracy is not None:
+            location["accuracy"] = self.accuracy
+        return location
+
+
+class LocationBuffer:
+    """
+    Thread-safe buffer of rider GPS fixes.
+
+    Only the newest fix per rider is kept: pings that arrive between two flushes
+    overwrite each other, so a flush writes at most one row per rider. A fix stays
+    readable while it is unwritten and for max_age seconds after it arrived; later
+    pings of the rider may be handled by another worker, so older ones are left to
+    the database.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latest: Dict[int, LocationFix] = {}
+        self._pending: Dict[int, LocationFix] = {}
+        self.received = 0
+        self.coalesced = 0
+        self.flushed = 0
+
+    def record(self, fix: LocationFix) -> None:
+        with self._lock:
+            current = self._latest.get(fix.delivery_person_id)
+            if current is not None and current.recorded_at > fix.recorded_at:
+                return  # late, out-of-order ping
+            self.received += 1
+            if fix.delivery_person_id in self._pending:
+                self.coalesced += 1
+            self._latest[fix.delivery_person_id] = fix
+            self._pending[fix.delivery_person_id] = fix
+
+    def _fresh(self, delivery_person_id: int, max_age: float) -> Optional[LocationFix]:
+        if delivery_person_id in self._pending:
+            return self._pending[delivery_person_id]
+        fix = self._latest.get(delivery_person_id)
+        if fix is not None and time.monotonic() - fix.received_at < max_age:
+            return fix
+        return None
+
+    def latest(self, delivery_person_id: int, max_age: float = LOCATION_FLUSH_SECONDS) -> Optional[LocationFix]:
+        with self._lock:
+            return self._fresh(delivery_person_id, max_age)
+
+    def latest_many(self, delivery_person_ids: Iterable[int], max_age: float = LOCATION_FLUSH_SECONDS) -> Dict[int, LocationFix]:
+        with self._lock:
+            found = {person_id: self._fresh(person_id, max_age) for person_id in delivery_person_ids}
+            return {person_id: fix for person_id, fix in found.items() if fix is not None}
+
+    def drain(self) -> Dict[int, LocationFix]:
+        """Take every fix not yet written"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            return pending
+
+    def requeue(self, fixes: Dict[int, LocationFix]) -> None:
+        """Put back fixes whose write failed, unless a newer one arrived meanwhile"""
+        with self._lock:
+            for person_id, fix in fixes.items():
+                if person_id not in self._pending:
+                    self._pending[person_id] = fix
+
+    def mark_flushed(self, count: int) -> None:
+        with self._lock:
+            self.flushed += count
+
+    def info(self) -> Dict:
+        with self._lock:
+            return {
+                "riders": len(self._latest),
+                "pending": len(self._pending),
+                "received": self.received,
+                "coalesced": self.coalesced,
+                "flushed": self.flushed
+            }
+
+
+class PeriodicFlusher:
+    """Daemon thread that calls flush every interval seconds, started on first use"""
+
+    def __init__(self, flush: Callable[[], int], interval: float = LOCATION_FLUSH_SECONDS, name: str = "location-flusher"):
+        self.flush = flush
+        self.interval = interval
+        self.name = name
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def stop(self, final_flush: bool = True) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 5)
+            self._thread = None
+        if final_flush:
+            self.flush()
+
+    def _run(self) -> None:
+        next_run = time.monotonic() + self.interval
+        while not self._stop.wait(max(0.0, next_run - time.monotonic())):
+            next_run += self.interval
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ {self.name} flush failed: {e}")
+
+
+location_buffer = LocationBuffer()
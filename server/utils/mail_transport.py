@@ -0,0 +1,152 @@
+import os
+import smtplib
+import threading
+from abc import ABC, abstractmethod
+from email.message import EmailMessage
+from typing import List, Optional
+
+# console (print only), smtp, or memory (kept in process, for tests)
+MAIL_TRANSPORT = os.getenv("MAIL_TRANSPORT", "console").lower()
+SMTP_HOST = os.getenv("SMTP_HOST", "localhost")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "1025"))
+SMTP_USERNAME = os.getenv("SMTP_USERNAME")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "false").lower() in ("1", "true", "yes")
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "10"))
+MAIL_FROM = os.getenv("MAIL_FROM", "Nexora <no-reply@nexora.local>")
+
+
+class OutgoingEmail:
+    """One message to deliver"""
+
+    __slots__ = ("to_email", "subject", "body")
+
+    def __init__(self, to_email: str, subject: str, body: str):
+        self.to_email = to_email
+        self.subject = subject
+        self.body = body
+
+    def as_message(self, sender: str = MAIL_FROM) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = sender
+        message["To"] = self.to_email
+        message["Subject"] = self.subject
+        message.set_content(self.body)
+        return message
+
+
+class MailTransport(ABC):
+    """Interface every mail transport implements"""
+
+    name = "base"
+
+    @abstractmethod
+    def send_batch(self, emails: List[OutgoingEmail]) -> List[Optional[str]]:
+        """Deliver the emails; returns one error message (or None when sent) per email, in order"""
+
+
+class ConsoleTransport(MailTransport):
+    """Prints instead of sending; the default outside production"""
+
+    name = "console"
+
+    def send_batch(self, emails: List[OutgoingEmail]) -> List[Optional[str]]:
+        for email in emails:
+            print(f"send_email -> to: {email.to_email}, subject: {email.subject}")
+        return [None] * len(emails)
+
+
+class MemoryTransport(MailTransport):
+    """Keeps sent emails in a list, for tests"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sent: List[OutgoingEmail] = []
+
+    def send_batch(self, emails: List[OutgoingEmail]) -> List[Optional[str]]:
+        with self._lock:
+            self.sent.extend(emails)
+        return [None] * len(emails)
+
+
+class SMTPTransport(MailTransport):
+    """
+    Sends a batch over one SMTP connection.
+
+    A connection or login failure fails the whole batch; a rejected recipient
+    fails only its own email.
+    """
+
+    name = "smtp"
+
+    def __init__(
+        self,
+        host: str = SMTP_HOST,
+        port: int = SMTP_PORT,
+        username: Optional[str] = SMTP_USERNAME,
+        password: Optional[str] = SMTP_PASSWORD,
+        starttls: bool = SMTP_STARTTLS,
+        timeout: float = SMTP_TIMEOUT
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def send_batch(self, emails: List[OutgoingEmail]) -> List[Optional[str]]:
+        if not emails:
+            return []
+        try:
+            client = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        except Exception as e:
+            return [f"SMTP connect failed: {e}"] * len(emails)
+
+        errors: List[Optional[str]] = []
+        try:
+            if self.starttls:
+                client.starttls()
+            if self.username:
+                client.login(self.username, self.password or "")
+            for email in emails:
+                try:
+                    client.send_message(email.as_message())
+                    errors.append(None)
+                except smtplib.SMTPServerDisconnected as e:
+                    # Everything after a dropped connection fails too
+                    errors.extend([f"SMTP disconnected: {e}"] * (len(emails) - len(errors)))
+                    break
+                except Exception as e:
+                    errors.append(str(e))
+        except Exception as e:
+            errors.extend([f"SMTP session failed: {e}"] * (len(emails) - len(errors)))
+        finally:
+            try:
+                client.quit()
+            except Exception:
+                pass
+        return errors
+
+
+def create_transport(name: str = MAIL_TRANSPORT) -> MailTransport:
+    if name == "smtp":
+        return SMTPTransport()
+    if name == "memory":
+        return MemoryTransport()
+    return ConsoleTransport()
+
+
+_transport = create_transport()
+
+
+def get_transport() -> MailTransport:
+    return _transport
+
+
+def set_transport(transport: MailTransport) -> None:
+    """Swap the transport used by send_email and the outbox workers (tests, local SMTP sink)"""
+    global _transport
+    _transport = transport
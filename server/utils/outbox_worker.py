@@ -0,0 +1,134 @@
+import os
+import time
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+# Worker threads per process (0: none, another process drains the outbox), jobs claimed
+# per batch, and how often idle workers look for due jobs
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", "2"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "2"))
+# Window for the jobs-per-second figures
+OUTBOX_RATE_WINDOW_SECONDS = 60
+
+
+class OutboxMetrics:
+    """Thread-safe counters of what the workers of this process did"""
+
+    def __init__(self, window: float = OUTBOX_RATE_WINDOW_SECONDS):
+        self.window = window
+        self._lock = threading.Lock()
+        self._recent: deque = deque()  # (monotonic time, jobs processed, jobs sent)
+        self.batches = 0
+        self.claimed = 0
+        self.sent = 0
+        self.retried = 0
+        self.dead = 0
+        self.errors = 0
+        self.last_batch_ms: Optional[float] = None
+        self.last_batch_at: Optional[float] = None
+
+    def record_batch(self, claimed: int, sent: int, retried: int, dead: int, elapsed_ms: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.batches += 1
+            self.claimed += claimed
+            self.sent += sent
+            self.retried += retried
+            self.dead += dead
+            self.last_batch_ms = round(elapsed_ms, 1)
+            self.last_batch_at = time.time()
+            self._recent.append((now, claimed, sent))
+            self._trim(now)
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def _trim(self, now: float) -> None:
+        while self._recent and self._recent[0][0] < now - self.window:
+            self._recent.popleft()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._trim(time.monotonic())
+            processed = sum(claimed for _, claimed, _ in self._recent)
+            sent = sum(sent for _, _, sent in self._recent)
+            return {
+                "batches": self.batches,
+                "claimed": self.claimed,
+                "sent": self.sent,
+                "retried": self.retried,
+                "dead": self.dead,
+                "errors": self.errors,
+                "last_batch_ms": self.last_batch_ms,
+                "last_batch_at": self.last_batch_at,
+                "jobs_per_second": round(processed / self.window, 2),
+                "sent_per_second": round(sent / self.window, 2)
+            }
+
+
+class OutboxWorkerPool:
+    """
+    Daemon threads that drain the outbox, started on first use.
+
+    Each worker calls process_batch(worker_name), which claims and runs one batch
+    and returns how many jobs it claimed. A worker keeps going while batches come
+    back non-empty, then sleeps until wake() (a commit that enqueued jobs) or the
+    poll interval, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[str], int],
+        workers: int = OUTBOX_WORKERS,
+        poll_interval: float = OUTBOX_POLL_SECONDS,
+        name: str = "outbox"
+    ):
+        self.process_batch = process_batch
+        self.workers = max(0, workers)
+        self.poll_interval = poll_interval
+        self.name = name
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def ensure_started(self) -> None:
+        if self._threads or not self.workers:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._run, args=(f"{self.name}-{os.getpid()}-{index}",), name=f"{self.name}-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def wake(self) -> None:
+        self.ensure_started()
+        self._wake.set()
+
+    def stop(self, timeout: float = 10) -> None:
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def _run(self, worker_name: str) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                claimed = self.process_batch(worker_name)
+            except Exception as e:
+                print(f"⚠️ {worker_name} batch failed: {e}")
+                claimed = 0
+            if not claimed:
+                self._wake.wait(self.poll_interval)
@@ -1,16 +1,114 @@
-from typing import List, Any
+from typing import List, Any, Optional, Tuple, Callable
+from sqlalchemy import DateTime, String, or_, and_, asc, desc, func, type_coerce
 from sqlalchemy.orm import Query
+from fastapi import HTTPException
+from datetime import datetime, date
+from decimal import Decimal
+import base64
+import json
+
+
+# -------------------------
+# CURSOR TOKENS
+# -------------------------
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    """Encode a (sort key, tiebreak id) pair into an opaque url-safe token"""
+    if isinstance(sort_value, datetime):
+        key = {"t": "dt", "v": sort_value.isoformat()}
+    elif isinstance(sort_value, date):
+        key = {"t": "d", "v": sort_value.isoformat()}
+    elif isinstance(sort_value, Decimal):
+        key = {"t": "dec", "v": str(sort_value)}
+    else:
+        key = {"t": "raw", "v": sort_value}
+
+    payload = json.dumps({"k": key, "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    """Decode a token produced by encode_cursor back into (sort key, tiebreak id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        key, row_id = payload["k"], int(payload["id"])
+
+        if key["t"] == "dt":
+            return datetime.fromisoformat(key["v"]), row_id
+        if key["t"] == "d":
+            return date.fromisoformat(key["v"]), row_id
+        if key["t"] == "dec":
+            return Decimal(key["v"]), row_id
+        return key["v"], row_id
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def split_page(
+    rows: List[Any],
+    per_page: int,
+    row_key: Callable[[Any], Tuple[Any, int]]
+) -> Tuple[List[Any], Optional[str]]:
+    """Split rows fetched with limit(per_page + 1) into the page and the cursor after it.
+
+    The extra row only shows that another page exists, so the last page gets no
+    cursor even when it is full. row_key maps a row to its (sort key, id).
+    """
+    items = rows[:max(per_page, 0)]
+    if not items or len(rows) <= per_page:
+        return items, None
+    return items, encode_cursor(*row_key(items[-1]))
+
+
+def comparable_sort_column(query: Query, sort_column):
+    """The sort column as a cursor value can be compared with.
+
+    SQLite keeps timestamps as text: 'YYYY-MM-DD HH:MM:SS' when a server default
+    (CURRENT_TIMESTAMP) wrote them, with '.ffffff' appended when SQLAlchemy did, and a
+    cursor value is bound in the longer form. Compared as strings, a row would sort
+    below the cursor of its own second, so stored values are padded to the bound form.
+    """
+    if isinstance(sort_column.type, DateTime) and query.session.get_bind().dialect.name == "sqlite":
+        padded = func.substr(type_coerce(sort_column, String) + ".000000", 1, 26)
+        return type_coerce(padded, sort_column.type)
+    return sort_column
+
+
+def apply_cursor(query: Query, sort_column, id_column, cursor: Optional[str], descending: bool = True) -> Query:
+    """Filter a query to rows after the cursor and order it by (sort key, id).
+
+    The sort column is expected to be non-null; the id column breaks ties so that
+    rows sharing a sort value are neither skipped nor repeated between pages.
+    """
+    direction = desc if descending else asc
+    sort_column = comparable_sort_column(query, sort_column)
+
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        if descending:
+            query = query.filter(or_(
+                sort_column < sort_value,
+                and_(sort_column == sort_value, id_column < row_id)
+            ))
+        else:
+            query = query.filter(or_(
+                sort_column > sort_value,
+                and_(sort_column == sort_value, id_column > row_id)
+            ))
+
+    return query.order_by(direction(sort_column), direction(id_column))
+
 
 class Paginator:
     def __init__(self, query: Query, page: int = 1, per_page: int = 20):
         self.query = query
         self.page = max(1, page)
         self.per_page = min(100, max(1, per_page))
-        
+
     def paginate(self):
         total = self.query.count()
         items = self.query.offset((self.page - 1) * self.per_page).limit(self.per_page).all()
-        
+
         return {
             "items": items,
             "total": total,
@@ -19,3 +117,36 @@ class Paginator:
             "total_pages": (total + self.per_page - 1) // self.per_page
         }
 
+    def cursor_paginate(
+        self,
+        sort_column,
+        id_column,
+        cursor: Optional[str] = None,
+        descending: bool = True,
+        include_total: bool = False,
+        row_key: Optional[Callable[[Any], Tuple[Any, int]]] = None
+    ):
+        """Keyset pagination: seek past the cursor instead of scanning an OFFSET.
+
+        Cost is independent of how deep the client has paged. The total is only
+        counted when include_total is set, since it is the expensive part.
+        row_key maps a result row to its (sort key, id) when the sort column is an
+        expression rather than a mapped attribute of the row.
+        """
+        total = self.query.count() if include_total else None
+
+        query = apply_cursor(self.query, sort_column, id_column, cursor, descending)
+        rows = query.limit(self.per_page + 1).all()
+
+        if row_key is None:
+            row_key = lambda row: (getattr(row, sort_column.key), getattr(row, id_column.key))
+        items, next_cursor = split_page(rows, self.per_page, row_key)
+        has_more = next_cursor is not None
+
+        return {
+            "items": items,
+            "total": total,
+            "per_page": self.per_page,
+            "next_cursor": next_cursor,
+            "has_more": has_more
+        }
@@ -0,0 +1,320 @@
+import os
+import threading
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime
+from time import perf_counter, time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.location_buffer import PeriodicFlusher
+
+# Record API traffic at all, how many finished requests the ring buffer holds
+# between two collections, and how often the collector folds them into histograms
+REQUEST_METRICS_ENABLED = os.getenv("REQUEST_METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+REQUEST_METRICS_BUFFER = int(os.getenv("REQUEST_METRICS_BUFFER", "65536"))
+REQUEST_METRICS_COLLECT_SECONDS = float(os.getenv("REQUEST_METRICS_COLLECT_SECONDS", "1"))
+
+# Upper bounds (ms) of the latency histogram buckets; one more open bucket follows the last
+LATENCY_BUCKETS_MS = (
+    0.5, 1, 2, 3, 5, 7.5, 10, 15, 20, 30, 50, 75, 100, 150, 200,
+    300, 500, 750, 1000, 1500, 2500, 5000, 10000, 30000
+)
+# Route label of requests no route matched (404s), so unknown paths do not add label values
+UNMATCHED_ROUTE = "<unmatched>"
+# Route label of in-flight requests that have not been routed yet
+ROUTING = "<routing>"
+
+RouteKey = Tuple[str, str]  # (method, route template)
+
+
+class RouteStats:
+    """Request count, status codes, sizes and latency histogram of one route"""
+
+    __slots__ = ("count", "client_errors", "errors", "duration_ms", "request_bytes", "response_bytes", "buckets", "statuses")
+
+    def __init__(self):
+        self.count = 0
+        self.client_errors = 0
+        self.errors = 0
+        self.duration_ms = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.statuses: Dict[int, int] = {}
+
+    def add(self, status: int, duration_ms: float, bucket: int, request_bytes: int, response_bytes: int) -> None:
+        self.count += 1
+        if status >= 500:
+            self.errors += 1
+        elif status >= 400:
+            self.client_errors += 1
+        self.duration_ms += duration_ms
+        self.request_bytes += request_bytes
+        self.response_bytes += response_bytes
+        self.buckets[bucket] += 1
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def merge(self, other: "RouteStats") -> None:
+        self.count += other.count
+        self.client_errors += other.client_errors
+        self.errors += other.errors
+        self.duration_ms += other.duration_ms
+        self.request_bytes += other.request_bytes
+        self.response_bytes += other.response_bytes
+        for index, count in enumerate(other.buckets):
+            self.buckets[index] += count
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+
+    def copy(self) -> "RouteStats":
+        stats = RouteStats()
+        stats.merge(self)
+        return stats
+
+
+def route_label(scope: Dict[str, Any], unrouted: str = UNMATCHED_ROUTE) -> str:
+    """Route template a request was routed to; a mount (static files) is labelled <mount path>/{path}"""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if "app_root_path" in scope:
+        return scope["root_path"][len(scope["app_root_path"]):] + "/{path}"
+    return unrouted
+
+
+def histogram_quantile(q: float, buckets: Iterable[Tuple[float, int]]) -> float:
+    """
+    Estimate the q-quantile (0-1) of a latency histogram given as (upper bound,
+    count) pairs, interpolating linearly inside the bucket it falls in, as
+    Prometheus does. Values in the open bucket (bound inf) report the last finite bound.
+    Empty buckets may be left out: every LATENCY_BUCKETS_MS bound is filled in.
+    """
+    counts = dict.fromkeys(LATENCY_BUCKETS_MS, 0)
+    for upper, count in buckets:
+        counts[upper] = counts.get(upper, 0) + count
+    buckets = sorted(counts.items())
+    total = sum(count for _, count in buckets)
+    if not total:
+        return 0.0
+    rank = q * total
+    seen, lower = 0, 0.0
+    for upper, count in buckets:
+        if count and seen + count >= rank:
+            if upper == float("inf"):
+                return lower
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+        if upper != float("inf"):
+            lower = upper
+    return lower
+
+
+class RequestMetrics:
+    """
+    Per-route API traffic of this process.
+
+    The request path never takes a lock: a finished request is one append to a
+    bounded deque (a ring buffer, atomic under the GIL), and an in-flight request
+    is one entry in a dict keyed by its scope. The collector thread drains the
+    ring every REQUEST_METRICS_COLLECT_SECONDS into histograms kept twice: totals
+    since start (for /metrics) and per-hour aggregates waiting to be written to
+    the database. If the ring fills up between two collections, the oldest
+    requests are overwritten and the collection is counted in overflows.
+    """
+
+    def __init__(self, buffer_size: int = REQUEST_METRICS_BUFFER):
+        self.buffer_size = max(1, buffer_size)
+        self._events: deque = deque(maxlen=self.buffer_size)
+        self._active: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._totals: Dict[RouteKey, RouteStats] = {}
+        self._pending: Dict[Tuple[datetime, str, str], RouteStats] = {}
+        self._hour: Optional[Tuple[float, float, datetime]] = None
+        self.started_at = time()
+        self.collected = 0
+        self.overflows = 0
+
+    def _hour_of(self, timestamp: float) -> datetime:
+        # Local hours, like every other timestamp the app stores; the last one is reused
+        if self._hour is None or not self._hour[0] <= timestamp < self._hour[1]:
+            hour = datetime.fromtimestamp(timestamp).replace(minute=0, second=0, microsecond=0)
+            start = hour.timestamp()
+            self._hour = (start, start + 3600, hour)
+        return self._hour[2]
+
+    def collect(self) -> int:
+        """Fold the requests finished since the last call into the histograms; returns how many"""
+        with self._lock:
+            events = self._events
+            available = len(events)
+            if available >= self.buffer_size:
+                self.overflows += 1
+            for _ in range(available):
+                method, route, status, seconds, request_bytes, response_bytes, finished_at = events.popleft()
+                duration_ms = seconds * 1000
+                bucket = bisect_left(LATENCY_BUCKETS_MS, duration_ms)
+                totals = self._totals.get((method, route))
+                if totals is None:
+                    totals = self._totals[(method, route)] = RouteStats()
+                totals.add(status, duration_ms, bucket, request_bytes, response_bytes)
+                key = (self._hour_of(finished_at), method, route)
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = RouteStats()
+                pending.add(status, duration_ms, bucket, request_bytes, response_bytes)
+            self.collected += available
+            return available
+
+    def drain_pending(self) -> Dict[Tuple[datetime, str, str], RouteStats]:
+        """Take the per-hour aggregates not yet written (collects first)"""
+        self.collect()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            return pending
+
+    def requeue(self, pending: Dict[Tuple[datetime, str, str], RouteStats]) -> None:
+        """Put back aggregates whose write failed"""
+        with self._lock:
+            for key, stats in pending.items():
+                current = self._pending.get(key)
+                if current is None:
+                    self._pending[key] = stats
+                else:
+                    current.merge(stats)
+
+    def totals(self) -> Dict[RouteKey, RouteStats]:
+        """Copies of the per-route totals since start (collects first)"""
+        self.collect()
+        with self._lock:
+            return {key: stats.copy() for key, stats in self._totals.items()}
+
+    def in_flight(self) -> Dict[RouteKey, int]:
+        counts: Dict[RouteKey, int] = {}
+        for scope in tuple(self._active.values()):
+            key = (scope.get("method", ""), route_label(scope, ROUTING))
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "buffer_size": self.buffer_size,
+            "buffered": len(self._events),
+            "collected": self.collected,
+            "overflows": self.overflows,
+            "in_flight": len(self._active),
+            "routes": len(self._totals)
+        }
+
+
+class RequestMetricsMiddleware:
+    """
+    Pure ASGI middleware that times every HTTP request and records its route
+    template, status code and request / response body sizes in RequestMetrics.
+    """
+
+    def __init__(self, app, metrics: Optional[RequestMetrics] = None):
+        self.app = app
+        self.metrics = metrics or request_metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        active = self.metrics._active
+        key = id(scope)
+        active[key] = scope
+        status = 500  # an exception before the response starts is answered with a 500
+        request_bytes = response_bytes = 0
+
+        async def receive_counted():
+            nonlocal request_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                request_bytes += len(message.get("body", b""))
+            return message
+
+        async def send_counted(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        start = perf_counter()
+        try:
+            await self.app(scope, receive_counted, send_counted)
+        finally:
+            route = scope.get("route")
+            self.metrics._events.append((
+                scope["method"],
+                route.path if route is not None else route_label(scope),
+                status,
+                perf_counter() - start,
+                request_bytes,
+                response_bytes,
+                time()
+            ))
+            active.pop(key, None)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def render_prometheus(metrics: Optional[RequestMetrics] = None) -> str:
+    """The request metrics in the Prometheus text exposition format (version 0.0.4)"""
+    metrics = metrics or request_metrics
+    totals = sorted(metrics.totals().items())
+    bounds = [f"{bound / 1000:g}" for bound in LATENCY_BUCKETS_MS] + ["+Inf"]
+    lines: List[str] = []
+
+    lines.append("# HELP http_requests_total Requests handled, by route and status code")
+    lines.append("# TYPE http_requests_total counter")
+    for (method, route), stats in totals:
+        labels = f'method="{method}",route="{_label(route)}"'
+        for status, count in sorted(stats.statuses.items()):
+            lines.append(f'http_requests_total{{{labels},status="{status}"}} {count}')
+
+    lines.append("# HELP http_request_duration_seconds Time from receiving a request to sending its last byte")
+    lines.append("# TYPE http_request_duration_seconds histogram")
+    for (method, route), stats in totals:
+        labels = f'method="{method}",route="{_label(route)}"'
+        cumulative = 0
+        for bound, count in zip(bounds, stats.buckets):
+            cumulative += count
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"http_request_duration_seconds_sum{{{labels}}} {stats.duration_ms / 1000:.6f}")
+        lines.append(f"http_request_duration_seconds_count{{{labels}}} {stats.count}")
+
+    for name, attribute, help_text in (
+        ("http_request_size_bytes_total", "request_bytes", "Request body bytes received"),
+        ("http_response_size_bytes_total", "response_bytes", "Response body bytes sent")
+    ):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for (method, route), stats in totals:
+            lines.append(f'{name}{{method="{method}",route="{_label(route)}"}} {getattr(stats, attribute)}')
+
+    lines.append("# HELP http_requests_in_flight Requests being handled right now")
+    lines.append("# TYPE http_requests_in_flight gauge")
+    for (method, route), count in sorted(metrics.in_flight().items()):
+        lines.append(f'http_requests_in_flight{{method="{method}",route="{_label(route)}"}} {count}')
+
+    info = metrics.info()
+    lines.append("# HELP http_request_metrics_overflows_total Collections that found the ring buffer full (oldest requests lost)")
+    lines.append("# TYPE http_request_metrics_overflows_total counter")
+    lines.append(f"http_request_metrics_overflows_total {info['overflows']}")
+    lines.append("# HELP process_start_time_seconds Start time of the process since the epoch")
+    lines.append("# TYPE process_start_time_seconds gauge")
+    lines.append(f"process_start_time_seconds {metrics.started_at:.3f}")
+    return "\n".join(lines) + "\n"
+
+
+request_metrics = RequestMetrics()
+request_metrics_collector = PeriodicFlusher(
+    request_metrics.collect,
+    interval=REQUEST_METRICS_COLLECT_SECONDS,
+    name="request-metrics-collector"
+)
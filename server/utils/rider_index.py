@@ -0,0 +1,185 @@
+import os
+import math
+import heapq
+import threading
+from typing import Container, Dict, Iterable, List, Optional, Tuple
+
+from utils.route_planner import haversine_km
+
+# Grid cell edge (north-south) in km; riders are bucketed by cell for k-NN lookups
+RIDER_INDEX_CELL_KM = float(os.getenv("RIDER_INDEX_CELL_KM", "1.0"))
+
+KM_PER_DEGREE = 111.32
+
+
+class RiderLocationIndex:
+    """
+    Thread-safe in-memory spatial index of rider positions.
+
+    Positions are bucketed into a lat/lng grid of ~RIDER_INDEX_CELL_KM cells.
+    nearest() scans rings of cells outwards from the query point and stops as
+    soon as no unscanned cell can hold a closer rider than the k-th found.
+    """
+
+    def __init__(self, cell_km: float = RIDER_INDEX_CELL_KM):
+        self._cell_deg = cell_km / KM_PER_DEGREE
+        self._lock = threading.Lock()
+        self._positions: Dict[int, Tuple[float, float]] = {}
+        self._cells: Dict[Tuple[int, int], Dict[int, Tuple[float, float]]] = {}
+        self._bounds: Optional[List[int]] = None  # min_row, max_row, min_col, max_col ever occupied
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return math.floor(lat / self._cell_deg), math.floor(lng / self._cell_deg)
+
+    def _discard(self, rider_id: int) -> None:
+        position = self._positions.pop(rider_id, None)
+        if position is None:
+            return
+        key = self._cell(*position)
+        bucket = self._cells.get(key)
+        if bucket is not None:
+            bucket.pop(rider_id, None)
+            if not bucket:
+                del self._cells[key]
+
+    def update(self, rider_id: int, lat: float, lng: float) -> None:
+        """Insert or move a rider"""
+        lat, lng = float(lat), float(lng)
+        key = self._cell(lat, lng)
+        with self._lock:
+            self._discard(rider_id)
+            self._positions[rider_id] = (lat, lng)
+            self._cells.setdefault(key, {})[rider_id] = (lat, lng)
+            row, col = key
+            if self._bounds is None:
+                self._bounds = [row, row, col, col]
+            else:
+                bounds = self._bounds
+                bounds[0], bounds[1] = min(bounds[0], row), max(bounds[1], row)
+                bounds[2], bounds[3] = min(bounds[2], col), max(bounds[3], col)
+
+    def remove(self, rider_id: int) -> None:
+        with self._lock:
+            self._discard(rider_id)
+
+    def replace_all(self, positions: Iterable[Tuple[int, float, float]]) -> None:
+        """Reset the index to exactly these (rider_id, lat, lng) entries"""
+        with self._lock:
+            self._positions.clear()
+            self._cells.clear()
+            self._bounds = None
+        for rider_id, lat, lng in positions:
+            self.update(rider_id, lat, lng)
+
+    def position(self, rider_id: int) -> Optional[Tuple[float, float]]:
+        with self._lock:
+            return self._positions.get(rider_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._positions)
+
+    def __contains__(self, rider_id: int) -> bool:
+        with self._lock:
+            return rider_id in self._positions
+
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        k: int,
+        exclude: Container[int] = (),
+        max_km: Optional[float] = None
+    ) -> List[Tuple[int, float]]:
+        """Up to k (rider_id, km) pairs closest to the point, nearest first"""
+        if k <= 0:
+            return []
+        lat, lng = float(lat), float(lng)
+        row, col = self._cell(lat, lng)
+        best: List[Tuple[float, int]] = []  # max-heap by distance via negation
+
+        with self._lock:
+            if self._bounds is None:
+                return []
+            min_row, max_row, min_col, max_col = self._bounds
+            max_ring = max(row - min_row, max_row - row, col - min_col, max_col - col, 0)
+
+            for ring in range(max_ring + 1):
+                # Anything in this ring or beyond is at least (ring - 1) cells away
+                floor_km = max(ring - 1, 0) * self._ring_cell_km(lat, ring)
+                if max_km is not None and floor_km > max_km:
+                    break
+                if len(best) == k and floor_km > -best[0][0]:
+                    break
+                if (2 * ring + 1) ** 2 > len(self._cells):
+                    # Far from everyone: cheaper to visit the remaining occupied cells directly,
+                    # nearest ring first, with the same cut-off
+                    north_km = self._cell_deg * KM_PER_DEGREE
+                    polar_deg = max(abs(lat), abs(min_row * self._cell_deg), abs((max_row + 1) * self._cell_deg))
+                    east_km = north_km * max(math.cos(math.radians(min(89.0, polar_deg))), 0.01)
+                    remaining = sorted(
+                        (
+                            math.hypot(
+                                max(abs(key[0] - row) - 1, 0) * north_km,
+                                max(abs(key[1] - col) - 1, 0) * east_km
+                            ),
+                            key
+                        )
+                        for key in self._cells
+                        if max(abs(key[0] - row), abs(key[1] - col)) >= ring
+                    )
+                    for floor_km, key in remaining:
+                        if (max_km is not None and floor_km > max_km) or (len(best) == k and floor_km > -best[0][0]):
+                            break
+                        self._scan((key,), lat, lng, k, exclude, max_km, best)
+                    break
+                self._scan(self._ring_cells(row, col, ring), lat, lng, k, exclude, max_km, best)
+
+        return [(rider_id, -negative) for negative, rider_id in sorted(best, reverse=True)]
+
+    def _ring_cell_km(self, lat: float, ring: int) -> float:
+        """Smallest cell edge (km) within `ring` cells of lat; east-west edges shrink towards the poles"""
+        return self._cell_deg * KM_PER_DEGREE * max(
+            math.cos(math.radians(min(89.0, abs(lat) + (ring + 1) * self._cell_deg))), 0.01
+        )
+
+    def _scan(
+        self,
+        keys: Iterable[Tuple[int, int]],
+        lat: float,
+        lng: float,
+        k: int,
+        exclude: Container[int],
+        max_km: Optional[float],
+        best: List[Tuple[float, int]]
+    ) -> None:
+        for key in keys:
+            bucket = self._cells.get(key)
+            if not bucket:
+                continue
+            for rider_id, (rider_lat, rider_lng) in bucket.items():
+                if rider_id in exclude:
+                    continue
+                distance = haversine_km(lat, lng, rider_lat, rider_lng)
+                if max_km is not None and distance > max_km:
+                    continue
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, rider_id))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, rider_id))
+
+    @staticmethod
+    def _ring_cells(row: int, col: int, ring: int) -> Iterable[Tuple[int, int]]:
+        if ring == 0:
+            yield row, col
+            return
+        for c in range(col - ring, col + ring + 1):
+            yield row - ring, c
+            yield row + ring, c
+        for r in range(row - ring + 1, row + ring):
+            yield r, col - ring
+            yield r, col + ring
+
+
+# Online riders of this process; kept current by the delivery person session listeners
+rider_index = RiderLocationIndex()
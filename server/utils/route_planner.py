@@ -0,0 +1,254 @@
+import os
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Average rider speed and time spent at each stop, used for ETAs
+ROUTE_SPEED_KMH = float(os.getenv("ROUTE_SPEED_KMH", "20"))
+ROUTE_SERVICE_MINUTES = float(os.getenv("ROUTE_SERVICE_MINUTES", "5"))
+
+# Local search stops after this many sweeps even if it has not converged
+ROUTE_MAX_PASSES = int(os.getenv("ROUTE_MAX_PASSES", "25"))
+OR_OPT_MAX_SEGMENT = 3
+OR_OPT_NEIGHBOURS = 10
+
+EARTH_RADIUS_KM = 6371.0088
+_EPSILON = 1e-9
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in km"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def distance_matrix(points: Sequence[Tuple[float, float]]) -> List[List[float]]:
+    """Symmetric haversine matrix (km) for (latitude, longitude) points"""
+    radians = [(math.radians(lat), math.radians(lon)) for lat, lon in points]
+    cosines = [math.cos(phi) for phi, _ in radians]
+    size = len(points)
+    matrix = [[0.0] * size for _ in range(size)]
+    for i in range(size):
+        phi1, lambda1 = radians[i]
+        row = matrix[i]
+        for j in range(i + 1, size):
+            phi2, lambda2 = radians[j]
+            a = math.sin((phi2 - phi1) / 2) ** 2 + cosines[i] * cosines[j] * math.sin((lambda2 - lambda1) / 2) ** 2
+            row[j] = matrix[j][i] = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+    return matrix
+
+
+def travel_minutes(distance_km: float, speed_kmh: float = ROUTE_SPEED_KMH) -> float:
+    return distance_km / speed_kmh * 60 if speed_kmh > 0 else 0.0
+
+
+# ===== ROUTE EVALUATION =====
+# Routes are lists of matrix indices starting with 0, the start node. The path is
+# open (the rider does not return to the start); with no start location node 0 is
+# a virtual point at distance 0 from every stop, so the first stop is free to move.
+
+def _route_km(route: List[int], matrix: List[List[float]]) -> float:
+    return sum(matrix[route[k - 1]][route[k]] for k in range(1, len(route)))
+
+
+def _route_lateness(
+    route: List[int],
+    matrix: List[List[float]],
+    deadlines: List[Optional[float]],
+    speed_kmh: float,
+    service_minutes: float
+) -> float:
+    """Total minutes by which stops are reached after their deadline (minutes from start)"""
+    elapsed = 0.0
+    lateness = 0.0
+    for k in range(1, len(route)):
+        elapsed += travel_minutes(matrix[route[k - 1]][route[k]], speed_kmh)
+        deadline = deadlines[route[k]]
+        if deadline is not None and elapsed > deadline:
+            lateness += elapsed - deadline
+        elapsed += service_minutes
+    return lateness
+
+
+def _nearest_neighbour(matrix: List[List[float]]) -> List[int]:
+    route = [0]
+    remaining = set(range(1, len(matrix)))
+    while remaining:
+        row = matrix[route[-1]]
+        nearest = min(remaining, key=lambda node: (row[node], node))
+        route.append(nearest)
+        remaining.remove(nearest)
+    return route
+
+
+def _two_opt_pass(route: List[int], matrix: List[List[float]], accept) -> int:
+    """One sweep of segment reversals, applied in place as they are found; returns moves made"""
+    moves = 0
+    last = len(route) - 1
+    for i in range(1, last):
+        j = i + 1
+        while j <= last:
+            a, b, c = route[i - 1], route[i], route[j]
+            delta = matrix[a][c] - matrix[a][b]
+            if j < last:
+                d = route[j + 1]
+                delta += matrix[b][d] - matrix[c][d]
+            if delta < -_EPSILON:
+                candidate = route[:i] + route[i:j + 1][::-1] + route[j + 1:]
+                if accept(candidate):
+                    route[:] = candidate
+                    moves += 1
+            j += 1
+    return moves
+
+
+def _neighbour_lists(matrix: List[List[float]], size: int) -> List[List[int]]:
+    """The `size` closest other nodes of every node"""
+    nodes = range(len(matrix))
+    return [sorted((other for other in nodes if other != node), key=matrix[node].__getitem__)[:size] for node in nodes]
+
+
+def _or_opt_pass(route: List[int], matrix: List[List[float]], neighbours: List[List[int]], accept) -> int:
+    """One sweep relocating 1-3 stop segments (either direction) next to one of their
+    nearest neighbours, in place; returns moves made"""
+    moves = 0
+    for length in range(1, OR_OPT_MAX_SEGMENT + 1):
+        i = 1
+        while i + length - 1 < len(route):
+            last = len(route) - 1
+            j = i + length - 1
+            first, tail = route[i], route[j]
+            prev = route[i - 1]
+            nxt = route[j + 1] if j < last else None
+            removal = matrix[prev][first]
+            if nxt is not None:
+                removal += matrix[tail][nxt] - matrix[prev][nxt]
+
+            position = {node: index for index, node in enumerate(route)}
+            segment = route[i:j + 1]
+
+            def after(node):
+                index = position[node] + 1
+                if index == i:
+                    index = j + 1
+                return route[index] if index <= last else None
+
+            def before(node):
+                index = position[node] - 1
+                return route[i - 1] if index == j else route[index]
+
+            # (a, b, head, end): segment goes between a and b entering at head, leaving at end
+            options = []
+            for end_node, other in ((first, tail), (tail, first)):
+                for n in neighbours[end_node]:
+                    if i <= position[n] <= j:
+                        continue
+                    options.append((n, after(n), end_node, other))
+                    if n != 0:
+                        options.append((before(n), n, other, end_node))
+
+            for a, b, head, end in options:
+                if a == prev and head == first:
+                    continue
+                insertion = matrix[a][head]
+                if b is not None:
+                    insertion += matrix[end][b] - matrix[a][b]
+                if insertion - removal < -_EPSILON:
+                    rest = route[:i] + route[j + 1:]
+                    at = rest.index(a) + 1
+                    candidate = rest[:at] + (segment if head == first else segment[::-1]) + rest[at:]
+                    if accept(candidate):
+                        route[:] = candidate
+                        moves += 1
+                        break
+            i += 1
+    return moves
+
+
+def plan_route(
+    stops: Sequence[Dict[str, Any]],
+    start: Optional[Tuple[float, float]] = None,
+    start_time: Optional[datetime] = None,
+    speed_kmh: float = ROUTE_SPEED_KMH,
+    service_minutes: float = ROUTE_SERVICE_MINUTES
+) -> Dict[str, Any]:
+    """Order stops into a short open path from start.
+
+    Each stop needs "latitude" and "longitude" and may carry a "deadline" datetime
+    (e.g. expected_delivery_time). The route is built by nearest neighbour (or
+    earliest deadline, when that is less late) and improved with 2-opt and Or-opt
+    moves; when deadlines are present a move is only taken if it does not add
+    lateness, so distance never trades against punctuality.
+
+    Returns the stop indices in visiting order with per-leg km, per-stop ETAs,
+    total km / minutes and total lateness in minutes.
+    """
+    start_time = start_time or datetime.now()
+    count = len(stops)
+    if count == 0:
+        return {"order": [], "legs_km": [], "etas": [], "total_km": 0.0, "total_minutes": 0.0, "late_minutes": 0.0}
+
+    points = [(float(stop["latitude"]), float(stop["longitude"])) for stop in stops]
+    if start is not None:
+        matrix = distance_matrix([(float(start[0]), float(start[1]))] + points)
+    else:
+        matrix = distance_matrix([points[0]] + points)
+        for node in range(count + 1):
+            matrix[0][node] = matrix[node][0] = 0.0
+
+    deadlines: List[Optional[float]] = [None]
+    for stop in stops:
+        deadline = stop.get("deadline")
+        deadlines.append((deadline - start_time).total_seconds() / 60 if deadline else None)
+    timed = any(deadline is not None for deadline in deadlines)
+
+    def lateness(route: List[int]) -> float:
+        return _route_lateness(route, matrix, deadlines, speed_kmh, service_minutes) if timed else 0.0
+
+    route = _nearest_neighbour(matrix)
+    if timed:
+        by_deadline = [0] + sorted(
+            range(1, count + 1),
+            key=lambda node: (deadlines[node] is None, deadlines[node] or 0.0, node)
+        )
+        route = min(route, by_deadline, key=lambda candidate: (lateness(candidate), _route_km(candidate, matrix)))
+
+    current_lateness = [lateness(route)]
+
+    def accept(candidate: List[int]) -> bool:
+        if not timed:
+            return True
+        candidate_lateness = lateness(candidate)
+        if candidate_lateness <= current_lateness[0] + _EPSILON:
+            current_lateness[0] = candidate_lateness
+            return True
+        return False
+
+    neighbours = _neighbour_lists(matrix, OR_OPT_NEIGHBOURS)
+    for _ in range(ROUTE_MAX_PASSES):
+        moves = _two_opt_pass(route, matrix, accept)
+        moves += _or_opt_pass(route, matrix, neighbours, accept)
+        if not moves:
+            break
+
+    legs_km = []
+    etas = []
+    elapsed = 0.0
+    for k in range(1, len(route)):
+        leg = matrix[route[k - 1]][route[k]]
+        elapsed += travel_minutes(leg, speed_kmh)
+        legs_km.append(round(leg, 3))
+        etas.append(start_time + timedelta(minutes=elapsed))
+        elapsed += service_minutes
+
+    return {
+        "order": [node - 1 for node in route[1:]],
+        "legs_km": legs_km,
+        "etas": etas,
+        "total_km": round(_route_km(route, matrix), 3),
+        "total_minutes": round(elapsed, 1),
+        "late_minutes": round(current_lateness[0], 1)
+    }
@@ -0,0 +1,194 @@
+import re
+import math
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Tuple, Optional, Iterable
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Matches below this trigram similarity are not considered typos of each other
+FUZZY_THRESHOLD = 0.3
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-case alphanumeric tokens of a piece of text"""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def trigrams(token: str) -> set:
+    """pg_trgm-style trigrams of a single token (padded with two leading spaces, one trailing)"""
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def trigram_similarity(a: str, b: str) -> float:
+    """Jaccard similarity of two tokens' trigram sets, same measure as pg_trgm similarity()"""
+    ta, tb = trigrams(a), trigrams(b)
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+
+class InMemorySearchIndex:
+    """
+    Thread-safe inverted index used when the database has no full-text support (SQLite).
+
+    Documents have a title (weighted higher) and a body. Ranking is tf-idf, query
+    terms match exactly, by prefix (for autocomplete) or by trigram similarity
+    (typo tolerance), each with a lower weight than the one before.
+    """
+
+    TITLE_WEIGHT = 3.0
+    PREFIX_WEIGHT = 0.7
+    FUZZY_WEIGHT = 0.5
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._doc_terms: Dict[int, set] = {}
+        self._titles: Dict[int, str] = {}
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+        self._trigram_map: Dict[str, set] = defaultdict(set)
+        self.loaded = False
+
+    # ---------- maintenance ----------
+
+    def add(self, doc_id: int, title: Optional[str], body: Optional[str] = None) -> None:
+        """Index (or re-index) a document"""
+        with self._lock:
+            self._remove_unlocked(doc_id)
+
+            weights: Dict[str, float] = defaultdict(float)
+            for token in tokenize(title):
+                weights[token] += self.TITLE_WEIGHT
+            for token in tokenize(body):
+                weights[token] += 1.0
+
+            for token, weight in weights.items():
+                if token not in self._postings:
+                    self._vocabulary_dirty = True
+                    for gram in trigrams(token):
+                        self._trigram_map[gram].add(token)
+                self._postings[token][doc_id] = weight
+
+            self._doc_terms[doc_id] = set(weights)
+            self._titles[doc_id] = title or ""
+
+    def remove(self, doc_id: int) -> None:
+        """Drop a document from the index"""
+        with self._lock:
+            self._remove_unlocked(doc_id)
+
+    def rebuild(self, documents: Iterable[Tuple[int, Optional[str], Optional[str]]]) -> None:
+        """Replace the whole index with (doc_id, title, body) rows"""
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._titles.clear()
+            self._trigram_map.clear()
+            self._vocabulary = []
+            self._vocabulary_dirty = True
+            for doc_id, title, body in documents:
+                self.add(doc_id, title, body)
+            self.loaded = True
+
+    def _remove_unlocked(self, doc_id: int) -> None:
+        for token in self._doc_terms.pop(doc_id, ()):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[token]
+                for gram in trigrams(token):
+                    self._trigram_map[gram].discard(token)
+                self._vocabulary_dirty = True
+        self._titles.pop(doc_id, None)
+
+    def _sorted_vocabulary(self) -> List[str]:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        return self._vocabulary
+
+    # ---------- lookup ----------
+
+    def _prefix_terms(self, prefix: str, limit: int = 50) -> List[str]:
+        vocabulary = self._sorted_vocabulary()
+        start = bisect_left(vocabulary, prefix)
+        terms = []
+        for term in vocabulary[start:]:
+            if not term.startswith(prefix) or len(terms) >= limit:
+                break
+            terms.append(term)
+        return terms
+
+    def _fuzzy_terms(self, token: str, limit: int = 10) -> List[Tuple[str, float]]:
+        candidates = set()
+        for gram in trigrams(token):
+            candidates |= self._trigram_map.get(gram, set())
+
+        scored = [(term, trigram_similarity(token, term)) for term in candidates]
+        scored = [(term, sim) for term, sim in scored if sim >= FUZZY_THRESHOLD]
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+        return scored[:limit]
+
+    def _expand(self, token: str, allow_prefix: bool) -> List[Tuple[str, float]]:
+        """Index terms a query token matches, with a weight per kind of match"""
+        if token in self._postings:
+            expansions = [(token, 1.0)]
+        else:
+            expansions = []
+
+        if allow_prefix:
+            expansions += [
+                (term, self.PREFIX_WEIGHT) for term in self._prefix_terms(token) if term != token
+            ]
+
+        if not expansions:
+            expansions = [(term, self.FUZZY_WEIGHT * sim) for term, sim in self._fuzzy_terms(token)]
+
+        return expansions
+
+    def search(self, query: str, limit: int = 1000, prefix_last: bool = True) -> List[Tuple[int, float]]:
+        """Ranked (doc_id, score) pairs; every query token must match (exactly, by prefix or fuzzily)"""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        with self._lock:
+            total_docs = max(len(self._doc_terms), 1)
+            scores: Optional[Dict[int, float]] = None
+
+            for position, token in enumerate(tokens):
+                allow_prefix = prefix_last and position == len(tokens) - 1
+                token_scores: Dict[int, float] = defaultdict(float)
+
+                for term, match_weight in self._expand(token, allow_prefix):
+                    postings = self._postings[term]
+                    idf = math.log(1 + total_docs / len(postings))
+                    for doc_id, tf in postings.items():
+                        token_scores[doc_id] = max(token_scores[doc_id], match_weight * tf * idf)
+
+                if scores is None:
+                    scores = dict(token_scores)
+                else:
+                    scores = {
+                        doc_id: score + token_scores[doc_id]
+                        for doc_id, score in scores.items() if doc_id in token_scores
+                    }
+                if not scores:
+                    return []
+
+        ranked = sorted(scores.items(), key=lambda pair: (-pair[1], pair[0]))
+        return ranked[:limit]
+
+    def suggest(self, query: str, limit: int = 10) -> List[str]:
+        """Titles of the best matching documents, for autocomplete"""
+        ranked = self.search(query, limit=limit, prefix_last=True)
+        with self._lock:
+            return [self._titles[doc_id] for doc_id, _ in ranked if doc_id in self._titles]
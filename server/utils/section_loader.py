@@ -0,0 +1,66 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Tuple
+
+# Threads shared by every composite endpoint, and how long one waits for its sections
+SECTION_POOL_SIZE = int(os.getenv("SECTION_POOL_SIZE", "8"))
+SECTION_TIMEOUT_SECONDS = float(os.getenv("SECTION_TIMEOUT_SECONDS", "3"))
+
+SECTION_OK = "ok"
+SECTION_TIMEOUT = "timeout"
+SECTION_ERROR = "error"
+
+_executor = ThreadPoolExecutor(max_workers=SECTION_POOL_SIZE, thread_name_prefix="section")
+
+
+def _run_section(loader: Callable, session_factory: Callable) -> Tuple[Any, float]:
+    started = time.perf_counter()
+    db = session_factory()
+    try:
+        return loader(db), (time.perf_counter() - started) * 1000
+    finally:
+        db.close()
+
+
+def load_sections(
+    loaders: Dict[str, Callable[[Any], Any]],
+    session_factory: Callable[[], Any],
+    timeout: float = SECTION_TIMEOUT_SECONDS
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Run independent read-only loaders concurrently, each with its own session.
+
+    Returns (results, timings): results holds only the sections that finished in
+    time; timings has one entry per section with its status (ok / timeout / error)
+    and elapsed milliseconds. A section that times out keeps running in the pool
+    and closes its session when it finishes; its result is discarded.
+    """
+    started = time.perf_counter()
+    futures = {name: _executor.submit(_run_section, loader, session_factory) for name, loader in loaders.items()}
+    wait(futures.values(), timeout=timeout)
+
+    results: Dict[str, Any] = {}
+    timings: List[Dict[str, Any]] = []
+    for name, future in futures.items():
+        if not future.done():
+            future.cancel()  # only helps if it never started
+            timings.append({
+                "section": name,
+                "status": SECTION_TIMEOUT,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+                "error": None
+            })
+            continue
+        try:
+            results[name], elapsed_ms = future.result()
+            timings.append({"section": name, "status": SECTION_OK, "elapsed_ms": round(elapsed_ms, 1), "error": None})
+        except Exception as e:
+            print(f"⚠️ Section {name} failed: {e}")
+            timings.append({
+                "section": name,
+                "status": SECTION_ERROR,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+                "error": str(e)
+            })
+    return results, timings
@@ -0,0 +1,117 @@
+"""
+Local SMTP stand-in: accepts every message and keeps it in memory.
+
+Point SMTPTransport at it to exercise real SMTP delivery without a mail server:
+
+    python -m utils.smtp_sink --port 1025
+    MAIL_TRANSPORT=smtp SMTP_PORT=1025 uvicorn main:app
+
+Tests can start one in-process with SMTPSink(port=0).start() and read .messages.
+Only the commands smtplib needs are implemented (no auth, no TLS).
+"""
+import argparse
+import socketserver
+import threading
+from email import message_from_bytes
+from email.message import Message
+from typing import List, Optional, Set
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        sink: "SMTPSink" = self.server.sink
+        self._reply("220 nexora smtp sink ready")
+        sender, recipients = None, []
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode(errors="replace").rstrip("\r\n")
+            command = line[:4].upper()
+
+            if command in ("HELO", "EHLO"):
+                self._reply("250 nexora")
+            elif command == "MAIL":
+                sender, recipients = line[10:].strip(), []
+                self._reply("250 OK")
+            elif command == "RCPT":
+                recipient = line[8:].strip().strip("<>")
+                if recipient in sink.reject:
+                    self._reply(f"550 No such user {recipient}")
+                else:
+                    recipients.append(recipient)
+                    self._reply("250 OK")
+            elif command == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b".\r\n", b".\n"):
+                        break
+                    lines.append(data[1:] if data.startswith(b"..") else data)
+                sink.received(message_from_bytes(b"".join(lines)), sender, recipients)
+                self._reply("250 OK queued")
+            elif command == "RSET":
+                sender, recipients = None, []
+                self._reply("250 OK")
+            elif command == "NOOP":
+                self._reply("250 OK")
+            elif command == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class SMTPSink:
+    """Threaded SMTP server that stores what it receives; recipients in reject get a 550"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 1025, echo: bool = False, reject: Optional[Set[str]] = None):
+        self._server = _Server((host, port), _SMTPHandler)
+        self._server.sink = self
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.echo = echo
+        self.reject = set(reject or ())
+        self.messages: List[Message] = []
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def received(self, message: Message, sender: Optional[str], recipients: List[str]) -> None:
+        with self._lock:
+            self.messages.append(message)
+        if self.echo:
+            print(f"📨 {sender} -> {', '.join(recipients)}: {message['Subject']}")
+
+    def start(self) -> "SMTPSink":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="smtp-sink", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local SMTP sink for development")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    args = parser.parse_args()
+    sink = SMTPSink(args.host, args.port, echo=True)
+    print(f"✅ SMTP sink listening on {args.host}:{sink.port}")
+    try:
+        sink._server.serve_forever()
+    except KeyboardInterrupt:
+        sink.stop()